@@ -22,12 +22,27 @@
 
 ''' Build redirection table for the master server '''
 
+#
+# Usage: ./MasterSrv/redir_table.py [-o file]
+#
+# Writes the compiled redirection table (see neubot/rendezvous/redir_table.py)
+# into MasterSrv/redir_table.json or into the given file.  MasterSrv/start.sh
+# installs it at /var/lib/neubot/redir_table.json, where the rendezvous server
+# picks it up, also when it is already running.
+#
+
 import asyncore
 import collections
+import getopt
 import sys
 import time
 
-def realmain():
+if __name__ == '__main__':
+    sys.path.insert(0, '.')
+
+from neubot.rendezvous import redir_table
+
+def build_table():
 
     ''' Build redirection table for the master server '''
 
@@ -60,7 +75,7 @@ def realmain():
     sys.stderr.write('Checking for empty continents... done\n')
 
     sys.stderr.write('Build redirection table...\n')
-    redir_table = {}
+    table = {}
     filep = open('MasterSrv/countries.dat', 'rb')
     for line in filep:
         if line.startswith('#'):
@@ -69,38 +84,50 @@ def realmain():
         #
         # Simplified policy, which uses just one server per continent
         # to avoid jumping from close to distant servers, which may be
-        # surprising.
+        # surprising.  We pick the first server in alphabetical order
+        # so that the output does not change from run to run.
         # The plan is to migrate to DONAR DNS before Neubot 0.5.0.
         #
         if country in nodes_by_country:
-            redir_table[country] = set(nodes_by_country[country])
+            table[country] = set(nodes_by_country[country])
         elif continent in nodes_by_continent:
-            redir_table[country] = set([list(nodes_by_continent[continent])[0]])
+            table[country] = set([sorted(nodes_by_continent[continent])[0]])
         else:
             sys.stderr.write('Internal error: no country/continent: %s/%s\n' %
                               (country, continent))
-            redir_table[country] = set(['master.neubot.org'])
+            table[country] = set(['master.neubot.org'])
+    filep.close()
     sys.stderr.write('Build redirection table... done\n')
 
-    prefix = 'sqlite3 $database'
-    sys.stdout.write('#!/bin/sh\n')
-    date = time.asctime(time.gmtime())
-    sys.stdout.write('# Autogenerated by MasterSrv/redir_table.py, %s\n' % date)
-    sys.stdout.write('database=/var/lib/neubot/database.sqlite3\n')
-    sys.stdout.write("%s 'CREATE TABLE IF NOT EXISTS geoloc ( "
-                     "id INTEGER PRIMARY KEY, country TEXT, address TEXT);'\n"
-                     % prefix)
-    sys.stdout.write("%s 'DELETE FROM geoloc;'\n" % prefix)
-    for country, addresses in redir_table.items():
-        for address in addresses:
-            sys.stdout.write("%s 'INSERT INTO geoloc (id, country, address) "
-                             "VALUES (NULL, \"%s\", \"%s:8080\");'\n" %
-                                 (prefix, country, address))
+    return dict((country, ['%s:8080' % address for address in addresses])
+                for country, addresses in table.items())
+
+def realmain():
+
+    ''' Build and write the redirection table '''
+
+    try:
+        options, arguments = getopt.getopt(sys.argv[1:], 'o:')
+    except getopt.error:
+        sys.exit('usage: ./MasterSrv/redir_table.py [-o file]')
+    if arguments:
+        sys.exit('usage: ./MasterSrv/redir_table.py [-o file]')
+
+    path = 'MasterSrv/redir_table.json'
+    for name, value in options:
+        if name == '-o':
+            path = value
+
+    table = build_table()
+    redir_table.write_table(path, table, time.asctime(time.gmtime()))
+    sys.stderr.write('Written %d countries to %s\n' % (len(table), path))
 
 def main():
     ''' Wrapper for the real main '''
     try:
         realmain()
+    except SystemExit:
+        raise
     except:
         sys.stderr.write('%s\n' % str(asyncore.compact_traceback()))
         sys.exit(1)
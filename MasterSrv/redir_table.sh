@@ -1,355 +0,0 @@
-#!/bin/sh
-# Autogenerated by MasterSrv/redir_table.py, Fri Oct 25 13:24:53 2013
-database=/var/lib/neubot/database.sqlite3
-sqlite3 $database 'CREATE TABLE IF NOT EXISTS geoloc ( id INTEGER PRIMARY KEY, country TEXT, address TEXT);'
-sqlite3 $database 'DELETE FROM geoloc;'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "BD", "neubot.mlab.mlab3.hnd01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "BE", "neubot.mlab.mlab2.ams01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "BF", "neubot.mlab.mlab3.tun01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "BG", "neubot.mlab.mlab2.ams01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "BA", "neubot.mlab.mlab2.ams01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "BB", "neubot.mlab.mlab2.iad01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "WF", "neubot.mlab.mlab1.wlg01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "BL", "neubot.mlab.mlab2.iad01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "BM", "neubot.mlab.mlab2.iad01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "BN", "neubot.mlab.mlab3.hnd01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "BO", "neubot.mlab.mlab1.bog01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "BH", "neubot.mlab.mlab3.hnd01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "BI", "neubot.mlab.mlab3.tun01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "BJ", "neubot.mlab.mlab3.tun01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "BT", "neubot.mlab.mlab3.hnd01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "JM", "neubot.mlab.mlab2.iad01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "BV", "neubot.mlab.mlab1.wlg01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "BW", "neubot.mlab.mlab3.tun01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "WS", "neubot.mlab.mlab1.wlg01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "BQ", "neubot.mlab.mlab2.iad01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "BR", "neubot.mlab.mlab1.bog01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "BS", "neubot.mlab.mlab2.iad01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "JE", "neubot.mlab.mlab2.ams01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "BY", "neubot.mlab.mlab2.ams01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "BZ", "neubot.mlab.mlab2.iad01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "RU", "neubot.mlab.mlab3.hnd01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "RW", "neubot.mlab.mlab3.tun01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "RS", "neubot.mlab.mlab2.ams01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "TL", "neubot.mlab.mlab3.hnd01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "RE", "neubot.mlab.mlab3.tun01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "TM", "neubot.mlab.mlab3.hnd01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "TJ", "neubot.mlab.mlab3.hnd01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "RO", "neubot.mlab.mlab2.ams01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "TK", "neubot.mlab.mlab1.wlg01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "GW", "neubot.mlab.mlab3.tun01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "GU", "neubot.mlab.mlab1.wlg01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "GT", "neubot.mlab.mlab2.iad01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "GS", "neubot.mlab.mlab1.wlg01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "GR", "neubot.mlab.mlab2.ath02.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "GR", "neubot.mlab.mlab2.ath01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "GR", "neubot.mlab.mlab3.ath01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "GR", "neubot.mlab.mlab3.ath02.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "GR", "neubot.mlab.mlab1.ath01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "GR", "neubot.mlab.mlab1.ath02.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "GQ", "neubot.mlab.mlab3.tun01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "GP", "neubot.mlab.mlab2.iad01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "JP", "neubot.mlab.mlab3.hnd01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "JP", "neubot.mlab.mlab2.hnd01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "JP", "neubot.mlab.mlab1.hnd01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "GY", "neubot.mlab.mlab1.bog01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "GG", "neubot.mlab.mlab2.ams01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "GF", "neubot.mlab.mlab1.bog01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "GE", "neubot.mlab.mlab3.hnd01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "GD", "neubot.mlab.mlab2.iad01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "GB", "neubot.mlab.mlab2.lhr01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "GB", "neubot.mlab.mlab2.lba01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "GB", "neubot.mlab.mlab3.lba01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "GB", "neubot.mlab.mlab3.lhr01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "GB", "neubot.mlab.mlab1.lhr01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "GB", "neubot.mlab.mlab1.lba01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "GA", "neubot.mlab.mlab3.tun01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "GN", "neubot.mlab.mlab3.tun01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "GM", "neubot.mlab.mlab3.tun01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "GL", "neubot.mlab.mlab2.iad01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "GI", "neubot.mlab.mlab2.ams01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "GH", "neubot.mlab.mlab3.tun01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "OM", "neubot.mlab.mlab3.hnd01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "TN", "neubot.mlab.mlab1.tun01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "TN", "neubot.mlab.mlab3.tun01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "TN", "neubot.mlab.mlab2.tun01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "JO", "neubot.mlab.mlab3.hnd01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "HR", "neubot.mlab.mlab2.ams01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "HT", "neubot.mlab.mlab2.iad01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "HU", "neubot.mlab.mlab2.ams01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "HK", "neubot.mlab.mlab3.hnd01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "HN", "neubot.mlab.mlab2.iad01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "HM", "neubot.mlab.mlab1.wlg01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "VE", "neubot.mlab.mlab1.bog01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "PR", "neubot.mlab.mlab2.iad01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "PS", "neubot.mlab.mlab3.hnd01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "PW", "neubot.mlab.mlab1.wlg01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "PT", "neubot.mlab.mlab2.ams01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "KN", "neubot.mlab.mlab2.iad01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "AF", "neubot.mlab.mlab3.hnd01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "AI", "neubot.mlab.mlab2.iad01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "PA", "neubot.mlab.mlab2.iad01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "PF", "neubot.mlab.mlab1.wlg01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "PG", "neubot.mlab.mlab1.wlg01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "PE", "neubot.mlab.mlab1.bog01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "PK", "neubot.mlab.mlab3.hnd01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "PH", "neubot.mlab.mlab3.hnd01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "PN", "neubot.mlab.mlab1.wlg01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "PL", "neubot.mlab.mlab4.prg01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "PL", "neubot.mlab.mlab1.prg01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "PL", "neubot.mlab.mlab2.prg01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "PL", "neubot.mlab.mlab3.prg01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "PM", "neubot.mlab.mlab2.iad01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "ZM", "neubot.mlab.mlab3.tun01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "EH", "neubot.mlab.mlab3.tun01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "EE", "neubot.mlab.mlab2.ams01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "EG", "neubot.mlab.mlab3.tun01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "ZA", "neubot.mlab.mlab2.jnb01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "ZA", "neubot.mlab.mlab1.jnb01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "ZA", "neubot.mlab.mlab3.jnb01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "EC", "neubot.mlab.mlab1.bog01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "IT", "neubot.mlab.mlab3.mil01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "IT", "neubot.mlab.mlab1.mil01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "IT", "neubot.mlab.mlab2.trn01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "IT", "neubot.mlab.mlab3.trn01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "IT", "neubot.mlab.mlab1.trn01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "IT", "neubot.mlab.mlab2.mil01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "VN", "neubot.mlab.mlab3.hnd01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "KZ", "neubot.mlab.mlab3.hnd01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "ET", "neubot.mlab.mlab3.tun01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "SO", "neubot.mlab.mlab3.tun01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "ZW", "neubot.mlab.mlab3.tun01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "SA", "neubot.mlab.mlab3.hnd01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "ES", "neubot.mlab.mlab3.mad01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "ES", "neubot.mlab.mlab1.mad01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "ES", "neubot.mlab.mlab2.mad01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "ER", "neubot.mlab.mlab3.tun01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "ME", "neubot.mlab.mlab2.ams01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "MD", "neubot.mlab.mlab2.ams01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "MG", "neubot.mlab.mlab3.tun01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "MF", "neubot.mlab.mlab2.iad01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "MA", "neubot.mlab.mlab3.tun01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "MC", "neubot.mlab.mlab2.ams01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "UZ", "neubot.mlab.mlab3.hnd01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "MM", "neubot.mlab.mlab3.hnd01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "ML", "neubot.mlab.mlab3.tun01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "MO", "neubot.mlab.mlab3.hnd01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "MN", "neubot.mlab.mlab3.hnd01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "MH", "neubot.mlab.mlab1.wlg01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "MK", "neubot.mlab.mlab2.ams01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "MU", "neubot.mlab.mlab3.tun01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "MT", "neubot.mlab.mlab2.ams01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "MW", "neubot.mlab.mlab3.tun01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "MV", "neubot.mlab.mlab3.hnd01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "MQ", "neubot.mlab.mlab2.iad01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "MP", "neubot.mlab.mlab1.wlg01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "MS", "neubot.mlab.mlab2.iad01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "MR", "neubot.mlab.mlab3.tun01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "IM", "neubot.mlab.mlab2.ams01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "UG", "neubot.mlab.mlab3.tun01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "TZ", "neubot.mlab.mlab3.tun01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "MY", "neubot.mlab.mlab3.hnd01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "MX", "neubot.mlab.mlab2.iad01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "IL", "neubot.mlab.mlab3.hnd01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "FR", "neubot.mlab.mlab2.par01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "FR", "neubot.mlab.mlab1.par01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "FR", "neubot.mlab.mlab3.par01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "AW", "neubot.mlab.mlab2.iad01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "SH", "neubot.mlab.mlab3.tun01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "SJ", "neubot.mlab.mlab2.ams01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "FI", "neubot.mlab.mlab2.ams01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "FJ", "neubot.mlab.mlab1.wlg01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "FK", "neubot.mlab.mlab1.bog01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "FM", "neubot.mlab.mlab1.wlg01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "FO", "neubot.mlab.mlab2.ams01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "NI", "neubot.mlab.mlab2.iad01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "NL", "neubot.mlab.mlab2.ams02.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "NL", "neubot.mlab.mlab2.ams01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "NL", "neubot.mlab.mlab3.ams02.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "NL", "neubot.mlab.mlab1.ams01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "NL", "neubot.mlab.mlab1.ams02.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "NL", "neubot.mlab.mlab3.ams01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "NO", "neubot.mlab.mlab2.svg01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "NO", "neubot.mlab.mlab1.svg01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "NO", "neubot.mlab.mlab3.svg01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "NA", "neubot.mlab.mlab3.tun01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "VU", "neubot.mlab.mlab1.wlg01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "NC", "neubot.mlab.mlab1.wlg01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "NE", "neubot.mlab.mlab3.tun01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "NF", "neubot.mlab.mlab1.wlg01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "NG", "neubot.mlab.mlab3.tun01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "NZ", "neubot.mlab.mlab1.wlg01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "NZ", "neubot.mlab.mlab3.wlg01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "NZ", "neubot.mlab.mlab2.wlg01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "NZ", "neubot.mlab.mlab2.akl01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "NZ", "neubot.mlab.mlab1.akl01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "NZ", "neubot.mlab.mlab3.akl01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "NP", "neubot.mlab.mlab3.hnd01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "NR", "neubot.mlab.mlab1.wlg01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "NU", "neubot.mlab.mlab1.wlg01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "CK", "neubot.mlab.mlab1.wlg01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "CI", "neubot.mlab.mlab3.tun01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "CH", "neubot.mlab.mlab2.ams01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "CO", "neubot.mlab.mlab1.bog01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "CO", "neubot.mlab.mlab3.bog01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "CO", "neubot.mlab.mlab2.bog01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "CN", "neubot.mlab.mlab3.hnd01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "CM", "neubot.mlab.mlab3.tun01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "CL", "neubot.mlab.mlab1.bog01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "CC", "neubot.mlab.mlab3.hnd01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "CA", "neubot.mlab.mlab2.iad01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "CG", "neubot.mlab.mlab3.tun01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "CF", "neubot.mlab.mlab3.tun01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "CD", "neubot.mlab.mlab3.tun01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "CZ", "neubot.mlab.mlab2.ams01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "CY", "neubot.mlab.mlab1.lca01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "CY", "neubot.mlab.mlab3.lca01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "CY", "neubot.mlab.mlab2.lca01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "CX", "neubot.mlab.mlab3.hnd01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "CR", "neubot.mlab.mlab2.iad01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "PY", "neubot.mlab.mlab1.bog01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "CW", "neubot.mlab.mlab2.iad01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "CV", "neubot.mlab.mlab3.tun01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "CU", "neubot.mlab.mlab2.iad01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "SZ", "neubot.mlab.mlab3.tun01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "SY", "neubot.mlab.mlab3.hnd01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "SX", "neubot.mlab.mlab2.iad01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "KG", "neubot.mlab.mlab3.hnd01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "KE", "neubot.mlab.mlab2.nbo01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "KE", "neubot.mlab.mlab1.nbo01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "KE", "neubot.mlab.mlab3.nbo01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "SR", "neubot.mlab.mlab1.bog01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "KI", "neubot.mlab.mlab1.wlg01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "KH", "neubot.mlab.mlab3.hnd01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "SV", "neubot.mlab.mlab2.iad01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "KM", "neubot.mlab.mlab3.tun01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "ST", "neubot.mlab.mlab3.tun01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "SK", "neubot.mlab.mlab2.ams01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "KR", "neubot.mlab.mlab3.hnd01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "SI", "neubot.mlab.mlab2.lju01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "SI", "neubot.mlab.mlab1.lju01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "SI", "neubot.mlab.mlab3.lju01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "KP", "neubot.mlab.mlab3.hnd01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "KW", "neubot.mlab.mlab3.hnd01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "SN", "neubot.mlab.mlab3.tun01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "SM", "neubot.mlab.mlab2.ams01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "SL", "neubot.mlab.mlab3.tun01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "SC", "neubot.mlab.mlab3.tun01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "SB", "neubot.mlab.mlab1.wlg01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "KY", "neubot.mlab.mlab2.iad01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "SG", "neubot.mlab.mlab3.hnd01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "SE", "neubot.mlab.mlab3.arn01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "SE", "neubot.mlab.mlab1.arn01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "SE", "neubot.mlab.mlab2.arn01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "SD", "neubot.mlab.mlab3.tun01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "DO", "neubot.mlab.mlab2.iad01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "DM", "neubot.mlab.mlab2.iad01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "DJ", "neubot.mlab.mlab3.tun01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "DK", "neubot.mlab.mlab2.ams01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "DE", "neubot.mlab.mlab3.ham01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "DE", "neubot.mlab.mlab1.ham01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "DE", "neubot.mlab.mlab2.ham01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "YE", "neubot.mlab.mlab3.hnd01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "DZ", "neubot.mlab.mlab3.tun01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "US", "neubot.mlab.mlab2.iad01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "US", "neubot.mlab.mlab1.mia01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "US", "neubot.mlab.mlab3.atl01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "US", "neubot.mlab.mlab4.nuq01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "US", "neubot.mlab.mlab1.iad01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "US", "neubot.mlab.mlab1.lga01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "US", "neubot.mlab.mlab3.ord01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "US", "neubot.mlab.mlab1.dfw01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "US", "neubot.mlab.mlab4.nuq02.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "US", "neubot.mlab.mlab3.dfw01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "US", "neubot.mlab.mlab1.sea01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "US", "neubot.mlab.mlab3.lga02.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "US", "neubot.mlab.mlab1.nuq02.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "US", "neubot.mlab.mlab2.atl01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "US", "neubot.mlab.mlab1.nuq0t.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "US", "neubot.mlab.mlab2.lga02.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "US", "neubot.mlab.mlab1.atl01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "US", "neubot.mlab.mlab2.nuq0t.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "US", "neubot.mlab.mlab2.dfw01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "US", "neubot.mlab.mlab1.lga02.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "US", "neubot.mlab.mlab2.mia01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "US", "neubot.mlab.mlab2.nuq01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "US", "neubot.mlab.mlab3.nuq0t.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "US", "neubot.mlab.mlab3.mia01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "US", "neubot.mlab.mlab1.nuq01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "US", "neubot.mlab.mlab2.sea01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "US", "neubot.mlab.mlab3.lga01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "US", "neubot.mlab.mlab2.lga01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "US", "neubot.mlab.mlab3.iad01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "US", "neubot.mlab.mlab3.nuq02.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "US", "neubot.mlab.mlab1.ord01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "US", "neubot.mlab.mlab2.ord01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "US", "neubot.mlab.mlab3.sea01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "US", "neubot.mlab.mlab3.nuq01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "US", "neubot.mlab.mlab1.lax01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "US", "neubot.mlab.mlab2.lax01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "US", "neubot.mlab.mlab3.lax01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "US", "neubot.mlab.mlab2.nuq02.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "US", "neubot.mlab.mlab4.nuq0t.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "UY", "neubot.mlab.mlab1.bog01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "YT", "neubot.mlab.mlab3.tun01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "UM", "neubot.mlab.mlab2.iad01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "LB", "neubot.mlab.mlab3.hnd01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "LC", "neubot.mlab.mlab2.iad01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "LA", "neubot.mlab.mlab3.hnd01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "TV", "neubot.mlab.mlab1.wlg01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "TW", "neubot.mlab.mlab1.tpe01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "TW", "neubot.mlab.mlab2.tpe01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "TW", "neubot.mlab.mlab3.tpe01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "TT", "neubot.mlab.mlab2.iad01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "TR", "neubot.mlab.mlab3.hnd01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "LK", "neubot.mlab.mlab3.hnd01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "LI", "neubot.mlab.mlab2.ams01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "LV", "neubot.mlab.mlab2.ams01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "TO", "neubot.mlab.mlab1.wlg01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "LT", "neubot.mlab.mlab2.ams01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "LU", "neubot.mlab.mlab2.ams01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "LR", "neubot.mlab.mlab3.tun01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "LS", "neubot.mlab.mlab3.tun01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "TH", "neubot.mlab.mlab3.hnd01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "TF", "neubot.mlab.mlab1.wlg01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "TG", "neubot.mlab.mlab3.tun01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "TD", "neubot.mlab.mlab3.tun01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "TC", "neubot.mlab.mlab2.iad01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "LY", "neubot.mlab.mlab3.tun01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "VA", "neubot.mlab.mlab2.ams01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "VC", "neubot.mlab.mlab2.iad01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "AE", "neubot.mlab.mlab3.hnd01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "AD", "neubot.mlab.mlab2.ams01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "AG", "neubot.mlab.mlab2.iad01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "VG", "neubot.mlab.mlab2.iad01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "IQ", "neubot.mlab.mlab3.hnd01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "VI", "neubot.mlab.mlab2.iad01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "IS", "neubot.mlab.mlab2.ams01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "IR", "neubot.mlab.mlab3.hnd01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "AM", "neubot.mlab.mlab3.hnd01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "AL", "neubot.mlab.mlab2.ams01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "AO", "neubot.mlab.mlab3.tun01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "AN", "neubot.mlab.mlab2.iad01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "AQ", "neubot.mlab.mlab1.wlg01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "AS", "neubot.mlab.mlab1.wlg01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "AR", "neubot.mlab.mlab1.bog01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "AU", "neubot.mlab.mlab2.syd01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "AU", "neubot.mlab.mlab1.syd02.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "AU", "neubot.mlab.mlab2.syd02.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "AU", "neubot.mlab.mlab1.syd01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "AU", "neubot.mlab.mlab3.syd02.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "AU", "neubot.mlab.mlab3.syd01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "AT", "neubot.mlab.mlab2.vie01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "AT", "neubot.mlab.mlab1.vie01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "AT", "neubot.mlab.mlab3.vie01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "IO", "neubot.mlab.mlab3.hnd01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "IN", "neubot.mlab.mlab3.hnd01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "AX", "neubot.mlab.mlab2.ams01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "AZ", "neubot.mlab.mlab3.hnd01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "IE", "neubot.mlab.mlab2.dub01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "IE", "neubot.mlab.mlab1.dub01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "IE", "neubot.mlab.mlab3.dub01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "ID", "neubot.mlab.mlab3.hnd01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "UA", "neubot.mlab.mlab2.ams01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "QA", "neubot.mlab.mlab3.hnd01.measurement-lab.org:8080");'
-sqlite3 $database 'INSERT INTO geoloc (id, country, address) VALUES (NULL, "MZ", "neubot.mlab.mlab3.tun01.measurement-lab.org:8080");'
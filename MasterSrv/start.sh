@@ -32,11 +32,10 @@ PYTHON=/usr/bin/python
 [ $(id -u) -eq 0 ] || { echo 'you must be root' 1>&2; exit 1; }
 
 $DEBUG $INSTDIR/MasterSrv/stop.sh
-$DEBUG /bin/sh $INSTDIR/MasterSrv/redir_table.sh
 
-$DEBUG sqlite3 /var/lib/neubot/database.sqlite3 'select * from geoloc';
-$DEBUG echo 'If the GEOLOC table looks ugly, hit ^C NOW!'
-$DEBUG sleep 3
+# Replace the table atomically, a running server reloads it
+$DEBUG cp $INSTDIR/MasterSrv/redir_table.json /var/lib/neubot/redir_table.json.new
+$DEBUG mv /var/lib/neubot/redir_table.json.new /var/lib/neubot/redir_table.json
 
 [ -f $INSTDIR/../neubot_cmdline ] && . $INSTDIR/../neubot_cmdline
 
@@ -31,6 +31,7 @@ import os
 import sys
 
 from neubot.http.client import ClientHTTP
+from neubot.http.message import DiscardBody
 from neubot.http.message import Message
 
 from neubot.state import STATE
@@ -130,7 +131,7 @@ class DASHClientSmpl(ClientHTTP):
         response = Message()
 
         # Receive and discard the body
-        response.body.write = lambda piece: None
+        response.body = DiscardBody()
 
         logging.debug("dash: send request - ticks %f, bytes %d, times %s",
           self.saved_ticks, self.saved_cnt, self.saved_times)
@@ -26,6 +26,7 @@
 # Adapted from neubot/raw_srvr_glue.py
 
 from mod_dash.server_smpl import DASHServerSmpl
+from neubot.tcp_info import TCP_INFO_SAMPLER
 
 class DASHServerGlue(DASHServerSmpl):
     """ Glue for DASH on the server side """
@@ -44,4 +45,6 @@ class DASHServerGlue(DASHServerSmpl):
         if auth not in self.negotiator.peers:
             return False
 
+        TCP_INFO_SAMPLER.watch(auth, stream)
+
         return DASHServerSmpl.got_request_headers(self, stream, request)
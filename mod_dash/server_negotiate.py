@@ -31,6 +31,7 @@ import hashlib
 
 from neubot.negotiate.server import NegotiateServerModule
 from neubot.backend import BACKEND
+from neubot.tcp_info import TCP_INFO_SAMPLER
 
 from neubot import utils
 
@@ -89,6 +90,8 @@ class DASHNegotiateServer(NegotiateServerModule):
                                        "srvr_timestamp": server_timestamp,
                                        "client": request_body,
                                        "server": result,
+                                       "srvr_tcp_info":
+                                         TCP_INFO_SAMPLER.collect(sha256),
                                       })
 
         #
@@ -111,3 +114,4 @@ class DASHNegotiateServer(NegotiateServerModule):
         if sha256 in self.peers:
             logging.warning("dash: del sha256 (ERR): %s", sha256)
             del self.peers[sha256]
+        TCP_INFO_SAMPLER.discard(sha256)
@@ -27,8 +27,10 @@
 
 # Adapted from neubot/speedtest/server.py
 
+from neubot.http.message import DiscardBody
 from neubot.http.message import Message
 from neubot.http.server import ServerHTTP
+from neubot.utils_random import RandomFileBody
 
 #
 # The default body size is small enough that the body, and
@@ -65,8 +67,10 @@ class DASHServerSmpl(ServerHTTP):
         # bytes.  (This is true especially when testing with
         # fast Neubot clients.)  This fix brings the amount of
         # memory consumed by the server under control again.
+        # With DiscardBody the stream does not even allocate
+        # strings for the body.
         #
-        request.body.write = lambda data: None
+        request.body = DiscardBody()
 
         if not stream.opaque:
             stream.opaque = DASHServerSideState()
@@ -105,19 +109,8 @@ class DASHServerSmpl(ServerHTTP):
             if body_size > DASH_MAXIMUM_BODY_SIZE:
                 body_size = DASH_MAXIMUM_BODY_SIZE
 
-            #
-            # XXX We don't have a quick solution for generating
-            # and sending many random bytes from Python.
-            #
-            # Or, better, we have a couple of ideas, but they
-            # have not been implemented into Neubot yet.
-            #
-            pattern = request["Authorization"]
-            if not pattern:
-                pattern = "deadbeef"
-            body = pattern * ((body_size / len(pattern)) + 1)
-            if len(body) > body_size:
-                body = body[:body_size]
+            # Cut from the random payload and sent with sendfile()
+            body = RandomFileBody(body_size)
 
             response = Message()
             response.compose(code="200", reason="Ok", body=body,
@@ -91,6 +91,9 @@ def main(args):
         logging.error('agent: still running as root')
         os._exit(1)
 
+    # Write the database without blocking the poller
+    DATABASE.start_worker()
+
     if conf["agent.rendezvous"]:
         BACKGROUND_RENDEZVOUS.start()
 
@@ -37,8 +37,10 @@ from neubot.config import ConfigError
 from neubot.debug import objgraph
 from neubot.http.message import Message
 from neubot.http.server import ServerHTTP
+from neubot.log import LOG
 from neubot.net.poller import POLLER
 from neubot.notify import NOTIFIER
+from neubot.recvbuf import RECV_STATS
 from neubot.state import STATECHANGE
 from neubot.speedtest.client import QUEUE_HISTORY
 from neubot.state import STATE
@@ -125,6 +127,8 @@ class ServerAPI(ServerHTTP):
         debuginfo = {}
         NOTIFIER.snap(debuginfo)
         POLLER.snap(debuginfo)
+        RECV_STATS.snap(debuginfo)
+        LOG.snap(debuginfo)
         debuginfo["queue_history"] = QUEUE_HISTORY
         debuginfo["WWWDIR"] = utils_hier.WWWDIR
         gc.collect()
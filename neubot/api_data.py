@@ -40,13 +40,52 @@ from neubot.database import DATABASE
 from neubot.database import table_bittorrent
 from neubot.database import table_speedtest
 from neubot.database import table_raw
+from neubot.http.json_body import JSONArrayBody
 from neubot.http.message import Message
 
+from neubot.http import json_body
 from neubot import utils
 
+# Number of results we fetch at a time when streaming
+PAGE = 256
+
+def _listify_table(table, since, until, limit, cursor):
+    ''' Get a page of results from a table '''
+
+    #
+    # The timestamps of the tables are integers, so the cursor is
+    # the timestamp of the last result we have returned, and the
+    # number of results with such timestamp we have returned.
+    #
+    previous, offset = -1, 0
+    if cursor is not None:
+        previous, offset = [int(elem) for elem in cursor.split(".")]
+        if until < 0 or until > previous + 1:
+            until = previous + 1
+
+    lst = table.listify(DATABASE.connection(), since, until, limit, offset)
+    if limit < 0 or len(lst) < limit or not lst:
+        return lst, None
+
+    timestamp = lst[-1]["timestamp"]
+    count = len([elem for elem in lst if elem["timestamp"] == timestamp])
+    if timestamp == previous and count == len(lst):
+        count += offset
+    return lst, "%d.%d" % (timestamp, count)
+
+def _walk(fetch, since, until, lst, cursor):
+    ''' Yield all the results, starting from the page we already
+        have and fetching the next ones one page at a time '''
+    while True:
+        for elem in lst:
+            yield elem
+        if cursor is None:
+            break
+        lst, cursor = fetch(since, until, PAGE, cursor)
+
 def api_data(stream, request, query):
     ''' Get data stored on the local database '''
-    since, until = -1, -1
+    since, until, limit, cursor = -1, -1, -1, None
     test = ''
 
     dictionary = cgi.parse_qs(query)
@@ -57,6 +96,10 @@ def api_data(stream, request, query):
         since = int(dictionary["since"][0])
     if "until" in dictionary:
         until = int(dictionary["until"][0])
+    if "limit" in dictionary:
+        limit = int(dictionary["limit"][0])
+    if "cursor" in dictionary:
+        cursor = str(dictionary["cursor"][0])
 
     if test == 'bittorrent':
         table = table_bittorrent
@@ -73,41 +116,50 @@ def api_data(stream, request, query):
 
     response = Message()
 
+    #
+    # Results are sorted newest first.  When the caller specifies a
+    # limit, we return at most limit results and, if there are more
+    # results, the X-Neubot-Cursor header, whose value shall be passed
+    # as the cursor of the next request to fetch the next page.
+    #
+    # Note: for generic tests (DASH and others) we assume that, whatever
+    # the test structure, there is a field called "timestamp", and the
+    # backend uses it to seek to the results in [since, until].
+    #
     if table:
-        lst = table.listify(DATABASE.connection(), since, until)
+        fetch = lambda *args: _listify_table(table, *args)
+    else:
+        fetch = lambda *args: BACKEND.query_generic(test, *args)
 
     #
-    # TODO We should migrate all the tests to use the new
-    # generic interface. At that point, we can also change
-    # the API to access "pages" of data by index.
+    # We fetch the first page before we start responding, because
+    # this is where a malformed cursor is parsed (its format depends
+    # on the table or on the backend), and later it's too late to
+    # send an error.
     #
-    # Until we change the API, we have an API that allows
-    # the caller to specify date ranges. For this reason
-    # below we emulate the date-ranges semantics provided
-    # by database-based tests.
+    try:
+        lst, cursor = fetch(since, until, PAGE if limit < 0 else limit,
+                            cursor)
+    except ValueError:
+        response.compose(code="400", reason="Bad Request",
+                         body="400 Bad Request")
+        stream.send_response(request, response)
+        return
+
     #
-    # Note: we assume that, whatever the test structure,
-    # there is a field called "timestamp".
+    # Without a limit, the results could be many, so we stream them
+    # and we fetch PAGE results at a time from the database.  With a
+    # limit, the page we have fetched is the response.
     #
+    if limit < 0:
+        body = JSONArrayBody(_walk(fetch, since, until, lst, cursor),
+                             indent=indent, sort_keys=sort_keys)
+        json_body.compose(request, response, body, mimetype)
     else:
-        lst = []
-        indexes = [None]
-        indexes.extend(range(16))
-        for index in indexes:
-            tmp = BACKEND.walk_generic(test, index)
-            if not tmp:
-                break
-            found_start = False
-            for elem in reversed(tmp):
-                if until >= 0 and elem["timestamp"] > until:
-                    continue
-                if since >= 0 and elem["timestamp"] < since:
-                    found_start = True
-                    break
-                lst.append(elem)
-            if found_start:
-                break
-
-    body = json.dumps(lst, indent=indent, sort_keys=sort_keys)
-    response.compose(code="200", reason="Ok", body=body, mimetype=mimetype)
+        body = json.dumps(lst, indent=indent, sort_keys=sort_keys)
+        response.compose(code="200", reason="Ok", body=body,
+                         mimetype=mimetype)
+        if cursor is not None:
+            response["X-Neubot-Cursor"] = cursor
+
     stream.send_response(request, response)
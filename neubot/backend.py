@@ -87,6 +87,7 @@ class BackendProxy(object):
         self.vfs = None
         self.datadir = None
         self.passwd = None
+        self.directories = set()
 
         if os.name == "posix":
             from neubot import utils_posix
@@ -190,14 +191,30 @@ class BackendProxy(object):
 
     def datadir_touch(self, components):
         ''' Touch a file below datadir '''
-        return utils_path.depth_visit(self.datadir, components, self._visit)
+        try:
+            return utils_path.depth_visit(self.datadir, components,
+                                          self._visit)
+        except (OSError, IOError):
+            # Maybe someone removed a directory we have created
+            if not self.directories:
+                raise
+            self.directories.clear()
+            return utils_path.depth_visit(self.datadir, components,
+                                          self._visit)
 
     def _visit(self, curpath, leaf):
         ''' Callback for depth_visit() '''
         if not leaf:
+            #
+            # Remember the directories we have created, so that we
+            # don't stat() and chown() them again for each file.
+            #
+            if curpath in self.directories:
+                return
             logging.debug('backend: mkdir_idempotent: %s', curpath)
             self.vfs.mkdir_idempotent(curpath, self.passwd.pw_uid,
                                       self.passwd.pw_gid)
+            self.directories.add(curpath)
         else:
             logging.debug('backend: touch_idempotent: %s', curpath)
             self.vfs.touch_idempotent(curpath, self.passwd.pw_uid,
@@ -279,6 +296,7 @@ def main(args):
     BACKEND.speedtest_store(msg)
     BACKEND.store_raw(msg)
     BACKEND.store_generic("generictest", msg)
+    BACKEND.close()
 
 if __name__ == '__main__':
     main(sys.argv)
@@ -27,17 +27,80 @@
 # Follows closely the M-Lab specification for saving results
 # in a very scalable way.
 #
+# Results are not written right away: the results of each test
+# that are stored within WINDOW seconds are collected and written
+# into the same file, named after the time of the first of them,
+# one JSON per line.  The JSON encoding and the compression are
+# done by a pool of PROCESSES worker processes, so that they do
+# not block the poller; where multiprocessing is not available we
+# do them in the poller, as we did before.
+#
+# The pool MUST be started before accepting connections, because
+# with Python 2 the worker processes inherit all the descriptors
+# of the server, and a connection that is open in a worker is not
+# really closed when the server closes it (the client does not
+# receive the FIN).
+#
 
 import gzip
+import logging
+import os
+import signal
 import time
 
+try:
+    import multiprocessing
+except ImportError:
+    multiprocessing = None
+
 from neubot.compat import json
+from neubot.poller import POLLER
 
 from neubot.backend_null import BackendNull
 
+# Seconds during which results are collected into the same file
+WINDOW = 1.0
+
+# Number of worker processes
+PROCESSES = 2
+
+def _init_process():
+    ''' Initialize a worker process '''
+    # The handlers we inherit from the server make no sense here
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    #
+    # Don't receive the signals sent to the process group of the
+    # server: a worker killed while waiting for a task holds the
+    # lock of the queue forever, and the pool hangs.  The server
+    # stops the workers when it closes the backend.
+    #
+    if hasattr(os, 'setpgid'):
+        os.setpgid(0, 0)
+
+def write_batch(fullpath, messages):
+    ''' Append messages to the compressed file at fullpath '''
+    data = ''.join(['%s\n' % json.dumps(message) for message in messages])
+    filep = gzip.open(fullpath, 'ab')
+    filep.write(data)
+    filep.close()
+    return len(messages)
+
 class BackendMLab(BackendNull):
     ''' M-Lab backend '''
 
+    def __init__(self, proxy, processes=PROCESSES):
+        BackendNull.__init__(self, proxy)
+        self.processes = processes
+        self.pool = None
+        self.batches = {}
+        self.outstanding = []
+        self.flush_scheduled = False
+        self.stats = {
+            'written': 0,
+            'errors': 0,
+        }
+
     def bittorrent_store(self, message):
         ''' Saves the results of a bittorrent test '''
         self.do_store('bittorrent', message)
@@ -54,8 +117,9 @@ class BackendMLab(BackendNull):
         """ Store the results of a generic test """
         self.do_store(test, results)
 
-    def do_store(self, test, message):
-        ''' Saves the results of the given test '''
+    @staticmethod
+    def _components(test):
+        ''' Return the path components of the next file of test '''
 
         # Get time information
         thetime = time.time()
@@ -67,30 +131,111 @@ class BackendMLab(BackendNull):
         # The time format is ISO8601, except that we use nanosecond
         # and not microsecond precision.
         #
-        components = [
-                      time.strftime('%Y', gmt),
-                      time.strftime('%m', gmt),
-                      time.strftime('%d', gmt),
-                      '%s.%09dZ_%s.gz' % (
-                        time.strftime('%Y%m%dT%H:%M:%S', gmt),
-                        nanosec, test)
-                     ]
+        return [
+                time.strftime('%Y', gmt),
+                time.strftime('%m', gmt),
+                time.strftime('%d', gmt),
+                '%s.%09dZ_%s.gz' % (
+                  time.strftime('%Y%m%dT%H:%M:%S', gmt),
+                  nanosec, test)
+               ]
 
-        #
-        # Make sure that the path exists and that ownership
-        # and permissions are OK.
-        #
-        fullpath = self.proxy.datadir_touch(components)
-
-        #
-        # Open the output file for appending, write into
-        # it the message and close.
-        # We open for appending just in case two tests
-        # terminates at the same time (unlikely!).
-        #
-        filep = gzip.open(fullpath, 'ab')
-        json.dump(message, filep)
-        filep.close()
+    def do_store(self, test, message):
+        ''' Saves the results of the given test '''
+        if test not in self.batches:
+            self.batches[test] = (self._components(test), [])
+        self.batches[test][1].append(message)
+        if not self.flush_scheduled:
+            self.flush_scheduled = True
+            POLLER.sched(WINDOW, self._flush_timeout)
+
+    def _flush_timeout(self):
+        ''' Write the batches WINDOW seconds after the first result '''
+        self.flush_scheduled = False
+        self.flush()
+
+    def start_workers(self):
+        ''' Start the worker processes; call it before the server
+            accepts any connection '''
+        if self.pool is None and self.processes > 0 and multiprocessing:
+            try:
+                self.pool = multiprocessing.Pool(self.processes,
+                                                 _init_process)
+            except (KeyboardInterrupt, SystemExit):
+                raise
+            except:
+                logging.warning('backend_mlab: cannot start worker '
+                                'processes', exc_info=1)
+                self.processes = 0
+
+    def flush(self):
+        ''' Start writing all the batches '''
+
+        batches, self.batches = self.batches, {}
+        for components, messages in batches.values():
+
+            #
+            # Make sure that the path exists and that ownership
+            # and permissions are OK.
+            #
+            # We open for appending just in case two batches are
+            # written at the same time (unlikely!).
+            #
+            try:
+                fullpath = self.proxy.datadir_touch(components)
+            except (KeyboardInterrupt, SystemExit):
+                raise
+            except:
+                logging.error('backend_mlab: cannot create file',
+                              exc_info=1)
+                self.stats['errors'] += len(messages)
+                continue
+
+            if self.pool:
+                result = self.pool.apply_async(write_batch,
+                                               (fullpath, messages))
+                self.outstanding.append((len(messages), result))
+            else:
+                self.stats['written'] += write_batch(fullpath, messages)
+
+        self._reap()
+
+    def _reap(self):
+        ''' Account for the batches that have been written '''
+        outstanding = []
+        for count, result in self.outstanding:
+            if not result.ready():
+                outstanding.append((count, result))
+                continue
+            try:
+                self.stats['written'] += result.get()
+            except (KeyboardInterrupt, SystemExit):
+                raise
+            except:
+                logging.error('backend_mlab: cannot write results',
+                              exc_info=1)
+                self.stats['errors'] += count
+        self.outstanding = outstanding
+
+    def queue_depth(self):
+        ''' Number of results that are not written yet '''
+        self._reap()
+        return (sum(len(batch[1]) for batch in self.batches.values()) +
+                sum(count for count, _ in self.outstanding))
+
+    def snap(self, data):
+        ''' Take a snapshot of the backend state '''
+        data['backend_mlab'] = dict(self.stats)
+        data['backend_mlab']['queue_depth'] = self.queue_depth()
+
+    def close(self):
+        ''' Write pending results and stop the worker processes '''
+        self.flush()
+        if self.pool:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+        self._reap()
 
     def walk_generic(self, test, index):
         """ Walk over the results of a generic test """
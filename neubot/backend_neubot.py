@@ -43,6 +43,7 @@ from neubot.database import table_speedtest
 from neubot.database import table_raw
 
 from neubot.backend_null import BackendNull
+from neubot.result_log import ResultLog
 
 from neubot import utils_path
 
@@ -62,7 +63,7 @@ class BackendNeubot(BackendNull):
         if DATABASE.readonly:
             logging.warning('backend_neubot: readonly database')
             return
-        table_bittorrent.insert(DATABASE.connection(), message)
+        DATABASE.submit(table_bittorrent.insert, dict(message), False)
 
     def store_raw(self, message):
         ''' Saves the results of a raw test '''
@@ -70,7 +71,7 @@ class BackendNeubot(BackendNull):
         if DATABASE.readonly:
             logging.warning('backend_neubot: readonly database')
             return
-        table_raw.insert(DATABASE.connection(), message)
+        DATABASE.submit(table_raw.insert, dict(message), False)
 
     def speedtest_store(self, message):
         ''' Saves the results of a speedtest test '''
@@ -78,86 +79,118 @@ class BackendNeubot(BackendNull):
         if DATABASE.readonly:
             logging.warning('backend_neubot: readonly database')
             return
-        table_speedtest.insert(DATABASE.connection(), message)
+        DATABASE.submit(table_speedtest.insert, dict(message), False)
 
     #
-    # 'Generic' load/store functions. We append test results into a vector,
-    # which is also serialized to disk using pickle. When the number of
-    # items in the vector exceeds a threshold, we rotate the logfiles created
-    # using pickle, and we start over with an empty vector.
+    # 'Generic' load/store functions. We append test results to a log
+    # (see result_log.py), which is split into segments of at most
+    # SPLIT_INTERVAL results, and we keep 1 + SPLIT_NUM_FILES segments.
     #
     # Also we access results by index, as the Twitter API does. Each index
-    # is the number of a logfile. When there is no index, we serve the logfile
-    # that is currently being written.
+    # is the number of a segment, starting from the one before the current
+    # one.  When there is no index, we serve the segment that is currently
+    # being written.  Alternatively, we query the results by timestamp,
+    # one page at a time.
     #
     # Dash Elhauge had the original idea behind this implementation, my
     # fault if it took too much to implement it.
     #
 
-    def store_generic(self, test, results):
-        """ Store the results of a generic test """
-
-        components = [ "%s.pickle" % test ]
-        fullpath = self.proxy.datadir_touch(components)
+    def _result_log(self, test, create=True):
+        """ Return the result log of a test.  Unless create is True,
+            return None when there are no results of the test on disk,
+            so we don't keep a log for each name that clients ask for """
+        log = self.generic.get(test)
+        if log is None:
+            log = ResultLog(self.proxy.datadir, test,
+                            self.proxy.datadir_touch,
+                            segment_records=SPLIT_INTERVAL,
+                            segments_kept=SPLIT_NUM_FILES + 1)
+            if (not create and not log.list_segments() and
+              not self._legacy_pickles(log.datadir, test)):
+                return None
+            self._migrate_pickles(test, log)
+            self.generic[test] = log
+        return log
+
+    @staticmethod
+    def _legacy_pickles(datadir, test):
+        """ Return the paths of the pickles saved by older versions """
+        fullpath = utils_path.append(datadir, "%s.pickle" % test, False)
+        paths = [fullpath + "." + str(index) for index in
+                 range(SPLIT_NUM_FILES, -1, -1)]
+        paths.append(fullpath)
+        return [path for path in paths if os.path.isfile(path)]
+
+    def _migrate_pickles(self, test, log):
+        """ Move the results saved by older versions into the log """
+
+        paths = self._legacy_pickles(log.datadir, test)
+        if not paths:
+            return
 
-        # Load
-        if not test in self.generic:
-            filep = open(fullpath, "rb")
+        #
+        # The pickles are removed only after all their results have
+        # been appended, and nothing else is appended before, so the
+        # segments found here are what is left of a migration that
+        # was interrupted.
+        #
+        logging.info("backend_neubot: moving %s results into log", test)
+        log.remove_segments()
+
+        for path in paths:
+            filep = open(path, "rb")
             content = filep.read()
             filep.close()
             if content:
-                self.generic[test] = pickle.loads(content)
-            else:
-                self.generic[test] = []
-
-        # Rotate
-        if len(self.generic[test]) >= SPLIT_INTERVAL:
-
-            tmppath = fullpath + "." + str(SPLIT_NUM_FILES)
-            if os.path.isfile(tmppath):
-                os.unlink(tmppath)
-
-            for index in range(SPLIT_NUM_FILES, 0, -1):
-                srcpath = fullpath + "." + str(index - 1)
-                if not os.path.isfile(srcpath):
-                    continue
-                destpath = fullpath + "." + str(index)
-                os.rename(srcpath, destpath)
-
-            tmppath = fullpath + ".0"
-            filep = open(tmppath, "wb")
-            pickle.dump(self.generic[test], filep)
-            filep.close()
-            self.generic[test] = []
+                for result in pickle.loads(content):
+                    log.append(result, sync=False)
+        log.sync()
 
-        # Write
-        self.generic[test].append(results)
-        filep = open(fullpath, "wb")
-        pickle.dump(self.generic[test], filep)
-        filep.close()
+        for path in paths:
+            os.unlink(path)
+
+    def store_generic(self, test, results):
+        """ Store the results of a generic test """
+        self._result_log(test).append(results)
 
     def walk_generic(self, test, index):
         """ Walk over the results of a generic test """
 
-        filename = "%s.pickle" % test
-        if index != None:
-            filename += "." + str(int(index))
-
-        fullpath = utils_path.append(self.proxy.datadir, filename, False)
-        if not fullpath:
+        if not utils_path.append(self.proxy.datadir, test, False):
             return []
 
-        if not os.path.isfile(fullpath):
+        log = self._result_log(test, False)
+        if log is None:
+            return []
+        segments = log.list_segments()
+        if index is None:
+            position = len(segments) - 1
+        else:
+            position = len(segments) - 2 - int(index)
+        if position < 0:
             return []
 
-        filep = open(fullpath, "rb")
-        content = filep.read()
-        filep.close()
+        return log.read(segments[position])
 
-        if not content:
-            return []
+    def query_generic(self, test, since=-1, until=-1, limit=-1, cursor=None):
+        """ Query the results of a generic test """
+
+        if not utils_path.append(self.proxy.datadir, test, False):
+            return [], None
+
+        # The cursor is "<segment>.<record>", see ResultLog.query()
+        if cursor is not None:
+            number, record = cursor.split(".")
+            cursor = (int(number), int(record))
 
-        return pickle.loads(content)
+        log = self._result_log(test, False)
+        if log is None:
+            return [], None
+        results, cursor = log.query(since, until, limit, cursor)
+        if cursor is not None:
+            cursor = "%d.%d" % cursor
+        return results, cursor
 
     def datadir_init(self, uname=None, datadir=None):
         ''' Initialize datadir (if needed) '''
@@ -44,5 +44,18 @@ class BackendNull(object):
     def walk_generic(self, test, index):
         """ Walk over the results of a generic test """
 
+    def query_generic(self, test, since=-1, until=-1, limit=-1, cursor=None):
+        """ Query the results of a generic test """
+        return [], None
+
     def datadir_init(self, uname=None, datadir=None):
         ''' Initialize datadir (if needed) '''
+
+    def start_workers(self):
+        ''' Start the worker processes (if any) '''
+
+    def snap(self, data):
+        ''' Take a snapshot of the backend state '''
+
+    def close(self):
+        ''' Save pending results (if any) '''
@@ -41,3 +41,22 @@ class BackendVolatile(BackendNull):
     def walk_generic(self, test, index):
         """ Walk over the results of a generic test """
         return self.generic.get(test, [])
+
+    def query_generic(self, test, since=-1, until=-1, limit=-1, cursor=None):
+        """ Query the results of a generic test """
+        vector = self.generic.get(test, [])
+        if cursor is None:
+            position = len(vector)
+        else:
+            position = int(cursor)
+        results = []
+        for index in range(position - 1, -1, -1):
+            if limit >= 0 and len(results) >= limit:
+                return results, str(index + 1)
+            timestamp = vector[index]["timestamp"]
+            if until >= 0 and timestamp > until:
+                continue
+            if since >= 0 and timestamp < since:
+                continue
+            results.append(vector[index])
+        return results, None
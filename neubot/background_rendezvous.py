@@ -147,9 +147,9 @@ class BackgroundRendezvous(object):
         ''' Schedule next rendezvous after interval seconds '''
         logging.info('background_rendezvous: next rendezvous in %d seconds',
                      interval)
-        timestamp = POLLER.sched(interval, self.run)
+        task = POLLER.sched(interval, self.run)
         STATE.update('idle', publish=False)
-        STATE.update('next_rendezvous', timestamp)
+        STATE.update('next_rendezvous', task.timestamp)
 
     def start(self):
         ''' Start automatic rendezvous '''
@@ -206,7 +206,8 @@ class BitTorrentClient(ClientHTTP):
                 if DATABASE.readonly:
                     logging.warning('bittorrent_client: readonly database')
                 else:
-                    table_bittorrent.insert(DATABASE.connection(), self.my_side)
+                    DATABASE.submit(table_bittorrent.insert,
+                                    dict(self.my_side), False)
 
             # Update the upstream channel estimate
             target_bytes = int(m["target_bytes"])
@@ -146,8 +146,10 @@ class StreamBitTorrent(Stream):
     def send_piece(self, index, begin, block):
         ''' Send the PIECE message '''
         logging.debug("> PIECE %d %d len=%d", index, begin, len(block))
-        self._send_message(struct.pack("!cII%ss" % len(block), PIECE,
-          index, begin, block))
+        # The block may be a view of the payload pool: don't copy it
+        self.start_send(tobinary(9 + len(block)) + struct.pack("!cII",
+          PIECE, index, begin))
+        self.start_send(block)
 
     def _send_message(self, *msg_a):
         ''' Convenience function to send a message '''
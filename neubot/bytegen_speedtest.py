@@ -23,6 +23,8 @@
 ''' Generates bytes for the speedtest test '''
 
 import getopt
+import os
+import random
 import sys
 
 if __name__ == '__main__':
@@ -33,6 +35,52 @@ from neubot import utils
 
 PIECE_LEN = 262144
 
+# Number of chunks in the cache
+CACHE_CHUNKS = 16
+
+#
+# How late we may notice that the test is over.  Reading the clock
+# for each chunk is expensive at high speed, so, using the speed so
+# far, we skip the reads that take less than this many seconds.
+# We don't trust the speed until at least that much time has passed,
+# and we never skip more than MAX_SKIPPED_READS reads, because the
+# speed may drop suddenly.
+#
+CLOCK_SLACK = 0.01
+MAX_SKIPPED_READS = 128
+
+LAST_CHUNK = '0\r\n\r\n'
+
+class ChunkCache(object):
+    ''' Cache of chunks with their chunked-encoding framing '''
+
+    def __init__(self, piece_len, count=CACHE_CHUNKS):
+        ''' Initializer '''
+        header = '%x\r\n' % piece_len
+        vector = []
+        for _ in range(count):
+            vector.append(header)
+            vector.append(str(RANDOMBLOCKS.get_block(piece_len)))
+            vector.append('\r\n')
+        self.data = ''.join(vector)
+        self.chunk_len = len(header) + piece_len + 2
+        self.count = count
+
+    def get_chunk(self):
+        ''' Return a view of a random chunk '''
+        offset = random.randrange(self.count) * self.chunk_len
+        return buffer(self.data, offset, self.chunk_len)
+
+# Maps piece length to cache, filled on demand
+CHUNK_CACHES = {}
+
+def chunk_cache(piece_len):
+    ''' Return the cache of chunks of @piece_len bytes '''
+    cache = CHUNK_CACHES.get(piece_len)
+    if cache is None:
+        cache = CHUNK_CACHES[piece_len] = ChunkCache(piece_len)
+    return cache
+
 class BytegenSpeedtest(object):
     ''' Bytes generator for speedtest '''
 
@@ -42,6 +90,22 @@ class BytegenSpeedtest(object):
         self.ticks = utils.ticks()
         self.closed = False
         self.piece_len = piece_len
+        self.cache = chunk_cache(piece_len)
+        self.reads = 0
+        self.next_check = 0
+
+    def _expired(self):
+        ''' Return True when the test is over '''
+        self.reads += 1
+        if self.reads < self.next_check:
+            return False
+        elapsed = utils.ticks() - self.ticks
+        if elapsed >= self.seconds:
+            return True
+        if elapsed >= CLOCK_SLACK:
+            self.next_check = self.reads + min(MAX_SKIPPED_READS,
+              int(self.reads / elapsed * CLOCK_SLACK))
+        return False
 
     def read(self, count=sys.maxint):
         ''' Read count bytes '''
@@ -51,36 +115,61 @@ class BytegenSpeedtest(object):
         if count < self.piece_len:
             raise RuntimeError('Invalid count')
 
-        diff = utils.ticks() - self.ticks
-        if diff < self.seconds:
-            data = RANDOMBLOCKS.get_block()[:self.piece_len]
-            length = '%x\r\n' % self.piece_len
-            vector = [ length, data, '\r\n' ]
-        else:
-            vector = [ '0\r\n', '\r\n' ]
-            self.closed = True
+        if not self._expired():
+            return self.cache.get_chunk()
 
-        return ''.join(vector)
+        self.closed = True
+        return LAST_CHUNK
 
     def close(self):
         ''' Close  '''
         self.closed = True
 
+USAGE = 'usage: neubot bytegen_speedtest [-B] [-t seconds]'
+
+def _benchmark(seconds):
+    ''' Generate for @seconds and report speed and CPU usage '''
+    total = 0
+    times = os.times()
+    begin = utils.ticks()
+    bytegen = BytegenSpeedtest(seconds)
+    while True:
+        data = bytegen.read()
+        if not data:
+            break
+        total += len(data)
+    elapsed = utils.ticks() - begin
+    cpu = sum(os.times()[:2]) - sum(times[:2])
+    sys.stdout.write('bytegen_speedtest: %d bytes in %s\n' % (total,
+                     utils.time_formatter(elapsed)))
+    sys.stdout.write('bytegen_speedtest: speed: %d bytes/s (%s)\n' % (
+                     total / elapsed, utils.speed_formatter(total / elapsed,
+                     bytez=True)))
+    sys.stdout.write('bytegen_speedtest: CPU: %s per GB\n' % (
+                     utils.time_formatter(cpu * 1000000000 / total)))
+
 def main(args):
     ''' Main() function '''
 
     try:
-        options, arguments = getopt.getopt(args[1:], 't:')
+        options, arguments = getopt.getopt(args[1:], 'Bt:')
     except getopt.error:
-        sys.exit('usage: neubot bytegen_speedtest [-t seconds]')
+        sys.exit(USAGE)
     if arguments:
-        sys.exit('usage: neubot bytegen_speedtest [-t seconds]')
+        sys.exit(USAGE)
 
+    benchmark = False
     seconds = 5.0
     for name, value in options:
-        if name == '-t':
+        if name == '-B':
+            benchmark = True
+        elif name == '-t':
             seconds = float(value)
 
+    if benchmark:
+        _benchmark(seconds)
+        return
+
     bytegen = BytegenSpeedtest(seconds)
     while True:
         data = bytegen.read()
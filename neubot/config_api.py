@@ -30,6 +30,7 @@ from neubot.compat import json
 from neubot.config import ConfigError
 from neubot.config import CONFIG
 from neubot.database import DATABASE
+from neubot.database import table_config
 from neubot.http.message import Message
 from neubot.state import STATE
 
@@ -104,7 +105,8 @@ def config_api(stream, request, query):
             raise ConfigError('Passed invalid agent.interval')
 
         # Merge settings
-        CONFIG.merge_api(updates, DATABASE.connection())
+        CONFIG.merge_api(updates)
+        DATABASE.submit(table_config.update, updates.items(), False)
 
         #
         # Update the state, such that, if the AJAX code is
@@ -34,10 +34,24 @@ from neubot.database import table_bittorrent
 from neubot.database import table_raw
 from neubot.database import migrate
 from neubot.database import migrate2
+from neubot.database import worker
+
+from neubot.defer import Deferred
+from neubot.poller import POLLER
 
 from neubot import database_xxx
 from neubot import system
 
+#
+# Writes are committed in batches: we commit when COMMIT_ROWS rows
+# have been written, or COMMIT_INTERVAL seconds after the first row
+# that has not been committed yet, whatever comes first.  In WAL
+# mode, each commit appends to the log and does not rewrite the
+# database, so a batch costs roughly as much as a single row.
+#
+COMMIT_ROWS = 128
+COMMIT_INTERVAL = 1.0
+
 class DatabaseManager(object):
     ''' Manages connection to database '''
 
@@ -45,6 +59,9 @@ class DatabaseManager(object):
         self.path = system.get_default_database_path()
         self.readonly = False
         self.dbc = None
+        self.pending = 0
+        self.commit_scheduled = False
+        self.worker = None
 
     def set_path(self, path):
         ''' Overrides default database path '''
@@ -83,6 +100,9 @@ class DatabaseManager(object):
                 self.readonly = True
                 return self.dbc
 
+            # Switch to incremental vacuum and to WAL mode
+            self._tune()
+
             #
             # Migrate MUST be before table creation.  This
             # is safe because table creation always uses
@@ -105,9 +125,78 @@ class DatabaseManager(object):
 
         return self.dbc
 
+    def _tune(self):
+        ''' Switch to incremental vacuum and to WAL mode '''
+
+        #
+        # The auto_vacuum mode of an existing database changes only
+        # after a full VACUUM, so we pay for it once, at startup, and
+        # then we reclaim free pages in small steps (see _table_utils).
+        #
+        if self.dbc.execute("PRAGMA auto_vacuum;").fetchone()[0] != 2:
+            logging.info('database: enabling incremental vacuum')
+            self.dbc.execute("PRAGMA auto_vacuum = INCREMENTAL;")
+            self.dbc.execute("VACUUM;")
+
+        mode = self.dbc.execute("PRAGMA journal_mode = WAL;").fetchone()[0]
+        logging.debug('database: journal mode: %s', mode)
+
+        # Other connections, opened after we drop root privileges,
+        # need to write the WAL and the shared-memory index
+        if mode == "wal":
+            for suffix in ("-wal", "-shm"):
+                system.check_database_path(self.path + suffix)
+
+        # In WAL mode NORMAL is safe: a crash may only lose commits
+        self.dbc.execute("PRAGMA synchronous = NORMAL;")
+
+    def start_worker(self):
+        ''' Run the operations passed to submit() in a dedicated
+            thread, if the database is open for writing '''
+        if (worker.HAVE_WORKER and self.dbc and not self.readonly and
+          self.path != ":memory:" and not self.worker):
+            self.worker = worker.DatabaseWorker(self.path)
+
+    def submit(self, func, *args):
+        ''' Run func(connection, *args), which is expected to write the
+            database without committing, and return a Deferred that is
+            fired with the result.  Without a worker func runs now, and
+            the Deferred is fired by the poller. '''
+        if self.worker:
+            return self.worker.submit(func, *args)
+        result = func(self.connection(), *args)
+        self.commit_later()
+        deferred = Deferred()
+        POLLER.sched(0, lambda: deferred.callback(result))
+        return deferred
+
+    def commit_later(self, rows=1):
+        ''' Commit rows written without committing, eventually '''
+        self.pending += rows
+        if self.pending >= COMMIT_ROWS:
+            self.commit()
+        elif not self.commit_scheduled:
+            self.commit_scheduled = True
+            POLLER.sched(COMMIT_INTERVAL, self._commit_timeout)
+
+    def _commit_timeout(self):
+        ''' Commit after COMMIT_INTERVAL seconds '''
+        self.commit_scheduled = False
+        self.commit()
+
+    def commit(self):
+        ''' Commit now, including what is waiting to be committed '''
+        if self.dbc:
+            self.dbc.commit()
+        self.pending = 0
+
     def close(self):
         ''' Close connection to database '''
+        if self.worker:
+            self.worker.close()
+            self.worker = None
         if self.dbc:
+            self.commit()
             self.dbc.close()
             self.dbc = None
 
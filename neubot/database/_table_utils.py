@@ -92,6 +92,34 @@ def make_create_table(table, template):
     query = "".join(vector)
     return query
 
+def make_create_index(table, columns):
+
+    '''
+     Given the table name and a sequence of column names this
+     function returns the query to create, if it does not exist,
+     an index on such columns.  Because id is the rowid, it is
+     already part of each index, so an index on timestamp also
+     serves the queries that order by timestamp and id.
+    '''
+
+    table = __check(table)
+    columns = [__check(column) for column in columns]
+    if not columns:
+        raise ValueError("No columns")
+
+    return ("CREATE INDEX IF NOT EXISTS %s_%s_idx ON %s (%s);" %
+            (table, "_".join(columns), table, ", ".join(columns)))
+
+def make_create_indexes(table, indexes):
+
+    '''
+     Given the table name and a sequence of indexes, each of which
+     is a sequence of column names, returns the list of queries to
+     create such indexes.
+    '''
+
+    return [make_create_index(table, columns) for columns in indexes]
+
 def make_insert_into(table, template):
 
     '''
@@ -152,6 +180,19 @@ def do_insert_into(connection, query, dictobj, template,
     if commit:
         connection.commit()
 
+# Pages freed by each incremental vacuum
+VACUUM_PAGES = 256
+
+def incremental_vacuum(connection, pages=VACUUM_PAGES):
+
+    '''
+     Return to the filesystem up to @pages free pages, without
+     blocking as long as a full VACUUM would do.
+    '''
+
+    # SQLite frees one page per step, so we must consume the cursor
+    connection.execute("PRAGMA incremental_vacuum(%d);" % pages).fetchall()
+
 def make_select(table, template, **kwargs):
 
     '''
@@ -186,8 +227,22 @@ def make_select(table, template, **kwargs):
         if until >= 0:
             vector.append("timestamp < :until")
 
+    #
+    # When the caller fetches the results one page at a time, we
+    # also order by id, so that the results with the same timestamp
+    # are always returned in the same order.
+    #
+    paged = "limit" in kwargs and int(kwargs["limit"]) >= 0
+
     if "desc" in kwargs and kwargs["desc"]:
         vector.append(" ORDER BY timestamp DESC")
+        if paged:
+            vector.append(", id DESC")
+    elif paged:
+        vector.append(" ORDER BY timestamp, id")
+
+    if paged:
+        vector.append(" LIMIT :limit OFFSET :offset")
     vector.append(";")
     query = "".join(vector)
     return query
@@ -521,6 +521,36 @@ def migrate_from_4_4_to_4_5(connection):
     logging.info('migrate2: from schema version 4.4 to 4.5... complete')
 
 
+# ===================
+# Migrate: 4.5 -> 4.6
+# ===================
+
+#
+# Index the columns we use to select and prune results.  The queries
+# are frozen here, rather than taken from the table modules, so that
+# this step does not change when the tables change in the future.
+#
+INDEXES_4_6 = (
+    ('speedtest', ('timestamp',)),
+    ('speedtest', ('uuid',)),
+    ('bittorrent', ('timestamp',)),
+    ('bittorrent', ('uuid',)),
+    ('raw', ('timestamp',)),
+    ('raw', ('uuid',)),
+    ('log', ('timestamp',)),
+)
+
+def migrate_from_4_5_to_4_6(connection):
+    ''' Migrate: 4.5 -> 4.6 '''
+    logging.info('migrate2: from schema version 4.5 to 4.6... in progress')
+    for table, columns in INDEXES_4_6:
+        connection.execute(_table_utils.make_create_index(table, columns))
+    connection.execute('''UPDATE config SET value='4.6'
+                              WHERE name='version';''')
+    connection.commit()
+    logging.info('migrate2: from schema version 4.5 to 4.6... complete')
+
+
 # ====
 # Main
 # ====
@@ -529,6 +559,7 @@ MIGRATORS = {
     '4.2': MigrateFrom42To43.migrate,
     '4.3': migrate_from_4_3_to_4_4,
     '4.4': migrate_from_4_4_to_4_5,
+    '4.5': migrate_from_4_5_to_4_6,
 }
 
 def migrate(connection):
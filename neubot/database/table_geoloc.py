@@ -38,3 +38,23 @@ def lookup_servers(connection, country):
     vector = map(lambda result: result[0], cursor)
     cursor.close()
     return vector
+
+def load_servers(connection):
+    ''' Return a dictionary that maps each country to the list
+        of its servers '''
+    servers = {}
+    cursor = connection.cursor()
+    cursor.execute("SELECT country, address FROM geoloc ORDER BY id;")
+    for country, address in cursor:
+        servers.setdefault(country, []).append(address)
+    cursor.close()
+    return servers
+
+def stamp(connection):
+    ''' Return a value that changes when servers are added to or
+        removed from the table '''
+    cursor = connection.cursor()
+    cursor.execute("SELECT MAX(id), COUNT(*) FROM geoloc;")
+    result = tuple(cursor.fetchone())
+    cursor.close()
+    return result
@@ -29,11 +29,16 @@ TEMPLATE = {
     "message": "",
 }
 
+INDEXES = (("timestamp",),)
+
 CREATE_TABLE = _table_utils.make_create_table("log", TEMPLATE)
 INSERT_INTO = _table_utils.make_insert_into("log", TEMPLATE)
+CREATE_INDEXES = _table_utils.make_create_indexes("log", INDEXES)
 
 def create(connection, commit=True):
     connection.execute(CREATE_TABLE)
+    for query in CREATE_INDEXES:
+        connection.execute(query)
     if commit:
         connection.commit()
 
@@ -42,6 +47,11 @@ def insert(connection, dictobj, commit=True):
     if commit:
         connection.commit()
 
+def insert_many(connection, dictobjs, commit=True):
+    connection.executemany(INSERT_INTO, dictobjs)
+    if commit:
+        connection.commit()
+
 def walk(connection, func, since=-1, until=-1):
     cursor = connection.cursor()
     SELECT = _table_utils.make_select("log", TEMPLATE,
@@ -52,6 +62,39 @@ def walk(connection, func, since=-1, until=-1):
 def listify(connection, since=-1, until=-1):
     return walk(connection, lambda t: dict(t), since, until)
 
+#
+# Walk the log table a page at a time, using the id to remember where
+# we are.  Each page is fetched with a new query, so it does not matter
+# whether the connection is committed while the caller is walking.
+#
+SELECT_NEXT = ("SELECT id, timestamp, severity, message FROM log"
+               " WHERE id > :id ORDER BY id LIMIT :limit;")
+SELECT_PREV = ("SELECT id, timestamp, severity, message FROM log"
+               " WHERE id < :id ORDER BY id DESC LIMIT :limit;")
+
+def last_id(connection):
+    return connection.execute("SELECT MAX(id) FROM log;").fetchone()[0]
+
+def iterate(connection, reverse=False, page=256, position=None):
+    if not reverse:
+        query = SELECT_NEXT
+        if position is None:
+            position = -1
+    else:
+        query = SELECT_PREV
+        if position is None:
+            position = (1 << 63) - 1
+    while True:
+        rows = connection.execute(query, {"id": position,
+                                          "limit": page}).fetchall()
+        for row in rows:
+            position = row["id"]
+            record = dict(row)
+            del record["id"]
+            yield record
+        if len(rows) < page:
+            break
+
 # Delete logs older than 30 days.
 def prune(connection, days_ago=None, commit=True):
     if not days_ago:
@@ -79,12 +79,17 @@ def __json_to_mapped_row(result):
             'json_data': json.dumps(result),
            }
 
+INDEXES = (('timestamp',), ('uuid',))
+
 CREATE_TABLE = _table_utils.make_create_table('raw', TEMPLATE)
 INSERT_INTO = _table_utils.make_insert_into('raw', TEMPLATE)
+CREATE_INDEXES = _table_utils.make_create_indexes('raw', INDEXES)
 
 def create(connection, commit=True):
     ''' Create the RAW table '''
     connection.execute(CREATE_TABLE)
+    for query in CREATE_INDEXES:
+        connection.execute(query)
     if commit:
         connection.commit()
 
@@ -94,14 +99,15 @@ def insert(connection, dictobj, commit=True, override_timestamp=True):
     _table_utils.do_insert_into(connection, INSERT_INTO, dictobj, TEMPLATE,
                                 commit, override_timestamp)
 
-def listify(connection, since=-1, until=-1):
+def listify(connection, since=-1, until=-1, limit=-1, offset=0):
     ''' Converts to list the content of RAW table '''
     vector = []
     cursor = connection.cursor()
     query = _table_utils.make_select('raw', TEMPLATE,
                                      since=since, until=until,
-                                     desc=True)
-    cursor.execute(query, {"since": since, "until": until})
+                                     desc=True, limit=limit)
+    cursor.execute(query, {"since": since, "until": until,
+                           "limit": limit, "offset": offset})
     for row in cursor:
         vector.append(dict(row))
     return vector
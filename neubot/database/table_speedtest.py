@@ -52,12 +52,17 @@ TEMPLATE = {
     "test_version": 1,
 }
 
+INDEXES = (("timestamp",), ("uuid",))
+
 CREATE_TABLE = _table_utils.make_create_table("speedtest", TEMPLATE)
 INSERT_INTO = _table_utils.make_insert_into("speedtest", TEMPLATE)
+CREATE_INDEXES = _table_utils.make_create_indexes("speedtest", INDEXES)
 
 def create(connection, commit=True):
     ''' Create a new speedtest table '''
     connection.execute(CREATE_TABLE)
+    for query in CREATE_INDEXES:
+        connection.execute(query)
     if commit:
         connection.commit()
 
@@ -66,14 +71,15 @@ def insert(connection, dictobj, commit=True, override_timestamp=True):
     _table_utils.do_insert_into(connection, INSERT_INTO, dictobj, TEMPLATE,
                                 commit, override_timestamp)
 
-def listify(connection, since=-1, until=-1):
+def listify(connection, since=-1, until=-1, limit=-1, offset=0):
     ''' Converts the content of speedtest table into a list '''
     vector = []
     cursor = connection.cursor()
     query = _table_utils.make_select("speedtest", TEMPLATE,
                                      since=since, until=until,
-                                     desc=True)
-    cursor.execute(query, {"since": since, "until": until})
+                                     desc=True, limit=limit)
+    cursor.execute(query, {"since": since, "until": until,
+                           "limit": limit, "offset": offset})
     for row in cursor:
         vector.append(dict(row))
     return vector
@@ -0,0 +1,170 @@
+# neubot/database/worker.py
+
+#
+# Copyright (c) 2013
+#     Nexa Center for Internet & Society, Politecnico di Torino (DAUIN)
+#     and Simone Basso <bassosimone@gmail.com>
+#
+# This file is part of Neubot <http://www.neubot.org/>.
+#
+# Neubot is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Neubot is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Neubot.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+''' Runs database operations in a dedicated thread '''
+
+#
+# The poller thread must not wait for the disk, or all the tests in
+# progress would suffer.  So operations that write the database are
+# submitted to a worker thread, which owns a connection of its own.
+# For each operation, submit() returns a Deferred, and the worker
+# runs the operation and queues its result.  It then writes a byte
+# into a socketpair, whose other end is watched by the poller.  When
+# the poller wakes up, it fires the Deferred of each queued result in
+# its own thread, so callbacks never run in the worker thread.
+#
+# The worker runs all the queued operations and then commits, so the
+# operations submitted while the disk was busy share a single commit.
+#
+# Because the database is in WAL mode, the poller thread can keep
+# reading with its own connection while the worker writes.
+#
+
+import collections
+import errno
+import logging
+import socket
+import sqlite3
+import sys
+import threading
+
+try:
+    import Queue as queue
+except ImportError:
+    import queue
+
+from neubot.defer import Deferred
+from neubot.defer import Failure
+from neubot.pollable import Pollable
+from neubot.poller import POLLER
+
+# Windows does not have socketpair() before Python 3.5
+HAVE_WORKER = hasattr(socket, 'socketpair')
+
+# Maximum number of operations that share a commit
+BATCH_MAX = 128
+
+class DatabaseWorker(Pollable):
+
+    ''' Runs database operations in a dedicated thread '''
+
+    def __init__(self, path):
+        Pollable.__init__(self)
+        self.watchdog = -1
+        self.path = path
+        self.requests = queue.Queue()
+        self.completed = collections.deque()
+        self.outstanding = 0
+        self.wakeup_recv, self.wakeup_send = socket.socketpair()
+        self.wakeup_recv.setblocking(False)
+        self.wakeup_send.setblocking(False)
+        self.thread = threading.Thread(target=self._run, name='database')
+        self.thread.daemon = True
+        self.thread.start()
+
+    def fileno(self):
+        return self.wakeup_recv.fileno()
+
+    def submit(self, func, *args):
+        ''' Run func(connection, *args) in the worker thread and return
+            a Deferred that is fired with the result in this thread '''
+        deferred = Deferred()
+        self.outstanding += 1
+        if self.outstanding == 1:
+            POLLER.set_readable(self)
+        self.requests.put((func, args, deferred))
+        return deferred
+
+    def _run(self):
+        ''' Body of the worker thread '''
+        connection = sqlite3.connect(self.path)
+        connection.row_factory = sqlite3.Row
+        while True:
+            batch = [self.requests.get()]
+            while batch[-1] is not None and len(batch) < BATCH_MAX:
+                try:
+                    batch.append(self.requests.get_nowait())
+                except queue.Empty:
+                    break
+            if batch[-1] is None:
+                batch.pop()
+                self._run_batch(connection, batch)
+                break
+            self._run_batch(connection, batch)
+        connection.close()
+
+    def _run_batch(self, connection, batch):
+        ''' Run a batch of operations and commit '''
+        if not batch:
+            return
+        results = []
+        for func, args, deferred in batch:
+            try:
+                result = func(connection, *args)
+            except (KeyboardInterrupt, SystemExit):
+                raise
+            except:
+                result = Failure()
+            results.append((deferred, result))
+        try:
+            connection.commit()
+        except (KeyboardInterrupt, SystemExit):
+            raise
+        except:
+            failure = Failure()
+            results = [(deferred, failure) for deferred, _ in results]
+        self.completed.extend(results)
+        self._wakeup()
+
+    def _wakeup(self):
+        ''' Wake up the poller thread '''
+        try:
+            self.wakeup_send.send('\0')
+        except socket.error:
+            # When the buffer is full the poller is awake anyway
+            code = sys.exc_info()[1].args[0]
+            if code not in (errno.EAGAIN, errno.EWOULDBLOCK):
+                logging.warning('database: cannot wake up poller',
+                                exc_info=1)
+
+    def handle_read(self):
+        ''' Fire the Deferreds of the completed operations '''
+        try:
+            self.wakeup_recv.recv(4096)
+        except socket.error:
+            pass
+        while self.completed:
+            deferred, result = self.completed.popleft()
+            self.outstanding -= 1
+            deferred.callback(result)
+        if self.outstanding == 0:
+            POLLER.unset_readable(self)
+
+    def close(self):
+        ''' Run the pending operations and stop the worker thread '''
+        self.requests.put(None)
+        self.thread.join()
+        self.handle_read()
+        self.wakeup_recv.close()
+        self.wakeup_send.close()
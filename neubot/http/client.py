@@ -37,6 +37,7 @@ from neubot.http.stream import StreamHTTP
 from neubot.net.stream import StreamHandler
 from neubot.http.stream import ERROR
 from neubot.http.stream import nextstate
+from neubot.http.message import DiscardBody
 from neubot.http.message import Message
 from neubot.net.poller import POLLER
 from neubot import utils
@@ -90,6 +91,11 @@ class ClientStream(StreamHTTP):
         else:
             return ERROR, 0
 
+    def body_is_discarded(self):
+        ''' Whether the response body is thrown away '''
+        return bool(self.requests and isinstance(
+                    self.requests[0].response.body, DiscardBody))
+
     def got_piece(self, piece):
         ''' Invoked when we receive a body piece '''
         if self.requests:
@@ -0,0 +1,125 @@
+# neubot/http/json_body.py
+
+#
+# Copyright (c) 2013
+#     Nexa Center for Internet & Society, Politecnico di Torino (DAUIN)
+#     and Simone Basso <bassosimone@gmail.com>
+#
+# This file is part of Neubot <http://www.neubot.org/>.
+#
+# Neubot is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Neubot is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Neubot.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+''' Bodies that are generated while they are sent '''
+
+#
+# The bodies below are file-like objects that, each time they are
+# read, pull some more strings from an iterable and return them in
+# a chunk framed using the chunked transfer encoding.  So a large
+# response, e.g. a JSON array containing all the results stored in
+# the database, is never in memory all at once.
+#
+
+import sys
+
+from neubot.compat import json
+
+# Amount of data we try to put into each chunk
+CHUNK_SIZE = 65536
+
+LAST_CHUNK = '0\r\n\r\n'
+
+class ChunkedBody(object):
+    ''' Body made of the strings yielded by an iterable '''
+
+    def __init__(self, iterable, chunk_size=CHUNK_SIZE):
+        ''' Initializer '''
+        self.iterator = iter(iterable)
+        self.chunk_size = chunk_size
+        self.closed = False
+
+    def read(self, count=sys.maxint):
+        ''' Read the next chunk '''
+
+        if self.closed:
+            return ''
+
+        vector, length = [], 0
+        for octets in self.iterator:
+            if octets:
+                vector.append(octets)
+                length += len(octets)
+                if length >= self.chunk_size:
+                    break
+        else:
+            self.closed = True
+
+        if length > 0:
+            vector.insert(0, '%x\r\n' % length)
+            vector.append('\r\n')
+        if self.closed:
+            vector.append(LAST_CHUNK)
+        return ''.join(vector)
+
+    def close(self):
+        ''' Close '''
+        self.closed = True
+
+def json_array(iterable, indent=None, sort_keys=False):
+    ''' Yield the JSON encoding of the array of the elements of iterable
+        one element at a time '''
+
+    if indent is None:
+        first, separator, last = '[', ', ', ']'
+    else:
+        padding = '\n' + ' ' * indent
+        first, separator, last = '[' + padding, ',' + padding, '\n]'
+
+    prefix = first
+    for elem in iterable:
+        octets = json.dumps(elem, indent=indent, sort_keys=sort_keys)
+        if indent is not None:
+            octets = octets.replace('\n', padding)
+        yield prefix
+        yield octets
+        prefix = separator
+
+    if prefix is first:
+        yield '[]'
+    else:
+        yield last
+
+class JSONArrayBody(ChunkedBody):
+    ''' Body containing the JSON array of the elements of an iterable '''
+
+    def __init__(self, iterable, indent=None, sort_keys=False,
+                 chunk_size=CHUNK_SIZE):
+        ''' Initializer '''
+        ChunkedBody.__init__(self, json_array(iterable, indent, sort_keys),
+                             chunk_size)
+
+def compose(request, response, body, mimetype):
+    ''' Compose a 200 response, with a body that is sent using the
+        chunked transfer encoding when the client supports it '''
+    if request.protocol == 'HTTP/1.0':
+        # HTTP/1.0 clients do not know chunked, so we make a plain body
+        vector = []
+        for octets in body.iterator:
+            vector.append(octets)
+        response.compose(code='200', reason='Ok', body=''.join(vector),
+                         mimetype=mimetype)
+    else:
+        response.compose(code='200', reason='Ok', chunked=body,
+                         mimetype=mimetype)
@@ -33,6 +33,7 @@ import os
 import logging
 
 from neubot.log import oops
+from neubot.utils_sendfile import SendfileBody
 
 from neubot import compat
 from neubot import utils
@@ -88,6 +89,30 @@ def urlsplit(uri):
         pathquery = pathquery + "?" + query
     return scheme, address, port, pathquery
 
+class DiscardBody(object):
+
+    '''
+     Body that throws away what is written into it.  When the body
+     of a message is a DiscardBody, the HTTP stream does not even
+     read the body into strings (see StreamHTTP).
+    '''
+
+    def write(self, octets):
+        ''' Throw away octets '''
+
+    @staticmethod
+    def read(count=-1):
+        ''' Pretend to read '''
+        return ""
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        ''' Pretend to seek '''
+
+    @staticmethod
+    def tell():
+        ''' Pretend to tell the current position '''
+        return 0
+
 class Message(object):
 
     ''' Represents an HTTP message '''
@@ -261,6 +286,9 @@ class Message(object):
             self.body = kwargs.get("body", None)
             if isinstance(self.body, basestring):
                 self.length = len(self.body)
+            elif isinstance(self.body, SendfileBody):
+                # Sent with sendfile() over plain sockets
+                self.length = len(self.body)
             else:
                 utils.safe_seek(self.body, 0, os.SEEK_END)
                 self.length = self.body.tell()
@@ -34,6 +34,7 @@ if __name__ == "__main__":
 
 from neubot.config import CONFIG
 from neubot.http.stream import ERROR
+from neubot.http.message import DiscardBody
 from neubot.http.message import Message
 from neubot.http.ssi import ssi_replace
 from neubot.http.stream import nextstate
@@ -41,6 +42,7 @@ from neubot.http.stream import StreamHTTP
 from neubot.log import LOG
 from neubot.net.stream import StreamHandler
 from neubot.net.poller import POLLER
+from neubot.utils_sendfile import SendfileBody
 
 from neubot.main import common
 
@@ -90,6 +92,11 @@ class ServerStream(StreamHTTP):
         else:
             return ERROR, 0
 
+    def body_is_discarded(self):
+        ''' Whether the request body is thrown away '''
+        return bool(self.request and isinstance(self.request.body,
+                                                DiscardBody))
+
     def got_piece(self, piece):
         ''' Invoked when we read a piece of the body '''
         if self.request:
@@ -169,6 +176,7 @@ class ServerHTTP(StreamHandler):
         if self.childs:
             for prefix, child in self.childs.items():
                 if request.uri.startswith(prefix):
+                    stream.set_recv_stats(child.__class__.__module__)
                     try:
                         return child.got_request_headers(stream, request)
                     except (KeyboardInterrupt, SystemExit):
@@ -218,7 +226,8 @@ class ServerHTTP(StreamHandler):
             return
 
         try:
-            filep = open(fullpath, "rb")
+            # Sent with sendfile() over plain sockets
+            filep = SendfileBody(open(fullpath, "rb"))
         except (IOError, OSError):
             logging.error("HTTP: Not Found: %s (WWWDIR: %s)",
                           fullpath, rootdir)
@@ -58,9 +58,10 @@ class StreamHTTP(Stream):
     def __init__(self, poller):
         ''' Initialize the stream '''
         Stream.__init__(self, poller)
-        self.incoming = []
+        self.incoming = bytearray()
         self.state = FIRSTLINE
         self.left = 0
+        self.discarding = False
 
     def connection_made(self):
         ''' Called when the connection is created '''
@@ -84,9 +85,10 @@ class StreamHTTP(Stream):
             vector.append(message.serialize_headers().read())
             body = message.serialize_body()
             if not isinstance(body, basestring):
-                vector.append(body.read())
-            else:
-                vector.append(body)
+                body = body.read()
+            if isinstance(body, buffer):
+                body = str(body)
+            vector.append(body)
             data = "".join(vector)
             self.start_send(data)
         else:
@@ -103,15 +105,35 @@ class StreamHTTP(Stream):
         #This one should be debug2 as well
         #logging.debug("HTTP receiver: got %d bytes", len(data))
 
-        # merge with previous fragments (if any)
+        offset = 0
+        length = len(data)
+
+        #
+        # Complete the line left incomplete by the previous fragments
+        # (if any).  The incomplete line is kept into a bytearray, so
+        # appending to it does not copy what we have already received,
+        # and we only search for the end of line into the new data: no
+        # byte is copied or scanned twice, even when the line arrives
+        # one byte at a time.
+        #
         if self.incoming:
-            self.incoming.append(data)
-            data = "".join(self.incoming)
+            index = data.find("\n", 0, MAXLINE - len(self.incoming))
+            if index == -1:
+                self.incoming.extend(data)
+                if len(self.incoming) >= MAXLINE:
+                    raise RuntimeError("Line too long")
+                self._start_recv_next()
+                return
+            offset = index + 1
+            length -= offset
+            self.incoming.extend(buffer(data, 0, offset))
+            line = str(self.incoming)
             del self.incoming[:]
+            self._got_line(line)
+            if self.close_complete or self.close_pending:
+                return
 
         # consume the current fragment
-        offset = 0
-        length = len(data)
         while length > 0:
             #ostate = self.state        # needed by commented-out code below
 
@@ -126,9 +148,9 @@ class StreamHTTP(Stream):
 
             # otherwise we're looking for the next line
             elif self.left == 0:
-                index = data.find("\n", offset)
+                index = data.find("\n", offset, offset + MAXLINE)
                 if index == -1:
-                    if length > MAXLINE:
+                    if length >= MAXLINE:
                         raise RuntimeError("Line too long")
                     break
                 index = index + 1
@@ -151,12 +173,31 @@ class StreamHTTP(Stream):
 
         # keep the eventual remainder for later
         if length > 0:
-            remainder = data[offset:]
-            self.incoming.append(remainder)
-            logging.debug("HTTP receiver: remainder %d", len(remainder))
+            self.incoming.extend(buffer(data, offset))
+            logging.debug("HTTP receiver: remainder %d", length)
 
         # get the next fragment
-        self.start_recv()
+        self._start_recv_next()
+
+    def _start_recv_next(self):
+        ''' Start receiving the next fragment '''
+        # When the body is discarded, don't even read it into a string
+        if (self.discarding and self.left > 0 and not self.incoming and
+          self.state in (BOUNDED, UNBOUNDED, CHUNK)):
+            self.start_recv_discard(self.left)
+        else:
+            self.start_recv()
+
+    def recv_discarded(self, count):
+        ''' We've received and discarded count bytes of the body '''
+        if self.close_complete or self.close_pending:
+            return
+        self.left -= count
+        # Empty piece so that upstream sees no data
+        self._got_piece("")
+        if self.close_complete or self.close_pending:
+            return
+        self._start_recv_next()
 
     def _got_line(self, line):
         ''' We've got a line... what do we do? '''
@@ -192,6 +233,7 @@ class StreamHTTP(Stream):
             else:
                 logging.debug("<")
                 self.state, self.left = self.got_end_of_headers()
+                self.discarding = self.body_is_discarded()
                 if self.state == ERROR:
                     # allow upstream to filter out unwanted requests
                     self.close()
@@ -259,6 +301,10 @@ class StreamHTTP(Stream):
     def got_end_of_headers(self):
         ''' Got the end of headers '''
 
+    def body_is_discarded(self):
+        ''' Whether upstream throws away the body '''
+        return False
+
     def got_piece(self, piece):
         ''' Got a piece of the body '''
 
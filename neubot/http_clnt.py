@@ -208,8 +208,8 @@ class HttpClient(Handler):
     def send_message(self, stream):
         ''' Send output buffer content to the other end '''
         context = stream.opaque
-        string = EMPTY_STRING.join(context.outq)
-        stream.send(string, self._handle_send_complete)
+        # The stream uses scatter-gather I/O, so no need to join()
+        stream.send(context.outq, self._handle_send_complete)
         context.outq = []
 
     def _handle_send_complete(self, stream):
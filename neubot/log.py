@@ -21,6 +21,7 @@
 # along with Neubot.  If not, see <http://www.gnu.org/licenses/>.
 #
 
+import collections
 import sys
 import logging
 import traceback
@@ -29,6 +30,7 @@ from neubot.net.poller import POLLER
 
 from neubot.config import CONFIG
 from neubot.database import DATABASE
+from neubot.database import _table_utils
 from neubot.database import table_log
 from neubot.notify import NOTIFIER
 
@@ -42,24 +44,31 @@ def stderr_logger(severity, message):
         sys.stderr.write('%s\n' % message)
 
 #
-# We commit every NOCOMMIT log messages or when we see
-# a WARNING or ERROR message (whichever of the two comes
-# first).
+# Records are kept in a bounded ring and written back to the
+# database FLUSH_INTERVAL seconds after the first of them was
+# logged, or as soon as there are FLUSH_RECORDS of them, unless
+# a test is in progress.  When the ring is full we drop the
+# oldest records.
 #
-NOCOMMIT = 32
+RING_SIZE = 4096
+FLUSH_RECORDS = 256
+FLUSH_INTERVAL = 1.0
 
 #
-# Interval in seconds between each invocation of the
-# function that takes care of the logs saved into the
-# database.
+# We log at most RATE_BURST messages with the same template
+# and severity every RATE_INTERVAL seconds, so that a burst of
+# errors (e.g. caused by a misbehaving client) cannot keep us
+# busy formatting and saving logs.  Access logs are not limited.
 #
-INTERVAL = 120
+RATE_BURST = 32
+RATE_INTERVAL = 1.0
 
 #
 # Interval in seconds between each invocation of the
-# function that compacts the database.
+# function that takes care of the logs saved into the
+# database.
 #
-INTERVAL_VACUUM = 3600
+INTERVAL = 120
 
 #
 # This is the number of days of logs we keep into
@@ -68,6 +77,19 @@ INTERVAL_VACUUM = 3600
 #
 DAYS_AGO = 7
 
+def _split_lines(message, exc_info):
+    ''' Return the lines of message, followed by the lines of
+        the traceback described by exc_info, if any '''
+    if not exc_info:
+        message = message.rstrip()
+        if not message:
+            return []
+        return [message]
+    exc_list = traceback.format_exception(exc_info[0], exc_info[1],
+                                          exc_info[2])
+    message = "%s\n%s\n" % (message, ''.join(exc_list))
+    return [line.rstrip() for line in message.split('\n') if line.strip()]
+
 class StreamingLogger(object):
 
     '''
@@ -151,30 +173,32 @@ class StreamingLogger(object):
             # Lazy processing
             if args:
                 message = message % args
-            if exc_info:
-                exc_list = traceback.format_exception(exc_info[0],
-                                                      exc_info[1],
-                                                      exc_info[2])
-                message = "%s\n%s\n" % (message, ''.join(exc_list))
-                for line in message.split('\n'):
-                    self._log(severity, line, None, None)
-                return
 
-            message = message.rstrip()
+            for line in _split_lines(message, exc_info):
+                try:
+
+                    logline = "%s %s\r\n" % (severity, line)
+                    # UTF-8 encoding to avoid supplying unicode to stream.py
+                    logline = logline.encode("utf-8")
+                    for stream in self.streams:
+                        stream.start_send(logline)
 
-            try:
+                except (KeyboardInterrupt, SystemExit):
+                    raise
+                except:
+                    pass
 
-                logline = "%s %s\r\n" % (severity, message)
-                # UTF-8 encoding to avoid supplying unicode to stream.py
-                logline = logline.encode("utf-8")
-                for stream in self.streams:
-                    stream.start_send(logline)
 
-            except (KeyboardInterrupt, SystemExit):
-                raise
-            except:
-                pass
+def _writeback(connection, records):
+    """Save records"""
+    table_log.insert_many(connection, records, False)
 
+def _prune(connection):
+    """Prune old log records"""
+    table_log.prune(connection, DAYS_AGO, commit=False)
+
+    # Reclaim a bit of the space freed by prune()
+    _table_utils.incremental_vacuum(connection)
 
 class Logger(object):
 
@@ -187,11 +211,19 @@ class Logger(object):
         self.logger = stderr_logger
         self.message = None
 
-        self.last_vacuum = 0
-
-        self._nocommit = NOCOMMIT
         self._use_database = False
-        self._queue = []
+        self._ring = collections.deque(maxlen=RING_SIZE)
+        self._flush_scheduled = False
+
+        self._window = 0.0
+        self._templates = {}
+
+        self.stats = {
+            "dropped_overflow": 0,
+            "dropped_rate": 0,
+            "flushes": 0,
+            "flushed_records": 0,
+        }
 
     #
     # Better not to touch the database when a test is in
@@ -206,6 +238,9 @@ class Logger(object):
 
         if (self._use_database and not NOTIFIER.is_subscribed("testdone")):
             self.writeback()
+            deferred = DATABASE.submit(_prune)
+            # Don't log errors, or we would try to write them back
+            deferred.add_errback(lambda failure: None)
 
     #
     # We don't want to log into the database when we run
@@ -218,36 +253,71 @@ class Logger(object):
     def redirect(self):
         self.logger = system.get_background_logger()
 
-    def _writeback(self):
-        """Really commit pending log records into the database"""
-
-        connection = DATABASE.connection()
-        table_log.prune(connection, DAYS_AGO, commit=False)
+    def _writeback(self, records):
+        """Really commit log records into the database"""
 
-        for record in self._queue:
-            table_log.insert(connection, record, False)
-        connection.commit()
-
-        now = utils.ticks()
-        if now - self.last_vacuum > INTERVAL_VACUUM:
-            connection.execute("VACUUM;")
-            self.last_vacuum = now
-        connection.commit()
+        deferred = DATABASE.submit(_writeback, records)
+        # Don't log errors, or we would try to write them back
+        deferred.add_errback(lambda failure: None)
 
     def writeback(self):
         """Commit pending log records into the database"""
 
+        if not self._ring:
+            return
+
+        # Purge the ring in any case
+        records = list(self._ring)
+        self._ring.clear()
+
+        self.stats["flushes"] += 1
+        self.stats["flushed_records"] += len(records)
+
         # At least do not crash
         try:
-            self._writeback()
+            self._writeback(records)
         except (KeyboardInterrupt, SystemExit):
             raise
         except:
             # TODO write this exception to syslog
             pass
 
-        # Purge the queue in any case
-        del self._queue[:]
+    def _flush_timeout(self):
+        """Write back FLUSH_INTERVAL seconds after the first record"""
+        self._flush_scheduled = False
+        if NOTIFIER.is_subscribed("testdone"):
+            self._flush_later()
+        else:
+            self.writeback()
+
+    def _flush_later(self):
+        """Write back in FLUSH_INTERVAL seconds, unless we already
+           plan to do that"""
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            POLLER.sched(FLUSH_INTERVAL, self._flush_timeout)
+
+    def _rate_limited(self, severity, template):
+        """Returns true if we have logged too many messages with
+           the given template and severity recently"""
+
+        now = utils.ticks()
+        if now - self._window >= RATE_INTERVAL:
+            templates = self._templates
+            self._window = now
+            self._templates = {}
+            for (key, count) in templates.items():
+                if count > RATE_BURST:
+                    self._emit(key[0], "log: suppressed %d messages like: %s"
+                               % (count - RATE_BURST, key[1]))
+
+        key = (severity, template)
+        count = self._templates.get(key, 0) + 1
+        self._templates[key] = count
+        if count > RATE_BURST:
+            self.stats["dropped_rate"] += 1
+            return True
+        return False
 
     def log(self, severity, message, args, exc_info):
         ''' Really log a message '''
@@ -274,69 +344,81 @@ class Logger(object):
         if not CONFIG['verbose'] and severity == 'DEBUG':
             return
 
+        #
+        # Decide whether to drop the message before formatting
+        # it, so that dropped messages cost as little as possible.
+        #
+        if severity != "ACCESS" and self._rate_limited(severity, message):
+            return
+
         # Lazy processing
         if args:
             message = message % args
-        if exc_info:
-            exc_list = traceback.format_exception(exc_info[0],
-                                                  exc_info[1],
-                                                  exc_info[2])
-            message = "%s\n%s\n" % (message, ''.join(exc_list))
-            for line in message.split('\n'):
-                self._log(severity, line, None, None)
-            return
 
-        message = message.rstrip()
+        for line in _split_lines(message, exc_info):
+            self._emit(severity, line)
 
-        # Write log into the database
-        if self._use_database and severity != "ACCESS":
-            record = {
-                      "timestamp": utils.timestamp(),
-                      "severity": severity,
-                      "message": message,
-                     }
+    def _emit(self, severity, message):
+        ''' Log a formatted message '''
 
+        # Queue log for the database
+        if self._use_database and severity != "ACCESS":
+            if len(self._ring) == RING_SIZE:
+                self.stats["dropped_overflow"] += 1
+            self._ring.append({
+                               "timestamp": utils.timestamp(),
+                               "severity": severity,
+                               "message": message,
+                              })
             #
-            # We don't need to commit INFO and DEBUG
-            # records: it's OK to see those with some
-            # delay.  While we want to see immediately
-            # WARNING and ERROR records.
-            # TODO We need to commit the database on
-            # sys.exit() and signals etc.  (This is
-            # more a database problem that a problem
-            # of this file.)
+            # While a test is in progress we keep records in the
+            # ring, so that we don't touch the database.
             #
-            if severity in ("INFO", "DEBUG"):
-                commit = False
-
-                # Do we need to commit now?
-                self._nocommit = self._nocommit -1
-                if self._nocommit <= 0:
-                    self._nocommit = NOCOMMIT
-                    commit = True
-
-            else:
-                # Must commit now
-                self._nocommit = NOCOMMIT
-                commit = True
-
-            self._queue.append(record)
-            if commit:
+            if (len(self._ring) >= FLUSH_RECORDS and
+              not NOTIFIER.is_subscribed("testdone")):
                 self.writeback()
+            else:
+                self._flush_later()
 
         # Write to the current logger object
         self.logger(severity, message)
 
+    def snap(self, data):
+        ''' Take a snapshot of logger statistics '''
+        data["log"] = dict(self.stats)
+        data["log"]["pending"] = len(self._ring)
+
     # Marshal
 
     def listify(self):
         if self._use_database:
             lst = table_log.listify(DATABASE.connection())
-            lst.extend(self._queue)
+            lst.extend(self._ring)
             return lst
         else:
             return []
 
+    def iterate(self, reverse=False):
+        """Yield the log records without loading them all at once"""
+        if self._use_database:
+            connection = DATABASE.connection()
+            if reverse:
+                # Skip what is written back while the caller is walking
+                queue = list(self._ring)
+                position = table_log.last_id(connection)
+                for record in reversed(queue):
+                    yield record
+                if position is not None:
+                    for record in table_log.iterate(connection, True,
+                                                    position=position + 1):
+                        yield record
+            else:
+                for record in table_log.iterate(connection):
+                    yield record
+                # Copy: we may write back while the caller is walking
+                for record in list(self._ring):
+                    yield record
+
 def oops(message="", func=None):
     if not func:
         func = logging.error
@@ -24,10 +24,12 @@
 
 import cgi
 
-from neubot.compat import json
+from neubot.http.json_body import ChunkedBody
+from neubot.http.json_body import JSONArrayBody
 from neubot.http.message import Message
 from neubot.log import LOG
 
+from neubot.http import json_body
 from neubot import utils
 
 def log_api(stream, request, query):
@@ -42,31 +44,27 @@ def log_api(stream, request, query):
     # to a log-caused Comet storm.
     #
 
-    # Get logs and options
-    logs = LOG.listify()
+    # Get logs and options, reversing logs on request
     options = cgi.parse_qs(query)
-
-    # Reverse logs on request
-    if utils.intify(options.get('reversed', ['0'])[0]):
-        logs = reversed(logs)
+    logs = LOG.iterate(utils.intify(options.get('reversed', ['0'])[0]))
 
     # Filter according to verbosity
     if utils.intify(options.get('verbosity', ['1'])[0]) < 2:
-        logs = [ log for log in logs if log['severity'] != 'DEBUG' ]
+        logs = ( log for log in logs if log['severity'] != 'DEBUG' )
     if utils.intify(options.get('verbosity', ['1'])[0]) < 1:
-        logs = [ log for log in logs if log['severity'] != 'INFO' ]
+        logs = ( log for log in logs if log['severity'] != 'INFO' )
 
     # Human-readable output?
     if utils.intify(options.get('debug', ['0'])[0]):
-        logs = [ '%(timestamp)d [%(severity)s]\t%(message)s\r\n' % log
-                 for log in logs ]
-        body = ''.join(logs).encode('utf-8')
+        logs = ( ('%(timestamp)d [%(severity)s]\t%(message)s\r\n'
+                  % log).encode('utf-8') for log in logs )
+        body = ChunkedBody(logs)
         mimetype = 'text/plain; encoding=utf-8'
     else:
-        body = json.dumps(logs)
+        body = JSONArrayBody(logs)
         mimetype = 'application/json'
 
-    # Compose and send response
+    # Compose and send response, streaming the logs
     response = Message()
-    response.compose(code='200', reason='Ok', body=body, mimetype=mimetype)
+    json_body.compose(request, response, body, mimetype)
     stream.send_response(request, response)
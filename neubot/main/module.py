@@ -35,6 +35,7 @@ MODULES = {
     "api.client"          : "neubot.api.client",
     "database"            : "neubot.database.main",
     "bittorrent"          : "neubot.bittorrent",
+    "bytegen_speedtest"   : "neubot.bytegen_speedtest",
     "http.client"         : "neubot.http.client",
     "http.server"         : "neubot.http.server",
     'notifier'            : 'neubot.notifier',
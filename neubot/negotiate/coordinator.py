@@ -0,0 +1,256 @@
+# neubot/negotiate/coordinator.py
+
+#
+# Copyright (c) 2013
+#     Nexa Center for Internet & Society, Politecnico di Torino (DAUIN)
+#     and Simone Basso <bassosimone@gmail.com>
+#
+# This file is part of Neubot <http://www.neubot.org/>.
+#
+# Neubot is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Neubot is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Neubot.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+''' Negotiate queue shared by many server processes '''
+
+#
+# When the server runs many worker processes, each worker accepts
+# its own clients, but there must be a single negotiate queue, so
+# that the number of tests running in parallel does not grow with
+# the number of workers.  The coordinator is a process that owns
+# the queue and talks with each worker over a UNIX domain socket,
+# using a trivial line-oriented protocol:
+#
+#     worker -> coordinator:
+#         join SID              -- add SID at the end of the queue
+#         leave SID             -- remove SID from the queue
+#
+#     coordinator -> worker:
+#         pos SID POS LENGTH    -- SID is now at position POS
+#         drop SID              -- SID was not admitted (RED)
+#         len LENGTH            -- the queue is now LENGTH long
+#
+# Where SID is an identifier that is unique within each worker.
+# The coordinator processes the lines in order, hence the queue
+# seen by the workers is always consistent.
+# The coordinator sends `pos` when SID joins the queue and when
+# it is unchoked only, and it sends `len` to all workers each time
+# the queue length changes.
+#
+
+import errno
+import logging
+import socket
+import sys
+
+from neubot.config import CONFIG
+from neubot.negotiate.server import NegotiateQueue
+from neubot.negotiate.server import random_early_discard
+from neubot.pollable import Pollable
+from neubot.poller import POLLER
+
+# Errors that mean `try again later'
+SOFT_ERRORS = (errno.EAGAIN, errno.EWOULDBLOCK, errno.EINTR)
+
+class CoordinatorChannel(Pollable):
+
+    ''' Line-oriented channel over a UNIX domain socket '''
+
+    def __init__(self, sock, handle_line, handle_eof):
+        Pollable.__init__(self)
+        self.watchdog = -1
+        self.sock = sock
+        self.sock.setblocking(False)
+        self.filenum = sock.fileno()
+        self.handle_line = handle_line
+        self.handle_eof = handle_eof
+        self.incoming = ''
+        self.outgoing = []
+        self.isclosed = False
+        POLLER.set_readable(self)
+
+    def __repr__(self):
+        return 'coordinator channel %d' % self.filenum
+
+    def fileno(self):
+        return self.filenum
+
+    def send_line(self, line):
+        ''' Queue line for sending '''
+        if not self.isclosed:
+            self.outgoing.append(line + '\n')
+            POLLER.set_writable(self)
+
+    def handle_read(self):
+        try:
+            data = self.sock.recv(262144)
+        except socket.error:
+            if sys.exc_info()[1].args[0] in SOFT_ERRORS:
+                return
+            raise
+        if not data:
+            POLLER.close(self)
+            return
+        lines = (self.incoming + data).split('\n')
+        self.incoming = lines.pop()
+        for line in lines:
+            self.handle_line(self, line.split())
+
+    def handle_write(self):
+        # Many updates are usually pending, write them in one go
+        data = ''.join(self.outgoing)
+        try:
+            count = self.sock.send(data)
+        except socket.error:
+            if sys.exc_info()[1].args[0] in SOFT_ERRORS:
+                return
+            raise
+        data = data[count:]
+        if data:
+            self.outgoing = [data]
+        else:
+            self.outgoing = []
+            POLLER.unset_writable(self)
+
+    def handle_close(self):
+        if not self.isclosed:
+            self.isclosed = True
+            self.sock.close()
+            self.handle_eof(self)
+
+class NegotiateCoordinator(object):
+
+    ''' Owns the negotiate queue on behalf of the workers '''
+
+    def __init__(self):
+        self.queue = NegotiateQueue()
+        self.channels = set()
+
+    def attach_worker(self, sock):
+        ''' Attach the worker at the other end of sock '''
+        channel = CoordinatorChannel(sock, self._handle_line,
+                                     self._handle_eof)
+        self.channels.add(channel)
+        return channel
+
+    def _handle_line(self, channel, words):
+        ''' Process a line received from a worker '''
+        if len(words) != 2:
+            raise RuntimeError('coordinator: protocol error')
+        if words[0] == 'join':
+            self.join(channel, words[1])
+        elif words[0] == 'leave':
+            self.leave(channel, words[1])
+        else:
+            raise RuntimeError('coordinator: protocol error')
+
+    def join(self, channel, sid):
+        ''' Add sid to the queue, unless RED says otherwise '''
+        position = len(self.queue)
+        if random_early_discard(position):
+            channel.send_line('drop %s' % sid)
+            return
+        self.queue.append((channel, sid), CONFIG['negotiate.parallelism'])
+        channel.send_line('pos %s %d %d' % (sid, position, len(self.queue)))
+        self._send_length()
+
+    def leave(self, channel, sid):
+        ''' Remove sid from the queue and notify the unchoked ones '''
+        try:
+            unchoked = self.queue.remove((channel, sid))
+        except KeyError:
+            return  # Dropped by RED
+        if unchoked:
+            self._unchoke()
+        self._send_length()
+
+    def _unchoke(self):
+        ''' Notify the entries that have just been unchoked '''
+        parallelism = CONFIG['negotiate.parallelism']
+        while True:
+            unchoked = self.queue.unchoke_next(parallelism)
+            if not unchoked:
+                break
+            (channel, sid), position = unchoked
+            channel.send_line('pos %s %d %d' % (sid, position,
+                                                len(self.queue)))
+
+    def _send_length(self):
+        ''' Tell all workers the length of the queue '''
+        for channel in self.channels:
+            channel.send_line('len %d' % len(self.queue))
+
+    def _handle_eof(self, lost_channel):
+        ''' Invoked when a worker goes away '''
+        logging.warning('coordinator: lost worker: %s', lost_channel)
+        self.channels.discard(lost_channel)
+        for entry in [entry for entry in self.queue
+                      if entry[0] is lost_channel]:
+            self.queue.remove(entry)
+        self._unchoke()
+        self._send_length()
+
+class NegotiateCoordinatorClient(object):
+
+    ''' Worker side of the coordinator protocol '''
+
+    def __init__(self, sock, server):
+        self.server = server
+        self.channel = CoordinatorChannel(sock, self._handle_line,
+                                          self._handle_eof)
+        self.streams = {}
+        self.sids = {}
+        self.counter = 0
+        self.queue_length = 0
+
+    def join(self, stream):
+        ''' Ask the coordinator to enqueue stream '''
+        self.counter += 1
+        sid = str(self.counter)
+        self.streams[sid] = stream
+        self.sids[stream] = sid
+        self.channel.send_line('join %s' % sid)
+
+    def leave(self, stream):
+        ''' Tell the coordinator that stream left the queue '''
+        sid = self.sids.pop(stream, None)
+        if sid is not None:
+            del self.streams[sid]
+            self.channel.send_line('leave %s' % sid)
+
+    def _handle_line(self, channel, words):
+        ''' Process a line received from the coordinator '''
+        if len(words) < 2:
+            raise RuntimeError('coordinator: protocol error')
+        if words[0] == 'len':
+            self.queue_length = int(words[1])
+            return
+        # Updates for streams that already left are not an error
+        stream = self.streams.get(words[1])
+        if words[0] == 'pos' and len(words) == 4:
+            self.queue_length = int(words[3])
+            if stream is not None:
+                self.server.position_changed(stream, int(words[2]))
+        elif words[0] == 'drop':
+            if stream is not None:
+                del self.streams[words[1]]
+                del self.sids[stream]
+                self.server.dropped(stream)
+        else:
+            raise RuntimeError('coordinator: protocol error')
+
+    @staticmethod
+    def _handle_eof(channel):
+        ''' Invoked when the coordinator goes away '''
+        logging.error('coordinator: lost connection with coordinator')
+        POLLER.break_loop()
@@ -22,10 +22,15 @@
 
 ''' Negotiate server '''
 
-import collections
+import itertools
 import random
 import logging
 
+try:
+    from collections import OrderedDict
+except ImportError:
+    from neubot.simplejson.ordered_dict import OrderedDict
+
 from neubot.config import CONFIG
 from neubot.http.message import Message
 from neubot.http.server import ServerHTTP
@@ -52,6 +57,60 @@ class NegotiateServerModule(object):
         ''' Invoked when a stream is authorized to take the test '''
         return { 'authorization': str(hash(stream)) }
 
+def random_early_discard(position):
+    ''' Return True if a stream arriving at position should be
+        dropped according to the Random Early Discard algorithm '''
+    min_thresh = CONFIG['negotiate.min_thresh']
+    max_thresh = CONFIG['negotiate.max_thresh']
+    return random.random() < float(position - min_thresh) / (
+                               max_thresh - min_thresh)
+
+class NegotiateQueue(object):
+
+    ''' Queue of the entries waiting to take a test '''
+
+    #
+    # Each entry is mapped to True once it has been unchoked, i.e.
+    # once it has been told that it can take the test.  Entries leave
+    # the queue in O(1), and, since only the first `parallelism`
+    # entries can be unchoked, we just need to walk them to find the
+    # next entry to unchoke.  We don't keep track of the position of
+    # the other entries: it changes each time an entry ahead of them
+    # leaves, and they only need to be told when they are unchoked.
+    #
+
+    def __init__(self):
+        self.entries = OrderedDict()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, entry):
+        return entry in self.entries
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def append(self, entry, parallelism):
+        ''' Append entry and return its position '''
+        position = len(self.entries)
+        self.entries[entry] = position < parallelism
+        return position
+
+    def remove(self, entry):
+        ''' Remove entry and return True if it was unchoked '''
+        return self.entries.pop(entry)
+
+    def unchoke_next(self, parallelism):
+        ''' Unchoke the first choked entry among the first parallelism
+            ones and return (entry, position), or None '''
+        for position, entry in enumerate(itertools.islice(self.entries,
+                                                          parallelism)):
+            if not self.entries[entry]:
+                self.entries[entry] = True
+                return entry, position
+        return None
+
 class NegotiateServer(ServerHTTP):
 
     ''' Common code layer for /negotiate and /collect '''
@@ -59,9 +118,22 @@ class NegotiateServer(ServerHTTP):
     def __init__(self, poller):
         ''' Initialize the negotiator '''
         ServerHTTP.__init__(self, poller)
-        self.queue = collections.deque()
+        self.queue = NegotiateQueue()
         self.modules = {}
         self.known = set()
+        self.positions = {}
+        self.coordinator = None
+
+    def attach_coordinator(self, coordinator):
+        ''' Delegate the queue to a coordinator shared among many
+            server processes (see negotiate/coordinator.py) '''
+        self.coordinator = coordinator
+
+    def queue_length(self):
+        ''' Return the current length of the queue '''
+        if self.coordinator:
+            return self.coordinator.queue_length
+        return len(self.queue)
 
     def register_module(self, name, module):
         ''' Register a module '''
@@ -124,23 +196,30 @@ class NegotiateServer(ServerHTTP):
         # immediately send a response.
         # When it's not the first time we see a stream, we just
         # take note that we owe it a response.  But we won't
-        # respond until its queue position changes.
+        # respond until it is unchoked, unless it has been
+        # unchoked while it had no pending request.
+        # With a coordinator, the decision and the position come
+        # later, so we treat also the first request as pending.
         #
         elif request.uri.startswith('/negotiate/'):
-            if not stream in self.known:
+            if not stream in self.known and self.coordinator:
+                self.known.add(stream)
+                stream.atclose(self._update_queue)
+                stream.opaque = request
+                self.coordinator.join(stream)
+            elif not stream in self.known:
                 position = len(self.queue)
-                min_thresh = CONFIG['negotiate.min_thresh']
-                max_thresh = CONFIG['negotiate.max_thresh']
-                if random.random() < float(position - min_thresh) / (
-                                       max_thresh - min_thresh):
+                if random_early_discard(position):
                     stream.close()
                     return
-                self.queue.append(stream)
+                self.queue.append(stream, CONFIG['negotiate.parallelism'])
                 self.known.add(stream)
                 stream.atclose(self._update_queue)
                 self._do_negotiate((stream, request, position))
             else:
                 stream.opaque = request
+                if stream in self.positions:
+                    self.position_changed(stream, self.positions.pop(stream))
 
         # For robustness
         else:
@@ -178,48 +257,73 @@ class NegotiateServer(ServerHTTP):
         stream.send_response(request, response)
 
     #
-    # In theory this function should walk the queue and remove the
-    # lost stream.  But, actually, it seems better/faster to create
-    # and fill a new queue.
-    # In the new queue we will add streams before @lost_stream and
-    # streams after @lost_stream that (i) have no pending comet
-    # request or (ii) have a pending comet request and successfully
-    # manage to send it.
-    # Note: in case of error sending the pending comet request,
-    # unregister atclose hook to prevent recursion.
-    # TODO Libero Camillo suggests to use an ordered dictionary to
-    # implement the queue.  I like the idea and I will look into
-    # that after the pending Neubot release.
+    # When a stream leaves the queue, only the streams that are
+    # unchoked because of that need a response: the position of the
+    # other ones changes, but they cannot take the test anyway.  So
+    # we don't send a comet response to all the streams behind the
+    # lost one, as we did in the past.
+    # Note: in case of error sending the response, unregister the
+    # atclose hook to prevent recursion.
     #
     def _update_queue(self, lost_stream, ignored):
         ''' Invoked when a connection is lost '''
-        queue, found = collections.deque(), False
-        position = 0
-        for stream in self.queue:
-            if not found:
-                if lost_stream != stream:
-                    position += 1
-                    queue.append(stream)
-                else:
-                    found = True
-                    self.known.remove(stream)
-            elif not stream.opaque:
-                position += 1
-                queue.append(stream)
+        self.known.remove(lost_stream)
+        self.positions.pop(lost_stream, None)
+        if self.coordinator:
+            self.coordinator.leave(lost_stream)
+        else:
+            self._leave(lost_stream)
+
+    def _leave(self, lost_stream):
+        ''' Remove lost_stream from the queue and respond to the
+            streams that are unchoked because of that '''
+        if not self.queue.remove(lost_stream):
+            return
+        parallelism = CONFIG['negotiate.parallelism']
+        while True:
+            unchoked = self.queue.unchoke_next(parallelism)
+            if not unchoked:
+                break
+            stream, position = unchoked
+            if not self._send_position(stream, position):
+                self.queue.remove(stream)
+
+    def _send_position(self, stream, position):
+        ''' Respond to the pending request of stream, or save position
+            until stream sends its next request.  Returns False if
+            we closed stream because of an error. '''
+        if not stream.opaque:
+            self.positions[stream] = position
+            return True
+        request, stream.opaque = stream.opaque, None
+        try:
+            self._do_negotiate((stream, request, position))
+        except (KeyboardInterrupt, SystemExit):
+            raise
+        except:
+            logging.error('Exception', exc_info=1)
+            stream.unregister_atclose(self._update_queue)
+            self.known.remove(stream)
+            stream.close()
+            return False
+        return True
+
+    def position_changed(self, stream, position):
+        ''' Invoked when stream is unchoked, by the coordinator or
+            because it has sent the request we owe a response to '''
+        if not self._send_position(stream, position):
+            if self.coordinator:
+                self.coordinator.leave(stream)
             else:
-                request, stream.opaque = stream.opaque, None
-                try:
-                    self._do_negotiate((stream, request, position))
-                    position += 1
-                    queue.append(stream)
-                except (KeyboardInterrupt, SystemExit):
-                    raise
-                except:
-                    logging.error('Exception', exc_info=1)
-                    stream.unregister_atclose(self._update_queue)
-                    self.known.remove(stream)
-                    stream.close()
-        self.queue = queue
+                self._leave(stream)
+
+    def dropped(self, stream):
+        ''' Invoked by the coordinator when stream is not admitted
+            into the queue by Random Early Discard '''
+        stream.unregister_atclose(self._update_queue)
+        self.known.remove(stream)
+        stream.opaque = None
+        stream.close()
 
 # No poller, so it cannot be used directly
 NEGOTIATE_SERVER = NegotiateServer(None)
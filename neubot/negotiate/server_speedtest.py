@@ -26,6 +26,7 @@ import logging
 
 from neubot.negotiate.server import NegotiateServerModule
 from neubot.backend import BACKEND
+from neubot.tcp_info import TCP_INFO_SAMPLER
 
 from neubot import privacy
 
@@ -82,6 +83,10 @@ class NegotiateServerSpeedtest(NegotiateServerModule):
               'privacy_can_share']
             del request_body['privacy_can_share']
 
+        tcp_info = TCP_INFO_SAMPLER.collect(ident)
+        if tcp_info:
+            request_body['srvr_tcp_info'] = tcp_info
+
         if privacy.collect_allowed(request_body):
             BACKEND.speedtest_store(request_body)
         else:
@@ -95,5 +100,6 @@ class NegotiateServerSpeedtest(NegotiateServerModule):
         ident = str(hash(stream))
         if ident in self.clients:
             self.clients.remove(ident)
+        TCP_INFO_SAMPLER.discard(ident)
 
 NEGOTIATE_SERVER_SPEEDTEST = NegotiateServerSpeedtest()
@@ -48,9 +48,13 @@ from neubot.config import CONFIG
 from neubot.log import oops
 from neubot.net.poller import POLLER
 from neubot.net.poller import Pollable
+from neubot.recvbuf import RECV_STATS
+from neubot.recvbuf import SCRATCH
+from neubot.utils_sendfile import SendfileBody
 
 from neubot import utils
 from neubot import utils_net
+from neubot import utils_sendfile
 
 from neubot.main import common
 
@@ -86,6 +90,18 @@ if ssl:
                 else:
                     return ERROR, exception
 
+        def sorecv_into(self, view, maxlen):
+            try:
+                count = self.sock.recv_into(view, maxlen)
+                return SUCCESS, count
+            except ssl.SSLError, exception:
+                if exception[0] == ssl.SSL_ERROR_WANT_READ:
+                    return WANT_READ, 0
+                elif exception[0] == ssl.SSL_ERROR_WANT_WRITE:
+                    return WANT_WRITE, 0
+                else:
+                    return ERROR, exception
+
         def sosend(self, octets):
             try:
                 count = self.sock.write(octets)
@@ -120,6 +136,18 @@ class SocketWrapper(object):
             else:
                 return ERROR, exception
 
+    def sorecv_into(self, view, maxlen):
+        try:
+            count = self.sock.recv_into(view, maxlen)
+            return SUCCESS, count
+        except socket.error, exception:
+            if exception[0] in SOFT_ERRORS:
+                return WANT_READ, 0
+            elif exception[0] == errno.ECONNRESET:
+                return CONNRESET, 0
+            else:
+                return ERROR, exception
+
     def sosend(self, octets):
         try:
             count = self.sock.send(octets)
@@ -132,6 +160,20 @@ class SocketWrapper(object):
             else:
                 return ERROR, exception
 
+    def sosendfile(self, body):
+        offset, count = body.region()
+        try:
+            count = utils_sendfile.sendfile(self.sock.fileno(),
+              body.fileno(), offset, count)
+            return SUCCESS, count
+        except (OSError, socket.error), exception:
+            if exception.errno in SOFT_ERRORS:
+                return WANT_WRITE, 0
+            elif exception.errno == errno.ECONNRESET:
+                return CONNRESET, 0
+            else:
+                return ERROR, exception
+
 class Stream(Pollable):
     def __init__(self, poller):
         Pollable.__init__(self)
@@ -150,8 +192,10 @@ class Stream(Pollable):
         self.close_complete = False
         self.close_pending = False
         self.recv_blocked = False
+        self.recv_discard = 0
         self.recv_pending = False
         self.recv_ssl_needs_kickoff = False
+        self.recv_stats = None
         self.send_blocked = False
         self.send_octets = None
         self.send_queue = collections.deque()
@@ -178,6 +222,7 @@ class Stream(Pollable):
         self.myname = utils_net.getsockname(sock)
         self.peername = utils_net.getpeername(sock)
         self.logname = str((self.myname, self.peername))
+        self.set_recv_stats(parent.__class__.__module__)
 
         logging.debug("* Connection made %s", str(self.logname))
 
@@ -249,6 +294,21 @@ class Stream(Pollable):
 
     # Recv path
 
+    def set_recv_stats(self, test):
+        ''' Account received bytes to test '''
+        self.recv_stats = RECV_STATS.get(test)
+
+    #
+    # Like start_recv() but reads at most maxlen bytes and throws
+    # them away, without allocating a new string.  Once done, the
+    # recv_discarded() callback is invoked with the number of bytes.
+    #
+    def start_recv_discard(self, maxlen):
+        if self.recv_pending:
+            return
+        self.recv_discard = min(maxlen, MAXBUF)
+        self.start_recv()
+
     def start_recv(self):
         if (self.close_complete or self.close_pending
           or self.recv_pending):
@@ -287,11 +347,36 @@ class Stream(Pollable):
             self.handle_write()
             return
 
-        status, octets = self.sock.sorecv(MAXBUF)
+        if self.recv_discard > 0:
+            status, count = self.sock.sorecv_into(SCRATCH.reserve(
+                                 self.recv_discard), self.recv_discard)
+
+            if status == SUCCESS and count > 0:
+
+                self.bytes_recv_tot += count
+                self.recv_stats['discard_reads'] += 1
+                self.recv_stats['discarded_bytes'] += count
+                self.recv_discard = 0
+                self.recv_pending = False
+                self.poller.unset_readable(self)
+
+                self.recv_discarded(count)
+                return
+
+            # Map to the same values that are returned by sorecv()
+            if status == ERROR:
+                octets = count
+            else:
+                octets = ""
+
+        else:
+            status, octets = self.sock.sorecv(MAXBUF)
 
         if status == SUCCESS and octets:
 
             self.bytes_recv_tot += len(octets)
+            self.recv_stats['allocations'] += 1
+            self.recv_stats['allocated_bytes'] += len(octets)
             self.recv_pending = False
             self.poller.unset_readable(self)
 
@@ -326,6 +411,9 @@ class Stream(Pollable):
     def recv_complete(self, octets):
         pass
 
+    def recv_discarded(self, count):
+        pass
+
     # Send path
 
     def read_send_queue(self):
@@ -333,11 +421,18 @@ class Stream(Pollable):
 
         while self.send_queue:
             octets = self.send_queue[0]
-            if isinstance(octets, basestring):
+            if isinstance(octets, (basestring, buffer)):
                 # remove the piece in any case
                 self.send_queue.popleft()
                 if octets:
                     break
+            elif (isinstance(octets, SendfileBody) and
+                  isinstance(self.sock, SocketWrapper) and
+                  utils_sendfile.HAVE_SENDFILE):
+                # handle_write() sends it with sendfile()
+                self.send_queue.popleft()
+                if octets:
+                    break
             else:
                 octets = octets.read(MAXBUF)
                 if octets:
@@ -380,31 +475,38 @@ class Stream(Pollable):
             self.handle_read()
             return
 
-        status, count = self.sock.sosend(self.send_octets)
+        if isinstance(self.send_octets, SendfileBody):
+            status, count = self.sock.sosendfile(self.send_octets)
+        else:
+            status, count = self.sock.sosend(self.send_octets)
 
         if status == SUCCESS and count > 0:
             self.bytes_sent_tot += count
 
-            if count == len(self.send_octets):
+            if count > len(self.send_octets):
+                raise RuntimeError("Sent more than expected")
 
-                self.send_octets = self.read_send_queue()
+            if isinstance(self.send_octets, SendfileBody):
+                self.send_octets.advance(count)
                 if self.send_octets:
                     return
 
-                self.send_pending = False
-                self.poller.unset_writable(self)
-
-                self.send_complete()
-                if self.close_pending:
-                    self.poller.close(self)
-                return
-
-            if count < len(self.send_octets):
+            elif count < len(self.send_octets):
                 self.send_octets = buffer(self.send_octets, count)
                 self.poller.set_writable(self)
                 return
 
-            raise RuntimeError("Sent more than expected")
+            self.send_octets = self.read_send_queue()
+            if self.send_octets:
+                return
+
+            self.send_pending = False
+            self.poller.unset_writable(self)
+
+            self.send_complete()
+            if self.close_pending:
+                self.poller.close(self)
+            return
 
         if status == WANT_WRITE:
             return
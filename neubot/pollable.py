@@ -25,6 +25,8 @@
 # Adapted from neubot/net/poller.py
 # Python3-ready: yes
 
+from neubot.poller import POLLER
+
 from neubot import utils
 
 # States returned by the socket model
@@ -62,3 +64,4 @@ class Pollable(object):
         ''' Set timeout of this pollable '''
         self.created = utils.ticks()
         self.watchdog = timeo
+        POLLER.update_watchdog(self)
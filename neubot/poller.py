@@ -29,44 +29,70 @@
 import logging
 import errno
 import select
-import sched
 import sys
 
 from neubot.utils import ticks
 from neubot.utils import timestamp
 
+from neubot.poller_timers import PollerTimers
+
+from neubot import poller_mux
+
 #
 # Number of seconds between each check for timed-out
 # I/O operations.
 #
 CHECK_TIMEOUT = 10
 
-class Poller(sched.scheduler):
+class Poller(object):
 
     ''' Dispatch read, write, periodic and other events '''
 
     #
     # We always keep the check_timeout() event registered
-    # so the scheduler is alive forever.
-    # We register self._poll() as the delay function and
-    # in that function we either invoke select() or we
-    # sleep for the requested amount of time.
+    # so the loop is alive forever.
+    # At each iteration we run the expired tasks and then
+    # we poll the multiplexer until the next deadline.
     #
 
     def __init__(self, select_timeout):
         ''' Initialize '''
-        sched.scheduler.__init__(self, ticks, self._poll)
         self.select_timeout = select_timeout
         self.again = True
         self.readset = {}
         self.writeset = {}
+        self.timers = PollerTimers()
+        self.watchdogs = PollerTimers()
+        self.watched = {}
+        self.watchdog_stats = {
+            'visited': 0,
+            'closed': 0,
+            'elapsed': 0.0,
+        }
+        self.multiplexer = poller_mux.create()
         self.check_timeout()
 
+    def set_multiplexer(self, name):
+        ''' Switch to the I/O multiplexer named name '''
+        multiplexer = poller_mux.create(name)
+        for fileno in set(self.readset) | set(self.writeset):
+            multiplexer.update(fileno, fileno in self.readset,
+                               fileno in self.writeset)
+        self.multiplexer.close()
+        self.multiplexer = multiplexer
+
+    def _update_interest(self, fileno):
+        ''' Tell the multiplexer about changes in interest '''
+        self.multiplexer.update(fileno, fileno in self.readset,
+                                fileno in self.writeset)
+
     def sched(self, delta, func, *args):
-        ''' Schedule task '''
+        ''' Schedule task and return a handle that can be used to
+            cancel it and that carries the timestamp at which the
+            task is expected to run '''
         #logging.debug('poller: sched: %s, %s, %s', delta, func, args)
-        self.enter(delta, 0, self._run_task, (func, args))
-        return timestamp() + delta
+        return self.timers.schedule(ticks() + delta, timestamp() + delta,
+                                    func, args)
 
     @staticmethod
     def _run_task(func, args):
@@ -82,30 +108,53 @@ class Poller(sched.scheduler):
         except:
             logging.error('poller: run_task() failed', exc_info=1)
 
+    #
+    # We only tell the multiplexer about a fileno when our interest
+    # in it changes, so that we don't need to rebuild the sets of
+    # monitored filenos at each loop iteration.
+    #
+
     def set_readable(self, stream):
         ''' Monitor for readability '''
-        self.readset[stream.fileno()] = stream
+        fileno = stream.fileno()
+        if fileno not in self.readset:
+            self.readset[fileno] = stream
+            self._update_interest(fileno)
+        else:
+            self.readset[fileno] = stream
+        self._watch(stream, fileno)
 
     def set_writable(self, stream):
         ''' Monitor for writability '''
-        self.writeset[stream.fileno()] = stream
+        fileno = stream.fileno()
+        if fileno not in self.writeset:
+            self.writeset[fileno] = stream
+            self._update_interest(fileno)
+        else:
+            self.writeset[fileno] = stream
+        self._watch(stream, fileno)
 
     def unset_readable(self, stream):
         ''' Stop monitoring for readability '''
         fileno = stream.fileno()
         if fileno in self.readset:
             del self.readset[fileno]
+            self._update_interest(fileno)
 
     def unset_writable(self, stream):
         ''' Stop monitoring for writability '''
         fileno = stream.fileno()
         if fileno in self.writeset:
             del self.writeset[fileno]
+            self._update_interest(fileno)
 
     def close(self, stream):
         ''' Safely close a stream '''
         self.unset_readable(stream)
         self.unset_writable(stream)
+        task = self.watched.pop(stream, None)
+        if task:
+            task.cancel()
         try:
             stream.handle_close()
         except (KeyboardInterrupt, SystemExit):
@@ -153,6 +202,21 @@ class Poller(sched.scheduler):
         ''' Break out of poller loop '''
         self.again = False
 
+    def run(self):
+        ''' Run expired tasks and dispatch I/O events '''
+        while True:
+            now = ticks()
+            while True:
+                expired = self.timers.pop_expired(now)
+                if not expired:
+                    break
+                self._run_task(expired[0], expired[1])
+            deadline = self.timers.next_deadline()
+            timeout = None
+            if deadline is not None:
+                timeout = max(0, deadline - ticks())
+            self._poll(timeout)
+
     def loop(self):
         ''' Poller loop '''
         while True:
@@ -177,13 +241,12 @@ class Poller(sched.scheduler):
 
             # Get list of readable/writable streams
             try:
-                res = select.select(list(self.readset.keys()),
-                                    list(self.writeset.keys()),
-                                    [], timeout)
+                res = self.multiplexer.poll(timeout)
             except select.error:
-                code = sys.exc_info()[1][0]
+                code = sys.exc_info()[1].args[0]
                 if code != errno.EINTR:
-                    logging.error('poller: select() failed', exc_info=1)
+                    logging.error('poller: %s() failed',
+                                  self.multiplexer.name, exc_info=1)
                     raise
 
                 else:
@@ -200,26 +263,97 @@ class Poller(sched.scheduler):
         else:
             raise KeyboardInterrupt('poller: no I/O pending')
 
+    #
+    # Each monitored stream has a watchdog, i.e. an entry in a heap
+    # ordered by the time at which the stream would expire, so that
+    # check_timeout() visits expired streams only.  The watchdog is
+    # armed when the stream is first monitored and it is lazily
+    # updated: when it expires we ask the stream whether it really
+    # expired, since created and watchdog may have changed in the
+    # meanwhile, and, if not, we arm it again.  Streams that are not
+    # monitored anymore when their watchdog expires are forgotten,
+    # and their watchdog is armed again if they are monitored later.
+    # So a stream does not need to tell us when it extends its
+    # deadline, but it MUST use set_timeout() to shorten it.
+    #
+
+    def _is_monitored(self, stream, fileno):
+        ''' Return True if stream is monitored for I/O '''
+        return (self.readset.get(fileno) is stream or
+                self.writeset.get(fileno) is stream)
+
+    def _watch(self, stream, fileno):
+        ''' Make sure the watchdog of stream is armed for fileno, e.g.
+            a connector may retry using a new socket '''
+        task = self.watched.get(stream)
+        if task:
+            if task.args == fileno:
+                return
+            del self.watched[stream]
+            task.cancel()
+        self._arm_watchdog(stream, fileno)
+
+    def _arm_watchdog(self, stream, fileno):
+        ''' Arm the watchdog of stream '''
+        if stream.watchdog >= 0:
+            # Note: we store the stream in place of the function
+            self.watched[stream] = self.watchdogs.schedule(
+              stream.created + stream.watchdog, 0, stream, fileno)
+
+    def update_watchdog(self, stream):
+        ''' Invoked by a stream when its timeout changes '''
+        task = self.watched.pop(stream, None)
+        if task:
+            fileno = task.args
+            task.cancel()
+        else:
+            fileno = stream.fileno()
+        if self._is_monitored(stream, fileno):
+            self._arm_watchdog(stream, fileno)
+
     def check_timeout(self):
         ''' Dispatch the periodic event '''
 
         self.sched(CHECK_TIMEOUT, self.check_timeout)
-        if self.readset or self.writeset:
 
-            streams = set()
-            streams.update(list(self.readset.values()))
-            streams.update(list(self.writeset.values()))
+        timenow = ticks()
+
+        #
+        # Collect all expired watchdogs before processing them, so
+        # that we don't visit twice a stream that we arm again.
+        #
+        expired = []
+        while True:
+            entry = self.watchdogs.pop_expired(timenow)
+            if not entry:
+                break
+            stream, fileno = entry
+            del self.watched[stream]
+            if self._is_monitored(stream, fileno):
+                expired.append((stream, fileno))
+
+        closed = 0
+        for stream, fileno in expired:
+            # Closing a stream may cause other streams to close
+            if not self._is_monitored(stream, fileno):
+                continue
+            if stream.handle_periodic(timenow):
+                logging.debug('poller: watchdog timeout: %s', str(stream))
+                self.close(stream)
+                closed += 1
+            else:
+                self._arm_watchdog(stream, fileno)
 
-            timenow = ticks()
-            for stream in streams:
-                if stream.handle_periodic(timenow):
-                    logging.debug('poller: watchdog timeout: %s', str(stream))
-                    self.close(stream)
+        self.watchdog_stats['visited'] = len(expired)
+        self.watchdog_stats['closed'] = closed
+        self.watchdog_stats['elapsed'] = ticks() - timenow
 
     def snap(self, data):
         ''' Take a snapshot of poller state '''
-        data['poller'] = { "readset": self.readset, "writeset": self.writeset }
-        if hasattr(self, 'queue'):
-            data['poller']['queue'] = self.queue
+        data['poller'] = { "readset": self.readset, "writeset": self.writeset,
+                           "multiplexer": self.multiplexer.name,
+                           "queue": self.timers.snap(),
+                           "watched": len(self.watched),
+                           "watchdog_stats": self.watchdog_stats }
 
 POLLER = Poller(1)
@@ -0,0 +1,287 @@
+# neubot/poller_mux.py
+
+#
+# Copyright (c) 2013
+#     Nexa Center for Internet & Society, Politecnico di Torino (DAUIN)
+#     and Simone Basso <bassosimone@gmail.com>
+#
+# This file is part of Neubot <http://www.neubot.org/>.
+#
+# Neubot is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Neubot is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Neubot.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+''' I/O multiplexers used by the poller '''
+
+# Python3-ready: yes
+
+#
+# Each multiplexer keeps track of the interest of the poller
+# in the readability and writability of each file descriptor.
+# The poller invokes update() each time the interest for a
+# file descriptor changes, so that epoll() and poll() do not
+# need to rebuild the whole set at each loop iteration, and
+# it invokes poll() to get the lists of readable and writable
+# file descriptors.
+#
+# All multiplexers are level triggered, because streams read
+# and write at most one buffer for each readiness event, and
+# so edge-triggered notifications would be lost.
+#
+
+import errno
+import logging
+import math
+import select
+import sys
+
+#
+# Errors that we get when we modify or register a file descriptor
+# that the kernel has already removed from the epoll set because it
+# was closed (and later reused for a new socket).
+#
+STALE_ERRORS = (errno.ENOENT, errno.EEXIST)
+
+class SelectMultiplexer(object):
+
+    ''' Multiplexer based on select() '''
+
+    name = 'select'
+
+    def __init__(self):
+        self.readset = {}
+        self.writeset = {}
+
+    def update(self, fileno, readable, writable):
+        ''' Update interest for fileno '''
+        if readable:
+            self.readset[fileno] = True
+        elif fileno in self.readset:
+            del self.readset[fileno]
+        if writable:
+            self.writeset[fileno] = True
+        elif fileno in self.writeset:
+            del self.writeset[fileno]
+
+    def poll(self, timeout):
+        ''' Return lists of readable and writable filenos '''
+        res = select.select(list(self.readset.keys()),
+                            list(self.writeset.keys()),
+                            [], timeout)
+        return res[0], res[1]
+
+    def close(self):
+        ''' Release resources '''
+        self.readset.clear()
+        self.writeset.clear()
+
+class _MaskMultiplexer(object):
+
+    ''' Base class for poll() and epoll() multiplexers '''
+
+    # Filled by subclasses
+    IN = 0
+    OUT = 0
+    READ_EVENTS = 0
+    WRITE_EVENTS = 0
+
+    def __init__(self):
+        self.masks = {}
+
+    def _register(self, fileno, mask):
+        ''' Register fileno with the kernel '''
+
+    def _modify(self, fileno, mask):
+        ''' Modify fileno registration '''
+
+    def _unregister(self, fileno):
+        ''' Unregister fileno '''
+
+    def update(self, fileno, readable, writable):
+        ''' Update interest for fileno '''
+
+        mask = 0
+        if readable:
+            mask |= self.IN
+        if writable:
+            mask |= self.OUT
+
+        omask = self.masks.get(fileno, 0)
+        if mask == omask:
+            return
+
+        if not mask:
+            del self.masks[fileno]
+            try:
+                self._unregister(fileno)
+            except (IOError, OSError, KeyError):
+                # Already closed: the kernel did the job for us
+                logging.debug('poller_mux: stale fileno: %d', fileno)
+            return
+
+        self.masks[fileno] = mask
+
+        #
+        # Note that a closed file descriptor is silently removed
+        # from the epoll set, so the number may be reused for a new
+        # socket which we believe is registered.  Handle that by
+        # falling back from modify() to register() and viceversa.
+        #
+        try:
+            if omask:
+                self._modify(fileno, mask)
+            else:
+                self._register(fileno, mask)
+        except (IOError, OSError):
+            code = sys.exc_info()[1].args[0]
+            if code == errno.EBADF:
+                # Forget it: the watchdog will reclaim the stream
+                logging.warning('poller_mux: bad fileno: %d', fileno)
+                del self.masks[fileno]
+                return
+            if code not in STALE_ERRORS:
+                raise
+            if omask:
+                self._register(fileno, mask)
+            else:
+                self._modify(fileno, mask)
+
+    def _wait(self, timeout):
+        ''' Wait for events and return list of (fileno, event) '''
+        return []
+
+    def poll(self, timeout):
+        ''' Return lists of readable and writable filenos '''
+
+        try:
+            events = self._wait(timeout)
+        except (IOError, OSError):
+            # Make errors look like the ones raised by select()
+            raise select.error(*sys.exc_info()[1].args)
+
+        readable, writable = [], []
+        for fileno, event in events:
+            if event & self.READ_EVENTS:
+                readable.append(fileno)
+            if event & self.WRITE_EVENTS:
+                writable.append(fileno)
+        return readable, writable
+
+    def close(self):
+        ''' Release resources '''
+        self.masks.clear()
+
+class PollMultiplexer(_MaskMultiplexer):
+
+    ''' Multiplexer based on poll() '''
+
+    name = 'poll'
+
+    #
+    # Errors and hangups are reported both as readable and as
+    # writable, so that the stream notices them no matter which
+    # operation it is waiting for.  This mimics select().
+    #
+    if hasattr(select, 'poll'):
+        IN = select.POLLIN | select.POLLPRI
+        OUT = select.POLLOUT
+        _ERRORS = select.POLLERR | select.POLLHUP | select.POLLNVAL
+        READ_EVENTS = IN | _ERRORS
+        WRITE_EVENTS = OUT | _ERRORS
+
+    def __init__(self):
+        _MaskMultiplexer.__init__(self)
+        self._poll = select.poll()
+
+    def _register(self, fileno, mask):
+        self._poll.register(fileno, mask)
+
+    def _modify(self, fileno, mask):
+        # Re-registering with poll() is not an error
+        self._poll.register(fileno, mask)
+
+    def _unregister(self, fileno):
+        self._poll.unregister(fileno)
+
+    def _wait(self, timeout):
+        if timeout is not None:
+            # Round up, otherwise we busy-loop until the deadline
+            timeout = int(math.ceil(timeout * 1000))
+        return self._poll.poll(timeout)
+
+class EpollMultiplexer(_MaskMultiplexer):
+
+    ''' Multiplexer based on Linux epoll() '''
+
+    name = 'epoll'
+
+    if hasattr(select, 'epoll'):
+        IN = select.EPOLLIN | select.EPOLLPRI
+        OUT = select.EPOLLOUT
+        _ERRORS = select.EPOLLERR | select.EPOLLHUP
+        READ_EVENTS = IN | _ERRORS
+        WRITE_EVENTS = OUT | _ERRORS
+
+    def __init__(self):
+        _MaskMultiplexer.__init__(self)
+        self._epoll = select.epoll()
+
+    def _register(self, fileno, mask):
+        self._epoll.register(fileno, mask)
+
+    def _modify(self, fileno, mask):
+        self._epoll.modify(fileno, mask)
+
+    def _unregister(self, fileno):
+        self._epoll.unregister(fileno)
+
+    def _wait(self, timeout):
+        if timeout is None:
+            timeout = -1
+        return self._epoll.poll(timeout)
+
+    def close(self):
+        _MaskMultiplexer.close(self)
+        self._epoll.close()
+
+MULTIPLEXERS = {
+    'epoll': EpollMultiplexer,
+    'poll': PollMultiplexer,
+    'select': SelectMultiplexer,
+}
+
+def available():
+    ''' Return the list of available multiplexers, best first '''
+    result = []
+    if hasattr(select, 'epoll'):
+        result.append('epoll')
+    # Poll() was broken on some MacOSX releases
+    if hasattr(select, 'poll') and sys.platform != 'darwin':
+        result.append('poll')
+    result.append('select')
+    return result
+
+def create(name='auto'):
+    ''' Create the multiplexer named name, or the best one
+        available if name is 'auto' '''
+    if name != 'auto' and name not in MULTIPLEXERS:
+        raise ValueError('poller_mux: unknown multiplexer: %s' % name)
+    names = available()
+    if name == 'auto':
+        name = names[0]
+    elif name not in names:
+        logging.warning('poller_mux: %s not available; using %s', name,
+                        names[0])
+        name = names[0]
+    logging.debug('poller_mux: using %s multiplexer', name)
+    return MULTIPLEXERS[name]()
@@ -0,0 +1,132 @@
+# neubot/poller_timers.py
+
+#
+# Copyright (c) 2013
+#     Nexa Center for Internet & Society, Politecnico di Torino (DAUIN)
+#     and Simone Basso <bassosimone@gmail.com>
+#
+# This file is part of Neubot <http://www.neubot.org/>.
+#
+# Neubot is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Neubot is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Neubot.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+''' Timers used by the poller '''
+
+# Python3-ready: yes
+
+#
+# This is a binary heap with lazy deletion.  Cancelling a task is
+# O(1) because we just mark the task as dead and we leave it into
+# the heap; dead tasks are skipped when they reach the top.  When
+# dead tasks are more than live tasks we rebuild the heap, so that
+# memory is bounded even when most timers are cancelled (e.g. the
+# watchdogs of streams that complete normally).
+#
+# Unlike sched.scheduler there is no locking, because the poller
+# is single threaded.
+#
+
+import heapq
+import itertools
+
+# Do not bother rebuilding tiny heaps
+COMPACT_MIN = 64
+
+class PollerTask(object):
+
+    ''' Handle of a scheduled task '''
+
+    __slots__ = ('deadline', 'timestamp', 'func', 'args', '_timers')
+
+    def __init__(self, timers, deadline, timestamp, func, args):
+        self._timers = timers
+        self.deadline = deadline
+        self.timestamp = timestamp
+        self.func = func
+        self.args = args
+
+    def cancel(self):
+        ''' Cancel this task, if it did not run yet '''
+        if self.func is not None:
+            self.func = None
+            self.args = None
+            self._timers.cancelled()
+
+    def pending(self):
+        ''' Return True if this task did not run yet '''
+        return self.func is not None
+
+    def __repr__(self):
+        return '<PollerTask %s at %f>' % (self.func, self.deadline)
+
+class PollerTimers(object):
+
+    ''' Heap of scheduled tasks '''
+
+    def __init__(self):
+        self.heap = []
+        self.counter = itertools.count()
+        self.dead = 0
+
+    def schedule(self, deadline, timestamp, func, args):
+        ''' Schedule func(args) at deadline and return a task '''
+        task = PollerTask(self, deadline, timestamp, func, args)
+        # The counter guarantees FIFO order for equal deadlines
+        heapq.heappush(self.heap, [deadline, next(self.counter), task])
+        return task
+
+    def cancelled(self):
+        ''' Invoked by a task when it is cancelled '''
+        self.dead += 1
+        if self.dead > COMPACT_MIN and self.dead * 2 > len(self.heap):
+            self.heap = [entry for entry in self.heap
+                         if entry[2].func is not None]
+            heapq.heapify(self.heap)
+            self.dead = 0
+
+    def _skip_dead(self):
+        ''' Remove dead tasks from the top of the heap '''
+        heap = self.heap
+        while heap and heap[0][2].func is None:
+            heapq.heappop(heap)
+            self.dead -= 1
+
+    def next_deadline(self):
+        ''' Return the deadline of the first task or None '''
+        self._skip_dead()
+        if self.heap:
+            return self.heap[0][0]
+        return None
+
+    def pop_expired(self, now):
+        ''' Pop the first task expired at now and return its func
+            and args, or None if no task is expired '''
+        self._skip_dead()
+        heap = self.heap
+        if heap and heap[0][0] <= now:
+            task = heapq.heappop(heap)[2]
+            func, args = task.func, task.args
+            # No longer in the heap, so cancel() must be a no-op
+            task.func = task.args = None
+            return func, args
+        return None
+
+    def __len__(self):
+        ''' Number of pending tasks '''
+        return len(self.heap) - self.dead
+
+    def snap(self):
+        ''' Return sorted list of pending tasks '''
+        return [entry[2] for entry in sorted(self.heap)
+                if entry[2].func is not None]
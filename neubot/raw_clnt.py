@@ -47,6 +47,7 @@ from neubot.raw_defs import PINGBACK
 from neubot.raw_defs import PINGBACK_CODE
 from neubot.raw_defs import RAWTEST
 from neubot.state import STATE
+from neubot.stream import RECV_RING
 from neubot.stream import Stream
 
 from neubot import utils
@@ -161,7 +162,8 @@ class RawClient(Handler):
 
     def _rawtest_sent(self, stream):
         ''' The RAWTEST message has been sent '''
-        stream.recv(MAXRECV, self._waiting_piece)
+        # Pieces are skipped, so there's no need to allocate new strings
+        stream.recv(MAXRECV, self._waiting_piece, RECV_RING)
 
     def _waiting_piece(self, stream, data):
         ''' Invoked when new data is available '''
@@ -210,7 +212,7 @@ class RawClient(Handler):
                     return
             else:
                 raise RuntimeError('raw_clnt: internal error')
-        stream.recv(MAXRECV, self._waiting_piece)
+        stream.recv(MAXRECV, self._waiting_piece, RECV_RING)
 
     def _periodic(self, args):
         ''' Periodically snap goodput '''
@@ -48,6 +48,7 @@ from neubot.http_clnt import HttpClient
 from neubot.notify import NOTIFIER
 from neubot.poller import POLLER
 from neubot.raw_clnt import RawClient
+from neubot.runner_hosts import RUNNER_HOSTS
 from neubot.state import STATE
 
 from neubot import http_utils
@@ -169,6 +170,8 @@ class RawNegotiate(HttpClient):
         # Note: this function MUST be callable multiple times
         extra = stream.opaque.extra
         extra['authorization'] = response['authorization']
+        RUNNER_HOSTS.update_load(extra['address'],
+                                 {'queue_len': response['queue_pos']})
         if response['unchoked']:
             logging.debug('raw_negotiate: negotiate complete... unchoked')
             response['address'] = extra['address']  # XXX
@@ -49,6 +49,8 @@ from neubot.raw_defs import PIECE_CODE
 from neubot.raw_defs import PING_CODE
 from neubot.raw_defs import PINGBACK
 from neubot.stream import Stream
+from neubot.server_load import SERVER_LOAD
+from neubot.tcp_info import TCP_INFO_SAMPLER
 
 from neubot import six
 from neubot import utils
@@ -75,6 +77,7 @@ class ServerContext(Brigade):
         self.snap_utime = 0.0
         self.snap_stime = 0.0
         self.web100_dirname = six.u('')
+        self.periodic = None
 
 class RawServer(Handler):
 
@@ -152,7 +155,8 @@ class RawServer(Handler):
         context.message = struct.pack('!I', len(message)) + message
         stream.send(context.message, self._piece_sent)
         #logging.debug('> PIECE')
-        POLLER.sched(1, self._periodic, stream)
+        context.periodic = POLLER.sched(1, self._periodic, stream)
+        TCP_INFO_SAMPLER.watch(stream, stream)
         stream.recv(1, self._waiting_eof)
 
     @staticmethod
@@ -185,19 +189,23 @@ class RawServer(Handler):
         if timediff > 1e-06:
             speed = utils.speed_formatter(bytesdiff / timediff)
             logging.info('raw_srvr: goodput: %s', speed)
+            SERVER_LOAD.add_goodput(bytesdiff, timediff)
         self._periodic_internal(stream)
+        context.state['tcp_info'] = TCP_INFO_SAMPLER.collect(stream)
         stream.send(EMPTY_MESSAGE, self._empty_message_sent)
         logging.debug('> {empty-message}')
 
     def _periodic(self, args):
         ''' Periodically snap goodput '''
         stream = args[0]
-        if stream.opaque:
+        context = stream.opaque
+        if context:
             deferred = Deferred()
             deferred.add_callback(self._periodic_internal)
             deferred.add_errback(lambda err: self._periodic_error(stream, err))
             deferred.callback(stream)
-            POLLER.sched(1, self._periodic, stream)
+            if not stream.isclosed:
+                context.periodic = POLLER.sched(1, self._periodic, stream)
 
     @staticmethod
     def _periodic_error(stream, err):
@@ -235,11 +243,16 @@ class RawServer(Handler):
     def _empty_message_sent(stream):
         ''' Sent the empty message to signal end of test '''
         # Tell the poller to reclaim this stream in some seconds
-        stream.created = utils.ticks()
-        stream.watchdog = 5
+        stream.set_timeout(5)
 
-    def _connection_lost(self, stream):
+    @staticmethod
+    def _connection_lost(stream):
         ''' Invoked when the connection is lost '''
+        # Don't keep the stream alive until the next periodic event
+        if stream.opaque.periodic:
+            stream.opaque.periodic.cancel()
+            stream.opaque.periodic = None
+        TCP_INFO_SAMPLER.discard(stream)
 
 def main(args):
     ''' Main function '''
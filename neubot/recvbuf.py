@@ -0,0 +1,126 @@
+# neubot/recvbuf.py
+
+#
+# Copyright (c) 2013
+#     Nexa Center for Internet & Society, Politecnico di Torino (DAUIN)
+#     and Simone Basso <bassosimone@gmail.com>
+#
+# This file is part of Neubot <http://www.neubot.org/>.
+#
+# Neubot is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Neubot is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Neubot.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+''' Preallocated receive buffers '''
+
+# Python3-ready: yes
+
+#
+# By default streams use recv(), which allocates a new string for
+# each read (up to 256 KiB).  Most of the time, however, the tests
+# just count the received bytes and throw them away.  So streams can
+# also receive into preallocated buffers using recv_into():
+#
+# - in ring mode the data is received into a per-stream ring buffer
+#   and the protocol gets a view of it, which is valid until the ring
+#   wraps around, i.e. for at least RING_SLOTS - 1 further reads;
+#
+# - in discard mode the data is received into a scratch buffer that
+#   is shared by all streams, and the protocol only gets the number
+#   of bytes received.
+#
+# We also count allocations and bytes for each test, so that one can
+# verify via the debug API whether the buffers are actually reused.
+#
+
+from neubot import six
+
+# Must be larger than the largest recv() of any protocol
+MAXRECV = 1 << 18
+
+# Number of max-sized reads that fit into a ring
+RING_SLOTS = 4
+
+if six.PY3:
+    def _view(buff, offset, count):
+        ''' Return view of count bytes of buff at offset '''
+        return memoryview(buff)[offset:offset + count]
+else:
+    def _view(buff, offset, count):
+        ''' Return view of count bytes of buff at offset '''
+        # Unlike memoryview, buffer behaves like str in Python 2
+        return buffer(buff, offset, count)
+
+class RingBuffer(object):
+
+    ''' Ring buffer for recv_into() '''
+
+    def __init__(self, size=MAXRECV * RING_SLOTS):
+        self.buff = bytearray(size)
+        self.view = memoryview(self.buff)
+        self.offset = 0
+
+    def reserve(self, maxlen):
+        ''' Return writable view of the next maxlen bytes '''
+        if maxlen > len(self.buff) // RING_SLOTS:
+            raise RuntimeError('recvbuf: maxlen too large')
+        if self.offset + maxlen > len(self.buff):
+            self.offset = 0
+        return self.view[self.offset:self.offset + maxlen]
+
+    def commit(self, count):
+        ''' Mark count bytes as received and return a view of them '''
+        octets = _view(self.buff, self.offset, count)
+        self.offset += count
+        return octets
+
+class Scratch(object):
+
+    ''' Scratch buffer used to discard data '''
+
+    def __init__(self, size=MAXRECV):
+        self.view = memoryview(bytearray(size))
+
+    def reserve(self, maxlen):
+        ''' Return writable view of up to maxlen bytes '''
+        return self.view[:maxlen]
+
+SCRATCH = Scratch()
+
+class RecvStats(object):
+
+    ''' Receive statistics for each test '''
+
+    def __init__(self):
+        self.tests = {}
+
+    def get(self, test):
+        ''' Return the statistics of test, creating them if needed '''
+        stats = self.tests.get(test)
+        if stats is None:
+            stats = self.tests[test] = {
+                'allocations': 0,
+                'allocated_bytes': 0,
+                'ring_reads': 0,
+                'ring_bytes': 0,
+                'discard_reads': 0,
+                'discarded_bytes': 0,
+            }
+        return stats
+
+    def snap(self, data):
+        ''' Take a snapshot of the statistics '''
+        data['recvbuf'] = dict((test, dict(stats)) for test, stats
+                               in self.tests.items())
+
+RECV_STATS = RecvStats()
@@ -0,0 +1,206 @@
+# neubot/rendezvous/geoip_table.py
+
+#
+# Copyright (c) 2013
+#     Nexa Center for Internet & Society, Politecnico di Torino (DAUIN)
+#     and Simone Basso <bassosimone@gmail.com>
+#
+# This file is part of Neubot <http://www.neubot.org/>.
+#
+# Neubot is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Neubot is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Neubot.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+''' Pure-Python country geolocation '''
+
+# Python3-ready: yes
+
+#
+# The table maps address ranges to countries.  We load it at startup
+# from a CSV file, where each row is either a network in CIDR notation
+# followed by the country code, e.g.:
+#
+#     130.192.0.0/16,IT
+#
+# or a row of MaxMind's legacy GeoIPCountryWhois.csv or GeoIPv6.csv,
+# where the first two fields are the first and the last address of
+# the range, and the fifth field is the country code.
+#
+# Ranges are either disjoint or nested (when they are nested the more
+# specific range wins), so we flatten them into sorted, disjoint and
+# maximal ranges, and we store their first and last addresses into
+# two sorted arrays, one for IPv4 and one for IPv6.  A lookup is a
+# binary search over the first addresses, so it does not allocate
+# anything but the integer representation of the address.
+#
+
+import array
+import bisect
+import csv
+import logging
+import socket
+import struct
+
+IPV4 = struct.Struct('!I')
+IPV6 = struct.Struct('!QQ')
+
+def address_to_number(address):
+    ''' Convert address to (family, number) '''
+    if ':' not in address:
+        return socket.AF_INET, IPV4.unpack(socket.inet_aton(address))[0]
+    high, low = IPV6.unpack(socket.inet_pton(socket.AF_INET6, address))
+    return socket.AF_INET6, (high << 64) | low
+
+def parse_network(network):
+    ''' Parse CIDR network and return (family, first, last) '''
+    address, length = network.split('/', 1)
+    family, number = address_to_number(address)
+    bits = 32 if family == socket.AF_INET else 128
+    length = int(length)
+    if length < 0 or length > bits:
+        raise ValueError('geoip_table: invalid prefix length')
+    mask = (1 << (bits - length)) - 1
+    return family, number & ~mask, number | mask
+
+def flatten(ranges):
+    ''' Flatten a list of (first, last, country) ranges that are
+        disjoint or nested into a sorted list of disjoint ranges '''
+
+    result = []
+
+    def emit(first, last, country):
+        ''' Append a range, merging it with the previous one '''
+        if first > last:
+            return
+        if (result and result[-1][2] == country and
+          result[-1][1] + 1 == first):
+            result[-1] = (result[-1][0], last, country)
+        else:
+            result.append((first, last, country))
+
+    # Outer ranges come before the ranges nested into them
+    ranges = sorted(ranges, key=lambda elem: (elem[0], -elem[1]))
+
+    stack, position = [], 0
+    for first, last, country in ranges:
+        while stack and stack[-1][1] < first:
+            top = stack.pop()
+            emit(position, top[1], top[2])
+            position = top[1] + 1
+        if stack:
+            emit(position, first - 1, stack[-1][2])
+        stack.append((first, last, country))
+        position = first
+    while stack:
+        top = stack.pop()
+        emit(position, top[1], top[2])
+        position = top[1] + 1
+
+    return result
+
+class _Ranges(object):
+    ''' Sorted disjoint ranges of a single address family '''
+
+    def __init__(self, ranges, countries, typecode):
+        if typecode:
+            self.firsts = array.array(typecode)
+            self.lasts = array.array(typecode)
+        else:
+            self.firsts, self.lasts = [], []
+        self.codes = array.array('H')
+        for first, last, country in flatten(ranges):
+            self.firsts.append(first)
+            self.lasts.append(last)
+            self.codes.append(countries[country])
+
+    def __len__(self):
+        return len(self.firsts)
+
+    def lookup(self, number):
+        ''' Return the index of the country of number, or -1 '''
+        index = bisect.bisect_right(self.firsts, number) - 1
+        if index >= 0 and number <= self.lasts[index]:
+            return self.codes[index]
+        return -1
+
+# Unsigned 32-bit array typecode, larger numbers go in lists
+_TYPECODE_IPV4 = 'I' if array.array('I').itemsize >= 4 else 'L'
+
+class CountryTable(object):
+    ''' Maps addresses to countries '''
+
+    def __init__(self):
+        self.countries = []
+        self.ipv4 = _Ranges((), {}, _TYPECODE_IPV4)
+        self.ipv6 = _Ranges((), {}, None)
+
+    def __len__(self):
+        return len(self.ipv4) + len(self.ipv6)
+
+    def load(self, rows):
+        ''' Replace the table with the content of an iterable
+            of CSV rows '''
+
+        ranges = {socket.AF_INET: [], socket.AF_INET6: []}
+        countries = {}
+
+        for row in rows:
+            if not row or row[0].startswith('#'):
+                continue
+            try:
+                if '/' in row[0]:
+                    family, first, last = parse_network(row[0])
+                    country = row[1]
+                else:
+                    family, first = address_to_number(row[0])
+                    other, last = address_to_number(row[1])
+                    if other != family or last < first:
+                        raise ValueError('geoip_table: invalid range')
+                    country = row[4]
+            except (IndexError, ValueError, socket.error, struct.error):
+                logging.warning('geoip_table: invalid row: %s', row)
+                continue
+            country = country.strip().upper()
+            if country not in countries:
+                countries[country] = len(countries)
+            ranges[family].append((first, last, country))
+
+        self.countries = sorted(countries, key=countries.get)
+        self.ipv4 = _Ranges(ranges[socket.AF_INET], countries,
+                            _TYPECODE_IPV4)
+        self.ipv6 = _Ranges(ranges[socket.AF_INET6], countries, None)
+
+    def load_file(self, path):
+        ''' Load the table from the CSV file at path '''
+        filep = open(path, 'r')
+        try:
+            self.load(csv.reader(filep))
+        finally:
+            filep.close()
+        logging.info('geoip_table: loaded %d ranges from %s', len(self),
+                     path)
+
+    def lookup_country(self, address):
+        ''' Return the country of address or the empty string '''
+        try:
+            family, number = address_to_number(address)
+        except (ValueError, socket.error, struct.error):
+            return ''
+        if family == socket.AF_INET:
+            index = self.ipv4.lookup(number)
+        else:
+            index = self.ipv6.lookup(number)
+        if index < 0:
+            return ''
+        return self.countries[index]
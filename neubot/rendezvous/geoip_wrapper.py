@@ -31,6 +31,7 @@ if __name__ == "__main__":
     sys.path.insert(0, ".")
 
 from neubot.config import CONFIG
+from neubot.rendezvous.geoip_table import CountryTable
 
 from neubot import utils
 
@@ -48,11 +49,26 @@ class Geolocator(object):
     def __init__(self):
         ''' Initialize geolocator object '''
         self.countries = None
+        self.table = None
 
     def open_or_die(self):
 
         ''' Open the database or die '''
 
+        #
+        # When we are given a CSV of address ranges, we use the
+        # pure-Python table, which does not need the GeoIP wrappers
+        # and answers from memory.
+        #
+        ranges = CONFIG.get("rendezvous.geoip_wrapper.country_ranges", "")
+        if ranges:
+            if not os.path.exists(ranges):
+                logging.error("Missing country ranges file: %s", ranges)
+                sys.exit(1)
+            self.table = CountryTable()
+            self.table.load_file(ranges)
+            return
+
         if not GEOIP:
             logging.error("Missing dependency: GeoIP")
             logging.info("Please install GeoIP python wrappers, e.g.")
@@ -77,7 +93,10 @@ class Geolocator(object):
 
     def lookup_country(self, address):
         ''' Lookup for country entry '''
-        country = self.countries.country_code_by_addr(address)
+        if self.table is not None:
+            country = self.table.lookup_country(address)
+        else:
+            country = self.countries.country_code_by_addr(address)
         if not country:
             logging.error("Geolocator: %s: not found", address)
             return ""
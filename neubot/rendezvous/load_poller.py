@@ -0,0 +1,129 @@
+# neubot/rendezvous/load_poller.py
+
+#
+# Copyright (c) 2013
+#     Nexa Center for Internet & Society, Politecnico di Torino (DAUIN)
+#     and Simone Basso <bassosimone@gmail.com>
+#
+# This file is part of Neubot <http://www.neubot.org/>.
+#
+# Neubot is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Neubot is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Neubot.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+''' Polls the load of the test servers '''
+
+# Python3-ready: yes
+
+import logging
+
+from neubot.compat import json
+from neubot.http_clnt import HttpClient
+from neubot.poller import POLLER
+from neubot.server_load import LoadTable
+
+from neubot import http_utils
+from neubot import six
+from neubot import utils_net
+from neubot import utils_version
+
+CODE200 = six.b('200')
+
+# Give up on a server after this number of seconds
+TIMEOUT = 10
+
+def split_server(server):
+    ''' Split server, as stored in the geoloc table, into
+        address and port '''
+    address, port = server, 80
+    if server.count(':') == 1:
+        address, port = server.split(':')
+    elif server.startswith('[') and ']:' in server:
+        address, port = server[1:].split(']:')
+    return address, int(port)
+
+class LoadPoller(HttpClient):
+    ''' Periodically fetches /api/load of the test servers '''
+
+    def __init__(self, table=None):
+        HttpClient.__init__(self)
+        if table is None:
+            table = LoadTable()
+        self.table = table
+        self.get_servers = None
+        self.interval = 0
+        self.task = None
+
+    def start(self, get_servers, interval):
+        ''' Poll the servers returned by get_servers() every
+            interval seconds '''
+        self.get_servers = get_servers
+        self.interval = interval
+        if self.interval > 0 and not self.task:
+            self.task = POLLER.sched(0, self._poll)
+
+    def _poll(self):
+        ''' Poll all servers '''
+        self.task = POLLER.sched(self.interval, self._poll)
+        servers = set(self.get_servers())
+        logging.debug('load_poller: polling %d servers', len(servers))
+        for server in servers:
+            try:
+                endpoint = split_server(server)
+            except ValueError:
+                logging.warning('load_poller: invalid server: %s', server)
+                continue
+            self.connect(endpoint, 0, 0, {'server': server, 'done': False})
+
+    def handle_connect_error(self, connector):
+        self.table.mark_down(connector.extra['server'])
+
+    def handle_connect(self, connector, sock, rtt, sslconfig, extra):
+        self.create_stream(sock, self._connection_made,
+          self._connection_lost, sslconfig, None, extra)
+
+    def _connection_made(self, stream):
+        ''' Send the request '''
+        stream.set_timeout(TIMEOUT)
+        extra = stream.opaque.extra
+        self.append_request(stream, 'GET', '/api/load', 'HTTP/1.1')
+        self.append_header(stream, 'Host', utils_net.format_epnt(
+                           split_server(extra['server'])))
+        self.append_header(stream, 'User-Agent', utils_version.HTTP_HEADER)
+        self.append_header(stream, 'Cache-Control', 'no-cache')
+        self.append_header(stream, 'Pragma', 'no-cache')
+        self.append_end_of_headers(stream)
+        self.send_message(stream)
+        stream.opaque.body = http_utils.Body()
+
+    def _connection_lost(self, stream):
+        ''' Mark the server down if it did not respond '''
+        extra = stream.opaque.extra
+        if not extra['done']:
+            self.table.mark_down(extra['server'])
+
+    def handle_end_of_body(self, stream):
+        HttpClient.handle_end_of_body(self, stream)
+        context = stream.opaque
+        extra = context.extra
+        if context.code == CODE200:
+            try:
+                report = json.loads(six.bytes_to_string(
+                                    context.body.getvalue(), 'utf-8'))
+                self.table.update(extra['server'], report)
+                extra['done'] = True
+            except (ValueError, TypeError, AttributeError):
+                logging.warning('load_poller: bad report from %s',
+                                extra['server'])
+        stream.close()
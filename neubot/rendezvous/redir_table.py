@@ -0,0 +1,140 @@
+# neubot/rendezvous/redir_table.py
+
+#
+# Copyright (c) 2013
+#     Nexa Center for Internet & Society, Politecnico di Torino (DAUIN)
+#     and Simone Basso <bassosimone@gmail.com>
+#
+# This file is part of Neubot <http://www.neubot.org/>.
+#
+# Neubot is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Neubot is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Neubot.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+''' Precompiled redirection table '''
+
+# Python3-ready: yes
+
+#
+# The redirection table maps each country to the list of its test
+# servers.  MasterSrv/redir_table.py compiles it, resolving the
+# continent fallbacks, into a JSON file like this:
+#
+#     {
+#      "version": 1,
+#      "generated": "Fri Oct 25 13:24:53 2013",
+#      "servers": ["neubot.mlab.mlab1.trn01.measurement-lab.org:8080"],
+#      "countries": {"IT": [0], "SM": [0], "VA": [0]}
+#     }
+#
+# where each server is stored once and countries refer to servers by
+# their index.  The file is replaced atomically with rename(), and the
+# rendezvous server checks whether it has changed every few seconds,
+# so a new table takes effect without restarting the server and with
+# no window in which the table is empty.
+#
+
+import logging
+import os
+
+from neubot.compat import json
+
+VERSION = 1
+
+def compile_table(table, generated=''):
+    ''' Compile a dictionary that maps each country to the list of
+        its servers into the JSON-serializable representation '''
+    servers = sorted(set(server for country in table
+                         for server in table[country]))
+    index = dict((server, position) for position, server
+                 in enumerate(servers))
+    return {
+            'version': VERSION,
+            'generated': generated,
+            'servers': servers,
+            'countries': dict((country, sorted(index[server] for server
+                                               in table[country]))
+                              for country in table),
+           }
+
+def decompile_table(compiled):
+    ''' Return the dictionary that maps each country to the list
+        of its servers, given the compiled table '''
+    if compiled.get('version') != VERSION:
+        raise ValueError('redir_table: unsupported version')
+    servers = compiled['servers']
+    table = {}
+    for country, indexes in compiled['countries'].items():
+        table[str(country)] = [str(servers[position])
+                               for position in indexes]
+    return table
+
+def write_table(path, table, generated=''):
+    ''' Atomically write the compiled table at path '''
+    temporary = path + '.new'
+    filep = open(temporary, 'w')
+    json.dump(compile_table(table, generated), filep, sort_keys=True,
+              separators=(',', ':'))
+    filep.flush()
+    os.fsync(filep.fileno())
+    filep.close()
+    os.rename(temporary, path)
+
+def read_table(path):
+    ''' Read the compiled table at path '''
+    filep = open(path, 'r')
+    try:
+        return decompile_table(json.load(filep))
+    finally:
+        filep.close()
+
+class RedirTable(object):
+    ''' Redirection table that is reloaded when the file changes '''
+
+    def __init__(self, path):
+        self.path = path
+        self.stamp = None
+        self.table = None
+
+    def check(self):
+        ''' Reload the table if the file has changed and return
+            True if the table has changed '''
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            if self.table is not None:
+                logging.warning('redir_table: %s was removed', self.path)
+                self.stamp, self.table = None, None
+                return True
+            return False
+
+        stamp = (stat.st_ino, stat.st_size, stat.st_mtime)
+        if stamp == self.stamp:
+            return False
+
+        # Don't retry until the file changes again
+        self.stamp = stamp
+
+        try:
+            table = read_table(self.path)
+        except (IOError, OSError, ValueError, KeyError, IndexError,
+                TypeError, AttributeError):
+            logging.warning('redir_table: cannot load %s', self.path,
+                            exc_info=1)
+            return False
+
+        logging.info('redir_table: loaded %d countries from %s',
+                     len(table), self.path)
+        self.table = table
+        return True
@@ -0,0 +1,90 @@
+# neubot/rendezvous/response_cache.py
+
+#
+# Copyright (c) 2013
+#     Nexa Center for Internet & Society, Politecnico di Torino (DAUIN)
+#     and Simone Basso <bassosimone@gmail.com>
+#
+# This file is part of Neubot <http://www.neubot.org/>.
+#
+# Neubot is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Neubot is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Neubot.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+''' Bounded LRU cache of rendezvous responses '''
+
+# Python3-ready: yes
+
+try:
+    from collections import OrderedDict
+except ImportError:
+    from neubot.simplejson.ordered_dict import OrderedDict
+
+# Number of distinct responses we keep
+MAXSIZE = 1024
+
+class ResponseCache(object):
+    ''' Least-recently-used cache with hit and miss counters '''
+
+    def __init__(self, maxsize=MAXSIZE):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        ''' Return the entry for key or None '''
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            self.misses += 1
+            return None
+        # Move it to the most recently used end
+        self.entries[key] = entry
+        self.hits += 1
+        return entry
+
+    def put(self, key, entry):
+        ''' Add the entry for key, evicting the least recently used
+            entry if the cache is full '''
+        self.entries.pop(key, None)
+        if self.maxsize <= 0:
+            return
+        while len(self.entries) >= self.maxsize:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+        self.entries[key] = entry
+
+    def clear(self):
+        ''' Forget all entries '''
+        self.entries.clear()
+        self.invalidations += 1
+
+    def snap(self, data):
+        ''' Save statistics into the data dictionary '''
+        lookups = self.hits + self.misses
+        data['response_cache'] = {
+                                  'entries': len(self.entries),
+                                  'maxsize': self.maxsize,
+                                  'hits': self.hits,
+                                  'misses': self.misses,
+                                  'hit_ratio': (float(self.hits) / lookups
+                                                if lookups else 0.0),
+                                  'evictions': self.evictions,
+                                  'invalidations': self.invalidations,
+                                 }
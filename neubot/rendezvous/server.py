@@ -22,7 +22,6 @@
 
 ''' Rendezvous server '''
 
-import random
 import sys
 import logging
 
@@ -37,20 +36,100 @@ from neubot.http.server import HTTP_SERVER
 from neubot.http.server import ServerHTTP
 from neubot.net.poller import POLLER
 from neubot.rendezvous.geoip_wrapper import Geolocator
+from neubot.rendezvous.load_poller import LoadPoller
+from neubot.rendezvous.redir_table import RedirTable
+from neubot.rendezvous.response_cache import ResponseCache
 from neubot.rendezvous import compat
 
 from neubot.main import common
 from neubot import marshal
 from neubot import privacy
+from neubot import server_load
 
 from neubot import utils_version
 
 GEOLOCATOR = Geolocator()
+LOAD_POLLER = LoadPoller()
+
+# Seconds between checks of the redirection table and of geoloc
+CHECK_INTERVAL = 10
 
 class ServerRendezvous(ServerHTTP):
 
     ''' Rendezvous server '''
 
+    def __init__(self, poller):
+        ServerHTTP.__init__(self, poller)
+        self.servers = None
+        self.cache = ResponseCache()
+        self.redir_table = None
+        self.geoloc_stamp = None
+
+    def use_redir_table(self, path):
+        ''' Use the redirection table at path, when it exists, instead
+            of the geoloc table, and reload it when it changes '''
+        self.redir_table = RedirTable(path)
+        if self.redir_table.check():
+            self.invalidate()
+
+    def check_tables(self):
+        ''' Periodically check whether the redirection table or, when
+            we don't use it, the geoloc table changed '''
+        changed = False
+        if self.redir_table and self.redir_table.check():
+            changed = True
+        if not self.redir_table or self.redir_table.table is None:
+            stamp = table_geoloc.stamp(DATABASE.connection())
+            if stamp != self.geoloc_stamp:
+                self.geoloc_stamp = stamp
+                changed = True
+        if changed:
+            self.invalidate()
+        POLLER.sched(CHECK_INTERVAL, self.check_tables)
+
+    def _load_servers(self):
+        ''' Read the servers of each country once and then answer
+            from memory '''
+        if self.servers is None:
+            if self.redir_table and self.redir_table.table is not None:
+                self.servers = dict(self.redir_table.table)
+            else:
+                self.servers = table_geoloc.load_servers(
+                                 DATABASE.connection())
+        return self.servers
+
+    def lookup_servers(self, country, default):
+        ''' Return the servers of country.  The first time that we
+            see a country, we register default as its server. '''
+        servers = self._load_servers().get(country)
+        if not servers:
+            logging.info("* learning new country: %s", country)
+            # The redirection table is compiled offline
+            if not self.redir_table or self.redir_table.table is None:
+                DATABASE.submit(table_geoloc.insert_server, country,
+                                default, False)
+            servers = self.servers[country] = [default]
+        return servers
+
+    def known_servers(self):
+        ''' Return the list of the servers of all countries '''
+        result = set()
+        for servers in self._load_servers().values():
+            result.update(servers)
+        return list(result)
+
+    def invalidate(self):
+        ''' Forget the cached responses and the servers of each
+            country, e.g. because the redirection table or the geoloc
+            table has changed '''
+        self.servers = None
+        self.cache.clear()
+
+    def snap(self, data):
+        ''' Save statistics into the data dictionary '''
+        self.cache.snap(data)
+        LOAD_POLLER.table.snap(data)
+
     def configure(self, conf):
         ''' Configure rendezvous server '''
 
@@ -64,6 +143,9 @@ class ServerRendezvous(ServerHTTP):
 
         ServerHTTP.configure(self, conf)
 
+        # Cached responses depend on rendezvous.server.* settings
+        self.cache.clear()
+
     def process_request(self, stream, request):
         ''' Process rendezvous request '''
 
@@ -74,6 +156,60 @@ class ServerRendezvous(ServerHTTP):
             ibody = marshal.unmarshal_object(request.body.read(),
               "application/xml", compat.RendezvousRequest)
 
+        #
+        # Backward compatibility: the variable name changed from
+        # can_share to can_publish after Neubot 0.4.5
+        #
+        request_body = ibody.__dict__.copy()
+        if 'privacy_can_share' in request_body:
+            request_body['privacy_can_publish'] = request_body[
+              'privacy_can_share']
+            del request_body['privacy_can_share']
+
+        # Redirect IFF have ALL privacy permissions
+        agent_address = stream.peername[0]
+        redirect = privacy.count_valid(request_body, 'privacy_') == 3
+        country = ""
+        if redirect:
+            country = GEOLOCATOR.lookup_country(agent_address)
+        else:
+            logging.warning('rendezvous_server: cannot redirect to M-Lab: %s',
+                        request_body)
+
+        #
+        # The response only depends on the following inputs, so we
+        # cache the serialized responses.  We cache one response for
+        # each candidate server, and for each request we pick one of
+        # them using the power of two choices, so that we prefer the
+        # servers that are less loaded (see server_load.py).
+        #
+        key = (ibody.version, "speedtest" in ibody.accept,
+               "bittorrent" in ibody.accept, redirect,
+               privacy.collect_allowed(request_body), country)
+        entry = self.cache.get(key)
+        if entry is None:
+            entry = self._prepare_responses(ibody, key)
+            self.cache.put(key, entry)
+
+        mimetype, servers, bodies = entry
+        server = server_load.choose(servers, LOAD_POLLER.table.load)
+        body = bodies[server]
+        if country:
+            logging.info("rendezvous_server: %s[%s] -> %s", agent_address,
+                     country, server)
+
+        response = Message()
+        response.compose(code="200", reason="Ok",
+          mimetype=mimetype, body=body)
+        stream.send_response(request, response)
+
+    def _prepare_responses(self, ibody, key):
+        ''' Return the mimetype, the list of candidate servers and
+            the body of the response for each server '''
+
+        accept_speedtest, accept_bittorrent, redirect, collect = key[1:5]
+        country = key[5]
+
         obody = compat.RendezvousResponse()
 
         #
@@ -109,53 +245,9 @@ class ServerRendezvous(ServerHTTP):
                                "master.neubot.org")
         logging.debug("* default test server: %s", server)
 
-        #
-        # Backward compatibility: the variable name changed from
-        # can_share to can_publish after Neubot 0.4.5
-        #
-        request_body = ibody.__dict__.copy()
-        if 'privacy_can_share' in request_body:
-            request_body['privacy_can_publish'] = request_body[
-              'privacy_can_share']
-            del request_body['privacy_can_share']
-
-        # Redirect IFF have ALL privacy permissions
-        if privacy.count_valid(request_body, 'privacy_') == 3:
-            agent_address = stream.peername[0]
-            country = GEOLOCATOR.lookup_country(agent_address)
-            if country:
-                servers = table_geoloc.lookup_servers(DATABASE.connection(),
-                                                      country)
-                if not servers:
-                    logging.info("* learning new country: %s", country)
-                    table_geoloc.insert_server(DATABASE.connection(),
-                                               country, server)
-                    servers = [server]
-                server = random.choice(servers)
-                logging.info("rendezvous_server: %s[%s] -> %s", agent_address,
-                         country, server)
-
-        else:
-            logging.warning('rendezvous_server: cannot redirect to M-Lab: %s',
-                        request_body)
-
-        #
-        # We require at least informed and can_collect since 0.4.4
-        # (released 25 October 2011), so stop clients with empty
-        # privacy settings, who were still using master.
-        #
-        if privacy.collect_allowed(request_body):
-            #
-            # Note: Here we will have problems if we store unquoted
-            # IPv6 addresses into the database.  Because the resulting
-            # URI won't be valid.
-            #
-            if "speedtest" in ibody.accept:
-                obody.available["speedtest"] = [
-                    "http://%s/speedtest" % server ]
-            if "bittorrent" in ibody.accept:
-                obody.available["bittorrent"] = [
-                    "http://%s/" % server ]
+        servers = [server]
+        if redirect and country:
+            servers = self.lookup_servers(country, server)
 
         #
         # Neubot <=0.3.7 expects to receive an XML document while
@@ -163,16 +255,41 @@ class ServerRendezvous(ServerHTTP):
         # pretty soon.
         #
         if ibody.version and utils_version.compare(ibody.version, "0.3.7") >= 0:
-            body = marshal.marshal_object(obody, "application/json")
             mimetype = "application/json"
         else:
-            body = compat.adhoc_marshaller(obody)
             mimetype = "text/xml"
 
-        response = Message()
-        response.compose(code="200", reason="Ok",
-          mimetype=mimetype, body=body)
-        stream.send_response(request, response)
+        bodies = {}
+        for server in servers:
+
+            #
+            # We require at least informed and can_collect since 0.4.4
+            # (released 25 October 2011), so stop clients with empty
+            # privacy settings, who were still using master.
+            #
+            obody.available = {}
+            if collect:
+                #
+                # Note: Here we will have problems if we store unquoted
+                # IPv6 addresses into the database.  Because the resulting
+                # URI won't be valid.
+                #
+                if accept_speedtest:
+                    obody.available["speedtest"] = [
+                        "http://%s/speedtest" % server ]
+                if accept_bittorrent:
+                    obody.available["bittorrent"] = [
+                        "http://%s/" % server ]
+
+            if mimetype == "application/json":
+                body = marshal.marshal_object(obody, "application/json")
+            else:
+                body = compat.adhoc_marshaller(obody)
+            bodies[server] = body
+
+        return mimetype, servers, bodies
+
+RENDEZVOUS_SERVER = ServerRendezvous(None)
 
 CONFIG.register_defaults({
     "rendezvous.server.address": "",
@@ -180,7 +297,10 @@ CONFIG.register_defaults({
     "rendezvous.server.update_version": "0.4.15.6",
     "rendezvous.geoip_wrapper.country_database":                        \
         "/usr/local/share/GeoIP/GeoIP.dat",
+    "rendezvous.geoip_wrapper.country_ranges": "",
     "rendezvous.server.default": "master.neubot.org",
+    "rendezvous.server.load_interval": 60,
+    "rendezvous.server.redir_table": "/var/lib/neubot/redir_table.json",
 })
 
 def run():
@@ -190,9 +310,17 @@ def run():
     logging.info("This product includes GeoLite data created by MaxMind, "
                  "available from <http://www.maxmind.com/>.")
 
-    server = ServerRendezvous(None)
-    server.configure(CONFIG)
-    HTTP_SERVER.register_child(server, "/rendezvous")
+    RENDEZVOUS_SERVER.configure(CONFIG)
+    HTTP_SERVER.register_child(RENDEZVOUS_SERVER, "/rendezvous")
+
+    # Falls back to the geoloc table when the file does not exist
+    if CONFIG["rendezvous.server.redir_table"]:
+        RENDEZVOUS_SERVER.use_redir_table(
+          CONFIG["rendezvous.server.redir_table"])
+    RENDEZVOUS_SERVER.check_tables()
+
+    LOAD_POLLER.start(RENDEZVOUS_SERVER.known_servers,
+                      CONFIG["rendezvous.server.load_interval"])
 
 def main(args):
     ''' Main function '''
@@ -203,7 +331,13 @@ def main(args):
         "rendezvous.server.update_version": "Update Neubot version number",
         "rendezvous.geoip_wrapper.country_database":                    \
           "Path of the GeoIP country database",
+        "rendezvous.geoip_wrapper.country_ranges":                      \
+          "Path of CSV country ranges, replaces GeoIP if set",
         "rendezvous.server.default": "Default test server to use",
+        "rendezvous.server.load_interval":                              \
+          "Seconds between polls of servers load, 0 disables",
+        "rendezvous.server.redir_table":                                \
+          "Path of the compiled redirection table",
     })
 
     common.main("rendezvous.server", "Rendezvous server", args)
@@ -0,0 +1,330 @@
+# neubot/result_log.py
+
+#
+# Copyright (c) 2013
+#     Nexa Center for Internet & Society, Politecnico di Torino (DAUIN)
+#     and Simone Basso <bassosimone@gmail.com>
+#
+# This file is part of Neubot <http://www.neubot.org/>.
+#
+# Neubot is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Neubot is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Neubot.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+''' Append-only log of test results '''
+
+#
+# The results of a test are appended to a sequence of segments, named
+# <test>.log.<N> below datadir, where N grows by one each time the
+# current segment becomes too large or contains too many results; we
+# keep the last SEGMENTS_KEPT segments only.
+#
+# Each record is the length of the pickled result, as a 32-bit big
+# endian number, followed by the pickled result.  Each result is
+# fsync()ed after it has been appended, and when the last record of
+# a segment is incomplete (e.g., because we crashed while writing it)
+# it is removed before appending new results.
+#
+# Each segment has a sidecar index, named <test>.log.<N>.idx, which
+# contains, for each record, its timestamp (a double) and its offset
+# (a 64-bit number), both big endian, so readers can seek to the
+# records they need.  The index is not fsync()ed: when it does not
+# match the segment, we rebuild it by scanning the segment.
+#
+# For each segment we also keep in memory the smallest and the largest
+# timestamp, so range queries skip the segments that cannot contain
+# matching results, and only unpickle the records that match.
+#
+
+import logging
+import os
+import struct
+
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+from neubot import utils_path
+
+RECORD_HEADER = struct.Struct('!I')
+INDEX_ENTRY = struct.Struct('!dQ')
+
+SEGMENT_RECORDS = 1024
+SEGMENT_BYTES = 1 << 22
+SEGMENTS_KEPT = 16
+
+def _timestamp(result):
+    ''' Return the timestamp of result '''
+    try:
+        return float(result.get('timestamp', 0))
+    except (AttributeError, TypeError, ValueError):
+        return 0.0
+
+def scan_records(data):
+    ''' Scan the records in data and return the list of the index
+        entries of the complete records and the end of the last
+        complete record '''
+    entries = []
+    offset = 0
+    while offset + RECORD_HEADER.size <= len(data):
+        length = RECORD_HEADER.unpack_from(data, offset)[0]
+        end = offset + RECORD_HEADER.size + length
+        if end > len(data):
+            break
+        result = pickle.loads(data[offset + RECORD_HEADER.size:end])
+        entries.append((_timestamp(result), offset))
+        offset = end
+    return entries, offset
+
+class ResultLog(object):
+
+    ''' Append-only log of the results of a test '''
+
+    def __init__(self, datadir, test, touch, segment_records=SEGMENT_RECORDS,
+                 segment_bytes=SEGMENT_BYTES, segments_kept=SEGMENTS_KEPT):
+        self.datadir = datadir
+        self.test = test
+        self.touch = touch
+        self.segment_records = segment_records
+        self.segment_bytes = segment_bytes
+        self.segments_kept = segments_kept
+        self.segments = None
+        self.current = None
+        self.bounds = {}
+
+    def _name(self, number, suffix=''):
+        ''' Return the name of a segment or of its index '''
+        return '%s.log.%d%s' % (self.test, number, suffix)
+
+    def _path(self, number, suffix=''):
+        ''' Return the path of a segment or of its index '''
+        return utils_path.append(self.datadir, self._name(number, suffix),
+                                 False)
+
+    def list_segments(self):
+        ''' Return the sorted list of segment numbers '''
+        if self.segments is None:
+            prefix = '%s.log.' % self.test
+            numbers = []
+            if os.path.isdir(self.datadir):
+                for name in os.listdir(self.datadir):
+                    if (name.startswith(prefix) and
+                      name[len(prefix):].isdigit()):
+                        numbers.append(int(name[len(prefix):]))
+            numbers.sort()
+            self.segments = numbers
+        return self.segments
+
+    def _load_index(self, number):
+        ''' Return the index entries of a segment and the end of its
+            last complete record, rebuilding the index if needed '''
+
+        path = self._path(number)
+        size = os.path.getsize(path)
+
+        try:
+            filep = open(self._path(number, '.idx'), 'rb')
+            data = filep.read()
+            filep.close()
+        except (IOError, OSError):
+            data = ''
+
+        entries = [INDEX_ENTRY.unpack_from(data, offset) for offset in
+                   range(0, len(data) - INDEX_ENTRY.size + 1,
+                         INDEX_ENTRY.size)]
+
+        end = 0
+        filep = open(path, 'rb')
+        if entries:
+            filep.seek(entries[-1][1])
+            header = filep.read(RECORD_HEADER.size)
+            if len(header) == RECORD_HEADER.size:
+                end = (entries[-1][1] + RECORD_HEADER.size +
+                       RECORD_HEADER.unpack(header)[0])
+        if end == size:
+            filep.close()
+            return entries, end
+
+        logging.warning('result_log: rebuilding index of %s', path)
+        filep.seek(0)
+        entries, end = scan_records(filep.read())
+        filep.close()
+        filep = open(self.touch([self._name(number, '.idx')]), 'wb')
+        for entry in entries:
+            filep.write(INDEX_ENTRY.pack(*entry))
+        filep.close()
+        return entries, end
+
+    def read_index(self, number):
+        ''' Return the index entries of a segment, i.e. the list of
+            the (timestamp, offset) of each record '''
+        return self._load_index(number)[0]
+
+    def get_bounds(self, number):
+        ''' Return the smallest and the largest timestamp of a segment,
+            or None if the segment is empty '''
+        if number not in self.bounds:
+            timestamps = [entry[0] for entry in self.read_index(number)]
+            if timestamps:
+                self.bounds[number] = (min(timestamps), max(timestamps))
+            else:
+                self.bounds[number] = None
+        return self.bounds[number]
+
+    def _read_records(self, number, offsets):
+        ''' Return the results of the records at offsets '''
+        results = []
+        if not offsets:
+            return results
+        filep = open(self._path(number), 'rb')
+        for offset in offsets:
+            filep.seek(offset)
+            length = RECORD_HEADER.unpack(filep.read(RECORD_HEADER.size))[0]
+            results.append(pickle.loads(filep.read(length)))
+        filep.close()
+        return results
+
+    def read(self, number, first=0, last=None):
+        ''' Return the results in records [first, last) of a segment '''
+        return self._read_records(number, [entry[1] for entry in
+                                  self.read_index(number)[first:last]])
+
+    def query(self, since=-1, until=-1, limit=-1, cursor=None):
+        ''' Return the results such that since <= timestamp <= until,
+            newest first, and the cursor to fetch the next limit results
+            (or None when there are no more results).  A negative since,
+            until or limit means no bound.  The cursor is a tuple made
+            of the segment number and of the first record that has not
+            been returned yet, counting backwards. '''
+
+        segments = self.list_segments()
+        if cursor is None:
+            start, position = len(segments) - 1, None
+        elif cursor[0] in segments:
+            start, position = segments.index(cursor[0]), cursor[1]
+        else:
+            return [], None
+
+        results = []
+        for index in range(start, -1, -1):
+            number = segments[index]
+            if index != start:
+                position = None
+
+            bounds = self.get_bounds(number)
+            if (not bounds or (since >= 0 and bounds[1] < since) or
+              (until >= 0 and bounds[0] > until)):
+                continue
+
+            entries = self.read_index(number)[:position]
+            offsets = []
+            for record in range(len(entries) - 1, -1, -1):
+                if limit >= 0 and len(results) + len(offsets) >= limit:
+                    results.extend(self._read_records(number, offsets))
+                    return results, (number, record + 1)
+                timestamp, offset = entries[record]
+                if until >= 0 and timestamp > until:
+                    continue
+                if since >= 0 and timestamp < since:
+                    continue
+                offsets.append(offset)
+            results.extend(self._read_records(number, offsets))
+
+        return results, None
+
+    def _open_current(self):
+        ''' Prepare the last segment for appending '''
+        segments = self.list_segments()
+        if not segments:
+            self._create_segment(0)
+            return
+        number = segments[-1]
+        entries, end = self._load_index(number)
+        path = self._path(number)
+        if end < os.path.getsize(path):
+            logging.warning('result_log: truncating %s at %d', path, end)
+            filep = open(path, 'r+b')
+            filep.truncate(end)
+            filep.close()
+        self.current = [number, len(entries), end]
+
+    def _create_segment(self, number):
+        ''' Create a new empty segment '''
+        for suffix in ('', '.idx'):
+            filep = open(self.touch([self._name(number, suffix)]), 'wb')
+            filep.close()
+        self.list_segments().append(number)
+        self.current = [number, 0, 0]
+
+    def _remove_segment(self, number):
+        ''' Remove a segment and its index '''
+        for suffix in ('', '.idx'):
+            path = self._path(number, suffix)
+            if os.path.isfile(path):
+                os.unlink(path)
+        self.bounds.pop(number, None)
+
+    def remove_segments(self):
+        ''' Remove all the segments '''
+        for number in self.list_segments():
+            self._remove_segment(number)
+        self.segments = []
+        self.current = None
+
+    def _rollover(self):
+        ''' Switch to a new segment and remove the old ones '''
+        self.sync()
+        self._create_segment(self.current[0] + 1)
+        segments = self.list_segments()
+        while len(segments) > self.segments_kept:
+            self._remove_segment(segments.pop(0))
+
+    def append(self, result, sync=True):
+        ''' Append result to the log '''
+        if self.current is None:
+            self._open_current()
+        number, count, size = self.current
+        if count >= self.segment_records or size >= self.segment_bytes:
+            self._rollover()
+            number, count, size = self.current
+
+        timestamp = _timestamp(result)
+        data = pickle.dumps(result, pickle.HIGHEST_PROTOCOL)
+        filep = open(self._path(number), 'ab')
+        filep.write(RECORD_HEADER.pack(len(data)) + data)
+        filep.flush()
+        if sync:
+            os.fsync(filep.fileno())
+        filep.close()
+
+        filep = open(self._path(number, '.idx'), 'ab')
+        filep.write(INDEX_ENTRY.pack(timestamp, size))
+        filep.close()
+
+        self.current = [number, count + 1,
+                        size + RECORD_HEADER.size + len(data)]
+
+        bounds = self.bounds.get(number)
+        if bounds:
+            self.bounds[number] = (min(bounds[0], timestamp),
+                                   max(bounds[1], timestamp))
+        elif number in self.bounds or count == 0:
+            self.bounds[number] = (timestamp, timestamp)
+
+    def sync(self):
+        ''' Make sure the current segment is on disk '''
+        if self.current is not None:
+            filep = open(self._path(self.current[0]), 'ab')
+            os.fsync(filep.fileno())
+            filep.close()
@@ -24,7 +24,10 @@
 ''' Keeps track of known M-Lab hosts '''
 
 import logging
-import random
+
+from neubot.server_load import LoadTable
+
+from neubot import server_load
 
 STATIC_TABLE_TIME = 'Sat Oct 12 10:21:57 2013'
 
@@ -155,17 +158,37 @@ STATIC_TABLE = [
     'neubot.mlab.mlab4.prg01.measurement-lab.org',
 ]
 
+# Added to the cost of the hosts at other sites
+PROXIMITY_PENALTY = 1.0
+
+def get_site(fqdn):
+    ''' Return the M-Lab site of fqdn (e.g. mil01) or None '''
+    labels = fqdn.split('.')
+    if 'measurement-lab' in labels:
+        index = labels.index('measurement-lab')
+        if index > 0:
+            return labels[index - 1]
+    return None
+
 class RunnerHosts(object):
     ''' Keeps track of known M-Lab hosts '''
 
     def __init__(self):
         self.closest = None
         self.random = None
+        self.site = None
+        self.loads = LoadTable()
 
     def set_closest_host(self, host):
         ''' Sets the closest M-Lab host '''
         logging.debug('runner_hosts: closest host: %s', host['fqdn'])
         self.closest = host['fqdn']
+        # Unlike the host, the site is a hint we can keep
+        self.site = get_site(self.closest)
+
+    def update_load(self, fqdn, report):
+        ''' Save the load of a host, e.g. our queue position '''
+        self.loads.update(fqdn, report)
 
     def set_random_host(self, host):
         ''' Sets one random M-Lab host '''
@@ -195,7 +218,7 @@ class RunnerHosts(object):
             result = self.closest
             self.closest = None
             return result
-        return self.get_random_static_host()
+        return self.get_random_static_host(self.site)
 
     def get_random_host(self):
         ''' Return one random host '''
@@ -205,13 +228,22 @@ class RunnerHosts(object):
             return result
         return self.get_random_static_host()
 
-    @staticmethod
-    def get_random_static_host():
-        ''' Use static table to return one host at random '''
+    def get_random_static_host(self, site=None):
+        ''' Use static table to return one host at random, preferring
+            the less loaded hosts and, if site is given, the hosts of
+            that site '''
         logging.warning('runner_hosts: no discovered hosts: using static table')
         logging.info('runner_hosts: table: num-hosts: %d, generated: "%s"',
           len(STATIC_TABLE), STATIC_TABLE_TIME)
         logging.warning('runner_hosts: selecting one static host at random')
-        return random.choice(STATIC_TABLE)
+
+        def cost(fqdn):
+            ''' Load of fqdn plus the proximity penalty '''
+            result = self.loads.load(fqdn)
+            if site and get_site(fqdn) != site:
+                result += PROXIMITY_PENALTY
+            return result
+
+        return server_load.choose(STATIC_TABLE, cost)
 
 RUNNER_HOSTS = RunnerHosts()
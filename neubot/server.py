@@ -52,12 +52,18 @@ from neubot.config import CONFIG
 from neubot.backend import BACKEND
 from neubot.log import LOG
 from neubot.raw_srvr_glue import RAW_SERVER_EX
+from neubot.recvbuf import RECV_STATS
+from neubot.server_load import SERVER_LOAD
+from neubot.tcp_info import TCP_INFO_SAMPLER
 
 from neubot import bittorrent
 from neubot import negotiate
+from neubot import server_workers
 from neubot import system
 from neubot import utils_modules
+from neubot import utils_net
 from neubot import utils_posix
+from neubot import utils_random
 
 #from neubot import rendezvous          # Not yet
 import neubot.rendezvous.server
@@ -94,13 +100,33 @@ class DebugAPI(ServerHTTP):
                         len(NEGOTIATE_SERVER_SPEEDTEST.clients),
                     'POLLER.readset': len(POLLER.readset),
                     'POLLER.writeset': len(POLLER.writeset),
-                    'LOG._queue': len(LOG._queue),
+                    'POLLER.watched': len(POLLER.watched),
+                    'POLLER.watchdog_visited': \
+                        POLLER.watchdog_stats['visited'],
+                    'POLLER.watchdog_elapsed': \
+                        POLLER.watchdog_stats['elapsed'],
+                    'LOG._ring': len(LOG._ring),
+                    'TCP_INFO_SAMPLER.series': \
+                        len(TCP_INFO_SAMPLER.series),
                     'CONFIG.conf': len(CONFIG.conf),
                     'NOTIFIER._timestamps': len(NOTIFIER._timestamps),
                     'NOTIFIER._subscribers': len(NOTIFIER._subscribers),
                     'NOTIFIER._tofire': len(NOTIFIER._tofire),
                    }
 
+        elif request.uri == '/debugmem/recvbuf':
+            body = {}
+            RECV_STATS.snap(body)
+            body = body['recvbuf']
+
+        elif request.uri == '/debugmem/backend':
+            body = {}
+            BACKEND.snap(body)
+
+        elif request.uri == '/debugmem/rendezvous':
+            body = {}
+            neubot.rendezvous.server.RENDEZVOUS_SERVER.snap(body)
+
         elif request.uri == '/debugmem/garbage':
             body = [str(obj) for obj in gc.garbage]
 
@@ -135,7 +161,8 @@ class DebugAPI(ServerHTTP):
         stream.send_response(request, response)
 
 class ServerSideAPI(ServerHTTP):
-    """ Implements server-side API for Nagios plugin """
+    """ Implements server-side API for Nagios plugin and the
+        /api/load API polled by the master server """
 
     def process_request(self, stream, request):
         """ Process HTTP request and return response """
@@ -150,7 +177,13 @@ class ServerSideAPI(ServerHTTP):
             response.compose(code="200", reason="Ok", body=body,
                              mimetype="application/json")
         elif request.uri == "/sapi/state":
-            body = '{"queue_len_cur": %d}' % len(NEGOTIATE_SERVER.queue)
+            body = '{"queue_len_cur": %d}' % NEGOTIATE_SERVER.queue_length()
+            response.compose(code="200", reason="Ok", body=body,
+                             mimetype="application/json")
+        elif request.uri == "/api/load":
+            body = json.dumps(SERVER_LOAD.marshal(
+                              NEGOTIATE_SERVER.queue_length(),
+                              CONFIG["negotiate.parallelism"]))
             response.compose(code="200", reason="Ok", body=body,
                              mimetype="application/json")
         else:
@@ -164,10 +197,14 @@ SETTINGS = {
     "server.datadir": '',
     'server.debug': False,
     "server.negotiate": True,
+    "server.payload": '',
+    "server.poller": "auto",
     "server.raw": True,
     "server.rendezvous": False,         # Not needed on the random server
     "server.sapi": True,
     "server.speedtest": True,
+    "server.tcp_info": 1000,
+    "server.workers": 0,
 }
 
 USAGE = '''\
@@ -184,14 +221,20 @@ valid defines:
   server.datadir    Set data directory (default: LOCALSTATEDIR/neubot)
   server.debug      Set to nonzero to enable debug API (default: 0)
   server.negotiate  Set to nonzero to enable negotiate server (default: 1)
+  server.payload    Set file to send instead of random data (default: none)
+  server.poller     Set epoll, poll, select or auto multiplexer (default: auto)
   server.raw        Set to nonzero to enable RAW server (default: 1)
   server.rendezvous Set to nonzero to enable rendezvous server (default: 0)
-  server.sapi       Set to nonzero to enable nagios API (default: 1)
-  server.speedtest  Set to nonzero to enable speedtest server (default: 1)'''
+  server.sapi       Set to nonzero to enable nagios and load API (default: 1)
+  server.speedtest  Set to nonzero to enable speedtest server (default: 1)
+  server.tcp_info   Set ms between TCP_INFO samples, 0 disables (default: 1000)
+  server.workers    Set number of worker processes, Linux only (default: 0)'''
 
 VALID_MACROS = ('server.bittorrent', 'server.daemonize', 'server.datadir',
-                'server.debug', 'server.negotiate', 'server.raw',
-                'server.rendezvous', 'server.sapi', 'server.speedtest')
+                'server.debug', 'server.negotiate', 'server.payload',
+                'server.poller', 'server.raw', 'server.rendezvous',
+                'server.sapi', 'server.speedtest', 'server.tcp_info',
+                'server.workers')
 
 def main(args):
     """ Starts the server module """
@@ -217,7 +260,8 @@ def main(args):
             name, value = value.split('=', 1)
             if name not in VALID_MACROS:
                 sys.exit(USAGE)
-            if name != 'server.datadir':  # XXX
+            if name not in ('server.datadir', 'server.payload',
+                            'server.poller'):  # XXX
                 value = int(value)
             SETTINGS[name] = value
         elif name == '-d':
@@ -241,6 +285,58 @@ def main(args):
     for name, value in SETTINGS.items():
         CONFIG[name] = value
 
+    try:
+        POLLER.set_multiplexer(CONFIG['server.poller'])
+    except ValueError:
+        sys.exit(USAGE)
+
+    TCP_INFO_SAMPLER.interval = CONFIG['server.tcp_info'] / 1000.0
+
+    # Before forking and dropping privileges
+    utils_random.payload_pool_init(CONFIG['server.payload'])
+
+    workers = CONFIG['server.workers']
+    if workers > 1 and not utils_net.reuseport_supported():
+        logging.warning('server: cannot run workers; using one process')
+        workers = 0
+
+    if workers > 1:
+        if CONFIG['server.daemonize']:
+            LOG.redirect()
+            system.go_background()
+        logging.info('Neubot server -- starting %d workers', workers)
+        server_workers.run(workers, CONFIG['server.poller'],
+          lambda: _start_servers(address))
+
+    else:
+        _start_servers(address)
+
+        #
+        # Go background and drop privileges,
+        # then enter into the main loop.
+        #
+        if CONFIG["server.daemonize"]:
+            LOG.redirect()
+            system.go_background()
+
+        sigterm_handler = lambda signo, frame: POLLER.break_loop()
+        signal.signal(signal.SIGTERM, sigterm_handler)
+
+        logging.info('Neubot server -- starting up')
+        system.drop_privileges()
+        DATABASE.start_worker()
+        # Before accepting connections (see backend_mlab.py)
+        BACKEND.start_workers()
+        POLLER.loop()
+
+    logging.info('Neubot server -- shutting down')
+    BACKEND.close()
+    DATABASE.close()
+    utils_posix.remove_pidfile('/var/run/neubot.pid')
+
+def _start_servers(address):
+    ''' Create the listening sockets and start the servers '''
+
     conf = CONFIG.copy()
 
     #
@@ -305,11 +401,14 @@ def main(args):
     # Start server-side API for Nagios plugin
     # to query the state of the server.
     # functionalities.
+    # The same server exports our load to the
+    # master server.
     #
     if conf["server.sapi"]:
         server = ServerSideAPI(POLLER)
         server.configure(conf)
         HTTP_SERVER.register_child(server, "/sapi")
+        HTTP_SERVER.register_child(server, "/api/load")
 
     #
     # Create localhost-only debug server
@@ -326,23 +425,5 @@ def main(args):
         "negotiate_server": NEGOTIATE_SERVER,
     })
 
-    #
-    # Go background and drop privileges,
-    # then enter into the main loop.
-    #
-    if conf["server.daemonize"]:
-        LOG.redirect()
-        system.go_background()
-
-    sigterm_handler = lambda signo, frame: POLLER.break_loop()
-    signal.signal(signal.SIGTERM, sigterm_handler)
-
-    logging.info('Neubot server -- starting up')
-    system.drop_privileges()
-    POLLER.loop()
-
-    logging.info('Neubot server -- shutting down')
-    utils_posix.remove_pidfile('/var/run/neubot.pid')
-
 if __name__ == "__main__":
     main(sys.argv)
@@ -0,0 +1,142 @@
+# neubot/server_load.py
+
+#
+# Copyright (c) 2013
+#     Nexa Center for Internet & Society, Politecnico di Torino (DAUIN)
+#     and Simone Basso <bassosimone@gmail.com>
+#
+# This file is part of Neubot <http://www.neubot.org/>.
+#
+# Neubot is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Neubot is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Neubot.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+''' Load of the test servers and load-aware selection '''
+
+# Python3-ready: yes
+
+#
+# Each test server exports its load at /api/load: the length of the
+# negotiate queue, the number of tests that run in parallel and the
+# goodput of the recent tests.  The master server periodically polls
+# the test servers (see rendezvous/load_poller.py) and keeps the loads
+# into a LoadTable, while clients record the queue position that they
+# get from the servers that they use.
+#
+# To select a server we use the power of two choices: we pick two of
+# the candidates at random and we keep the one with the lower cost,
+# i.e. its load plus a proximity penalty.  Picking the least loaded
+# server instead would send all clients to the same server until the
+# next update of the loads.
+#
+
+import random
+
+from neubot import utils
+
+# Reports older than this number of seconds are ignored
+MAX_AGE = 300.0
+
+# Load of servers that we know nothing about
+UNKNOWN_LOAD = 0.0
+
+# Load of servers that did not respond
+DOWN_LOAD = 1000.0
+
+# Weight of the most recent test in the mean goodput
+GOODPUT_ALPHA = 0.25
+
+class ServerLoad(object):
+    ''' Load of this test server '''
+
+    def __init__(self):
+        self.goodput = 0.0
+        self.tests = 0
+
+    def add_goodput(self, bytesdiff, timediff):
+        ''' Account the goodput of a test '''
+        if timediff <= 0:
+            return
+        speed = bytesdiff / timediff
+        if self.tests == 0:
+            self.goodput = speed
+        else:
+            self.goodput += GOODPUT_ALPHA * (speed - self.goodput)
+        self.tests += 1
+
+    def marshal(self, queue_len, parallelism):
+        ''' Return the load report '''
+        return {
+                'queue_len': queue_len,
+                'parallelism': parallelism,
+                'goodput': self.goodput,
+                'tests': self.tests,
+                'timestamp': utils.timestamp(),
+               }
+
+SERVER_LOAD = ServerLoad()
+
+def compute_load(report):
+    ''' Return the number of queued clients per test slot '''
+    parallelism = max(1, int(report.get('parallelism', 1)))
+    return float(report.get('queue_len', 0)) / parallelism
+
+class LoadTable(object):
+    ''' Aggregated load of many servers '''
+
+    def __init__(self, max_age=MAX_AGE):
+        self.max_age = max_age
+        self.entries = {}
+
+    def update(self, server, report, now=None):
+        ''' Save the load report of server '''
+        if now is None:
+            now = utils.ticks()
+        self.entries[server] = (now, compute_load(report), report)
+
+    def mark_down(self, server, now=None):
+        ''' Remember that server did not respond '''
+        if now is None:
+            now = utils.ticks()
+        self.entries[server] = (now, DOWN_LOAD, None)
+
+    def load(self, server, now=None):
+        ''' Return the load of server '''
+        entry = self.entries.get(server)
+        if entry is None:
+            return UNKNOWN_LOAD
+        if now is None:
+            now = utils.ticks()
+        if now - entry[0] > self.max_age:
+            return UNKNOWN_LOAD
+        return entry[1]
+
+    def snap(self, data):
+        ''' Save the loads into the data dictionary '''
+        now = utils.ticks()
+        data['load_table'] = dict((server, {
+                                            'age': now - entry[0],
+                                            'load': entry[1],
+                                            'report': entry[2],
+                                           })
+                                  for server, entry in self.entries.items())
+
+def choose(candidates, cost, rand=random):
+    ''' Return the cheaper of two random candidates '''
+    if len(candidates) <= 1:
+        return candidates[0]
+    first, second = rand.sample(candidates, 2)
+    if cost(second) < cost(first):
+        return second
+    return first
@@ -0,0 +1,184 @@
+# neubot/server_workers.py
+
+#
+# Copyright (c) 2013
+#     Nexa Center for Internet & Society, Politecnico di Torino (DAUIN)
+#     and Simone Basso <bassosimone@gmail.com>
+#
+# This file is part of Neubot <http://www.neubot.org/>.
+#
+# Neubot is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Neubot is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Neubot.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+''' Run the server using many worker processes '''
+
+#
+# The master process forks a negotiate coordinator and N workers,
+# and then waits for them.  Each worker runs all the servers, and
+# the listening sockets are shared using SO_REUSEPORT, so that the
+# kernel spreads the clients over the workers.  Since the state of
+# each test (e.g. authorized peers) is local to a worker, we attach
+# a BPF program that sends all the connections of a client to the
+# same worker (see utils_net.py).  To make sure that the N-th worker
+# is the N-th socket of each group, workers are started in turn.
+#
+# Linux only (SO_ATTACH_REUSEPORT_CBPF is available since 4.5).
+#
+
+import errno
+import logging
+import os
+import random
+import signal
+import socket
+import sys
+
+from neubot.backend import BACKEND
+from neubot.database import DATABASE
+from neubot.negotiate.coordinator import NegotiateCoordinator
+from neubot.negotiate.coordinator import NegotiateCoordinatorClient
+from neubot.negotiate.server import NEGOTIATE_SERVER
+from neubot.poller import POLLER
+
+from neubot import six
+from neubot import system
+from neubot import utils_net
+
+def _child_init(multiplexer):
+    ''' Common initialization for child processes '''
+
+    # The epoll descriptor is shared with the parent after fork()
+    POLLER.set_multiplexer(multiplexer)
+
+    # Otherwise all the children produce the same random numbers
+    random.seed()
+
+    # Never share a sqlite connection with another process
+    DATABASE.close()
+
+    sigterm_handler = lambda signo, frame: POLLER.break_loop()
+    signal.signal(signal.SIGTERM, sigterm_handler)
+
+def _run_coordinator(multiplexer, sockets):
+    ''' Body of the coordinator process '''
+    _child_init(multiplexer)
+    coordinator = NegotiateCoordinator()
+    for sock in sockets:
+        coordinator.attach_worker(sock)
+    logging.info('server_workers: coordinator %d running', os.getpid())
+    system.drop_privileges()
+    POLLER.loop()
+
+def _run_worker(multiplexer, count, sock, ready, start_servers):
+    ''' Body of a worker process '''
+    _child_init(multiplexer)
+    utils_net.set_reuseport_group(count)
+    NEGOTIATE_SERVER.attach_coordinator(
+      NegotiateCoordinatorClient(sock, NEGOTIATE_SERVER))
+    start_servers()
+    os.write(ready, six.b('R'))
+    os.close(ready)
+    logging.info('server_workers: worker %d running', os.getpid())
+    system.drop_privileges()
+    # Before accepting connections (see backend_mlab.py)
+    BACKEND.start_workers()
+    POLLER.loop()
+    # Before _fork() calls os._exit()
+    BACKEND.close()
+
+def _fork(func, args, unused):
+    ''' Run func(*args) in a child process and return its pid '''
+    pid = os.fork()
+    if pid > 0:
+        return pid
+    status = 0
+    try:
+        for sock in unused:
+            sock.close()
+        func(*args)
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    except:
+        logging.error('server_workers: child failed', exc_info=1)
+        status = 1
+    # Don't run the code of the master after fork()
+    os._exit(status)
+
+def _terminate(children):
+    ''' Terminate all children '''
+    for pid in children:
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except OSError:
+            pass
+
+def run(count, multiplexer, start_servers):
+    ''' Run count workers and a coordinator, and wait for them.  The
+        start_servers function is invoked by each worker to create
+        the listening sockets. '''
+
+    pairs = [socket.socketpair() for _ in range(count)]
+    masters = [pair[0] for pair in pairs]
+    workers = [pair[1] for pair in pairs]
+
+    children = set()
+    stopping = []
+
+    def sigterm_handler(signo, frame):
+        ''' Forward SIGTERM to children '''
+        stopping.append(signo)
+        _terminate(children)
+
+    signal.signal(signal.SIGTERM, sigterm_handler)
+
+    children.add(_fork(_run_coordinator, (multiplexer, masters), workers))
+    for sock in masters:
+        sock.close()
+
+    for index, sock in enumerate(workers):
+        ready, ready_w = os.pipe()
+        unused = [other for other in workers if other is not sock]
+        args = (multiplexer, count, sock, ready_w, start_servers)
+        children.add(_fork(_run_worker, args, unused))
+        os.close(ready_w)
+        sock.close()
+        started = os.read(ready, 1)
+        os.close(ready)
+        if not started:
+            logging.error('server_workers: worker %d failed', index)
+            stopping.append(0)
+            _terminate(children)
+            break
+
+    if not stopping:
+        logging.info('Neubot server -- %d workers running', count)
+
+    #
+    # When a child dies the service is crippled (e.g. without the
+    # coordinator no test can be authorized) so stop all children
+    # and let the supervisor restart the server.
+    #
+    while children:
+        try:
+            pid, status = os.wait()
+        except OSError:
+            if sys.exc_info()[1].args[0] == errno.EINTR:
+                continue
+            raise
+        children.discard(pid)
+        if not stopping:
+            logging.warning('server_workers: child %d exited (status %d)',
+                            pid, status)
+            stopping.append(0)
+            _terminate(children)
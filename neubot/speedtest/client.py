@@ -32,6 +32,7 @@ from neubot.config import CONFIG
 from neubot.database import DATABASE
 from neubot.database import table_speedtest
 from neubot.http.client import ClientHTTP
+from neubot.http.message import DiscardBody
 from neubot.http.message import Message
 from neubot.net.poller import POLLER
 from neubot.notify import NOTIFIER
@@ -104,7 +105,7 @@ class ClientDownload(ClientHTTP):
         self.ticks[stream] = utils.ticks()
         self.bytes[stream] = stream.bytes_recv_tot
         response = Message()
-        response.body.write = lambda piece: None
+        response.body = DiscardBody()
         stream.send_request(request, response)
 
     def got_response(self, stream, request, response):
@@ -207,12 +208,6 @@ def obj_to_dict(obj):
     }
     return dictionary
 
-def insertxxx(connection, obj, commit=True, override_timestamp=True):
-    ''' Hack to insert a result object into speedtest table,
-        converting it into a dictionary. '''
-    table_speedtest.insert(connection, obj_to_dict(obj), commit,
-                           override_timestamp)
-
 ### Glue result class and dictionary ###
 
 class ClientCollect(ClientHTTP):
@@ -251,7 +246,8 @@ class ClientCollect(ClientHTTP):
             if DATABASE.readonly:
                 logging.warning('speedtest: readonly database')
             else:
-                insertxxx(DATABASE.connection(), m1)
+                DATABASE.submit(table_speedtest.insert, obj_to_dict(m1),
+                                False)
 
         request = Message()
         request.compose(method="POST", pathquery="/speedtest/collect",
@@ -22,11 +22,14 @@
 
 ''' Speedtest server '''
 
-from neubot.utils_random import RandomBody
+from neubot.utils_random import RandomFileBody
+from neubot.http.message import DiscardBody
 from neubot.http.message import Message
 from neubot.http.server import ServerHTTP
 
 from neubot.bytegen_speedtest import BytegenSpeedtest
+from neubot.negotiate.server_speedtest import NEGOTIATE_SERVER_SPEEDTEST
+from neubot.tcp_info import TCP_INFO_SAMPLER
 
 TARGET = 5
 
@@ -48,8 +51,16 @@ class SpeedtestServer(ServerHTTP):
         # bytes.  (This is true especially when testing with
         # fast Neubot clients.)  This fix brings the amount of
         # memory consumed by the server under control again.
+        # With DiscardBody the stream does not even allocate
+        # strings for the body.
         #
-        request.body.write = lambda data: None
+        request.body = DiscardBody()
+
+        # Sample the connections used by authorized clients
+        authorization = request['authorization']
+        if isgood and authorization in NEGOTIATE_SERVER_SPEEDTEST.clients:
+            TCP_INFO_SAMPLER.watch(authorization, stream)
+
         return isgood
 
     @staticmethod
@@ -90,7 +101,7 @@ class SpeedtestServer(ServerHTTP):
             first, last = self._parse_range(request)
             response = Message()
             response.compose(code='200', reason='Ok',
-              body=RandomBody(last - first + 1),
+              body=RandomFileBody(last - first + 1),
               mimetype='application/octet-stream')
             stream.send_response(request, response)
 
@@ -36,6 +36,7 @@ from neubot.pollable import SUCCESS
 from neubot.pollable import WANT_READ
 from neubot.pollable import WANT_WRITE
 from neubot.poller import POLLER
+from neubot.stream import coalesce
 
 class SSLWrapper(object):
     ''' Wrapper for an SSL socket '''
@@ -72,6 +73,19 @@ class SSLWrapper(object):
             else:
                 raise
 
+    def sorecv_into(self, view, maxlen):
+        ''' Wrapper for SSL_read() into a buffer '''
+        try:
+            return SUCCESS, self.sock.recv_into(view, maxlen)
+        except ssl.SSLError:
+            exception = sys.exc_info()[1]
+            if exception.args[0] == ssl.SSL_ERROR_WANT_READ:
+                return WANT_READ, 0
+            elif exception.args[0] == ssl.SSL_ERROR_WANT_WRITE:
+                return WANT_WRITE, 0
+            else:
+                raise
+
     def sosend(self, octets):
         ''' Wrapper for SSL_write() '''
         try:
@@ -85,6 +99,11 @@ class SSLWrapper(object):
             else:
                 raise
 
+    def sosendv(self, buffers):
+        ''' Wrapper for SSL_write() with many buffers '''
+        # SSL sockets do not support sendmsg()
+        return self.sosend(coalesce(buffers))
+
 class Handshaker(Pollable):
     ''' A pollable SSL handshaker '''
 
@@ -24,6 +24,7 @@
 
 # Python3-ready: yes
 
+import collections
 import errno
 import logging
 import os
@@ -38,6 +39,10 @@ from neubot.pollable import CONNRST
 from neubot.pollable import SUCCESS
 from neubot.pollable import WANT_READ
 from neubot.pollable import WANT_WRITE
+from neubot.recvbuf import MAXRECV
+from neubot.recvbuf import RECV_STATS
+from neubot.recvbuf import RingBuffer
+from neubot.recvbuf import SCRATCH
 
 from neubot import utils_net
 from neubot import six
@@ -47,6 +52,34 @@ SOFT_ERRORS = (errno.EAGAIN, errno.EWOULDBLOCK, errno.EINTR)
 
 EMPTY_STRING = six.b('')
 
+# How recv() delivers data (see recvbuf.py)
+RECV_ALLOC, RECV_RING, RECV_DISCARD = range(3)
+
+# Python 3.3+ on Unix
+HAVE_SENDMSG = hasattr(socket.socket, 'sendmsg')
+
+# Max bytes we copy when we need to emulate writev()
+COALESCE_MAX = 65536
+
+def coalesce(buffers):
+    ''' Emulate writev() when sendmsg() is not available: return the
+        first buffer, if it is large enough, otherwise join the first
+        buffers, copying at most COALESCE_MAX bytes.  This way small
+        pieces (headers, chunk framing) are not sent in tiny segments
+        and the body is not copied. '''
+    first = buffers[0]
+    if len(first) >= COALESCE_MAX or len(buffers) == 1:
+        return first
+    pieces, total = [], 0
+    for octets in buffers:
+        if total >= COALESCE_MAX:
+            break
+        # Note: slicing also converts Python 2 buffer()s to str
+        octets = octets[:COALESCE_MAX - total]
+        pieces.append(octets)
+        total += len(octets)
+    return EMPTY_STRING.join(pieces)
+
 class StreamWrapper(object):
 
     ''' Wrapper for a simple socket '''
@@ -83,6 +116,19 @@ class StreamWrapper(object):
             else:
                 raise
 
+    def sorecv_into(self, view, maxlen):
+        ''' Wrapper for socket recv_into() '''
+        try:
+            return SUCCESS, self.sock.recv_into(view, maxlen)
+        except socket.error:
+            exception = sys.exc_info()[1]
+            if exception.args[0] in SOFT_ERRORS:
+                return WANT_READ, 0
+            elif exception.args[0] == errno.ECONNRESET:
+                return CONNRST, 0
+            else:
+                raise
+
     def sosend(self, octets):
         ''' Wrapper for socket send() '''
         try:
@@ -96,6 +142,21 @@ class StreamWrapper(object):
             else:
                 raise
 
+    def sosendv(self, buffers):
+        ''' Wrapper for socket sendmsg() '''
+        if not HAVE_SENDMSG:
+            return self.sosend(coalesce(buffers))
+        try:
+            return SUCCESS, self.sock.sendmsg(buffers)
+        except socket.error:
+            exception = sys.exc_info()[1]
+            if exception.args[0] in SOFT_ERRORS:
+                return WANT_WRITE, 0
+            elif exception.args[0] == errno.ECONNRESET:
+                return CONNRST, 0
+            else:
+                raise
+
 class StreamWrapperDebug(StreamWrapper):
     ''' Debug stream wrapper '''
 
@@ -103,6 +164,10 @@ class StreamWrapperDebug(StreamWrapper):
         maxlen = 1
         return StreamWrapper.sorecv(self, maxlen)
 
+    def sorecv_into(self, view, maxlen):
+        maxlen = 1
+        return StreamWrapper.sorecv_into(self, view, maxlen)
+
 def _stream_wrapper(sock):
     ''' Create the right stream wrapper '''
     if not os.environ.get('NEUBOT_STREAM_DEBUG'):
@@ -138,8 +203,12 @@ class Stream(Pollable):
         self.atconnect = Deferred()
         self.opaque = opaque
         self.recv_complete = None
+        self.recv_ring = None
+        self.recv_stats = RECV_STATS.get(getattr(connection_lost,
+                                                 '__module__', None))
         self.send_complete = None
         self.send_octets = EMPTY_STRING
+        self.send_queue = collections.deque()
         self.sock = None
 
         # Variables we don't need to clear
@@ -150,6 +219,7 @@ class Stream(Pollable):
         self.isclosed = False
         self.recv_bytes = 0
         self.recv_blocked = False
+        self.recv_mode = RECV_ALLOC
         self.send_blocked = False
 
         self.atclose.add_callback(connection_lost)
@@ -210,8 +280,10 @@ class Stream(Pollable):
         self.atconnect = None
         self.opaque = None
         self.recv_complete = None
+        self.recv_ring = None
         self.send_complete = None
         self.send_octets = None
+        self.send_queue = None
         self.sock = None
 
     def __del__(self):
@@ -222,9 +294,13 @@ class Stream(Pollable):
     # operation, the poller invokes handle_read() when the socket becomes
     # readbable, handle_read() invokes recv_complete() when the recv()
     # is complete.
+    # By default recv_complete() receives a new string.  With RECV_RING
+    # it receives a view of the stream ring buffer, which is valid for
+    # a few more reads only, and with RECV_DISCARD it just receives the
+    # number of bytes that were read (see recvbuf.py).
     #
 
-    def recv(self, recv_bytes, recv_complete):
+    def recv(self, recv_bytes, recv_complete, recv_mode=RECV_ALLOC):
         ''' Async recv() '''
 
         if self.isclosed:
@@ -234,8 +310,12 @@ class Stream(Pollable):
         if recv_bytes <= 0:
             raise RuntimeError('stream: invalid recv_bytes')
 
+        if recv_mode == RECV_RING and not self.recv_ring:
+            self.recv_ring = RingBuffer()
+
         self.recv_bytes = recv_bytes
         self.recv_complete = recv_complete
+        self.recv_mode = recv_mode
 
         if self.recv_blocked:
             logging.debug('stream: recv() is blocked')
@@ -259,6 +339,10 @@ class Stream(Pollable):
             self.handle_write()
             return
 
+        if self.recv_mode != RECV_ALLOC:
+            self._handle_read_into()
+            return
+
         status, octets = self.sock.sorecv(self.recv_bytes)
 
         #
@@ -270,11 +354,44 @@ class Stream(Pollable):
 
         if status == SUCCESS and octets:
             self.bytes_in += len(octets)
+            self.recv_stats['allocations'] += 1
+            self.recv_stats['allocated_bytes'] += len(octets)
             self.recv_bytes = 0
             POLLER.unset_readable(self)
             self.recv_complete(self, octets)
             return
 
+        self._handle_recv_status(status, len(octets))
+
+    def _handle_read_into(self):
+        ''' Receive into the ring or into the scratch buffer '''
+
+        if self.recv_mode == RECV_RING:
+            target = self.recv_ring
+        else:
+            target = SCRATCH
+        maxlen = min(self.recv_bytes, MAXRECV)
+        status, count = self.sock.sorecv_into(target.reserve(maxlen), maxlen)
+
+        if status == SUCCESS and count > 0:
+            self.bytes_in += count
+            self.recv_bytes = 0
+            POLLER.unset_readable(self)
+            if self.recv_mode == RECV_RING:
+                self.recv_stats['ring_reads'] += 1
+                self.recv_stats['ring_bytes'] += count
+                self.recv_complete(self, target.commit(count))
+            else:
+                self.recv_stats['discard_reads'] += 1
+                self.recv_stats['discarded_bytes'] += count
+                self.recv_complete(self, count)
+            return
+
+        self._handle_recv_status(status, count)
+
+    def _handle_recv_status(self, status, count):
+        ''' Handle the recv() status, except success '''
+
         if status == WANT_READ:
             return
 
@@ -285,13 +402,13 @@ class Stream(Pollable):
             self.send_blocked = True
             return
 
-        if status == SUCCESS and not octets:
+        if status == SUCCESS and not count:
             logging.debug('stream: EOF')
             self.eof = True
             POLLER.close(self)
             return
 
-        if status == CONNRST and not octets:
+        if status == CONNRST and not count:
             logging.debug('stream: RST ')
             self.conn_rst = True
             POLLER.close(self)
@@ -304,6 +421,10 @@ class Stream(Pollable):
     # operation, the poller invokes handle_write() when the underlying socket
     # becomes writable, handle_write() invokes send_complete() when send()
     # is complete.
+    # The protocol may also pass send() a list of buffers, which are sent
+    # using scatter-gather I/O, so that there is no need to join headers,
+    # framing and body into a single string.  The single buffer case is
+    # still handled separately, because it is the fast path for tests.
     #
 
     def send(self, send_octets, send_complete):
@@ -311,10 +432,17 @@ class Stream(Pollable):
 
         if self.isclosed:
             raise RuntimeError('stream: send() on a closed stream')
-        if self.send_octets:
+        if self.send_octets or self.send_queue:
             raise RuntimeError('stream: already send()ing')
 
-        self.send_octets = send_octets
+        if isinstance(send_octets, (list, tuple)):
+            for octets in send_octets:
+                if octets:
+                    self.send_queue.append(octets)
+            if not self.send_queue:
+                raise RuntimeError('stream: nothing to send')
+        else:
+            self.send_octets = send_octets
         self.send_complete = send_complete
 
         if self.send_blocked:
@@ -333,12 +461,16 @@ class Stream(Pollable):
         if self.send_blocked:
             logging.debug('stream: handle_write() => handle_read()')
             POLLER.set_readable(self)
-            if not self.send_octets:
+            if not self.send_octets and not self.send_queue:
                 POLLER.unset_writable(self)
             self.send_blocked = False
             self.handle_read()
             return
 
+        if self.send_queue:
+            self._handle_write_queue()
+            return
+
         status, count = self.sock.sosend(self.send_octets)
 
         #
@@ -363,6 +495,36 @@ class Stream(Pollable):
 
             raise RuntimeError('stream: invalid count')
 
+        self._handle_send_status(status, count)
+
+    def _handle_write_queue(self):
+        ''' Send the queued buffers '''
+
+        status, count = self.sock.sosendv(self.send_queue)
+
+        if status == SUCCESS and count > 0:
+            self.bytes_out += count
+
+            # Skip sent buffers and slice the partially sent one
+            queue = self.send_queue
+            while queue and count >= len(queue[0]):
+                count -= len(queue.popleft())
+            if queue:
+                if count > 0:
+                    queue[0] = six.buff(queue[0], count)
+                return
+            if count > 0:
+                raise RuntimeError('stream: invalid count')
+
+            POLLER.unset_writable(self)
+            self.send_complete(self)
+            return
+
+        self._handle_send_status(status, count)
+
+    def _handle_send_status(self, status, count):
+        ''' Handle the send() status, except success '''
+
         if status == WANT_WRITE:
             return
 
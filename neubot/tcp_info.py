@@ -0,0 +1,243 @@
+# neubot/tcp_info.py
+
+#
+# Copyright (c) 2013
+#     Nexa Center for Internet & Society, Politecnico di Torino (DAUIN)
+#     and Simone Basso <bassosimone@gmail.com>
+#
+# This file is part of Neubot <http://www.neubot.org/>.
+#
+# Neubot is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Neubot is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Neubot.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+''' Sample TCP_INFO of test connections '''
+
+#
+# Web100 is not available on modern kernels, so we periodically
+# snap at getsockopt(TCP_INFO) of each test connection instead.
+#
+# A single timer samples all the watched connections every interval
+# seconds.  We decode the structure returned by the kernel using a
+# struct that we compile in advance and that skips the fields we do
+# not keep, and we append the values to a flat array of doubles, so
+# each sample costs little more than the getsockopt() itself.  The
+# layout depends on the length of what the kernel returns, because
+# newer kernels return more fields.
+#
+# Samples are grouped by key (e.g. the authorization of a test), so
+# that the code that saves the results can collect them.  We forget
+# the samples that nobody collects within STALE seconds after all
+# their connections have been closed.
+#
+
+import array
+import logging
+import socket
+import struct
+import sys
+
+from neubot.poller import POLLER
+
+from neubot import utils
+
+HAVE_TCP_INFO = sys.platform.startswith('linux')
+TCP_INFO = getattr(socket, 'TCP_INFO', 11)
+
+# Larger than struct tcp_info, the kernel returns what it has
+BUFLEN = 256
+
+# Default sampling interval in seconds
+INTERVAL = 1.0
+
+# Maximum number of samples for each connection
+MAX_SAMPLES = 600
+
+# Seconds after which we forget samples that nobody has collected
+STALE = 60.0
+
+#
+# The beginning of the Linux struct tcp_info (see <linux/tcp.h>), with
+# native byte order and no padding, because each field is naturally
+# aligned.  The groups of fields were added in different kernels.
+#
+FIELDS = (
+    ('state', 'B'), ('ca_state', 'B'), ('retransmits', 'B'),
+    ('probes', 'B'), ('backoff', 'B'), ('options', 'B'),
+    ('wscale', 'B'), ('flags', 'B'),
+    ('rto', 'I'), ('ato', 'I'), ('snd_mss', 'I'), ('rcv_mss', 'I'),
+    ('unacked', 'I'), ('sacked', 'I'), ('lost', 'I'), ('retrans', 'I'),
+    ('fackets', 'I'),
+    ('last_data_sent', 'I'), ('last_ack_sent', 'I'),
+    ('last_data_recv', 'I'), ('last_ack_recv', 'I'),
+    ('pmtu', 'I'), ('rcv_ssthresh', 'I'), ('rtt', 'I'), ('rttvar', 'I'),
+    ('snd_ssthresh', 'I'), ('snd_cwnd', 'I'), ('advmss', 'I'),
+    ('reordering', 'I'),
+    ('rcv_rtt', 'I'), ('rcv_space', 'I'),
+    ('total_retrans', 'I'),
+    # Linux 3.15 and 4.1
+    ('pacing_rate', 'Q'), ('max_pacing_rate', 'Q'),
+    ('bytes_acked', 'Q'), ('bytes_received', 'Q'),
+    # Linux 4.2
+    ('segs_out', 'I'), ('segs_in', 'I'),
+    # Linux 4.6
+    ('notsent_bytes', 'I'), ('min_rtt', 'I'),
+    ('data_segs_in', 'I'), ('data_segs_out', 'I'),
+    # Linux 4.9
+    ('delivery_rate', 'Q'),
+)
+
+# The fields we keep
+KEEP = ('state', 'ca_state', 'snd_mss', 'unacked', 'retrans', 'rtt',
+        'rttvar', 'snd_ssthresh', 'snd_cwnd', 'rcv_space', 'total_retrans',
+        'pacing_rate', 'bytes_acked', 'bytes_received', 'segs_out',
+        'segs_in', 'notsent_bytes', 'min_rtt', 'delivery_rate')
+
+class Layout(object):
+    ''' Precompiled decoder for a given length of tcp_info '''
+
+    def __init__(self, length, keep=KEEP):
+        fmt, names, size = ['='], [], 0
+        for name, code in FIELDS:
+            width = struct.calcsize('=' + code)
+            if size + width > length:
+                break
+            if name in keep:
+                fmt.append(code)
+                names.append(name)
+            else:
+                fmt.append('%dx' % width)
+            size += width
+        self.struct = struct.Struct(''.join(fmt))
+        self.names = tuple(names)
+
+_LAYOUTS = {}
+
+def get_layout(length):
+    ''' Return the layout for tcp_info of the given length '''
+    layout = _LAYOUTS.get(length)
+    if layout is None:
+        layout = _LAYOUTS[length] = Layout(length)
+    return layout
+
+class Series(object):
+    ''' Time series of TCP_INFO samples of a connection '''
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.layout = None
+        self.samples = array.array('d')
+
+    def sample(self, ticks):
+        ''' Take a sample and return False when we should stop '''
+        if self.sock is None:
+            return False
+        try:
+            data = self.sock.getsockopt(socket.IPPROTO_TCP, TCP_INFO, BUFLEN)
+        except (socket.error, AttributeError):
+            # Most likely the socket is closed
+            self.sock = None
+            return False
+        if self.layout is None:
+            self.layout = get_layout(len(data))
+        if len(self.samples) >= MAX_SAMPLES * (len(self.layout.names) + 1):
+            return True
+        self.samples.append(ticks)
+        self.samples.extend(self.layout.struct.unpack_from(data))
+        return True
+
+    def stop(self):
+        ''' Take a last sample and forget the socket '''
+        self.sample(utils.ticks())
+        self.sock = None
+
+    def marshal(self):
+        ''' Return a compact JSON-friendly representation '''
+        if self.layout is None:
+            return {'fields': [], 'samples': []}
+        width = len(self.layout.names) + 1
+        samples = self.samples.tolist()
+        return {
+                'fields': ['ticks'] + list(self.layout.names),
+                'samples': [samples[index:index + width] for index
+                            in range(0, len(samples), width)],
+               }
+
+class TCPInfoSampler(object):
+    ''' Sample TCP_INFO of the watched connections '''
+
+    def __init__(self, interval=INTERVAL, stale=STALE):
+        self.interval = interval
+        self.stale = stale
+        self.series = {}
+        self.idle = {}
+        self.task = None
+
+    def enabled(self):
+        ''' Returns True if we can and shall sample '''
+        return HAVE_TCP_INFO and self.interval > 0
+
+    def watch(self, key, stream):
+        ''' Start sampling the connection of stream under key '''
+        if not self.enabled():
+            return
+        sock = getattr(stream.sock, 'sock', None)
+        if sock is None:
+            return
+        series = self.series.get(key, ())
+        for elem in series:
+            if elem.sock is sock:
+                return
+        elem = Series(sock)
+        if not elem.sample(utils.ticks()):
+            return
+        self.series.setdefault(key, []).append(elem)
+        if self.task is None:
+            self.task = POLLER.sched(self.interval, self._sample)
+
+    def _sample(self):
+        ''' Periodically sample all connections '''
+        self.task = None
+        ticks = utils.ticks()
+        for key, series in list(self.series.items()):
+            active = 0
+            for elem in series:
+                if elem.sample(ticks):
+                    active += 1
+            if active:
+                self.idle.pop(key, None)
+            elif self.idle.setdefault(key, ticks) + self.stale < ticks:
+                logging.debug('tcp_info: forget stale samples of %s', key)
+                del self.series[key]
+                del self.idle[key]
+        if self.series:
+            self.task = POLLER.sched(self.interval, self._sample)
+
+    def collect(self, key):
+        ''' Stop sampling the connections under key and return
+            their time series '''
+        result = []
+        self.idle.pop(key, None)
+        for elem in self.series.pop(key, ()):
+            elem.stop()
+            result.append(elem.marshal())
+        return result
+
+    def discard(self, key):
+        ''' Stop sampling the connections under key '''
+        self.idle.pop(key, None)
+        if self.series.pop(key, None) is not None:
+            logging.debug('tcp_info: discard samples of %s', key)
+
+TCP_INFO_SAMPLER = TCPInfoSampler()
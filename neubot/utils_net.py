@@ -31,6 +31,95 @@ import sys
 # Winsock returns EWOULDBLOCK
 INPROGRESS = [ 0, errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EAGAIN ]
 
+# Linux values, not exported by the socket module of older Pythons
+SO_REUSEPORT = getattr(socket, 'SO_REUSEPORT', 15)
+SO_ATTACH_REUSEPORT_CBPF = 51
+
+#
+# Number of processes that listen on the same endpoints using
+# SO_REUSEPORT, or zero if listening sockets are not shared.  When
+# the sockets are shared, each process must create its listening
+# sockets in turn, so that the N-th process is the N-th socket in
+# each SO_REUSEPORT group.  This is because the kernel selects the
+# socket using the source address of the client, so that all the
+# connections of a client reach the same process (the one that has
+# authorized it to run a test).
+#
+REUSEPORT_GROUP = 0
+
+def set_reuseport_group(count):
+    ''' Share listening sockets among count processes '''
+    global REUSEPORT_GROUP
+    REUSEPORT_GROUP = count
+
+#
+# Classic BPF program that maps the client address into the index
+# of the socket in the group: it reads the last 32 bits of the IPv4
+# or IPv6 source address from the network header (the kernel passes
+# us the packet starting at the TCP payload, hence SKF_NET_OFF) and
+# returns them modulo the number of sockets.
+#
+SKF_NET_OFF = -0x100000 & 0xffffffff
+STEERING_PROGRAM = (
+    (0x30, 0, 0, SKF_NET_OFF),          # ldb [net + 0]
+    (0x74, 0, 0, 4),                    # rsh #4
+    (0x15, 2, 0, 6),                    # jeq #6, ipv6, ipv4
+    (0x20, 0, 0, SKF_NET_OFF + 12),     # ipv4: ld [net + 12]
+    (0x05, 0, 0, 1),                    # ja modulo
+    (0x20, 0, 0, SKF_NET_OFF + 20),     # ipv6: ld [net + 20]
+    (0x94, 0, 0, None),                 # modulo: mod #count
+    (0x16, 0, 0, 0),                    # ret a
+)
+
+def _attach_steering(sock, count):
+    ''' Attach the steering program to sock '''
+
+    # Lazy import because it's Linux-only stuff
+    import ctypes
+
+    class SockFilter(ctypes.Structure):
+        ''' struct sock_filter '''
+        _fields_ = [('code', ctypes.c_uint16), ('jt', ctypes.c_uint8),
+                    ('jf', ctypes.c_uint8), ('k', ctypes.c_uint32)]
+
+    class SockFprog(ctypes.Structure):
+        ''' struct sock_fprog '''
+        _fields_ = [('len', ctypes.c_uint16),
+                    ('filter', ctypes.POINTER(SockFilter))]
+
+    instructions = []
+    for code, jt, jf, k in STEERING_PROGRAM:
+        if k is None:
+            k = count
+        instructions.append(SockFilter(code, jt, jf, k))
+    program = (SockFilter * len(instructions))(*instructions)
+    fprog = SockFprog(len(instructions), program)
+
+    # The kernel copies the program before setsockopt() returns
+    sock.setsockopt(socket.SOL_SOCKET, SO_ATTACH_REUSEPORT_CBPF,
+      ctypes.string_at(ctypes.addressof(fprog), ctypes.sizeof(fprog)))
+
+def reuseport_supported():
+    ''' Return True if we can share listening sockets '''
+    if not sys.platform.startswith('linux'):
+        return False
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    try:
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, SO_REUSEPORT, 1)
+            sock.bind(('127.0.0.1', 0))
+            sock.listen(1)
+            _attach_steering(sock, 2)
+        except (KeyboardInterrupt, SystemExit):
+            raise
+        except:
+            logging.warning('utils_net: cannot share listening sockets',
+                            exc_info=1)
+            return False
+    finally:
+        sock.close()
+    return True
+
 def format_epnt(epnt):
     ''' Format endpoint for printing '''
     address, port = epnt[:2]
@@ -133,10 +222,15 @@ def listen(epnt, prefer_ipv6):
 
             sock = socket.socket(ainfo[0], socket.SOCK_STREAM)
             sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            if REUSEPORT_GROUP:
+                sock.setsockopt(socket.SOL_SOCKET, SO_REUSEPORT, 1)
             sock.setblocking(False)
             sock.bind(ainfo[4])
             # Probably the backlog here is too big
             sock.listen(128)
+            # Must be attached after listen(), when the group exists
+            if REUSEPORT_GROUP:
+                _attach_steering(sock, REUSEPORT_GROUP)
 
             logging.debug('listen(): listening at: %s', format_epnt(ainfo[4]))
             sockets.append(sock)
@@ -23,115 +23,67 @@
 ''' Generate random data blocks for the tests '''
 
 #
-# This code is inspired by code published on the blog
-# of Jesse Noller <http://bit.ly/irj8je>.
+# The random data is generated once, and stored into a temporary
+# file that is memory-mapped.  (Or one can map an existing file, if
+# the server should always send the same bytes.)  Blocks are views
+# of the mapping at random offsets, so they don't copy any data, and
+# the file can be sent with sendfile() (see RandomFileBody).
+#
+# The server creates the pool before forking the workers (and before
+# dropping privileges), so all the servers of all the workers share
+# the same pages.  Other processes create it when they need it.
+#
+# This replaces the generator of blocks made by shuffling words of
+# the files in WWWDIR, whose joins were expensive at high speed and
+# produced compressible data.
 #
 
-import collections
-import os.path
+import mmap
+import os
 import random
+import tempfile
 
-#
-# Must use WWWDIR because Python modules are not
-# reachable with Windows.  They are stored into
-# library.zip.
-#
-from neubot import utils_hier
+from neubot.utils_sendfile import SendfileBody
 
-# Maximum depth
-MAXDEPTH = 16
+from neubot import six
 
 # Size of a block
 BLOCKSIZE = 262144
 
-def listdir(curdir, vector, depth):
-
-    ''' Make a list of all the files in a given directory
-        up to a certain depth '''
-
-    if depth > MAXDEPTH:
-        return
-
-    for entry in os.listdir(curdir):
-        entry = os.path.join(curdir, entry)
-        if os.path.isdir(entry):
-            listdir(entry, vector, depth + 1)
-        elif os.path.isfile(entry):
-            vector.append(entry)
-
-def create_base_block(length):
-
-    ''' Create a base block of length @length '''
-
-    base_block = collections.deque()
-
-    files = []
-    listdir(utils_hier.WWWDIR, files, 0)
-    random.shuffle(files)
-
-    for fpath in files:
-        fileptr = open(fpath, 'rb')
-        content = fileptr.read()
-        words = content.split()
-
-        for word in words:
-            amount = min(len(word), length)
-            word = word[:amount]
-            wordlist = list(word)
-            random.shuffle(wordlist)
-
-            base_block.append(''.join(wordlist))
-            length -= amount
-            if length <= 0:
-                break
-
-        if length <= 0:
-            break
-
-    return base_block
-
-def block_generator(size):
+# Size of the payload pool
+POOLSIZE = 32 * BLOCKSIZE
 
-    ''' Generator that returns blocks '''
-
-    block = create_base_block(size)
-    while True:
-        block.rotate(random.randrange(4, 16))
-        yield ''.join(block)
+if six.PY3:
+    def _view(buff, offset, count):
+        ''' Return view of count bytes of buff at offset '''
+        return memoryview(buff)[offset:offset + count]
+else:
+    def _view(buff, offset, count):
+        ''' Return view of count bytes of buff at offset '''
+        # Unlike memoryview, buffer behaves like str in Python 2
+        return buffer(buff, offset, count)
 
 class RandomBlocks(object):
 
-    ''' Generate blocks randomly shuffling a base block '''
+    ''' Hand out random blocks of the payload pool '''
 
     def __init__(self, size=BLOCKSIZE):
         ''' Initialize random blocks generator '''
-        self._generator = block_generator(size)
         self.blocksiz = size
 
-    def reinit(self):
-        ''' Reinitialize the generator '''
-        self._generator = block_generator(self.blocksiz)
-
-    def get_block(self):
-        ''' Return a block of data '''
-        return self._generator.next()
+    def get_block(self, length=None):
+        ''' Return a view of a block of data '''
+        if length is None:
+            length = self.blocksiz
+        return payload_pool().view(length)
 
 RANDOMBLOCKS = RandomBlocks()
 
-#
-# XXX Create and discard the first block at the very
-# beginning, so we are sure that we can fetch all the
-# needed files in the common case, i.e. when we
-# startup as root.
-#
-RANDOMBLOCKS.get_block()
-
 class RandomBody(object):
 
     '''
      This class implements a minimal file-like interface and
-     employs the random number generator to create the content
-     returned by its read() method.
+     returns views of the payload pool from its read() method.
     '''
 
     def __init__(self, total):
@@ -145,7 +97,7 @@ class RandomBody(object):
         amt = min(self.total, min(want, RANDOMBLOCKS.blocksiz))
         if amt:
             self.total -= amt
-            return RANDOMBLOCKS.get_block()[:amt]
+            return RANDOMBLOCKS.get_block(amt)
         else:
             return ''
 
@@ -155,3 +107,74 @@ class RandomBody(object):
     def tell(self):
         ''' Tell the amounts of bytes left '''
         return self.total
+
+class PayloadPool(object):
+
+    '''
+     Incompressible random data, written once into a file that is
+     memory-mapped.  If @path is not empty, the file at @path is
+     mapped instead.
+    '''
+
+    def __init__(self, path='', size=POOLSIZE):
+        if path:
+            self.filep = open(path, 'rb')
+            size = os.fstat(self.filep.fileno()).st_size
+            if size < BLOCKSIZE:
+                raise RuntimeError('utils_random: payload file too small')
+        else:
+            self.filep = tempfile.TemporaryFile()
+            written = 0
+            while written < size:
+                block = os.urandom(min(BLOCKSIZE, size - written))
+                self.filep.write(block)
+                written += len(block)
+            self.filep.flush()
+        self.size = size
+        self.mmap = mmap.mmap(self.filep.fileno(), size,
+                              access=mmap.ACCESS_READ)
+
+    def view(self, length):
+        ''' Return a view of @length bytes at a random offset '''
+        if length > self.size:
+            raise RuntimeError('utils_random: view too large')
+        return _view(self.mmap, random.randint(0, self.size - length),
+                     length)
+
+# Created on demand, unless the server creates it
+PAYLOAD_POOL = None
+
+def payload_pool_init(path=''):
+    ''' Create the payload pool, mapping @path if not empty '''
+    global PAYLOAD_POOL
+    PAYLOAD_POOL = PayloadPool(path)
+    return PAYLOAD_POOL
+
+def payload_pool():
+    ''' Return the payload pool, creating it if needed '''
+    if PAYLOAD_POOL is None:
+        return payload_pool_init()
+    return PAYLOAD_POOL
+
+class RandomFileBody(SendfileBody):
+
+    '''
+     Random body of @total bytes that starts at a random offset
+     of the payload pool file and wraps around its end.
+    '''
+
+    def __init__(self, total):
+        self.payload = payload_pool()
+        SendfileBody.__init__(self, self.payload.filep,
+          random.randrange(self.payload.size), int(total))
+
+    def region(self):
+        ''' Return offset in the file and length of the next
+            contiguous piece of the body '''
+        offset = (self.start + self.position) % self.payload.size
+        return offset, min(self.count - self.position,
+                           self.payload.size - offset)
+
+    def pread(self, offset, count):
+        ''' Read count bytes at offset from the memory map '''
+        return self.payload.mmap[offset:offset + count]
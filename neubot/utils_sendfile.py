@@ -0,0 +1,136 @@
+# neubot/utils_sendfile.py
+
+#
+# Copyright (c) 2013
+#     Nexa Center for Internet & Society, Politecnico di Torino (DAUIN)
+#     and Simone Basso <bassosimone@gmail.com>
+#
+# This file is part of Neubot <http://www.neubot.org/>.
+#
+# Neubot is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Neubot is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Neubot.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+''' Send file regions with sendfile() '''
+
+# Python3-ready: yes
+
+#
+# A SendfileBody is a file-like object that describes a region of
+# a file.  When it is the body of a message sent over a plain socket,
+# the stream passes the region to sendfile(), so the data goes from
+# the page cache to the socket without passing through Python.  Over
+# SSL, and where sendfile() is not available, the stream just reads
+# the body, as it does for any other file-like object.
+#
+# Python 2 does not have os.sendfile(), so on Linux we call the
+# sendfile() of the C library using ctypes.
+#
+
+import logging
+import os
+import sys
+
+def _libc_sendfile():
+    ''' Return a sendfile() that uses the C library, or None '''
+
+    if not sys.platform.startswith('linux'):
+        return None
+
+    try:
+        # Lazy import because it's Linux-only stuff
+        import ctypes
+        libc = ctypes.CDLL(None, use_errno=True)
+        func = libc.sendfile64
+    except (KeyboardInterrupt, SystemExit):
+        raise
+    except:
+        logging.warning('utils_sendfile: cannot use libc sendfile()',
+                        exc_info=1)
+        return None
+
+    func.argtypes = [ctypes.c_int, ctypes.c_int,
+                     ctypes.POINTER(ctypes.c_int64), ctypes.c_size_t]
+    func.restype = ctypes.c_ssize_t
+
+    def libc_sendfile(outfd, infd, offset, count):
+        ''' Send count bytes of infd at offset over outfd '''
+        result = func(outfd, infd, ctypes.byref(ctypes.c_int64(offset)),
+                      count)
+        if result < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+        return result
+
+    return libc_sendfile
+
+if hasattr(os, 'sendfile'):
+    sendfile = os.sendfile
+else:
+    sendfile = _libc_sendfile()
+
+HAVE_SENDFILE = sendfile is not None
+
+class SendfileBody(object):
+
+    ''' File-like object describing a region of a file '''
+
+    def __init__(self, filep, offset=0, count=None):
+        self.filep = filep
+        self.start = offset
+        if count is None:
+            count = os.fstat(filep.fileno()).st_size - offset
+        self.count = count
+        self.position = 0
+
+    def __len__(self):
+        return self.count - self.position
+
+    def fileno(self):
+        ''' Return the file descriptor '''
+        return self.filep.fileno()
+
+    def region(self):
+        ''' Return offset in the file and length of the next
+            contiguous piece of the body '''
+        return self.start + self.position, self.count - self.position
+
+    def advance(self, count):
+        ''' Mark count bytes as sent '''
+        self.position += count
+
+    def pread(self, offset, count):
+        ''' Read count bytes at offset '''
+        self.filep.seek(offset)
+        return self.filep.read(count)
+
+    def read(self, maxlen=None):
+        ''' Read up to maxlen bytes '''
+        offset, count = self.region()
+        if maxlen is not None and maxlen >= 0:
+            count = min(count, maxlen)
+        octets = self.pread(offset, max(count, 0))
+        self.position += len(octets)
+        return octets
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        ''' Seek within the region '''
+        if whence == os.SEEK_CUR:
+            offset += self.position
+        elif whence == os.SEEK_END:
+            offset += self.count
+        self.position = max(0, min(offset, self.count))
+
+    def tell(self):
+        ''' Return the current position within the region '''
+        return self.position
@@ -39,6 +39,13 @@
 # the minimal set of features that I need to allow Neubot to snap at web100's
 # variables.
 #
+# To find the directory of a connection we keep a table that maps the spec
+# of each connection, i.e. its local and remote endpoints, to the directories
+# with such spec.  Each lookup lists /proc/web100 and only reads the spec of
+# the connections that appeared since the previous lookup.  To snap at the
+# variables, we unpack the whole /read file using a single struct that we
+# compile from the header.
+#
 
 import logging
 import getopt
@@ -81,22 +88,24 @@ SIZES = {
         }
 
 # Note: in struct '=' means native byte order, standard alignment, no padding
-CONVERT = {
-           COUNTER32: lambda raw: struct.unpack('=I', raw)[0],
-           COUNTER64: lambda raw: struct.unpack('=Q', raw)[0],
-           GAUGE32: lambda raw: struct.unpack('=I', raw)[0],
-           INET_ADDRESS: lambda raw: struct.unpack('=17s', raw)[0],
-           INET_ADDRESS_IPV4: lambda raw: struct.unpack('=I', raw)[0],
-           INET_ADDRESS_IPV6: lambda raw: struct.unpack('=17s', raw)[0],
-           INET_PORT_NUMBER: lambda raw: struct.unpack('=H', raw)[0],
-           INTEGER32: lambda raw: struct.unpack('=I', raw)[0],
-           INTEGER: lambda raw: struct.unpack('=I', raw)[0],
-           OCTET: lambda raw: struct.unpack('=B', raw)[0],
-           STR32: lambda raw: struct.unpack('=32s', raw)[0],
-           TIME_TICKS: lambda raw: struct.unpack('=I', raw)[0],
-           UNSIGNED32: lambda raw: struct.unpack('=I', raw)[0],
+FORMATS = {
+           COUNTER32: 'I',
+           COUNTER64: 'Q',
+           GAUGE32: 'I',
+           INET_ADDRESS: '17s',
+           INET_ADDRESS_IPV4: 'I',
+           INET_ADDRESS_IPV6: '17s',
+           INET_PORT_NUMBER: 'H',
+           INTEGER32: 'I',
+           INTEGER: 'I',
+           OCTET: 'B',
+           STR32: '32s',
+           TIME_TICKS: 'I',
+           UNSIGNED32: 'I',
           }
 
+WEB100_DIR = '/proc/web100'
+
 ADDRTYPES = (
              ADDRTYPE_UNKNOWN,
              ADDRTYPE_IPV4,
@@ -104,10 +113,10 @@ ADDRTYPES = (
              ADDRTYPE_DNS
             ) = (0, 1, 2, 16)
 
-def _web100_init():
+def _web100_init(root=WEB100_DIR):
     ''' Read web100 header at /proc/web100/header '''
     hdr, group = {}, ''
-    filep = open('/proc/web100/header', 'r')
+    filep = open(os.sep.join([root, 'header']), 'r')
     for line in filep:
         line = line.strip()
         if not line:
@@ -128,35 +137,74 @@ def _web100_init():
     filep.close()
     return hdr
 
-def web100_init():
+def web100_init(root=WEB100_DIR):
     ''' Read web100 hdr at /proc/web100/header '''
     try:
-        return _web100_init()
+        return _web100_init(root)
     except IOError:
         logging.warning('web100: no information available', exc_info=1)
         return {}
 
-def web100_find_dirname(hdr, spec):
+def _web100_readspec(dirname):
+    ''' Read the spec of the connection at dirname '''
+    data = _web100_readfile(os.sep.join([dirname, 'spec-ascii'])).strip()
+    # Work-around web100 kernel bug
+    if ':::' in data:
+        data = data.replace(':::', '::')
+    return data
+
+class ConnectionTable(object):
+    ''' Maps the spec of each connection to its directories '''
+
+    def __init__(self, root=WEB100_DIR):
+        self.root = root
+        self.cids = {}
+        self.specs = {}
+
+    def refresh(self):
+        ''' Forget connections that are gone and read the spec
+            of the new ones '''
+
+        try:
+            names = set(os.listdir(self.root))
+        except OSError:
+            names = set()
+
+        for cid in list(self.cids):
+            if cid not in names:
+                self._forget(cid)
+
+        for cid in names:
+            if cid in self.cids or not cid.isdigit():
+                continue
+            dirname = os.sep.join([self.root, cid])
+            spec = _web100_readspec(dirname)
+            # Maybe gone already, or not ready: retry next time
+            if not spec:
+                continue
+            self.cids[cid] = spec
+            self.specs.setdefault(spec, []).append(dirname)
+
+    def _forget(self, cid):
+        ''' Forget a connection '''
+        spec = self.cids.pop(cid)
+        dirnames = self.specs[spec]
+        dirnames.remove(os.sep.join([self.root, cid]))
+        if not dirnames:
+            del self.specs[spec]
+
+    def find(self, spec):
+        ''' Return the directories of the connections with spec '''
+        self.refresh()
+        return list(self.specs.get(spec, ()))
+
+CONNECTIONS = ConnectionTable()
+
+def web100_find_dirname(hdr, spec, table=CONNECTIONS):
     ''' Find /proc/web100/<dirname> with the given spec '''
     result = ''
     if hdr:
-        matching = []
-        for name in os.listdir('/proc/web100'):
-            dirname = os.sep.join(['/proc/web100', name])
-            if not os.path.isdir(dirname):
-                continue
-            tmp = os.sep.join([dirname, 'spec-ascii'])
-            if not os.path.isfile(tmp):
-                continue
-            data = _web100_readfile(tmp)
-            if not data:
-                continue
-            data = data.strip()
-            # Work-around web100 kernel bug
-            if ':::' in data:
-                data = data.replace(':::', '::')
-            if data == spec:
-                matching.append(dirname)
+        matching = table.find(spec)
         if len(matching) == 1:
             result = matching[0]
         elif len(matching) > 1:
@@ -165,6 +213,51 @@ def web100_find_dirname(hdr, spec):
         logging.warning('web100: no information available')
     return result
 
+class Decoder(object):
+    ''' Decodes a web100 group using a precompiled struct '''
+
+    def __init__(self, group):
+
+        #
+        # Variables must not overlap to be in the same struct, so
+        # we use a struct for each variable that overlaps another
+        # one (if any), and unpack it separately.
+        #
+        fmt, names, self.others, end = ['='], [], [], 0
+        for off, kind, size, name in sorted((value + (name,)) for name,
+                                            value in group.items()):
+            if off < end:
+                self.others.append((name, off, struct.Struct(
+                                    '=' + FORMATS[kind])))
+                continue
+            if off > end:
+                fmt.append('%dx' % (off - end))
+            fmt.append(FORMATS[kind])
+            names.append(name)
+            end = off + size
+
+        self.struct = struct.Struct(''.join(fmt))
+        self.names = names
+        self.size = max([end] + [off + other.size for _, off, other
+                                 in self.others])
+
+    def decode(self, data):
+        ''' Decode data and return a dictionary '''
+        if len(data) < self.size:
+            return {}
+        result = dict(zip(self.names, self.struct.unpack_from(data)))
+        for name, off, other in self.others:
+            result[name] = other.unpack_from(data, off)[0]
+        return result
+
+_DECODER = [None, None]
+
+def _web100_decoder(hdr):
+    ''' Return the decoder for the /read group of hdr '''
+    if _DECODER[0] is not hdr:
+        _DECODER[:] = [hdr, Decoder(hdr['/read'])]
+    return _DECODER[1]
+
 def web100_snap(hdr, dirname):
     ''' Take a snapshot of standard web100 variables '''
     if not hdr:
@@ -174,11 +267,8 @@ def web100_snap(hdr, dirname):
     path = os.sep.join([dirname, 'read'])
     data = _web100_readfile(path)
     if data:
-        for name, value in hdr['/read'].items():
-            off, kind, size = value
-            tmp = data[off:off + size]
-            value = CONVERT[kind](tmp)
-            result[name] = value
+        result = _web100_decoder(hdr).decode(data)
+    if result:
         _web100_normalise_addr(result, 'LocalAddress', 'LocalAddressType')
         _web100_normalise_addr(result, 'RemAddress', 'LocalAddressType')
     return result
@@ -218,8 +308,8 @@ def _web100_normalise_addr(result, value_name, addrtype_name):
 
 def __autocheck(hdr):
     ''' Autocheck this implementation '''
-    for dirname in os.listdir('/proc/web100'):
-        dirpath = os.sep.join(['/proc/web100', dirname])
+    for dirname in os.listdir(WEB100_DIR):
+        dirpath = os.sep.join([WEB100_DIR, dirname])
         if not os.path.isdir(dirpath):
             continue
         filepath = os.sep.join([dirpath, 'spec-ascii'])
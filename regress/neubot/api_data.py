@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+
+#
+# Copyright (c) 2013
+#     Nexa Center for Internet & Society, Politecnico di Torino (DAUIN)
+#     and Simone Basso <bassosimone@gmail.com>
+#
+# This file is part of Neubot <http://www.neubot.org/>.
+#
+# Neubot is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Neubot is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Neubot.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+''' Regression test for neubot/api_data.py '''
+
+import sqlite3
+import sys
+import unittest
+
+if __name__ == '__main__':
+    sys.path.insert(0, '.')
+
+from neubot.backend import BACKEND
+from neubot.compat import json
+from neubot.database import DATABASE
+from neubot.database import table_speedtest
+from neubot.http.message import Message
+
+from neubot import api_data
+
+from regress.neubot.database.table_speedtest_gen import ResultIterator
+from regress.neubot.http.json_body import dechunk
+
+class FakeStream(object):
+    ''' Stream that saves the response '''
+
+    def __init__(self):
+        self.response = None
+
+    def send_response(self, request, response):
+        ''' Save the response '''
+        self.response = response
+
+def _get(query):
+    ''' Invoke api_data() and return the results and the cursor '''
+    stream = FakeStream()
+    api_data.api_data(stream, Message(protocol='HTTP/1.1'), query)
+    body = stream.response.body
+    if not isinstance(body, basestring):
+        body = dechunk(body)
+    return json.loads(body), stream.response.headers.get('x-neubot-cursor')
+
+def _get_pages(query, limit):
+    ''' Fetch all the pages and return the results '''
+    results, cursor = _get(query + '&limit=%d' % limit)
+    while cursor:
+        assert len(results) % limit == 0
+        page, cursor = _get(query + '&limit=%d&cursor=%s' % (limit, cursor))
+        results.extend(page)
+    return results
+
+class Tables(unittest.TestCase):
+
+    ''' Verifies paging over a table '''
+
+    def setUp(self):
+        self.dbc = DATABASE.dbc
+        DATABASE.dbc = sqlite3.connect(':memory:')
+        DATABASE.dbc.row_factory = sqlite3.Row
+        table_speedtest.create(DATABASE.dbc)
+        results = list(ResultIterator())
+        # Make sure there are results with the same timestamp
+        for result in results[:20]:
+            result['timestamp'] = results[20]['timestamp']
+        for result in results:
+            table_speedtest.insert(DATABASE.dbc, result, commit=False,
+                                   override_timestamp=False)
+
+    def tearDown(self):
+        DATABASE.dbc = self.dbc
+
+    def test_stream(self):
+        ''' Make sure we stream when there is no limit '''
+        stream = FakeStream()
+        api_data.api_data(stream, Message(protocol='HTTP/1.1'),
+                          'test=speedtest')
+        self.assertEqual(stream.response['transfer-encoding'], 'chunked')
+        self.assertEqual(len(json.loads(dechunk(stream.response.body))), 100)
+
+    def test_pages(self):
+        ''' Make sure pages contain all the results exactly once '''
+        everything = _get('test=speedtest&limit=1000')[0]
+        self.assertEqual(sorted(everything), sorted(_get('test=speedtest')[0]))
+        for limit in (1, 7, 50, 100):
+            self.assertEqual(_get_pages('test=speedtest', limit),
+                             everything)
+
+    def test_range(self):
+        ''' Make sure pages honour since and until '''
+        everything = _get('test=speedtest&limit=1000')[0]
+        since = everything[80]['timestamp']
+        until = everything[10]['timestamp']
+        query = 'test=speedtest&since=%d&until=%d' % (since, until)
+        expected = [result for result in everything
+                    if since <= result['timestamp'] < until]
+        self.assertEqual(_get(query + '&limit=1000')[0], expected)
+        self.assertEqual(_get_pages(query, 3), expected)
+
+    def test_bad_cursor(self):
+        ''' Make sure we reject a malformed cursor before streaming '''
+        for cursor in ('abc', '1', '1.2.3', '1.x'):
+            for query in ('', '&limit=10'):
+                stream = FakeStream()
+                api_data.api_data(stream, Message(protocol='HTTP/1.1'),
+                  'test=speedtest&cursor=%s%s' % (cursor, query))
+                self.assertEqual(stream.response.code, '400')
+
+class Generic(unittest.TestCase):
+
+    ''' Verifies paging over a generic test '''
+
+    def setUp(self):
+        BACKEND.use_backend('volatile')
+        for index in range(100):
+            BACKEND.store_generic('dash', {'timestamp': index // 2})
+
+    def tearDown(self):
+        BACKEND.use_backend('neubot')
+
+    def test_pages(self):
+        ''' Make sure pages contain all the results exactly once '''
+        expected = [{'timestamp': index // 2} for index in range(99, -1, -1)]
+        self.assertEqual(_get('test=dash')[0], expected)
+        self.assertEqual(_get_pages('test=dash', 7), expected)
+        self.assertEqual(_get_pages('test=dash&since=10&until=20', 4),
+                         expected[58:80])
+
+    def test_bad_cursor(self):
+        ''' Make sure we reject a malformed cursor before streaming '''
+        stream = FakeStream()
+        api_data.api_data(stream, Message(protocol='HTTP/1.1'),
+                          'test=dash&cursor=abc')
+        self.assertEqual(stream.response.code, '400')
+
+if __name__ == '__main__':
+    unittest.main()
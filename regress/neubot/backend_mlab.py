@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+
+#
+# Copyright (c) 2013
+#     Nexa Center for Internet & Society, Politecnico di Torino (DAUIN)
+#     and Simone Basso <bassosimone@gmail.com>
+#
+# This file is part of Neubot <http://www.neubot.org/>.
+#
+# Neubot is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Neubot is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Neubot.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+''' Regression test for neubot/backend_mlab.py '''
+
+import gzip
+import os
+import pwd
+import shutil
+import sys
+import tempfile
+import unittest
+
+if __name__ == '__main__':
+    sys.path.insert(0, '.')
+
+from neubot.backend import BackendProxy
+from neubot.backend_mlab import BackendMLab
+from neubot.compat import json
+
+def _read(path):
+    ''' Read the results saved in path '''
+    filep = gzip.open(path, 'rb')
+    lines = filep.read().splitlines()
+    filep.close()
+    return [json.loads(line) for line in lines]
+
+class Store(unittest.TestCase):
+
+    ''' Verifies that results are batched and written '''
+
+    processes = 2
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.proxy = BackendProxy()
+        self.proxy.really_init_datadir(pwd.getpwuid(os.getuid()).pw_name,
+                                       self.tmpdir)
+        self.backend = BackendMLab(self.proxy, self.processes)
+        self.backend.start_workers()
+
+    def tearDown(self):
+        self.backend.close()
+        shutil.rmtree(self.tmpdir)
+
+    def _files(self):
+        ''' Return the path of each file below datadir '''
+        paths = []
+        for dirpath, _, filenames in os.walk(self.tmpdir):
+            for filename in filenames:
+                paths.append(os.path.join(dirpath, filename))
+        return sorted(paths)
+
+    def test_batch(self):
+        ''' Make sure results of the same test go in the same file '''
+        for index in range(10):
+            self.backend.speedtest_store({'index': index})
+        self.backend.store_generic('dash', [{'index': 10}])
+        self.assertEqual(self.backend.queue_depth(), 11)
+        self.assertEqual(self._files(), [])
+
+        # Pretend that WINDOW seconds have elapsed
+        self.backend._flush_timeout()
+        self.backend.close()
+        self.assertEqual(self.backend.queue_depth(), 0)
+        self.assertEqual(self.backend.stats['written'], 11)
+
+        paths = dict((path.rsplit('_', 1)[1], path) for path
+                     in self._files())
+        self.assertEqual(sorted(paths.keys()), ['dash.gz', 'speedtest.gz'])
+        self.assertEqual(_read(paths['dash.gz']), [[{'index': 10}]])
+        self.assertEqual(_read(paths['speedtest.gz']), [{'index': index}
+                         for index in range(10)])
+
+    def test_directories(self):
+        ''' Make sure we create directories once, unless they are
+            removed behind our back '''
+        self.backend.speedtest_store({})
+        self.backend.flush()
+        directories = set(self.proxy.directories)
+        self.assertEqual(len(directories), 3)
+        self.backend.close()
+
+        shutil.rmtree(os.path.dirname(self._files()[0]))
+        self.backend.speedtest_store({})
+        self.backend.close()
+        self.assertEqual(self.proxy.directories, directories)
+        self.assertEqual(len(self._files()), 1)
+
+    def test_snap(self):
+        ''' Make sure we export the queue depth '''
+        self.backend.bittorrent_store({})
+        data = {}
+        self.backend.snap(data)
+        self.assertEqual(data['backend_mlab'], {'queue_depth': 1,
+                         'written': 0, 'errors': 0})
+
+class StoreInline(Store):
+
+    ''' Verifies writing without worker processes '''
+
+    processes = 0
+
+if __name__ == '__main__':
+    unittest.main()
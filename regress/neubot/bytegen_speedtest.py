@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+
+#
+# Copyright (c) 2013
+#     Nexa Center for Internet & Society, Politecnico di Torino (DAUIN)
+#     and Simone Basso <bassosimone@gmail.com>
+#
+# This file is part of Neubot <http://www.neubot.org/>.
+#
+# Neubot is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Neubot is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Neubot.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+''' Regression test for neubot/bytegen_speedtest.py '''
+
+import sys
+import unittest
+
+if __name__ == '__main__':
+    sys.path.insert(0, '.')
+
+from neubot.bytegen_speedtest import BytegenSpeedtest
+from neubot.bytegen_speedtest import ChunkCache
+
+from neubot import bytegen_speedtest
+
+class Framing(unittest.TestCase):
+
+    ''' Verifies the chunked-encoding framing '''
+
+    def test_chunks(self):
+        ''' Make sure each chunk is properly framed '''
+        cache = ChunkCache(1000, 4)
+        for _ in range(16):
+            chunk = str(cache.get_chunk())
+            self.assertTrue(chunk.startswith('3e8\r\n'))
+            self.assertTrue(chunk.endswith('\r\n'))
+            self.assertEqual(len(chunk), 5 + 1000 + 2)
+
+    def test_last_chunk(self):
+        ''' Make sure we send the last chunk after the deadline '''
+        bytegen = BytegenSpeedtest(0.0, 1000)
+        self.assertEqual(bytegen.read(), '0\r\n\r\n')
+        self.assertEqual(bytegen.read(), '')
+
+    def test_invalid_count(self):
+        ''' Make sure we refuse to read less than a chunk '''
+        bytegen = BytegenSpeedtest(1.0, 1000)
+        self.assertRaises(RuntimeError, bytegen.read, 999)
+
+class Clock(unittest.TestCase):
+
+    ''' Verifies the amortized clock check '''
+
+    def setUp(self):
+        self.ticks = bytegen_speedtest.utils.ticks
+        self.now = 0.0
+        bytegen_speedtest.utils.ticks = lambda: self.now
+
+    def tearDown(self):
+        bytegen_speedtest.utils.ticks = self.ticks
+
+    def test_skip_reads(self):
+        ''' Make sure we don't read the clock for each chunk '''
+        bytegen = BytegenSpeedtest(1.0, 1000)
+        for _ in range(1000):
+            self.assertNotEqual(bytegen.read(), '0\r\n\r\n')
+
+        # 1000 reads in 0.1 s: don't read the clock for 0.01 s
+        self.now = 0.1
+        bytegen.read()
+        self.assertEqual(bytegen.next_check, 1001 + 100)
+
+        self.now = 2.0
+        for _ in range(99):
+            self.assertNotEqual(bytegen.read(), '0\r\n\r\n')
+        self.assertEqual(bytegen.read(), '0\r\n\r\n')
+
+    def test_early_first_read(self):
+        ''' Make sure a first read right after the constructor does
+            not make us skip the clock for many reads '''
+        bytegen = BytegenSpeedtest(5.0, 1000)
+        self.now = 0.00002
+        reads = 0
+        while bytegen.read() != '0\r\n\r\n':
+            reads += 1
+            self.now += 0.1
+        self.assertTrue(reads <= 51)
+
+    def test_max_skipped(self):
+        ''' Make sure we don't skip too many reads '''
+        bytegen = BytegenSpeedtest(1.0, 1000)
+        for _ in range(100000):
+            bytegen.read()
+        self.now = 0.1
+        bytegen.read()
+        self.assertEqual(bytegen.next_check, 100001 +
+                         bytegen_speedtest.MAX_SKIPPED_READS)
+
+if __name__ == '__main__':
+    unittest.main()
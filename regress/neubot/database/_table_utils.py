@@ -59,5 +59,78 @@ class TestRenameColumn(unittest.TestCase):
         self.assertEqual(query, 'CREATE TABLE Person (id INTEGER PRIMARY '
                                 'KEY, age INTEGER, surname TEXT, name TEXT)')
 
+class TestMakeSelect(unittest.TestCase):
+
+    ''' Regression test for make_select() '''
+
+    def test_limit(self):
+        ''' Make sure limit adds a stable order and an offset '''
+        query = _table_utils.make_select('Person', {'timestamp': 0},
+                                         desc=True, limit=10)
+        self.assertEqual(query, 'SELECT timestamp FROM Person ORDER BY '
+                         'timestamp DESC, id DESC LIMIT :limit OFFSET '
+                         ':offset;')
+
+    def test_no_limit(self):
+        ''' Make sure a negative limit means no limit '''
+        query = _table_utils.make_select('Person', {'timestamp': 0},
+                                         desc=True, limit=-1)
+        self.assertEqual(query, 'SELECT timestamp FROM Person ORDER BY '
+                         'timestamp DESC;')
+
+class TestMakeCreateIndex(unittest.TestCase):
+
+    ''' Regression test for make_create_index() '''
+
+    def test_query(self):
+        ''' Make sure the index is created only if needed '''
+        self.assertEqual(_table_utils.make_create_index('Person',
+                         ('surname', 'name')), 'CREATE INDEX IF NOT EXISTS '
+                         'Person_surname_name_idx ON Person (surname, name);')
+
+    def test_invalid(self):
+        ''' Make sure we refuse invalid or missing columns '''
+        self.assertRaises(ValueError, _table_utils.make_create_index,
+                          'Person', ('name; DROP TABLE Person',))
+        self.assertRaises(ValueError, _table_utils.make_create_index,
+                          'Person', ())
+
+    def test_plan(self):
+        ''' Make sure range queries use the index and do not sort '''
+        template = {'timestamp': 0, 'name': ''}
+        connection = sqlite3.connect(':memory:')
+        connection.execute(_table_utils.make_create_table('Person',
+                                                          template))
+        for query in _table_utils.make_create_indexes('Person',
+                                                      (('timestamp',),)):
+            connection.execute(query)
+            connection.execute(query)
+        query = _table_utils.make_select('Person', template, since=1,
+                                         until=2, desc=True, limit=10)
+        plan = ' '.join(str(row[-1]) for row in connection.execute(
+                        'EXPLAIN QUERY PLAN ' + query, {'since': 1,
+                        'until': 2, 'limit': 10, 'offset': 0}))
+        self.assertTrue('Person_timestamp_idx' in plan)
+        self.assertFalse('TEMP B-TREE' in plan)
+
+class TestIncrementalVacuum(unittest.TestCase):
+
+    ''' Regression test for incremental_vacuum() '''
+
+    def test_pages(self):
+        ''' Make sure we free the requested number of pages '''
+        connection = sqlite3.connect(':memory:')
+        connection.execute('PRAGMA auto_vacuum = INCREMENTAL;')
+        connection.execute('CREATE TABLE blobs (data TEXT);')
+        connection.executemany('INSERT INTO blobs VALUES (?);',
+                               [('x' * 4000,) for _ in range(1024)])
+        connection.execute('DELETE FROM blobs;')
+        connection.commit()
+        before = connection.execute('PRAGMA freelist_count;').fetchone()[0]
+        self.assertTrue(before > 2 * 100)
+        _table_utils.incremental_vacuum(connection, 100)
+        after = connection.execute('PRAGMA freelist_count;').fetchone()[0]
+        self.assertEqual(after, before - 100)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+
+#
+# Copyright (c) 2013
+#     Nexa Center for Internet & Society, Politecnico di Torino (DAUIN)
+#     and Simone Basso <bassosimone@gmail.com>
+#
+# This file is part of Neubot <http://www.neubot.org/>.
+#
+# Neubot is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Neubot is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Neubot.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+'''
+ Benchmark of the indexes of the results tables: time the queries
+ that select a page of results, that walk a time range, and that
+ prune old results, first without and then with the indexes, on a
+ speedtest table with a million rows (or with the number of rows
+ passed on the command line).
+'''
+
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+
+if __name__ == '__main__':
+    sys.path.insert(0, '.')
+
+from neubot.database import table_speedtest
+
+from neubot import utils
+
+# Default number of rows in the table
+ROWS = 1000000
+
+# Rows inserted by each executemany()
+BATCH = 10000
+
+# Number of times we run each query
+REPEAT = 8
+
+def _populate(connection, rows):
+    ''' Fill the speedtest table with rows results, one per minute '''
+    # Not create(), because we want to time the queries without indexes
+    connection.execute(table_speedtest.CREATE_TABLE)
+    for first in range(0, rows, BATCH):
+        records = []
+        for index in range(first, min(first + BATCH, rows)):
+            record = dict(table_speedtest.TEMPLATE)
+            record.update({'timestamp': index * 60,
+                           'uuid': 'uuid-%d' % (index % 64),
+                           'download_speed': float(index)})
+            records.append(record)
+        connection.executemany(table_speedtest.INSERT_INTO, records)
+    connection.commit()
+
+def _time(func):
+    ''' Return the average time it takes to run func '''
+    begin = utils.ticks()
+    for _ in range(REPEAT):
+        func()
+    return (utils.ticks() - begin) / REPEAT
+
+def _run(connection, rows):
+    ''' Run the queries and return their timings '''
+    middle = rows * 30
+    week = 7 * 24 * 60 * 60
+
+    def page():
+        ''' Newest page of the results in a week '''
+        table_speedtest.listify(connection, middle, middle + week, 256)
+
+    def walk():
+        ''' All the results in a week '''
+        table_speedtest.listify(connection, middle, middle + week)
+
+    def prune():
+        ''' Prune the oldest week, then roll back '''
+        table_speedtest.prune(connection, week, False)
+        connection.rollback()
+
+    return [(name, _time(func)) for name, func in (('page', page),
+            ('walk', walk), ('prune', prune))]
+
+def main(args):
+    ''' Run the benchmark '''
+    rows = ROWS
+    if len(args) > 1:
+        rows = int(args[1])
+
+    tmpdir = tempfile.mkdtemp()
+    try:
+        connection = sqlite3.connect(os.path.join(tmpdir, 'bench.sqlite3'))
+        connection.row_factory = sqlite3.Row
+        _populate(connection, rows)
+        before = _run(connection, rows)
+        begin = utils.ticks()
+        table_speedtest.create(connection)
+        indexing = utils.ticks() - begin
+        after = _run(connection, rows)
+        connection.close()
+    finally:
+        shutil.rmtree(tmpdir)
+
+    print('%d rows, indexes created in %.3f s' % (rows, indexing))
+    print('%-8s %12s %12s' % ('query', 'no index', 'index'))
+    for (name, slow), (_, fast) in zip(before, after):
+        print('%-8s %10.3f ms %9.3f ms' % (name, slow * 1000, fast * 1000))
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+
+#
+# Copyright (c) 2013
+#     Nexa Center for Internet & Society, Politecnico di Torino (DAUIN)
+#     and Simone Basso <bassosimone@gmail.com>
+#
+# This file is part of Neubot <http://www.neubot.org/>.
+#
+# Neubot is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Neubot is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Neubot.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+'''
+ Benchmark of database inserts: compare rows per second when we
+ commit each row in the default journal mode, as we did before, and
+ when we batch rows in WAL mode, as DatabaseManager does now.
+'''
+
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+
+if __name__ == '__main__':
+    sys.path.insert(0, '.')
+
+from neubot.database import DatabaseManager
+from neubot.database import table_log
+
+from neubot import database
+from neubot import utils
+
+# Number of rows we insert
+ROWS = 512
+
+def _record(index):
+    ''' Create a log record '''
+    return {'timestamp': index, 'severity': 'INFO',
+            'message': 'benchmark record %d' % index}
+
+def _legacy(path):
+    ''' Commit each row in the default journal mode '''
+    connection = sqlite3.connect(path)
+    table_log.create(connection)
+    begin = utils.ticks()
+    for index in range(ROWS):
+        table_log.insert(connection, _record(index))
+    elapsed = utils.ticks() - begin
+    connection.close()
+    return ROWS / elapsed
+
+def _batched(path):
+    ''' Batch rows in WAL mode '''
+    manager = DatabaseManager()
+    manager.set_path(path)
+    connection = manager.connection()
+    begin = utils.ticks()
+    for index in range(0, ROWS, database.COMMIT_ROWS):
+        records = [_record(index + offset) for offset in
+                   range(database.COMMIT_ROWS)]
+        table_log.insert_many(connection, records, False)
+        manager.commit_later(len(records))
+    manager.commit()
+    elapsed = utils.ticks() - begin
+    manager.close()
+    return ROWS / elapsed
+
+def _single(path):
+    ''' Commit each row in WAL mode '''
+    manager = DatabaseManager()
+    manager.set_path(path)
+    connection = manager.connection()
+    begin = utils.ticks()
+    for index in range(ROWS):
+        table_log.insert(connection, _record(index))
+    elapsed = utils.ticks() - begin
+    manager.close()
+    return ROWS / elapsed
+
+def main():
+    ''' Run the benchmark '''
+    tmpdir = tempfile.mkdtemp()
+    try:
+        for name, func in (('legacy', _legacy), ('wal', _single),
+                           ('wal+batch', _batched)):
+            path = os.path.join(tmpdir, '%s.sqlite3' % name)
+            print('%-10s %10.0f rows/s' % (name, func(path)))
+    finally:
+        shutil.rmtree(tmpdir)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+
+#
+# Copyright (c) 2013
+#     Nexa Center for Internet & Society, Politecnico di Torino (DAUIN)
+#     and Simone Basso <bassosimone@gmail.com>
+#
+# This file is part of Neubot <http://www.neubot.org/>.
+#
+# Neubot is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Neubot is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Neubot.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+''' Regression test for the DatabaseManager of neubot/database '''
+
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+if __name__ == '__main__':
+    sys.path.insert(0, '.')
+
+from neubot.database import DatabaseManager
+from neubot.database import table_config
+from neubot.database import table_speedtest
+
+from neubot import database
+
+class Manager(unittest.TestCase):
+
+    ''' Verifies DatabaseManager '''
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'database.sqlite3')
+        self.manager = DatabaseManager()
+        self.manager.set_path(self.path)
+
+    def tearDown(self):
+        self.manager.close()
+        shutil.rmtree(self.tmpdir)
+
+    def _count(self):
+        ''' Count the committed rows using another connection '''
+        connection = sqlite3.connect(self.path)
+        count = connection.execute('SELECT COUNT(*) FROM speedtest;'
+                                   ).fetchone()[0]
+        connection.close()
+        return count
+
+    def _insert(self):
+        ''' Insert a row without committing '''
+        table_speedtest.insert(self.manager.connection(), {},
+                               commit=False)
+        self.manager.commit_later()
+
+    def test_pragmas(self):
+        ''' Make sure we use WAL and incremental vacuum '''
+        connection = self.manager.connection()
+        self.assertEqual(connection.execute('PRAGMA journal_mode;'
+                                            ).fetchone()[0], 'wal')
+        self.assertEqual(connection.execute('PRAGMA auto_vacuum;'
+                                            ).fetchone()[0], 2)
+
+    def test_convert(self):
+        ''' Make sure an existing database is converted '''
+        connection = sqlite3.connect(self.path)
+        table_speedtest.create(connection)
+        connection.close()
+        self.test_pragmas()
+
+    def test_indexes(self):
+        ''' Make sure old databases are migrated and indexed '''
+        connection = sqlite3.connect(self.path)
+        table_config.create(connection)
+        connection.execute("UPDATE config SET value='4.5' "
+                           "WHERE name='version';")
+        connection.execute('''CREATE TABLE log (id INTEGER PRIMARY KEY,
+                              timestamp INTEGER, severity TEXT,
+                              message TEXT);''')
+        for table in ('speedtest', 'bittorrent', 'raw'):
+            connection.execute('CREATE TABLE %s (id INTEGER PRIMARY KEY, '
+                               'timestamp INTEGER, uuid TEXT);' % table)
+        connection.commit()
+        connection.close()
+
+        connection = self.manager.connection()
+        self.assertEqual(connection.execute("SELECT value FROM config "
+                         "WHERE name='version';").fetchone()[0],
+                         table_config.SCHEMA_VERSION)
+        names = set(row[0] for row in connection.execute(
+                    "SELECT name FROM sqlite_master WHERE type='index';"))
+        for table in ('speedtest', 'bittorrent', 'raw'):
+            self.assertTrue('%s_timestamp_idx' % table in names)
+            self.assertTrue('%s_uuid_idx' % table in names)
+        self.assertTrue('log_timestamp_idx' in names)
+
+    def test_batch(self):
+        ''' Make sure we commit after COMMIT_ROWS rows '''
+        for _ in range(database.COMMIT_ROWS - 1):
+            self._insert()
+        self.assertEqual(self._count(), 0)
+        self._insert()
+        self.assertEqual(self._count(), database.COMMIT_ROWS)
+
+    def test_interval(self):
+        ''' Make sure we commit after COMMIT_INTERVAL seconds '''
+        self._insert()
+        self._insert()
+        self.assertTrue(self.manager.commit_scheduled)
+        self.assertEqual(self._count(), 0)
+        # Pretend that COMMIT_INTERVAL seconds have elapsed
+        self.manager._commit_timeout()
+        self.assertEqual(self._count(), 2)
+        self.assertFalse(self.manager.commit_scheduled)
+
+    def test_close(self):
+        ''' Make sure close() commits '''
+        self._insert()
+        self.manager.close()
+        self.assertEqual(self._count(), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+
+#
+# Copyright (c) 2013
+#     Nexa Center for Internet & Society, Politecnico di Torino (DAUIN)
+#     and Simone Basso <bassosimone@gmail.com>
+#
+# This file is part of Neubot <http://www.neubot.org/>.
+#
+# Neubot is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Neubot is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Neubot.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+''' Regression test for neubot/database/worker.py '''
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+
+if __name__ == '__main__':
+    sys.path.insert(0, '.')
+
+from neubot.database import DatabaseManager
+from neubot.database import table_log
+from neubot.defer import Failure
+from neubot.poller import POLLER
+
+def _record(index):
+    ''' Create a log record '''
+    return {'timestamp': index, 'severity': 'INFO',
+            'message': 'message %d' % index}
+
+def _fail(connection):
+    ''' Operation that fails '''
+    raise RuntimeError('failure')
+
+def _count(connection):
+    ''' Count the log records '''
+    return connection.execute('SELECT COUNT(*) FROM log;').fetchone()[0]
+
+class Worker(unittest.TestCase):
+
+    ''' Verifies the database worker '''
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.manager = DatabaseManager()
+        self.manager.set_path(os.path.join(self.tmpdir, 'database.sqlite3'))
+        self.manager.connect()
+        self.manager.start_worker()
+        self.results = []
+
+    def tearDown(self):
+        self.manager.close()
+        shutil.rmtree(self.tmpdir)
+
+    def _save(self, result):
+        ''' Save result and the thread that saw it '''
+        self.results.append((result, threading.current_thread()))
+
+    def test_submit(self):
+        ''' Make sure operations run and callbacks run in this thread '''
+        self.assertTrue(self.manager.worker)
+        for index in range(10):
+            self.manager.submit(table_log.insert, _record(index), False)
+        self.manager.submit(_count).add_callback(self._save)
+        POLLER.loop()
+        self.assertEqual(self.results, [(10, threading.current_thread())])
+        self.assertEqual(_count(self.manager.connection()), 10)
+        self.assertFalse(self.manager.worker.fileno() in POLLER.readset)
+
+    def test_failure(self):
+        ''' Make sure errors are routed to the errbacks '''
+        deferred = self.manager.submit(_fail)
+        deferred.add_errback(self._save)
+        self.manager.submit(table_log.insert, _record(0), False)
+        POLLER.loop()
+        self.assertTrue(isinstance(self.results[0][0], Failure))
+        self.assertEqual(_count(self.manager.connection()), 1)
+
+    def test_close(self):
+        ''' Make sure close() runs the pending operations '''
+        for index in range(1000):
+            self.manager.submit(table_log.insert, _record(index), False)
+        self.manager.submit(_count).add_callback(self._save)
+        self.manager.close()
+        self.assertEqual(self.results[0][0], 1000)
+
+class NoWorker(unittest.TestCase):
+
+    ''' Verifies submit() without a worker '''
+
+    def test_submit(self):
+        ''' Make sure operations run at once '''
+        manager = DatabaseManager()
+        manager.set_path(':memory:')
+        manager.start_worker()
+        self.assertEqual(manager.worker, None)
+        manager.submit(table_log.insert, _record(0), False)
+        results = []
+        manager.submit(_count).add_callback(results.append)
+        self.assertEqual(results, [])
+        POLLER.loop()
+        self.assertEqual(results, [1])
+        manager.close()
+
+if __name__ == '__main__':
+    unittest.main()
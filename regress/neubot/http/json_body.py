@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+
+#
+# Copyright (c) 2013
+#     Nexa Center for Internet & Society, Politecnico di Torino (DAUIN)
+#     and Simone Basso <bassosimone@gmail.com>
+#
+# This file is part of Neubot <http://www.neubot.org/>.
+#
+# Neubot is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Neubot is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Neubot.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+''' Regression test for neubot/http/json_body.py '''
+
+import sys
+import unittest
+
+if __name__ == '__main__':
+    sys.path.insert(0, '.')
+
+from neubot.compat import json
+from neubot.http.json_body import ChunkedBody
+from neubot.http.json_body import JSONArrayBody
+from neubot.http.message import Message
+
+from neubot.http import json_body
+
+def dechunk(body):
+    ''' Read a chunked body and return the data '''
+    data = []
+    while True:
+        octets = body.read()
+        if not octets:
+            break
+        data.append(octets)
+    data = ''.join(data)
+
+    vector = []
+    while True:
+        header, data = data.split('\r\n', 1)
+        length = int(header, 16)
+        if length == 0:
+            assert data == '\r\n'
+            return ''.join(vector)
+        vector.append(data[:length])
+        assert data[length:length + 2] == '\r\n'
+        data = data[length + 2:]
+
+class Chunked(unittest.TestCase):
+
+    ''' Verifies ChunkedBody '''
+
+    def test_framing(self):
+        ''' Make sure strings are coalesced into chunks '''
+        body = ChunkedBody(['abc', '', 'de', 'f' * 10, 'g'], chunk_size=4)
+        self.assertEqual(body.read(), '5\r\nabcde\r\n')
+        self.assertEqual(body.read(), 'a\r\n' + 'f' * 10 + '\r\n')
+        self.assertEqual(body.read(), '1\r\ng\r\n0\r\n\r\n')
+        self.assertEqual(body.read(), '')
+
+    def test_empty(self):
+        ''' Make sure an empty body is just the last chunk '''
+        body = ChunkedBody([])
+        self.assertEqual(body.read(), '0\r\n\r\n')
+        self.assertEqual(body.read(), '')
+
+    def test_lazy(self):
+        ''' Make sure we pull strings only when we are read '''
+        pulled = []
+        def generate():
+            ''' Generate strings and remember it '''
+            for index in range(100):
+                pulled.append(index)
+                yield 'x' * 10
+        body = ChunkedBody(generate(), chunk_size=100)
+        self.assertEqual(pulled, [])
+        body.read()
+        self.assertEqual(len(pulled), 10)
+
+class JSONArray(unittest.TestCase):
+
+    ''' Verifies JSONArrayBody '''
+
+    def test_same_as_dumps(self):
+        ''' Make sure we emit what json.dumps() emits '''
+        for vector in ([], [1], [{'a': [1, 2]}, 'b', None] * 100):
+            body = JSONArrayBody(iter(vector), chunk_size=64)
+            self.assertEqual(dechunk(body), json.dumps(vector))
+
+    def test_indent(self):
+        ''' Make sure indented output is valid JSON '''
+        vector = [{'b': 1, 'a': [1, 2]}, {}, 'c']
+        body = JSONArrayBody(vector, indent=4, sort_keys=True)
+        data = dechunk(body)
+        self.assertEqual(json.loads(data), vector)
+        self.assertTrue(data.startswith('[\n    {\n        "a": ['))
+        self.assertEqual(dechunk(JSONArrayBody([], indent=4)), '[]')
+
+class Compose(unittest.TestCase):
+
+    ''' Verifies compose() '''
+
+    def test_http11(self):
+        ''' Make sure we use chunked with HTTP/1.1 clients '''
+        body = JSONArrayBody([1, 2])
+        response = Message()
+        json_body.compose(Message(protocol='HTTP/1.1'), response, body,
+                          'application/json')
+        self.assertEqual(response['transfer-encoding'], 'chunked')
+        self.assertTrue(response.body is body)
+
+    def test_http10(self):
+        ''' Make sure we don't use chunked with HTTP/1.0 clients '''
+        response = Message()
+        json_body.compose(Message(protocol='HTTP/1.0'), response,
+                          JSONArrayBody([1, 2]), 'application/json')
+        self.assertEqual(response['transfer-encoding'], '')
+        self.assertEqual(response.body, '[1, 2]')
+        self.assertEqual(response['content-length'], '6')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+
+#
+# Copyright (c) 2013
+#     Nexa Center for Internet & Society, Politecnico di Torino (DAUIN)
+#     and Simone Basso <bassosimone@gmail.com>
+#
+# This file is part of Neubot <http://www.neubot.org/>.
+#
+# Neubot is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Neubot is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Neubot.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+''' Regression test for neubot/http/stream.py '''
+
+import sys
+import unittest
+
+if __name__ == '__main__':
+    sys.path.insert(0, '.')
+
+from neubot.http import stream
+from neubot.http.stream import StreamHTTP
+
+REQUEST = ('GET /dash/download/1000 HTTP/1.1\r\n'
+           'Host: 127.0.0.1:8080\r\n'
+           'Content-Length: 5\r\n'
+           '\r\n'
+           'hello')
+
+CHUNKED = ('HTTP/1.1 200 Ok\r\n'
+           'Transfer-Encoding: chunked\r\n'
+           '\r\n'
+           '3\r\nabc\r\n'
+           '2\r\nde\r\n'
+           '0\r\n'
+           '\r\n')
+
+class ParsingStream(StreamHTTP):
+
+    ''' HTTP stream that records what it parses '''
+
+    def __init__(self):
+        StreamHTTP.__init__(self, None)
+        self.events = []
+        self.chunked = False
+
+    def start_recv(self):
+        ''' Pretend to receive '''
+
+    def got_request_line(self, method, uri, protocol):
+        self.events.append(('request', method, uri, protocol))
+
+    def got_response_line(self, protocol, code, reason):
+        self.events.append(('response', protocol, code, reason))
+
+    def got_header(self, key, value):
+        self.events.append(('header', key, value))
+        if key.lower() == 'content-length':
+            self.length = int(value)
+        elif key.lower() == 'transfer-encoding':
+            self.chunked = True
+
+    def got_end_of_headers(self):
+        self.events.append(('end_of_headers',))
+        if self.chunked:
+            return stream.CHUNK_LENGTH, 0
+        return stream.BOUNDED, self.length
+
+    def got_piece(self, piece):
+        self.events.append(('piece', str(piece)))
+
+    def got_end_of_body(self):
+        self.events.append(('end_of_body',))
+
+def _parse(fragments):
+    ''' Parse fragments and return the events '''
+    parser = ParsingStream()
+    for fragment in fragments:
+        parser.recv_complete(fragment)
+    return parser
+
+def _join_pieces(events):
+    ''' Join consecutive pieces '''
+    result = []
+    for event in events:
+        if event[0] == 'piece' and result and result[-1][0] == 'piece':
+            result[-1] = ('piece', result[-1][1] + event[1])
+        elif event != ('piece', ''):
+            result.append(event)
+    return result
+
+class Parser(unittest.TestCase):
+
+    ''' Verifies the incremental HTTP parser '''
+
+    def test_whole(self):
+        ''' Make sure we parse a request received at once '''
+        parser = _parse([REQUEST])
+        self.assertEqual(parser.events, [
+            ('request', 'GET', '/dash/download/1000', 'HTTP/1.1'),
+            ('header', 'Host', '127.0.0.1:8080'),
+            ('header', 'Content-Length', '5'),
+            ('end_of_headers',),
+            ('piece', 'hello'),
+            ('end_of_body',),
+        ])
+        self.assertEqual(len(parser.incoming), 0)
+
+    def test_byte_by_byte(self):
+        ''' Make sure we parse a request received byte by byte '''
+        self.assertEqual(_join_pieces(_parse(REQUEST).events),
+                         _parse([REQUEST]).events)
+
+    def test_pipelined(self):
+        ''' Make sure we parse pipelined requests at any split '''
+        data = REQUEST * 3
+        expected = _parse([data]).events
+        for index in range(len(data)):
+            parser = _parse([data[:index], data[index:]])
+            self.assertEqual(_join_pieces(parser.events), expected)
+
+    def test_chunked(self):
+        ''' Make sure we parse chunked bodies at any split '''
+        expected = _parse([CHUNKED]).events
+        self.assertEqual(_join_pieces(expected)[-2:], [('piece', 'abcde'),
+                         ('end_of_body',)])
+        for index in range(len(CHUNKED)):
+            parser = _parse([CHUNKED[:index], CHUNKED[index:]])
+            self.assertEqual(_join_pieces(parser.events),
+                             _join_pieces(expected))
+
+    def test_line_too_long(self):
+        ''' Make sure we don't accept lines longer than MAXLINE '''
+        parser = ParsingStream()
+        parser.recv_complete('GET / HTTP/1.1\r\n')
+        parser.recv_complete('A' * (stream.MAXLINE - 1))
+        self.assertRaises(RuntimeError, parser.recv_complete, 'A')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+
+#
+# Copyright (c) 2013
+#     Nexa Center for Internet & Society, Politecnico di Torino (DAUIN)
+#     and Simone Basso <bassosimone@gmail.com>
+#
+# This file is part of Neubot <http://www.neubot.org/>.
+#
+# Neubot is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Neubot is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Neubot.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+'''
+ Benchmark of the HTTP parser: compare requests per second of the
+ incremental parser with the previous implementation, which joined
+ all the fragments each time a line was incomplete.
+'''
+
+import logging
+import sys
+
+if __name__ == '__main__':
+    sys.path.insert(0, '.')
+
+from neubot.http import stream
+from neubot.http.stream import StreamHTTP
+
+from neubot import utils
+
+# A DASH request, with a big Authorization header
+REQUEST = ('GET /dash/download/1000 HTTP/1.1\r\n'
+           'Host: 127.0.0.1:8080\r\n'
+           'Authorization: %s\r\n'
+           'Cache-Control: no-cache\r\n'
+           'Pragma: no-cache\r\n'
+           '\r\n') % ('0' * 4096)
+
+# Number of pipelined requests
+REQUESTS = 400
+
+class CountingStream(StreamHTTP):
+
+    ''' HTTP stream that counts the requests '''
+
+    def __init__(self):
+        StreamHTTP.__init__(self, None)
+        self.requests = 0
+
+    def start_recv(self):
+        ''' Pretend to receive '''
+
+    def got_request_line(self, method, uri, protocol):
+        self.requests += 1
+
+    def got_end_of_headers(self):
+        return stream.FIRSTLINE, 0
+
+class LegacyStream(CountingStream):
+
+    ''' HTTP stream that uses the previous parser '''
+
+    def __init__(self):
+        CountingStream.__init__(self)
+        self.incoming = []
+
+    def recv_complete(self, data):
+        ''' The previous implementation of recv_complete() '''
+        if self.close_complete or self.close_pending:
+            return
+        if self.incoming:
+            self.incoming.append(data)
+            data = "".join(self.incoming)
+            del self.incoming[:]
+        offset = 0
+        length = len(data)
+        while length > 0:
+            if self.left > 0:
+                count = min(self.left, length)
+                piece = buffer(data, offset, count)
+                self.left -= count
+                offset += count
+                length -= count
+                self._got_piece(piece)
+            elif self.left == 0:
+                index = data.find("\n", offset)
+                if index == -1:
+                    if length > stream.MAXLINE:
+                        raise RuntimeError("Line too long")
+                    break
+                index = index + 1
+                line = data[offset:index]
+                length -= (index - offset)
+                offset = index
+                self._got_line(line)
+            else:
+                raise RuntimeError("Left become negative")
+            if self.close_complete or self.close_pending:
+                return
+        if length > 0:
+            remainder = data[offset:]
+            self.incoming.append(remainder)
+            logging.debug("HTTP receiver: remainder %d", len(remainder))
+        self._start_recv_next()
+
+def _run(factory, fragment_size):
+    ''' Feed REQUESTS requests in fragments and return requests/s '''
+    data = REQUEST * REQUESTS
+    fragments = [data[index:index + fragment_size]
+                 for index in range(0, len(data), fragment_size)]
+    parser = factory()
+    begin = utils.ticks()
+    for fragment in fragments:
+        parser.recv_complete(fragment)
+    elapsed = utils.ticks() - begin
+    assert(parser.requests == REQUESTS)
+    return REQUESTS / elapsed
+
+def main():
+    ''' Run the benchmark '''
+    # Measure the parser, not the cost of debug messages
+    logging.disable(logging.DEBUG)
+    for fragment_size in (16, 64, 1460, 65536):
+        legacy = _run(LegacyStream, fragment_size)
+        current = _run(CountingStream, fragment_size)
+        print('fragment %5d bytes: legacy %8.0f req/s, current %8.0f req/s '
+              '(x%.1f)' % (fragment_size, legacy, current, current / legacy))
+
+if __name__ == '__main__':
+    main()
@@ -52,7 +52,7 @@ class FakeStream(object):
 
     def send(self, data, func):
         ''' Emulates stream send() '''
-        self.outs = data
+        self.outs = http_clnt.EMPTY_STRING.join(data)
         # func is ignored
 
     def recv(self, count, func):
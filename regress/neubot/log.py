@@ -22,48 +22,178 @@
 
 ''' Unit test for neubot/log.py '''
 
-#
-# This is the old testing code for the logger...
-# the code below screams for deletion and an unit
-# test would be more than welcome.
-#
 
 import logging
+import sqlite3
 import sys
+import unittest
 
 if __name__ == "__main__":
     sys.path.insert(0, ".")
 
+from neubot.database import DATABASE
+from neubot.database import table_log
 from neubot.log import LOG, oops
+from neubot.log import Logger
+from neubot.notify import NOTIFIER
+
 from neubot import compat
+from neubot import log
 
-if __name__ == "__main__":
+class FakeArgument(object):
+    ''' Argument that counts how many times it is formatted '''
+
+    def __init__(self):
+        self.count = 0
+
+    def __str__(self):
+        self.count += 1
+        return 'argument'
+
+class RateLimit(unittest.TestCase):
+
+    ''' Verifies rate limiting '''
+
+    def setUp(self):
+        self.logger = Logger()
+        self.lines = []
+        self.logger.logger = lambda severity, message: self.lines.append(
+                                               (severity, message))
+
+    def test_burst(self):
+        ''' Make sure we drop messages after RATE_BURST and that we
+            don't format the messages we drop '''
+        argument = FakeArgument()
+        for _ in range(log.RATE_BURST + 10):
+            self.logger.log('WARNING', 'warning %s', (argument,), None)
+        self.assertEqual(len(self.lines), log.RATE_BURST)
+        self.assertEqual(argument.count, log.RATE_BURST)
+        self.assertEqual(self.logger.stats['dropped_rate'], 10)
+
+        # Other templates are not affected
+        self.logger.log('WARNING', 'other warning', (), None)
+        self.assertEqual(self.lines[-1], ('WARNING', 'other warning'))
+
+        # Pretend that RATE_INTERVAL seconds have elapsed
+        self.logger._window -= log.RATE_INTERVAL
+        self.logger.log('WARNING', 'warning %s', (argument,), None)
+        self.assertEqual(self.lines[-2], ('WARNING', 'log: suppressed 10 '
+                         'messages like: warning %s'))
+        self.assertEqual(self.lines[-1], ('WARNING', 'warning argument'))
+
+    def test_access(self):
+        ''' Make sure we don't limit access logs '''
+        for _ in range(log.RATE_BURST + 10):
+            self.logger.log('ACCESS', 'access', (), None)
+        self.assertEqual(len(self.lines), log.RATE_BURST + 10)
+
+    def test_traceback(self):
+        ''' Make sure we split tracebacks into lines '''
+        try:
+            raise RuntimeError('testing exc_info')
+        except RuntimeError:
+            self.logger.log('ERROR', 'exception', (), sys.exc_info())
+        self.assertEqual(self.lines[0], ('ERROR', 'exception'))
+        self.assertEqual(self.lines[-1], ('ERROR', 'RuntimeError: testing '
+                                                   'exc_info'))
+        for line in self.lines:
+            self.assertTrue(line[1] and '\n' not in line[1])
+
+class Ring(unittest.TestCase):
 
-    logging.info("INFO w/ logging.info")
-    logging.debug("DEBUG w/ logging.debug")
-    logging.warning("WARNING w/ logging.warning")
-    logging.error("ERROR w/ logging.error")
+    ''' Verifies the ring and the flusher '''
 
-    print compat.json.dumps(LOG.listify())
+    def setUp(self):
+        self.saved = DATABASE.dbc
+        DATABASE.dbc = sqlite3.connect(':memory:')
+        DATABASE.dbc.row_factory = sqlite3.Row
+        table_log.create(DATABASE.dbc)
+        self.logger = Logger()
+        self.logger.logger = lambda severity, message: None
+        self.logger._use_database = True
 
-    access_logger = logging.getLogger('access')
-    access_logger.info('Test access logger')
+    def tearDown(self):
+        DATABASE.dbc = self.saved
+        NOTIFIER._subscribers.pop('testdone', None)
 
-    try:
-        raise Exception("Testing exc_info")
-    except (KeyboardInterrupt, SystemExit):
-        raise
-    except:
-        logging.error('EXCEPTION', exc_info=1)
+    def _count(self):
+        ''' Count the records in the database '''
+        return DATABASE.dbc.execute('SELECT COUNT(*) FROM log;'
+                                    ).fetchone()[0]
 
-    oops("Testing the new oops feature")
+    def _fill(self, count):
+        ''' Log count distinct messages '''
+        for index in range(count):
+            self.logger.log('INFO', 'message %d' % index, (), None)
 
-    # Testing variadic args
-    logging.warning("WARNING %s", "variadic warning")
+    def test_flush(self):
+        ''' Make sure we write back after FLUSH_RECORDS records '''
+        self._fill(log.FLUSH_RECORDS - 1)
+        self.assertTrue(self.logger._flush_scheduled)
+        self.assertEqual(self._count(), 0)
+        self._fill(1)
+        self.assertEqual(self._count(), log.FLUSH_RECORDS)
+        self.assertEqual(self.logger.stats['flushes'], 1)
 
-    LOG.redirect()
+    def test_timeout(self):
+        ''' Make sure we write back after FLUSH_INTERVAL seconds '''
+        self._fill(2)
+        # Pretend that FLUSH_INTERVAL seconds have elapsed
+        self.logger._flush_timeout()
+        self.assertEqual(self._count(), 2)
+        self.assertEqual(len(self.logger._ring), 0)
 
-    logging.info("INFO w/ logging.info")
-    logging.debug("DEBUG w/ logging.debug")
-    logging.warning("WARNING w/ logging.warning")
-    logging.error("ERROR w/ logging.error")
+    def test_overflow(self):
+        ''' Make sure we drop the oldest records while testing '''
+        NOTIFIER.subscribe('testdone', lambda *args: None)
+        self._fill(log.RING_SIZE + 10)
+        self.logger._flush_timeout()
+        self.assertEqual(self._count(), 0)
+        self.assertEqual(self.logger.stats['dropped_overflow'], 10)
+        self.assertEqual(self.logger._ring[0]['message'], 'message 10')
+
+        debuginfo = {}
+        self.logger.snap(debuginfo)
+        self.assertEqual(debuginfo['log']['pending'], log.RING_SIZE)
+
+class Smoke(unittest.TestCase):
+
+    ''' The old testing code for the logger '''
+
+    def test_old(self):
+        ''' Make sure that logging does not crash '''
+
+        logging.info("INFO w/ logging.info")
+        logging.debug("DEBUG w/ logging.debug")
+        logging.warning("WARNING w/ logging.warning")
+        logging.error("ERROR w/ logging.error")
+
+        compat.json.dumps(LOG.listify())
+
+        access_logger = logging.getLogger('access')
+        access_logger.info('Test access logger')
+
+        try:
+            raise Exception("Testing exc_info")
+        except (KeyboardInterrupt, SystemExit):
+            raise
+        except:
+            logging.error('EXCEPTION', exc_info=1)
+
+        oops("Testing the new oops feature")
+
+        # Testing variadic args
+        logging.warning("WARNING %s", "variadic warning")
+
+        saved = LOG.logger
+        LOG.redirect()
+
+        logging.info("INFO w/ logging.info")
+        logging.debug("DEBUG w/ logging.debug")
+        logging.warning("WARNING w/ logging.warning")
+        logging.error("ERROR w/ logging.error")
+
+        LOG.logger = saved
+
+if __name__ == "__main__":
+    unittest.main()
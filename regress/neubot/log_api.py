@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+
+#
+# Copyright (c) 2013
+#     Nexa Center for Internet & Society, Politecnico di Torino (DAUIN)
+#     and Simone Basso <bassosimone@gmail.com>
+#
+# This file is part of Neubot <http://www.neubot.org/>.
+#
+# Neubot is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Neubot is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Neubot.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+''' Regression test for neubot/log_api.py '''
+
+import collections
+import sqlite3
+import sys
+import unittest
+
+if __name__ == '__main__':
+    sys.path.insert(0, '.')
+
+from neubot.compat import json
+from neubot.database import DATABASE
+from neubot.database import table_log
+from neubot.http.message import Message
+from neubot.log import LOG
+
+from neubot import log_api
+
+from regress.neubot.http.json_body import dechunk
+
+class FakeStream(object):
+    ''' Stream that saves the response '''
+
+    def __init__(self):
+        self.response = None
+
+    def send_response(self, request, response):
+        ''' Save the response '''
+        self.response = response
+
+def _record(index, severity='INFO'):
+    ''' Create a log record '''
+    return {'timestamp': index, 'severity': severity,
+            'message': 'message %d' % index}
+
+class LogAPI(unittest.TestCase):
+
+    ''' Verifies /api/log '''
+
+    def setUp(self):
+        self.saved = DATABASE.dbc, LOG._use_database, LOG._ring
+        DATABASE.dbc = sqlite3.connect(':memory:')
+        DATABASE.dbc.row_factory = sqlite3.Row
+        table_log.create(DATABASE.dbc)
+        for index in range(600):
+            severity = ('INFO', 'DEBUG')[index % 2]
+            table_log.insert(DATABASE.dbc, _record(index, severity), False)
+        LOG._use_database = True
+        LOG._ring = collections.deque([_record(600),
+                                       _record(601, 'WARNING')])
+
+    def tearDown(self):
+        DATABASE.dbc, LOG._use_database, LOG._ring = self.saved
+
+    def _get(self, query):
+        ''' Invoke log_api() and return the body '''
+        stream = FakeStream()
+        log_api.log_api(stream, Message(protocol='HTTP/1.1'), query)
+        self.assertEqual(stream.response['transfer-encoding'], 'chunked')
+        return dechunk(stream.response.body)
+
+    def test_order(self):
+        ''' Make sure we walk the logs in both directions '''
+        logs = json.loads(self._get('verbosity=2'))
+        self.assertEqual([log['timestamp'] for log in logs],
+                         list(range(602)))
+        logs = json.loads(self._get('verbosity=2&reversed=1'))
+        self.assertEqual([log['timestamp'] for log in logs],
+                         list(range(601, -1, -1)))
+
+    def test_verbosity(self):
+        ''' Make sure we filter according to verbosity '''
+        logs = json.loads(self._get('verbosity=1'))
+        self.assertEqual(len(logs), 302)
+        logs = json.loads(self._get('verbosity=0'))
+        self.assertEqual(logs, [_record(601, 'WARNING')])
+
+    def test_debug(self):
+        ''' Make sure the human readable output works '''
+        lines = self._get('verbosity=0&debug=1')
+        self.assertEqual(lines, '601 [WARNING]\tmessage 601\r\n')
+
+    def test_writeback(self):
+        ''' Make sure a writeback while walking does not duplicate logs '''
+        iterator = LOG.iterate(True)
+        self.assertEqual(iterator.next(), _record(601, 'WARNING'))
+        for record in LOG._ring:
+            table_log.insert(DATABASE.dbc, record, False)
+        LOG._ring.clear()
+        timestamps = [log['timestamp'] for log in iterator]
+        self.assertEqual(timestamps, list(range(600, -1, -1)))
+
+if __name__ == '__main__':
+    unittest.main()
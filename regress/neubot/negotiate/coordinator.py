@@ -0,0 +1,233 @@
+#!/usr/bin/env python
+
+#
+# Copyright (c) 2013
+#     Nexa Center for Internet & Society, Politecnico di Torino (DAUIN)
+#     and Simone Basso <bassosimone@gmail.com>
+#
+# This file is part of Neubot <http://www.neubot.org/>.
+#
+# Neubot is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Neubot is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Neubot.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+''' Regression test for neubot/negotiate/coordinator.py '''
+
+import StringIO
+import sys
+import unittest
+
+if __name__ == "__main__":
+    sys.path.insert(0, ".")
+
+from neubot.config import CONFIG
+from neubot.http.message import Message
+from neubot.negotiate.coordinator import NegotiateCoordinator
+from neubot.negotiate.server import NegotiateServer
+from neubot.negotiate.server import NegotiateServerModule
+
+from neubot.compat import json
+
+class FakeChannel(object):
+    ''' Channel that saves the lines it should send '''
+
+    def __init__(self):
+        self.lines = []
+
+    def send_line(self, line):
+        ''' Save line '''
+        self.lines.append(line)
+
+class FakeClient(object):
+    ''' Coordinator client that saves joins and leaves '''
+
+    def __init__(self):
+        self.joined = []
+        self.left = []
+        self.queue_length = 0
+
+    def join(self, stream):
+        ''' Save stream '''
+        self.joined.append(stream)
+
+    def leave(self, stream):
+        ''' Save stream '''
+        self.left.append(stream)
+
+class MinimalHttpStream(object):
+    ''' Minimal HTTP stream '''
+
+    def __init__(self):
+        self.response = None
+        self.opaque = None
+        self.peername = ('abc', 0)
+        self.closed = False
+
+    def send_response(self, request, response):
+        ''' Save the response '''
+        self.response = response
+
+    def close(self):
+        ''' Pretend to close the stream '''
+        self.closed = True
+
+    def atclose(self, func):
+        ''' Pretend to register atclose hook '''
+
+    def unregister_atclose(self, func):
+        ''' Pretend to unregister atclosed hook '''
+
+class Coordinator(unittest.TestCase):
+
+    ''' Verifies the queue kept by the coordinator '''
+
+    def test_join(self):
+        ''' Make sure join appends to the queue '''
+        coordinator = NegotiateCoordinator()
+        channel = FakeChannel()
+        coordinator.join(channel, '1')
+        coordinator.join(channel, '2')
+        self.assertEqual(channel.lines, ['pos 1 0 1', 'pos 2 1 2'])
+
+    def test_leave(self):
+        ''' Make sure leave notifies only the unchoked one '''
+        coordinator = NegotiateCoordinator()
+        first, second = FakeChannel(), FakeChannel()
+        parallelism = CONFIG['negotiate.parallelism']
+        for index in range(parallelism + 2):
+            if index % 2:
+                coordinator.join(second, str(index))
+            else:
+                coordinator.join(first, str(index))
+        first.lines, second.lines = [], []
+
+        # Leaving while choked does not change who is unchoked
+        channels = [first, second]
+        coordinator.leave(channels[(parallelism + 1) % 2],
+                          str(parallelism + 1))
+        self.assertEqual(first.lines + second.lines, [])
+        self.assertEqual(len(coordinator.queue), parallelism + 1)
+
+        coordinator.leave(second, '1')
+        channel = channels[parallelism % 2]
+        self.assertEqual(channel.lines, ['pos %d %d %d' % (parallelism,
+                         parallelism - 1, parallelism)])
+        self.assertEqual(len(first.lines) + len(second.lines), 1)
+
+    def test_length(self):
+        ''' Make sure all workers learn the length of the queue '''
+        coordinator = NegotiateCoordinator()
+        first, second = FakeChannel(), FakeChannel()
+        coordinator.channels.update([first, second])
+        coordinator.join(first, '1')
+        coordinator.join(first, '2')
+        coordinator.leave(first, '1')
+        self.assertEqual(second.lines, ['len 1', 'len 2', 'len 1'])
+        self.assertEqual(first.lines, ['pos 1 0 1', 'len 1',
+                                       'pos 2 1 2', 'len 2', 'len 1'])
+
+    def test_leave_unknown(self):
+        ''' Make sure leave ignores unknown identifiers '''
+        coordinator = NegotiateCoordinator()
+        channel = FakeChannel()
+        coordinator.join(channel, '1')
+        coordinator.leave(channel, '2')
+        coordinator.leave(FakeChannel(), '1')
+        self.assertEqual(len(coordinator.queue), 1)
+
+    def test_red(self):
+        ''' Make sure we drop when the queue is too long '''
+        coordinator = NegotiateCoordinator()
+        channel = FakeChannel()
+        for index in range(CONFIG['negotiate.max_thresh'] * 2):
+            coordinator.join(channel, str(index))
+        self.assertTrue(len(coordinator.queue) <
+                        CONFIG['negotiate.max_thresh'] + 1)
+        self.assertTrue([line for line in channel.lines
+                         if line.startswith('drop ')])
+
+    def test_lost_worker(self):
+        ''' Make sure we forget the streams of a lost worker '''
+        coordinator = NegotiateCoordinator()
+        first, second = FakeChannel(), FakeChannel()
+        parallelism = CONFIG['negotiate.parallelism']
+        coordinator.join(first, '1')
+        coordinator.join(second, '1')
+        for index in range(parallelism):
+            coordinator.join(first, str(index + 2))
+        first.lines = []
+        coordinator._handle_eof(second)
+        self.assertEqual(list(coordinator.queue),
+                         [(first, str(index + 1))
+                          for index in range(parallelism + 1)])
+        self.assertEqual(first.lines, ['pos %d %d %d' % (parallelism,
+                         parallelism - 1, parallelism + 1)])
+
+class ServerWithCoordinator(unittest.TestCase):
+
+    ''' Verifies the negotiate server when it uses a coordinator '''
+
+    def _create(self):
+        ''' Create server and client '''
+        server = NegotiateServer(None)
+        server.register_module('abc', NegotiateServerModule())
+        client = FakeClient()
+        server.attach_coordinator(client)
+        return server, client
+
+    def test_join_delays_response(self):
+        ''' Make sure the first request waits for the coordinator '''
+        server, client = self._create()
+        stream = MinimalHttpStream()
+        request = Message(uri='/negotiate/abc')
+        request.body = StringIO.StringIO('{}')
+        server.process_request(stream, request)
+        self.assertEqual(client.joined, [stream])
+        self.assertEqual(stream.opaque, request)
+        self.assertEqual(stream.response, None)
+
+        server.position_changed(stream, 0)
+        self.assertEqual(stream.opaque, None)
+        body = json.loads(stream.response.body)
+        self.assertEqual(body['queue_pos'], 0)
+        self.assertEqual(body['unchoked'], 1)
+
+        # No pending request, nothing to do
+        stream.response = None
+        server.position_changed(stream, 0)
+        self.assertEqual(stream.response, None)
+
+    def test_dropped(self):
+        ''' Make sure dropped streams are closed '''
+        server, client = self._create()
+        stream = MinimalHttpStream()
+        request = Message(uri='/negotiate/abc')
+        request.body = StringIO.StringIO('{}')
+        server.process_request(stream, request)
+        server.dropped(stream)
+        self.assertTrue(stream.closed)
+        self.assertFalse(stream in server.known)
+
+    def test_update_queue(self):
+        ''' Make sure a lost stream leaves the coordinator queue '''
+        server, client = self._create()
+        stream = MinimalHttpStream()
+        request = Message(uri='/negotiate/abc')
+        request.body = StringIO.StringIO('{}')
+        server.process_request(stream, request)
+        server._update_queue(stream, None)
+        self.assertEqual(client.left, [stream])
+        self.assertFalse(stream in server.known)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+
+#
+# Copyright (c) 2013
+#     Nexa Center for Internet & Society, Politecnico di Torino (DAUIN)
+#     and Simone Basso <bassosimone@gmail.com>
+#
+# This file is part of Neubot <http://www.neubot.org/>.
+#
+# Neubot is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Neubot is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Neubot.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+'''
+ Benchmark of the negotiate queue: 10k clients are queued, each one
+ with a pending comet request, and then some of them leave, either
+ from the head of the queue (i.e., they have taken the test) or from
+ a random position (i.e., they gave up).  Compare the time spent for
+ each departure and the number of responses sent with the previous
+ implementation, which rebuilt the queue and responded to all the
+ clients behind the one that left.
+'''
+
+import collections
+import logging
+import random
+import sys
+
+if __name__ == '__main__':
+    sys.path.insert(0, '.')
+
+from neubot.config import CONFIG
+from neubot.negotiate.server import NegotiateServer
+
+from neubot import utils
+
+# Number of queued clients
+CLIENTS = 10000
+
+# Number of clients that leave the queue
+DEPARTURES = 1000
+
+class Stream(object):
+
+    ''' Queued client '''
+
+    def __init__(self):
+        self.opaque = 'request'
+
+    def close(self):
+        ''' Pretend to close the stream '''
+
+    def atclose(self, func):
+        ''' Pretend to register atclose hook '''
+
+    def unregister_atclose(self, func):
+        ''' Pretend to unregister atclose hook '''
+
+class CountingServer(NegotiateServer):
+
+    ''' Negotiate server that counts the responses '''
+
+    def __init__(self):
+        NegotiateServer.__init__(self, None)
+        self.responses = 0
+
+    def fill(self, streams):
+        ''' Enqueue streams '''
+        for stream in streams:
+            self.queue.append(stream, CONFIG['negotiate.parallelism'])
+            self.known.add(stream)
+
+    def _do_negotiate(self, baton):
+        ''' Count the response; the client sends the next request
+            as soon as it receives the response '''
+        stream, request = baton[0], baton[1]
+        self.responses += 1
+        stream.opaque = request
+
+class LegacyServer(CountingServer):
+
+    ''' Negotiate server that uses the previous queue '''
+
+    def __init__(self):
+        CountingServer.__init__(self)
+        self.queue = collections.deque()
+
+    def fill(self, streams):
+        for stream in streams:
+            self.queue.append(stream)
+            self.known.add(stream)
+
+    def _update_queue(self, lost_stream, ignored):
+        ''' The previous implementation of _update_queue() '''
+        queue, found = collections.deque(), False
+        position = 0
+        for stream in self.queue:
+            if not found:
+                if lost_stream != stream:
+                    position += 1
+                    queue.append(stream)
+                else:
+                    found = True
+                    self.known.remove(stream)
+            elif not stream.opaque:
+                position += 1
+                queue.append(stream)
+            else:
+                request, stream.opaque = stream.opaque, None
+                try:
+                    self._do_negotiate((stream, request, position))
+                    position += 1
+                    queue.append(stream)
+                except (KeyboardInterrupt, SystemExit):
+                    raise
+                except:
+                    logging.error('Exception', exc_info=1)
+                    stream.unregister_atclose(self._update_queue)
+                    self.known.remove(stream)
+                    stream.close()
+        self.queue = queue
+
+def _run(factory, from_head):
+    ''' Run the benchmark and return departures/s and responses '''
+    streams = [Stream() for _ in range(CLIENTS)]
+    server = factory()
+    server.fill(streams)
+
+    # Use the same departures for both servers
+    rnd = random.Random(CLIENTS)
+    departures = []
+    for _ in range(DEPARTURES):
+        if from_head:
+            index = 0
+        else:
+            index = rnd.randrange(len(streams))
+        departures.append(streams.pop(index))
+
+    begin = utils.ticks()
+    for stream in departures:
+        server._update_queue(stream, None)
+    elapsed = utils.ticks() - begin
+    assert(len(server.queue) == CLIENTS - DEPARTURES)
+    return DEPARTURES / elapsed, server.responses
+
+def main():
+    ''' Run the benchmark '''
+    for from_head in (True, False):
+        legacy, legacy_responses = _run(LegacyServer, from_head)
+        current, responses = _run(CountingServer, from_head)
+        print('%d clients, %d leave from %s: legacy %8.0f leave/s '
+              '(%d responses), current %8.0f leave/s (%d responses)' % (
+              CLIENTS, DEPARTURES, ['random', 'head'][from_head], legacy,
+              legacy_responses, current, responses))
+
+if __name__ == '__main__':
+    main()
@@ -32,6 +32,7 @@ from neubot.http.message import Message
 from neubot.negotiate.server import NEGOTIATE_SERVER
 from neubot.negotiate.server import NegotiateServerModule
 from neubot.negotiate.server import NegotiateServer
+from neubot.negotiate.server import NegotiateQueue
 
 from neubot.compat import json
 
@@ -142,7 +143,7 @@ class ProcessRequest(unittest.TestCase):
 
         server = NegotiateServer(None)
         stream = MinimalHttpStream()
-        server.queue.append(stream)
+        server.queue.append(stream, CONFIG['negotiate.parallelism'])
         server.known.add(stream)
 
         request = Message(uri='/negotiate/')
@@ -167,12 +168,12 @@ class ProcessRequest(unittest.TestCase):
             # Should ALWAYS accept
             if len(server.queue) < CONFIG['negotiate.min_thresh']:
                 server.process_request(stream, request)
-                self.assertEquals(server.queue[-1], stream)
+                self.assertTrue(stream in server.queue)
 
             # MAY accept or reject
             elif len(server.queue) < CONFIG['negotiate.max_thresh']:
                 server.process_request(stream, request)
-                if server.queue[-1] == stream:
+                if stream in server.queue:
                     red_accepted += 1
                 else:
                     red_rejected += 1
@@ -180,7 +181,7 @@ class ProcessRequest(unittest.TestCase):
             # MUST reject
             else:
                 server.process_request(stream, request)
-                self.assertNotEqual(server.queue[-1], stream)
+                self.assertFalse(stream in server.queue)
                 red_discarded += 1
                 if red_discarded == 64:
                     break
@@ -276,19 +277,26 @@ class UpdateQueue(unittest.TestCase):
     ''' Verifies the behavior of _update_queue() method
         of NEGOTIATE_SERVER '''
 
-    def test_stream_before(self):
-        ''' Verify what happens to a stream before the lost one '''
-
+    def _create(self, count, pending=True):
+        ''' Create server and queue with count streams '''
         server = NegotiateServerForUpdateQueue(None)
-        for position in range(5):
+        streams = []
+        for position in range(count):
             stream = MinimalHttpStream()
-            server.queue.append(stream)
+            server.queue.append(stream, CONFIG['negotiate.parallelism'])
             server.known.add(stream)
-            server.queue[-1].opaque = position
+            if pending:
+                stream.opaque = position
+            streams.append(stream)
+        return server, streams
 
-        server._update_queue(server.queue[-1], None)
+    def test_stream_before(self):
+        ''' Verify what happens to a stream before the lost one '''
 
-        self.assertEqual(len(server.queue), 4)
+        server, streams = self._create(5)
+        server._update_queue(streams[-1], None)
+
+        self.assertEqual(list(server.queue), streams[:-1])
         for position, stream in enumerate(server.queue):
             self.assertEqual(stream.opaque, position)
             self.assertTrue(stream in server.known)
@@ -296,67 +304,96 @@ class UpdateQueue(unittest.TestCase):
     def test_stream_lost(self):
         ''' Verify what happens to the lost stream '''
 
-        server = NegotiateServerForUpdateQueue(None)
-        for _ in range(5):
-            stream = MinimalHttpStream()
-            server.queue.append(stream)
-            server.known.add(stream)
-
-        lost_stream = server.queue[3]
+        server, streams = self._create(5, False)
+        lost_stream = streams[3]
         server._update_queue(lost_stream, None)
 
         self.assertTrue(lost_stream not in server.queue)
         self.assertTrue(lost_stream not in server.known)
 
-    def test_stream_after__no_send(self):
-        ''' Verify what happens to streams after that don't have to send '''
-
-        server = NegotiateServerForUpdateQueue(None)
-        for _ in range(5):
-            stream = MinimalHttpStream()
-            server.queue.append(stream)
-            server.known.add(stream)
+    def test_stream_after__choked(self):
+        ''' Verify that we don't respond to streams that are still
+            choked after the lost one has left '''
 
-        lost_stream = server.queue[2]
-        server._update_queue(lost_stream, None)
+        parallelism = CONFIG['negotiate.parallelism']
+        server, streams = self._create(parallelism + 3)
+        server._update_queue(streams[parallelism], None)
 
         self.assertEqual(server.negotiated, [])
+        self.assertEqual(len(server.queue), parallelism + 2)
 
     def test_stream_after__send(self):
-        ''' Verify what happens to streams after that has to send '''
+        ''' Verify that we respond to the stream that is unchoked '''
 
-        server = NegotiateServerForUpdateQueue(None)
-        for position in range(5):
-            stream = MinimalHttpStream()
-            server.queue.append(stream)
-            server.known.add(stream)
-            stream.opaque = position
+        parallelism = CONFIG['negotiate.parallelism']
+        server, streams = self._create(parallelism + 3)
+        server._update_queue(streams[2], None)
 
-        lost_stream = server.queue[2]
-        server._update_queue(lost_stream, None)
+        self.assertEqual(server.negotiated, [
+                                             (streams[parallelism],
+                                              parallelism,
+                                              parallelism - 1),
+                                            ])
+
+    def test_stream_after__no_send(self):
+        ''' Verify that we respond later to the stream that is
+            unchoked when it has no pending request '''
+
+        parallelism = CONFIG['negotiate.parallelism']
+        server, streams = self._create(parallelism + 3, False)
+        server.register_module('abc', None)
+        server._update_queue(streams[2], None)
 
+        self.assertEqual(server.negotiated, [])
+        self.assertEqual(server.positions,
+                         {streams[parallelism]: parallelism - 1})
+
+        request = Message(uri='/negotiate/abc')
+        server.process_request(streams[parallelism], request)
         self.assertEqual(server.negotiated, [
-                                             (server.queue[2], 3, 2),
-                                             (server.queue[3], 4, 3),
+                                             (streams[parallelism],
+                                              request,
+                                              parallelism - 1),
                                             ])
+        self.assertEqual(server.positions, {})
 
     def test_stream_after__error(self):
-        ''' Verify what happens when a stream after raises an error '''
-
-        server = NegotiateServerForUpdateQueue(None)
-        for position in range(5):
-            stream = MinimalHttpStream()
-            server.queue.append(stream)
-            server.known.add(stream)
-            stream.opaque = position
+        ''' Verify what happens when the unchoked stream raises '''
 
-        lost_stream = server.queue[2]
-        server.queue[3].generate_error = True
-        server._update_queue(lost_stream, None)
+        parallelism = CONFIG['negotiate.parallelism']
+        server, streams = self._create(parallelism + 3)
+        streams[parallelism].generate_error = True
+        server._update_queue(streams[2], None)
 
+        self.assertTrue(streams[parallelism] not in server.queue)
+        self.assertTrue(streams[parallelism] not in server.known)
         self.assertEqual(server.negotiated, [
-                                             (server.queue[2], 4, 2),
+                                             (streams[parallelism + 1],
+                                              parallelism + 1,
+                                              parallelism - 1),
                                             ])
 
+class Queue(unittest.TestCase):
+
+    ''' Verifies the behavior of NegotiateQueue '''
+
+    def test_unchoke_next(self):
+        ''' Make sure we unchoke the first choked entries only '''
+        queue = NegotiateQueue()
+        for entry in range(5):
+            self.assertEqual(queue.append(entry, 2), entry)
+        self.assertEqual(queue.unchoke_next(2), None)
+        self.assertFalse(queue.remove(3))
+        self.assertEqual(queue.unchoke_next(2), None)
+        self.assertTrue(queue.remove(0))
+        self.assertEqual(queue.unchoke_next(2), (2, 1))
+        self.assertEqual(queue.unchoke_next(2), None)
+        self.assertEqual(queue.unchoke_next(3), (4, 2))
+        self.assertEqual(list(queue), [1, 2, 4])
+
+    def test_remove_unknown(self):
+        ''' Make sure we raise when removing an unknown entry '''
+        self.assertRaises(KeyError, NegotiateQueue().remove, 0)
+
 if __name__ == "__main__":
     unittest.main()
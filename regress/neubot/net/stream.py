@@ -31,6 +31,7 @@ if __name__ == "__main__":
 
 from neubot.config import CONFIG
 from neubot.net import stream
+from neubot.utils_sendfile import SendfileBody
 
 #
 # Provide the bare minimum needed to look
@@ -469,5 +470,77 @@ class TestStreamSend_ReandSendQueue_NotEmpty(unittest.TestCase):
     def set_writable(self, stream):
         pass
 
+#
+# Make sure that in discard mode we receive into the scratch
+# buffer and we pass upstream just the number of bytes.
+#
+class TestStreamRecvDiscard(TestStream_Base):
+    def runTest(self):
+        self.readable = False
+        self.discarded = []
+        self.stream.recv_discarded = self.discarded.append
+        self.stream.recv_complete = lambda octets: self.fail()
+        self.stream.sock.sorecv = lambda maxlen: self.fail()
+        self.stream.sock.sorecv_into = lambda view, maxlen: (
+                                        stream.SUCCESS, maxlen - 1)
+
+        self.stream.start_recv_discard(1 << 20)
+        self.assertEqual(self.stream.recv_discard, stream.MAXBUF)
+        self.assertTrue(self.readable)
+
+        self.stream.handle_read()
+        self.assertFalse(self.readable)
+        self.assertEqual(self.discarded, [stream.MAXBUF - 1])
+        self.assertEqual(self.stream.recv_discard, 0)
+        self.assertEqual(self.stream.bytes_recv_tot, stream.MAXBUF - 1)
+
+    def set_readable(self, stream):
+        self.readable = True
+    def unset_readable(self, stream):
+        self.readable = False
+
+#
+# Make sure that a SendfileBody is not read into strings on
+# plain sockets, and that partial sendfile()s are handled.
+#
+class TestStreamSendfile(TestStream_Base):
+    def runTest(self):
+        if not stream.utils_sendfile.HAVE_SENDFILE:
+            return
+        self.writable = False
+        self.complete = 0
+        self.stream.send_complete = self._send_complete
+        self.stream.sock.sosend = lambda octets: self.fail()
+        counts = [1000, 0]
+        def sosendfile(body):
+            offset, count = body.region()
+            self.assertEqual(offset, 7 + 1500 - len(body))
+            count = min(count, counts.pop(0) or count)
+            return stream.SUCCESS, count
+
+        self.stream.sock.sosendfile = sosendfile
+        body = SendfileBody(StringIO.StringIO(), 7, 1500)
+        body.read = lambda maxlen=None: self.fail()
+        self.stream.start_send(body)
+        self.assertTrue(self.stream.send_octets is body)
+        self.assertTrue(self.writable)
+
+        self.stream.handle_write()
+        self.assertEqual(len(body), 500)
+        self.assertEqual(self.complete, 0)
+
+        self.stream.handle_write()
+        self.assertEqual(len(body), 0)
+        self.assertEqual(self.complete, 1)
+        self.assertFalse(self.writable)
+        self.assertEqual(self.stream.bytes_sent_tot, 1500)
+
+    def _send_complete(self):
+        self.complete += 1
+    def set_writable(self, stream):
+        self.writable = True
+    def unset_writable(self, stream):
+        self.writable = False
+
 if __name__ == "__main__":
     unittest.main()
@@ -30,6 +30,12 @@ if __name__ == '__main__':
 
 from neubot.poller import Poller
 
+def _create_poller():
+    ''' Create a poller that does not need real filenos '''
+    poller = Poller(1)
+    poller.set_multiplexer('select')
+    return poller
+
 class TestCheckTimeoutStream(object):
     ''' Fake stream for TestCheckTimeout '''
 
@@ -37,6 +43,8 @@ class TestCheckTimeoutStream(object):
         '''Initialize fake stream '''
         self._result = result
         self._fileno = fileno
+        self.created = 0
+        self.watchdog = 0
 
     def fileno(self):
         ''' Return file number '''
@@ -65,25 +73,25 @@ class TestCheckTimeout(unittest.TestCase):
 
     def test_readable(self):
         ''' Make sure it runs when there's only readable stuff '''
-        poller = Poller(1)
+        poller = _create_poller()
         result = []
         stream = TestCheckTimeoutStream(result, 1)
-        poller.readset[1] = stream
+        poller.set_readable(stream)
         poller.check_timeout()
         self.assertEqual(result, [1])
 
     def test_writable(self):
         ''' Make sure it runs when there's only writable stuff '''
-        poller = Poller(1)
+        poller = _create_poller()
         result = []
         stream = TestCheckTimeoutStream(result, 1)
-        poller.writeset[1] = stream
+        poller.set_writable(stream)
         poller.check_timeout()
         self.assertEqual(result, [1])
 
     def test_complete(self):
         ''' Make sure it works with both readable and writable streams '''
-        poller = Poller(1)
+        poller = _create_poller()
         result = []
 
         #
@@ -94,9 +102,9 @@ class TestCheckTimeout(unittest.TestCase):
         #
         for i in range(256):
             stream = TestCheckTimeoutStream(result, i)
-            poller.readset[i] = stream
+            poller.set_readable(stream)
             if i > 14 and i < 128:
-                poller.writeset[i] = stream
+                poller.set_writable(stream)
 
         # This should close odd streams only
         poller.check_timeout()
@@ -110,5 +118,61 @@ class TestCheckTimeout(unittest.TestCase):
         # Make sure the writable set is consistent
         self.assertEqual(sorted(poller.writeset), range(16, 128, 2))
 
+        # Make sure we only keep track of the surviving streams
+        self.assertEqual(sorted(stream.fileno() for stream in
+                                poller.watched), range(0, 256, 2))
+        self.assertEqual(poller.watchdog_stats['visited'], 256)
+        self.assertEqual(poller.watchdog_stats['closed'], 128)
+
+    def test_not_expired(self):
+        ''' Make sure we don't visit streams that did not expire '''
+        poller = _create_poller()
+        result = []
+        stream = TestCheckTimeoutStream(result, 1)
+        stream.created = 1e12
+        stream.handle_periodic = None   # Would raise if invoked
+        poller.set_readable(stream)
+        poller.check_timeout()
+        self.assertEqual(result, [])
+        self.assertEqual(poller.watchdog_stats['visited'], 0)
+
+    def test_not_monitored(self):
+        ''' Make sure we forget streams that are not monitored '''
+        poller = _create_poller()
+        result = []
+        stream = TestCheckTimeoutStream(result, 1)
+        poller.set_readable(stream)
+        poller.unset_readable(stream)
+        poller.check_timeout()
+        self.assertEqual(result, [])
+        self.assertEqual(poller.watched, {})
+
+    def test_update_watchdog(self):
+        ''' Make sure update_watchdog() makes the deadline shorter '''
+        poller = _create_poller()
+        result = []
+        stream = TestCheckTimeoutStream(result, 1)
+        stream.watchdog = 1e12
+        poller.set_readable(stream)
+        poller.check_timeout()
+        self.assertEqual(result, [])
+        stream.watchdog = 0
+        poller.update_watchdog(stream)
+        poller.check_timeout()
+        self.assertEqual(result, [1])
+
+    def test_new_fileno(self):
+        ''' Make sure we watch a stream that changes its fileno '''
+        poller = _create_poller()
+        result = []
+        stream = TestCheckTimeoutStream(result, 2)
+        poller.set_writable(stream)
+        poller.unset_writable(stream)
+        stream._fileno = 3
+        poller.set_writable(stream)
+        self.assertEqual(poller.watched[stream].args, 3)
+        poller.check_timeout()
+        self.assertEqual(result, [3])
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+
+#
+# Copyright (c) 2013
+#     Nexa Center for Internet & Society, Politecnico di Torino (DAUIN)
+#     and Simone Basso <bassosimone@gmail.com>
+#
+# This file is part of Neubot <http://www.neubot.org/>.
+#
+# Neubot is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Neubot is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Neubot.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+''' Regression test for neubot/poller_mux.py '''
+
+import socket
+import sys
+import unittest
+
+if __name__ == '__main__':
+    sys.path.insert(0, '.')
+
+from neubot import poller_mux
+
+class MultiplexerMixin(object):
+    ''' Tests shared by all multiplexers '''
+
+    name = None
+
+    def setUp(self):
+        ''' Create a multiplexer and a pair of connected sockets '''
+        self.mux = poller_mux.MULTIPLEXERS[self.name]()
+        self.left, self.right = socket.socketpair()
+
+    def tearDown(self):
+        ''' Release resources '''
+        self.mux.close()
+        self.left.close()
+        self.right.close()
+
+    def test_writable(self):
+        ''' Make sure a fresh socket is writable '''
+        self.mux.update(self.left.fileno(), False, True)
+        self.assertEqual(self.mux.poll(1), ([], [self.left.fileno()]))
+
+    def test_readable(self):
+        ''' Make sure readability is reported '''
+        self.mux.update(self.left.fileno(), True, False)
+        self.assertEqual(self.mux.poll(0), ([], []))
+        self.right.send(b'x')
+        self.assertEqual(self.mux.poll(1), ([self.left.fileno()], []))
+
+    def test_unregister(self):
+        ''' Make sure no events are reported after we lose interest '''
+        self.mux.update(self.left.fileno(), True, True)
+        self.mux.update(self.left.fileno(), False, False)
+        self.right.send(b'x')
+        self.assertEqual(self.mux.poll(0), ([], []))
+
+    def test_stale(self):
+        ''' Make sure we survive closed and reused filenos '''
+        fileno = self.left.fileno()
+        self.mux.update(fileno, False, True)
+        self.left.close()
+        self.mux.update(fileno, False, False)
+        self.left, other = socket.socketpair()
+        try:
+            self.mux.update(self.left.fileno(), False, True)
+            self.assertEqual(self.mux.poll(1), ([], [self.left.fileno()]))
+        finally:
+            other.close()
+
+class SelectMultiplexer(MultiplexerMixin, unittest.TestCase):
+    ''' Test the select() multiplexer '''
+    name = 'select'
+
+if 'poll' in poller_mux.available():
+    class PollMultiplexer(MultiplexerMixin, unittest.TestCase):
+        ''' Test the poll() multiplexer '''
+        name = 'poll'
+
+if 'epoll' in poller_mux.available():
+    class EpollMultiplexer(MultiplexerMixin, unittest.TestCase):
+        ''' Test the epoll() multiplexer '''
+        name = 'epoll'
+
+class Create(unittest.TestCase):
+    ''' Test the create() function '''
+
+    def test_auto(self):
+        ''' Make sure auto picks the best multiplexer '''
+        mux = poller_mux.create()
+        self.assertEqual(mux.name, poller_mux.available()[0])
+        mux.close()
+
+    def test_unknown(self):
+        ''' Make sure we reject unknown multiplexers '''
+        self.assertRaises(ValueError, poller_mux.create, 'kqueue')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+
+#
+# Copyright (c) 2013
+#     Nexa Center for Internet & Society, Politecnico di Torino (DAUIN)
+#     and Simone Basso <bassosimone@gmail.com>
+#
+# This file is part of Neubot <http://www.neubot.org/>.
+#
+# Neubot is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Neubot is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Neubot.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+''' Regression test for neubot/poller_timers.py '''
+
+import sys
+import unittest
+
+if __name__ == '__main__':
+    sys.path.insert(0, '.')
+
+from neubot.poller_timers import PollerTimers
+from neubot import poller_timers
+
+def _drain(timers, now):
+    ''' Return the list of args of the tasks expired at now '''
+    result = []
+    while True:
+        expired = timers.pop_expired(now)
+        if not expired:
+            break
+        result.append(expired[1])
+    return result
+
+class TestPollerTimers(unittest.TestCase):
+    ''' Regression test for PollerTimers '''
+
+    def test_order(self):
+        ''' Make sure tasks are run in deadline and FIFO order '''
+        timers = PollerTimers()
+        timers.schedule(2.0, 0, len, 'c')
+        timers.schedule(1.0, 0, len, 'a')
+        timers.schedule(1.0, 0, len, 'b')
+        self.assertEqual(timers.next_deadline(), 1.0)
+        self.assertEqual(_drain(timers, 1.5), ['a', 'b'])
+        self.assertEqual(_drain(timers, 2.0), ['c'])
+        self.assertEqual(timers.next_deadline(), None)
+
+    def test_cancel(self):
+        ''' Make sure cancelled tasks are not run '''
+        timers = PollerTimers()
+        task = timers.schedule(1.0, 0, len, 'a')
+        timers.schedule(2.0, 0, len, 'b')
+        task.cancel()
+        task.cancel()
+        self.assertFalse(task.pending())
+        self.assertEqual(len(timers), 1)
+        self.assertEqual(timers.next_deadline(), 2.0)
+        self.assertEqual(_drain(timers, 3.0), ['b'])
+
+    def test_cancel_after_run(self):
+        ''' Make sure cancelling a task that already run is a no-op '''
+        timers = PollerTimers()
+        task = timers.schedule(1.0, 0, len, 'a')
+        self.assertEqual(_drain(timers, 1.0), ['a'])
+        task.cancel()
+        self.assertEqual(timers.dead, 0)
+        self.assertEqual(len(timers), 0)
+
+    def test_compact(self):
+        ''' Make sure the heap does not grow with cancelled tasks '''
+        timers = PollerTimers()
+        count = poller_timers.COMPACT_MIN * 10
+        tasks = [timers.schedule(float(i), 0, len, i) for i in range(count)]
+        for task in tasks[:-1]:
+            task.cancel()
+        self.assertEqual(len(timers), 1)
+        self.assertTrue(len(timers.heap) <= poller_timers.COMPACT_MIN + 1)
+        self.assertEqual(_drain(timers, count), [count - 1])
+
+if __name__ == '__main__':
+    unittest.main()
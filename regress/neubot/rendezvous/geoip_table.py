@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+
+#
+# Copyright (c) 2013
+#     Nexa Center for Internet & Society, Politecnico di Torino (DAUIN)
+#     and Simone Basso <bassosimone@gmail.com>
+#
+# This file is part of Neubot <http://www.neubot.org/>.
+#
+# Neubot is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Neubot is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Neubot.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+''' Regression test for neubot/rendezvous/geoip_table.py '''
+
+import sqlite3
+import sys
+import unittest
+
+if __name__ == '__main__':
+    sys.path.insert(0, '.')
+
+from neubot.database import table_geoloc
+from neubot.rendezvous.geoip_table import CountryTable
+from neubot.rendezvous import geoip_table
+
+ROWS = [
+    ['# network,country'],
+    ['130.192.0.0/16', 'IT'],
+    ['130.192.91.0/24', 'fr'],
+    ['130.192.91.211/32', 'DE'],
+    ['8.8.8.0/24', 'US'],
+    ['"1.0.0.0"', ''],
+    ['1.0.0.0', '1.0.0.255', '16777216', '16777471', 'AU', 'Australia'],
+    ['2001:db8::/32', 'NL'],
+    ['2001:db8:1::', '2001:db8:1::ffff', '0', '0', 'BE', 'Belgium'],
+    [],
+]
+
+class Flatten(unittest.TestCase):
+
+    ''' Verifies the flattening of nested ranges '''
+
+    def test_nested(self):
+        ''' Make sure the more specific range wins '''
+        self.assertEqual(geoip_table.flatten([
+                                              (0, 255, 'X'),
+                                              (16, 31, 'Y'),
+                                              (20, 20, 'Z'),
+                                              (300, 400, 'W'),
+                                             ]),
+                         [
+                          (0, 15, 'X'),
+                          (16, 19, 'Y'),
+                          (20, 20, 'Z'),
+                          (21, 31, 'Y'),
+                          (32, 255, 'X'),
+                          (300, 400, 'W'),
+                         ])
+
+    def test_merge(self):
+        ''' Make sure adjacent ranges of a country are merged '''
+        self.assertEqual(geoip_table.flatten([
+                                              (0, 15, 'X'),
+                                              (16, 31, 'X'),
+                                              (0, 31, 'X'),
+                                             ]),
+                         [(0, 31, 'X')])
+
+    def test_network(self):
+        ''' Make sure we parse networks correctly '''
+        self.assertEqual(geoip_table.parse_network('10.0.0.1/8')[1:],
+                         (0x0a000000, 0x0affffff))
+        self.assertEqual(geoip_table.parse_network('::/0')[1:],
+                         (0, (1 << 128) - 1))
+        self.assertRaises(ValueError, geoip_table.parse_network,
+                          '10.0.0.0/33')
+
+class Lookup(unittest.TestCase):
+
+    ''' Verifies the lookup of countries '''
+
+    def setUp(self):
+        self.table = CountryTable()
+        self.table.load(ROWS)
+
+    def test_ipv4(self):
+        ''' Make sure we find the country of IPv4 addresses '''
+        self.assertEqual(self.table.lookup_country('130.192.1.1'), 'IT')
+        self.assertEqual(self.table.lookup_country('130.192.91.1'), 'FR')
+        self.assertEqual(self.table.lookup_country('130.192.91.211'), 'DE')
+        self.assertEqual(self.table.lookup_country('130.192.91.212'), 'FR')
+        self.assertEqual(self.table.lookup_country('130.192.255.255'), 'IT')
+        self.assertEqual(self.table.lookup_country('1.0.0.128'), 'AU')
+        self.assertEqual(self.table.lookup_country('8.8.8.8'), 'US')
+
+    def test_ipv6(self):
+        ''' Make sure we find the country of IPv6 addresses '''
+        self.assertEqual(self.table.lookup_country('2001:db8::1'), 'NL')
+        self.assertEqual(self.table.lookup_country('2001:db8:1::10'), 'BE')
+        self.assertEqual(self.table.lookup_country('2001:db8:1::1:0'), 'NL')
+
+    def test_not_found(self):
+        ''' Make sure we return the empty string when not found '''
+        self.assertEqual(self.table.lookup_country('0.0.0.0'), '')
+        self.assertEqual(self.table.lookup_country('8.8.9.0'), '')
+        self.assertEqual(self.table.lookup_country('255.255.255.255'), '')
+        self.assertEqual(self.table.lookup_country('::1'), '')
+        self.assertEqual(self.table.lookup_country('invalid'), '')
+
+    def test_reload(self):
+        ''' Make sure load() replaces the table '''
+        self.table.load([['10.0.0.0/8', 'IT']])
+        self.assertEqual(self.table.lookup_country('130.192.1.1'), '')
+        self.assertEqual(self.table.lookup_country('10.1.2.3'), 'IT')
+        self.assertEqual(self.table.countries, ['IT'])
+
+class Servers(unittest.TestCase):
+
+    ''' Verifies the country to servers map '''
+
+    def test_load_servers(self):
+        ''' Make sure we load the servers of each country '''
+        connection = sqlite3.connect(':memory:')
+        table_geoloc.create(connection)
+        table_geoloc.insert_server(connection, 'IT', 'a.example.org')
+        table_geoloc.insert_server(connection, 'FR', 'b.example.org')
+        table_geoloc.insert_server(connection, 'IT', 'c.example.org')
+        self.assertEqual(table_geoloc.load_servers(connection), {
+                         'IT': ['a.example.org', 'c.example.org'],
+                         'FR': ['b.example.org'],
+                        })
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+
+#
+# Copyright (c) 2013
+#     Nexa Center for Internet & Society, Politecnico di Torino (DAUIN)
+#     and Simone Basso <bassosimone@gmail.com>
+#
+# This file is part of Neubot <http://www.neubot.org/>.
+#
+# Neubot is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Neubot is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Neubot.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+''' Regression test for neubot/rendezvous/redir_table.py '''
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+if __name__ == '__main__':
+    sys.path.insert(0, '.')
+
+from neubot.database import DATABASE
+from neubot.rendezvous.redir_table import RedirTable
+from neubot.rendezvous.server import ServerRendezvous
+from neubot.rendezvous import redir_table
+
+TABLE = {
+         'IT': ['a.example.org:8080', 'b.example.org:8080'],
+         'SM': ['a.example.org:8080'],
+         'FR': ['c.example.org:8080'],
+        }
+
+class Compile(unittest.TestCase):
+
+    ''' Verifies the compiled representation '''
+
+    def test_roundtrip(self):
+        ''' Make sure we decompile what we compile '''
+        compiled = redir_table.compile_table(TABLE)
+        self.assertEqual(compiled['servers'], ['a.example.org:8080',
+                                               'b.example.org:8080',
+                                               'c.example.org:8080'])
+        self.assertEqual(compiled['countries']['SM'], [0])
+        self.assertEqual(redir_table.decompile_table(compiled), TABLE)
+
+    def test_version(self):
+        ''' Make sure we refuse unknown versions '''
+        compiled = redir_table.compile_table(TABLE)
+        compiled['version'] = 2
+        self.assertRaises(ValueError, redir_table.decompile_table, compiled)
+
+class Reload(unittest.TestCase):
+
+    ''' Verifies the reload of the table '''
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'redir_table.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def _write(self, table):
+        ''' Write table and make sure the file looks changed '''
+        redir_table.write_table(self.path, table)
+        os.utime(self.path, (0, os.stat(self.path).st_mtime + 1))
+
+    def test_reload(self):
+        ''' Make sure we reload the table when the file changes '''
+        table = RedirTable(self.path)
+        self.assertFalse(table.check())
+        self.assertEqual(table.table, None)
+        self._write(TABLE)
+        self.assertEqual(os.listdir(self.tmpdir), ['redir_table.json'])
+        self.assertTrue(table.check())
+        self.assertEqual(table.table, TABLE)
+        self.assertFalse(table.check())
+        self._write({'IT': ['d.example.org']})
+        self.assertTrue(table.check())
+        self.assertEqual(table.table, {'IT': ['d.example.org']})
+        os.unlink(self.path)
+        self.assertTrue(table.check())
+        self.assertEqual(table.table, None)
+
+    def test_broken(self):
+        ''' Make sure we keep the old table if the new one is broken '''
+        table = RedirTable(self.path)
+        self._write(TABLE)
+        table.check()
+        filep = open(self.path, 'w')
+        filep.write('{"version": 1, "servers": [], "countries"')
+        filep.close()
+        os.utime(self.path, (0, os.stat(self.path).st_mtime + 2))
+        self.assertFalse(table.check())
+        self.assertEqual(table.table, TABLE)
+
+    def test_server(self):
+        ''' Make sure the rendezvous server uses the new table '''
+        DATABASE.set_path(':memory:')
+        self._write(TABLE)
+        server = ServerRendezvous(None)
+        server.use_redir_table(self.path)
+        self.assertEqual(server.lookup_servers('FR', 'master'),
+                         ['c.example.org:8080'])
+        self.assertEqual(server.lookup_servers('DE', 'master'), ['master'])
+        self._write({'FR': ['d.example.org:8080']})
+        server.check_tables()
+        self.assertEqual(server.lookup_servers('FR', 'master'),
+                         ['d.example.org:8080'])
+        # Once when loaded and once when reloaded
+        self.assertEqual(server.cache.invalidations, 2)
+
+if __name__ == '__main__':
+    unittest.main()
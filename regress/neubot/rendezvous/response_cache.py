@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+
+#
+# Copyright (c) 2013
+#     Nexa Center for Internet & Society, Politecnico di Torino (DAUIN)
+#     and Simone Basso <bassosimone@gmail.com>
+#
+# This file is part of Neubot <http://www.neubot.org/>.
+#
+# Neubot is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Neubot is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Neubot.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+''' Regression test for neubot/rendezvous/response_cache.py '''
+
+import StringIO
+import sys
+import unittest
+
+if __name__ == '__main__':
+    sys.path.insert(0, '.')
+
+from neubot.compat import json
+from neubot.database import DATABASE
+from neubot.http.message import Message
+from neubot.rendezvous.geoip_table import CountryTable
+from neubot.rendezvous.response_cache import ResponseCache
+from neubot.rendezvous.server import ServerRendezvous
+from neubot.rendezvous import server as rendezvous_server
+
+class LRU(unittest.TestCase):
+
+    ''' Verifies the LRU policy '''
+
+    def test_evict(self):
+        ''' Make sure we evict the least recently used entry '''
+        cache = ResponseCache(2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        self.assertEqual(cache.get('a'), 1)
+        cache.put('c', 3)
+        self.assertEqual(cache.get('b'), None)
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.get('c'), 3)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.evictions, 1)
+
+    def test_stats(self):
+        ''' Make sure we report the hit ratio '''
+        cache = ResponseCache()
+        cache.get('a')
+        cache.put('a', 1)
+        cache.get('a')
+        cache.get('a')
+        cache.get('a')
+        data = {}
+        cache.snap(data)
+        self.assertEqual(data['response_cache']['hit_ratio'], 0.75)
+        cache.clear()
+        self.assertEqual(cache.get('a'), None)
+        self.assertEqual(cache.invalidations, 1)
+
+class _Stream(object):
+    ''' Fake stream that saves the response '''
+
+    def __init__(self, address):
+        self.peername = (address, 54321)
+        self.response = None
+
+    def send_response(self, request, response):
+        ''' Save the response '''
+        self.response = response
+
+def _rendezvous(server, address, version='0.4.15.3', privacy=1):
+    ''' Run a rendezvous and return the decoded response '''
+    request = Message()
+    request.compose(method='GET', pathquery='/rendezvous', host='neubot',
+                    mimetype='application/json', body=json.dumps({
+                     'accept': ['speedtest', 'bittorrent'],
+                     'version': version,
+                     'privacy_informed': privacy,
+                     'privacy_can_collect': privacy,
+                     'privacy_can_share': privacy,
+                    }))
+    request.body = StringIO.StringIO(request.body)
+    stream = _Stream(address)
+    server.process_request(stream, request)
+    return json.loads(stream.response.body)
+
+class Server(unittest.TestCase):
+
+    ''' Verifies the rendezvous server with the cache '''
+
+    def setUp(self):
+        DATABASE.set_path(':memory:')
+        connection = DATABASE.connection()
+        connection.execute('DELETE FROM geoloc;')
+        for address in ('a.example.org', 'b.example.org'):
+            connection.execute('INSERT INTO geoloc VALUES (NULL, ?, ?);',
+                               ('IT', address))
+        table = CountryTable()
+        table.load([['130.192.0.0/16', 'IT'], ['8.8.8.0/24', 'US']])
+        rendezvous_server.GEOLOCATOR.table = table
+        self.server = ServerRendezvous(None)
+        self.server.configure({'rendezvous.server.update_version': '0.4.16.0',
+                               'rendezvous.server.default': 'master'})
+
+    def test_random_choice(self):
+        ''' Make sure we still pick servers at random '''
+        seen = set()
+        for _ in range(64):
+            body = _rendezvous(self.server, '130.192.91.211')
+            seen.add(body['available']['speedtest'][0])
+            self.assertEqual(body['update']['version'], '0.4.16.0')
+        self.assertEqual(seen, set(['http://a.example.org/speedtest',
+                                    'http://b.example.org/speedtest']))
+        self.assertEqual(len(self.server.cache), 1)
+        self.assertEqual(self.server.cache.hits, 63)
+
+    def test_key(self):
+        ''' Make sure the responses depend on the inputs '''
+        body = _rendezvous(self.server, '8.8.8.8')
+        self.assertEqual(body['available']['bittorrent'], ['http://master/'])
+        body = _rendezvous(self.server, '130.192.1.1', privacy=0)
+        self.assertEqual(body['available'], {})
+        body = _rendezvous(self.server, '130.192.1.1', version='0.4.16.0')
+        self.assertEqual(body['update'], {})
+        self.assertEqual(len(self.server.cache), 3)
+
+    def test_invalidate(self):
+        ''' Make sure configure() invalidates the cache '''
+        _rendezvous(self.server, '130.192.1.1')
+        self.server.configure({'rendezvous.server.update_version': '0.4.17.0',
+                               'rendezvous.server.default': 'master'})
+        body = _rendezvous(self.server, '130.192.1.1')
+        self.assertEqual(body['update']['version'], '0.4.17.0')
+        self.assertEqual(self.server.cache.hits, 0)
+
+    def test_geoloc_changed(self):
+        ''' Make sure we notice the changes of the geoloc table '''
+        self.server.check_tables()
+        body = _rendezvous(self.server, '8.8.8.8')
+        self.assertEqual(body['available']['speedtest'],
+                         ['http://master/speedtest'])
+        connection = DATABASE.connection()
+        connection.execute('DELETE FROM geoloc WHERE country = ?;', ('US',))
+        connection.execute('INSERT INTO geoloc VALUES (NULL, ?, ?);',
+                           ('US', 'c.example.org'))
+        connection.commit()
+        invalidations = self.server.cache.invalidations
+        self.server.check_tables()
+        self.assertEqual(self.server.cache.invalidations, invalidations + 1)
+        body = _rendezvous(self.server, '8.8.8.8')
+        self.assertEqual(body['available']['speedtest'],
+                         ['http://c.example.org/speedtest'])
+
+        # Nothing changed, nothing to do
+        self.server.check_tables()
+        self.assertEqual(self.server.cache.invalidations, invalidations + 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,264 @@
+#!/usr/bin/env python
+
+#
+# Copyright (c) 2013
+#     Nexa Center for Internet & Society, Politecnico di Torino (DAUIN)
+#     and Simone Basso <bassosimone@gmail.com>
+#
+# This file is part of Neubot <http://www.neubot.org/>.
+#
+# Neubot is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Neubot is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Neubot.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+''' Regression test for neubot/result_log.py '''
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+if __name__ == '__main__':
+    sys.path.insert(0, '.')
+
+from neubot.backend_neubot import BackendNeubot
+from neubot.result_log import ResultLog
+
+class FakeProxy(object):
+    ''' Backend proxy that touches files below a temporary dir '''
+
+    def __init__(self, datadir):
+        self.datadir = datadir
+
+    def datadir_touch(self, components):
+        ''' Create file below datadir '''
+        path = os.path.join(self.datadir, *components)
+        open(path, 'ab').close()
+        return path
+
+class ResultLogTestCase(unittest.TestCase):
+
+    ''' Creates and removes the temporary datadir '''
+
+    def setUp(self):
+        self.proxy = FakeProxy(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.proxy.datadir)
+
+    def _create(self, **kwargs):
+        ''' Create result log '''
+        return ResultLog(self.proxy.datadir, 'dash',
+                         self.proxy.datadir_touch, **kwargs)
+
+    def _path(self, name):
+        ''' Return path below datadir '''
+        return os.path.join(self.proxy.datadir, name)
+
+class Append(ResultLogTestCase):
+
+    ''' Verifies append and read '''
+
+    def test_roundtrip(self):
+        ''' Make sure we read what we appended '''
+        log = self._create()
+        for index in range(10):
+            log.append({'timestamp': index, 'value': 'x' * index})
+        self.assertEqual(log.list_segments(), [0])
+        results = self._create().read(0)
+        self.assertEqual([result['timestamp'] for result in results],
+                         list(range(10)))
+        self.assertEqual(self._create().read(0, 3, 5), results[3:5])
+        self.assertEqual([entry[0] for entry in log.read_index(0)],
+                         list(range(10)))
+
+    def test_rollover(self):
+        ''' Make sure we switch segment and remove old segments '''
+        log = self._create(segment_records=3, segments_kept=2)
+        for index in range(10):
+            log.append({'timestamp': index})
+        self.assertEqual(log.list_segments(), [2, 3])
+        self.assertFalse(os.path.exists(self._path('dash.log.1')))
+        self.assertFalse(os.path.exists(self._path('dash.log.1.idx')))
+        log = self._create()
+        self.assertEqual(log.list_segments(), [2, 3])
+        self.assertEqual(log.read(2), [{'timestamp': 6}, {'timestamp': 7},
+                                       {'timestamp': 8}])
+        self.assertEqual(log.read(3), [{'timestamp': 9}])
+
+    def test_rollover_bytes(self):
+        ''' Make sure we switch segment when it is too big '''
+        log = self._create(segment_bytes=100)
+        for index in range(3):
+            log.append({'timestamp': index, 'value': 'x' * 100})
+        self.assertEqual(log.list_segments(), [0, 1, 2])
+
+class Query(ResultLogTestCase):
+
+    ''' Verifies range queries '''
+
+    def _fill(self):
+        ''' Create a log with 4 segments of 10 results '''
+        log = self._create(segment_records=10)
+        for index in range(40):
+            log.append({'timestamp': index})
+        return log
+
+    def test_range(self):
+        ''' Make sure we return the results in range, newest first '''
+        results, cursor = self._fill().query(since=5, until=33)
+        self.assertEqual([result['timestamp'] for result in results],
+                         list(range(33, 4, -1)))
+        self.assertEqual(cursor, None)
+
+    def test_pages(self):
+        ''' Make sure we can walk the results one page at a time '''
+        log = self._fill()
+        timestamps, cursor = [], None
+        while True:
+            results, cursor = log.query(since=3, limit=7, cursor=cursor)
+            self.assertTrue(len(results) <= 7)
+            timestamps.extend(result['timestamp'] for result in results)
+            if cursor is None:
+                break
+        self.assertEqual(timestamps, list(range(39, 2, -1)))
+
+    def test_skip_segments(self):
+        ''' Make sure we only read the segments that may match '''
+        log = self._create()
+        self._fill()
+        log.get_bounds(0)
+        read = []
+        read_index = log.read_index
+        log.read_index = lambda number: read.append(number) or \
+                                        read_index(number)
+        results = log.query(since=12, until=14)[0]
+        self.assertEqual(len(results), 3)
+        self.assertEqual(sorted(read), [1, 1, 2, 3])
+        del read[:]
+        log.query(since=12, until=14)
+        self.assertEqual(read, [1])
+
+    def test_stale_cursor(self):
+        ''' Make sure a cursor into a removed segment ends the walk '''
+        self.assertEqual(self._fill().query(cursor=(100, 3)), ([], None))
+
+    def test_bounds_after_append(self):
+        ''' Make sure append keeps the bounds up to date '''
+        log = self._fill()
+        self.assertEqual(log.get_bounds(3), (30, 39))
+        log.append({'timestamp': 1})
+        self.assertEqual(log.get_bounds(4), (1, 1))
+        log.append({'timestamp': 7})
+        self.assertEqual(log.get_bounds(4), (1, 7))
+
+class Recovery(ResultLogTestCase):
+
+    ''' Verifies that we recover from crashes '''
+
+    def test_torn_record(self):
+        ''' Make sure an incomplete record is removed '''
+        log = self._create()
+        log.append({'timestamp': 1})
+        size = os.path.getsize(self._path('dash.log.0'))
+        filep = open(self._path('dash.log.0'), 'ab')
+        filep.write('\0\0\1\0abc')
+        filep.close()
+
+        log = self._create()
+        self.assertEqual(log.read(0), [{'timestamp': 1}])
+        log.append({'timestamp': 2})
+        self.assertEqual(self._create().read(0), [{'timestamp': 1},
+                                                  {'timestamp': 2}])
+        self.assertTrue(os.path.getsize(self._path('dash.log.0')) > size)
+
+    def test_lost_index(self):
+        ''' Make sure the index is rebuilt when it is not in sync '''
+        log = self._create()
+        for index in range(4):
+            log.append({'timestamp': index})
+        filep = open(self._path('dash.log.0.idx'), 'r+b')
+        filep.truncate(20)
+        filep.close()
+        self.assertEqual(len(self._create().read_index(0)), 4)
+        self.assertEqual(os.path.getsize(self._path('dash.log.0.idx')), 64)
+
+class Backend(ResultLogTestCase):
+
+    ''' Verifies the neubot backend '''
+
+    def test_walk(self):
+        ''' Make sure walk_generic() follows the old indexing '''
+        backend = BackendNeubot(self.proxy)
+        for index in range(1025):
+            backend.store_generic('dash', {'timestamp': index})
+        self.assertEqual(backend.walk_generic('dash', None),
+                         [{'timestamp': 1024}])
+        self.assertEqual(len(backend.walk_generic('dash', 0)), 1024)
+        self.assertEqual(backend.walk_generic('dash', 1), [])
+        self.assertEqual(backend.walk_generic('../dash', None), [])
+
+    def test_query(self):
+        ''' Make sure query_generic() pages over segments '''
+        backend = BackendNeubot(self.proxy)
+        for index in range(1030):
+            backend.store_generic('dash', {'timestamp': index})
+        results, cursor = backend.query_generic('dash', limit=10)
+        self.assertEqual([result['timestamp'] for result in results],
+                         list(range(1029, 1019, -1)))
+        self.assertEqual(cursor, '0.1020')
+        results, cursor = backend.query_generic('dash', limit=10,
+                                                cursor=cursor)
+        self.assertEqual([result['timestamp'] for result in results],
+                         list(range(1019, 1009, -1)))
+        self.assertEqual(cursor, '0.1010')
+        self.assertRaises(ValueError, backend.query_generic, 'dash',
+                          cursor='1')
+        self.assertEqual(backend.query_generic('../dash'), ([], None))
+
+    def test_unknown_test(self):
+        ''' Make sure we don't keep a log for unknown tests '''
+        backend = BackendNeubot(self.proxy)
+        for index in range(16):
+            test = 'unknown%d' % index
+            self.assertEqual(backend.walk_generic(test, None), [])
+            self.assertEqual(backend.query_generic(test), ([], None))
+        self.assertEqual(backend.generic, {})
+        self.assertEqual(os.listdir(self.proxy.datadir), [])
+
+    def test_migrate(self):
+        ''' Make sure we move old pickles into the log '''
+        for name, first in (('dash.pickle.1', 0), ('dash.pickle.0', 2),
+                            ('dash.pickle', 4)):
+            filep = open(self._path(name), 'wb')
+            pickle.dump([{'timestamp': first}, {'timestamp': first + 1}],
+                        filep)
+            filep.close()
+        # Left behind by an interrupted migration
+        open(self._path('dash.log.0'), 'wb').write('garbage')
+
+        backend = BackendNeubot(self.proxy)
+        results = backend.walk_generic('dash', None)
+        self.assertEqual([result['timestamp'] for result in results],
+                         list(range(6)))
+        self.assertFalse(os.path.exists(self._path('dash.pickle')))
+        self.assertFalse(os.path.exists(self._path('dash.pickle.0')))
+
+if __name__ == '__main__':
+    unittest.main()
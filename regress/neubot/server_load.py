@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+
+#
+# Copyright (c) 2013
+#     Nexa Center for Internet & Society, Politecnico di Torino (DAUIN)
+#     and Simone Basso <bassosimone@gmail.com>
+#
+# This file is part of Neubot <http://www.neubot.org/>.
+#
+# Neubot is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Neubot is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Neubot.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+''' Regression test for neubot/server_load.py '''
+
+import random
+import sys
+import unittest
+
+if __name__ == '__main__':
+    sys.path.insert(0, '.')
+
+from neubot.rendezvous.load_poller import split_server
+from neubot.runner_hosts import RunnerHosts
+from neubot.server_load import LoadTable
+from neubot.server_load import ServerLoad
+
+from neubot import runner_hosts
+from neubot import server_load
+
+class Report(unittest.TestCase):
+
+    ''' Verifies the load report of a test server '''
+
+    def test_goodput(self):
+        ''' Make sure the goodput is a moving average '''
+        load = ServerLoad()
+        load.add_goodput(1000, 1.0)
+        self.assertEqual(load.goodput, 1000.0)
+        load.add_goodput(2000, 1.0)
+        self.assertEqual(load.goodput, 1250.0)
+        load.add_goodput(2000, 0.0)
+        report = load.marshal(3, 7)
+        self.assertEqual(report['tests'], 2)
+        self.assertEqual(report['queue_len'], 3)
+        self.assertEqual(report['parallelism'], 7)
+
+class Table(unittest.TestCase):
+
+    ''' Verifies the table of loads '''
+
+    def test_load(self):
+        ''' Make sure we compute the load of fresh reports only '''
+        table = LoadTable(max_age=60)
+        table.update('a', {'queue_len': 14, 'parallelism': 7}, now=0)
+        table.update('b', {'queue_len': 3}, now=0)
+        table.mark_down('c', now=0)
+        self.assertEqual(table.load('a', now=10), 2.0)
+        self.assertEqual(table.load('b', now=10), 3.0)
+        self.assertEqual(table.load('c', now=10), server_load.DOWN_LOAD)
+        self.assertEqual(table.load('d', now=10), server_load.UNKNOWN_LOAD)
+        self.assertEqual(table.load('a', now=100), server_load.UNKNOWN_LOAD)
+
+    def test_choose(self):
+        ''' Make sure we pick the cheaper of two candidates '''
+        costs = {'a': 0, 'b': 1, 'c': 2}
+        rand = random.Random(0)
+        picks = [server_load.choose(['a', 'b', 'c'], costs.get, rand)
+                 for _ in range(300)]
+        self.assertEqual(picks.count('c'), 0)
+        self.assertTrue(picks.count('a') > picks.count('b') > 0)
+        self.assertEqual(server_load.choose(['a'], costs.get), 'a')
+
+class Hosts(unittest.TestCase):
+
+    ''' Verifies the selection of static hosts '''
+
+    def test_site(self):
+        ''' Make sure we extract the site of M-Lab hosts '''
+        self.assertEqual(runner_hosts.get_site(
+          'neubot.mlab.mlab1.mil01.measurement-lab.org'), 'mil01')
+        self.assertEqual(runner_hosts.get_site('master.neubot.org'), None)
+
+    def test_avoid_loaded(self):
+        ''' Make sure we avoid the hosts where we were queued '''
+        random.seed(0)
+        hosts = RunnerHosts()
+        for fqdn in runner_hosts.STATIC_TABLE[1:]:
+            hosts.update_load(fqdn, {'queue_len': 10})
+        picks = [hosts.get_random_static_host() for _ in range(500)]
+        # Twice as often as choosing at random among 124 hosts
+        self.assertTrue(picks.count(runner_hosts.STATIC_TABLE[0]) > 4)
+
+    def test_prefer_site(self):
+        ''' Make sure we prefer the hosts of the given site '''
+        random.seed(0)
+        hosts = RunnerHosts()
+        hosts.set_closest_host({
+            'fqdn': 'neubot.mlab.mlab1.mil01.measurement-lab.org'})
+        self.assertEqual(hosts.get_closest_host(),
+                         'neubot.mlab.mlab1.mil01.measurement-lab.org')
+        picks = [hosts.get_closest_host() for _ in range(500)]
+        local = [fqdn for fqdn in picks if '.mil01.' in fqdn]
+        # Twice as often as choosing at random among 124 hosts
+        self.assertTrue(len(local) > 12)
+
+class Poller(unittest.TestCase):
+
+    ''' Verifies the poller of the master server '''
+
+    def test_split_server(self):
+        ''' Make sure we split the servers of the geoloc table '''
+        self.assertEqual(split_server('a.example.org'), ('a.example.org', 80))
+        self.assertEqual(split_server('a.example.org:8080'),
+                         ('a.example.org', 8080))
+        self.assertEqual(split_server('[::1]:8080'), ('::1', 8080))
+        self.assertRaises(ValueError, split_server, 'a.example.org:x')
+
+if __name__ == '__main__':
+    unittest.main()
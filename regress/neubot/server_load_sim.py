@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+
+#
+# Copyright (c) 2013
+#     Nexa Center for Internet & Society, Politecnico di Torino (DAUIN)
+#     and Simone Basso <bassosimone@gmail.com>
+#
+# This file is part of Neubot <http://www.neubot.org/>.
+#
+# Neubot is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Neubot is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Neubot.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+'''
+ Simulator of the server selection policies: clients arrive at random
+ and each one runs a test on the server picked by the policy, waiting
+ in the server's queue when all its test slots are busy.  The loads
+ seen by the policies are refreshed every REPORT_INTERVAL seconds, as
+ when the master polls the test servers.  We print the mean and the
+ 95th percentile of the time spent in the queue for each policy.
+'''
+
+import heapq
+import random
+import sys
+
+if __name__ == '__main__':
+    sys.path.insert(0, '.')
+
+from neubot.server_load import LoadTable
+
+from neubot import server_load
+
+SERVERS = 40
+PARALLELISM = 7             # negotiate.parallelism
+TEST_DURATION = 10.0
+UTILIZATION = 0.85
+REPORT_INTERVAL = 10.0
+DURATION = 3600.0
+
+class Server(object):
+    ''' A simulated test server '''
+
+    def __init__(self, speed):
+        self.speed = speed
+        self.running = 0
+        self.queue = []
+
+    def queue_len(self):
+        ''' Clients queued or running, as /api/load reports it '''
+        return self.running + len(self.queue)
+
+def simulate(policy, seed):
+    ''' Run the simulation and return the sorted waiting times '''
+
+    rand = random.Random(seed)
+
+    # Some servers are slower (e.g. worse connectivity)
+    servers = [Server(1.0 if index % 4 else 0.5) for index in range(SERVERS)]
+    names = list(range(SERVERS))
+    capacity = sum(PARALLELISM * elem.speed / TEST_DURATION
+                   for elem in servers)
+    rate = UTILIZATION * capacity
+
+    table = LoadTable(max_age=DURATION)
+    events = [(0.0, 'report', None), (rand.expovariate(rate), 'arrive', None)]
+    waits = []
+
+    def start(now, server, arrived):
+        ''' Start a test on server '''
+        server.running += 1
+        waits.append(now - arrived)
+        duration = rand.expovariate(1.0 / TEST_DURATION) / server.speed
+        heapq.heappush(events, (now + duration, 'done', server))
+
+    while events:
+        now, kind, server = heapq.heappop(events)
+        if now > DURATION:
+            break
+        if kind == 'report':
+            for name in names:
+                table.update(name, {'queue_len': servers[name].queue_len(),
+                                    'parallelism': PARALLELISM *
+                                                   servers[name].speed},
+                             now=now)
+            heapq.heappush(events, (now + REPORT_INTERVAL, 'report', None))
+        elif kind == 'arrive':
+            server = servers[policy(names, table, now, rand)]
+            if server.running < PARALLELISM:
+                start(now, server, now)
+            else:
+                server.queue.append(now)
+            heapq.heappush(events, (now + rand.expovariate(rate),
+                                    'arrive', None))
+        else:
+            server.running -= 1
+            if server.queue:
+                start(now, server, server.queue.pop(0))
+
+    waits.sort()
+    return waits
+
+def random_policy(names, table, now, rand):
+    ''' What the rendezvous did before '''
+    return rand.choice(names)
+
+def least_loaded_policy(names, table, now, rand):
+    ''' Always pick the least loaded server '''
+    return min(names, key=lambda name: table.load(name, now))
+
+def two_choices_policy(names, table, now, rand):
+    ''' What the rendezvous does now '''
+    return server_load.choose(names, lambda name: table.load(name, now),
+                              rand)
+
+def main(args):
+    ''' Run the simulator '''
+    seed = 1
+    if len(args) > 1:
+        seed = int(args[1])
+    print('%d servers, utilization %.2f, loads refreshed every %d s' % (
+          SERVERS, UTILIZATION, REPORT_INTERVAL))
+    print('%-14s %12s %12s' % ('policy', 'mean wait', 'p95 wait'))
+    for name, policy in (('random', random_policy),
+                         ('least-loaded', least_loaded_policy),
+                         ('two-choices', two_choices_policy)):
+        waits = simulate(policy, seed)
+        print('%-14s %10.2f s %10.2f s' % (name, sum(waits) / len(waits),
+              waits[int(len(waits) * 0.95)]))
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,232 @@
+#!/usr/bin/env python
+
+#
+# Copyright (c) 2013
+#     Nexa Center for Internet & Society, Politecnico di Torino (DAUIN)
+#     and Simone Basso <bassosimone@gmail.com>
+#
+# This file is part of Neubot <http://www.neubot.org/>.
+#
+# Neubot is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Neubot is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Neubot.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+''' Regression test for neubot/stream.py '''
+
+# Python3-ready: yes
+
+import socket
+import sys
+import unittest
+
+if __name__ == '__main__':
+    sys.path.insert(0, '.')
+
+from neubot.pollable import SUCCESS
+from neubot.pollable import WANT_WRITE
+from neubot.poller import POLLER
+from neubot.stream import Stream
+
+from neubot import recvbuf
+from neubot import six
+from neubot import stream as stream_module
+
+class FakeWrapper(object):
+    ''' Socket wrapper that sends as much as we say '''
+
+    def __init__(self, counts):
+        self.counts = counts
+        self.sent = []
+
+    def sosendv(self, buffers):
+        ''' Pretend to send buffers '''
+        count = self.counts.pop(0)
+        if count == 0:
+            return WANT_WRITE, 0
+        data = stream_module.EMPTY_STRING.join([bytes(octets)
+                                                for octets in buffers])
+        self.sent.append(data[:count])
+        return SUCCESS, count
+
+    def close(self):
+        ''' Pretend to close the socket '''
+
+def _create_stream():
+    ''' Create a stream connected over the loopback '''
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.bind(('127.0.0.1', 0))
+    listener.listen(1)
+    client = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    client.connect(listener.getsockname())
+    server = listener.accept()[0]
+    listener.close()
+    nothing = lambda stream: None
+    stream = Stream(client, nothing, nothing, None, None, None)
+    return stream, server
+
+class Coalesce(unittest.TestCase):
+
+    ''' Verifies writev() emulation '''
+
+    def test_small(self):
+        ''' Make sure small buffers are joined '''
+        self.assertEqual(stream_module.coalesce([six.b('a'), six.b('bc'),
+                         six.b('d')]), six.b('abcd'))
+
+    def test_large_first(self):
+        ''' Make sure a large first buffer is not copied '''
+        first = six.b('A') * stream_module.COALESCE_MAX
+        self.assertTrue(stream_module.coalesce([first, six.b('B')]) is first)
+
+    def test_bounded(self):
+        ''' Make sure we copy at most COALESCE_MAX bytes '''
+        maxlen = stream_module.COALESCE_MAX
+        buffers = [six.b('A') * 10, six.b('B') * (2 * maxlen)]
+        result = stream_module.coalesce(buffers)
+        self.assertEqual(len(result), maxlen)
+        self.assertEqual(result[:11], six.b('A') * 10 + six.b('B'))
+
+class SendQueue(unittest.TestCase):
+
+    ''' Verifies the scatter-gather send path '''
+
+    def setUp(self):
+        self.stream, self.peer = _create_stream()
+        self.complete = []
+
+    def tearDown(self):
+        self.stream.close()
+        self.peer.close()
+
+    def _send_complete(self, stream):
+        ''' Invoked when send is complete '''
+        self.complete.append(stream)
+
+    def test_partial(self):
+        ''' Make sure partial writes advance through the queue '''
+        self.stream.sock = FakeWrapper([2, 0, 3, 4])
+        self.stream.send([six.b('abc'), six.b(''), six.b('def'),
+                          six.b('ghi')], self._send_complete)
+        self.assertTrue(self.stream.fileno() in POLLER.writeset)
+
+        for _ in range(3):
+            self.stream.handle_write()
+            self.assertEqual(self.complete, [])
+        self.assertEqual(self.stream.sock.sent, [six.b('ab'), six.b('cde')])
+
+        self.stream.handle_write()
+        self.assertEqual(self.stream.sock.sent[-1], six.b('fghi'))
+        self.assertEqual(self.complete, [self.stream])
+        self.assertEqual(self.stream.bytes_out, 9)
+        self.assertFalse(self.stream.fileno() in POLLER.writeset)
+
+    def test_already_sending(self):
+        ''' Make sure we cannot send while the queue is not empty '''
+        self.stream.send([six.b('abc')], self._send_complete)
+        self.assertRaises(RuntimeError, self.stream.send, six.b('abc'),
+                          self._send_complete)
+
+    def test_nothing_to_send(self):
+        ''' Make sure we refuse to send an empty list '''
+        self.assertRaises(RuntimeError, self.stream.send, [six.b('')],
+                          self._send_complete)
+
+    def test_real_socket(self):
+        ''' Make sure the data reaches the other end '''
+        self.stream.send([six.b('abc'), six.b('d') * 100000],
+                         self._send_complete)
+        data = []
+        while not self.complete:
+            self.stream.handle_write()
+            data.append(self.peer.recv(262144))
+        while sum(len(octets) for octets in data) < 100003:
+            data.append(self.peer.recv(262144))
+        self.assertEqual(six.b('').join(data),
+                         six.b('abc') + six.b('d') * 100000)
+
+class RecvModes(unittest.TestCase):
+
+    ''' Verifies the recv_into() receive modes '''
+
+    def setUp(self):
+        self.stream, self.peer = _create_stream()
+        self.received = []
+
+    def tearDown(self):
+        self.stream.close()
+        self.peer.close()
+
+    def _recv_complete(self, stream, data):
+        ''' Invoked when recv is complete '''
+        self.received.append(data)
+
+    def _recv(self, mode, data):
+        ''' Receive data using mode '''
+        self.peer.sendall(data)
+        self.stream.recv(len(data), self._recv_complete, mode)
+        while not self.received:
+            self.stream.handle_read()
+        return self.received.pop()
+
+    def test_ring(self):
+        ''' Make sure ring mode returns views of the ring '''
+        ring_reads = self.stream.recv_stats['ring_reads']
+        first = self._recv(stream_module.RECV_RING, six.b('abc'))
+        second = self._recv(stream_module.RECV_RING, six.b('def'))
+        self.assertEqual(bytes(first), six.b('abc'))
+        self.assertEqual(bytes(second), six.b('def'))
+        self.assertEqual(self.stream.recv_ring.offset, 6)
+        self.assertEqual(self.stream.recv_stats['ring_reads'],
+                         ring_reads + 2)
+
+    def test_discard(self):
+        ''' Make sure discard mode returns the count '''
+        discarded = self.stream.recv_stats['discarded_bytes']
+        self.assertEqual(self._recv(stream_module.RECV_DISCARD,
+                                    six.b('abcd')), 4)
+        self.assertEqual(self.stream.recv_stats['discarded_bytes'],
+                         discarded + 4)
+        self.assertEqual(self.stream.bytes_in, 4)
+
+    def test_alloc(self):
+        ''' Make sure the default mode still returns strings '''
+        self.assertEqual(self._recv(stream_module.RECV_ALLOC,
+                                    six.b('abcd')), six.b('abcd'))
+
+class RingBuffer(unittest.TestCase):
+
+    ''' Verifies the ring buffer '''
+
+    def test_wrap(self):
+        ''' Make sure the ring wraps and previous views are valid '''
+        ring = recvbuf.RingBuffer(16)
+        ring.reserve(4)[:3] = six.b('abc')
+        first = ring.commit(3)
+        ring.reserve(4)[:4] = six.b('defg')
+        ring.commit(4)
+        ring.reserve(4)
+        ring.commit(4)
+        ring.reserve(4)
+        self.assertEqual(ring.offset, 11)
+        ring.commit(4)
+        ring.reserve(4)
+        self.assertEqual(ring.offset, 0)
+        self.assertEqual(bytes(first), six.b('abc'))
+
+    def test_too_large(self):
+        ''' Make sure we cannot reserve more than one slot '''
+        ring = recvbuf.RingBuffer(16)
+        self.assertRaises(RuntimeError, ring.reserve, 5)
+
+if __name__ == '__main__':
+    unittest.main()
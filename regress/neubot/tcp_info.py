@@ -0,0 +1,198 @@
+#!/usr/bin/env python
+
+#
+# Copyright (c) 2013
+#     Nexa Center for Internet & Society, Politecnico di Torino (DAUIN)
+#     and Simone Basso <bassosimone@gmail.com>
+#
+# This file is part of Neubot <http://www.neubot.org/>.
+#
+# Neubot is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Neubot is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Neubot.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+''' Regression test for neubot/tcp_info.py '''
+
+import socket
+import sys
+import time
+import unittest
+
+if __name__ == '__main__':
+    sys.path.insert(0, '.')
+
+from neubot.tcp_info import TCPInfoSampler
+
+from neubot import tcp_info
+
+class _Wrapper(object):
+    ''' Fake wrapper of a socket '''
+
+    def __init__(self, sock):
+        self.sock = sock
+
+class _Stream(object):
+    ''' Fake stream, the socket is at stream.sock.sock '''
+
+    def __init__(self, sock):
+        self.sock = _Wrapper(sock)
+
+def _connect():
+    ''' Return a pair of connected TCP sockets '''
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.bind(('127.0.0.1', 0))
+    listener.listen(1)
+    client = socket.create_connection(listener.getsockname())
+    server = listener.accept()[0]
+    listener.close()
+    return client, server
+
+class Layout(unittest.TestCase):
+
+    ''' Verifies the precompiled decoder '''
+
+    def test_sizes(self):
+        ''' Make sure the layout matches the kernel structure '''
+        self.assertEqual(tcp_info.get_layout(104).struct.size, 104)
+        self.assertEqual(tcp_info.get_layout(168).struct.size, 168)
+        self.assertEqual(tcp_info.get_layout(256).struct.size, 168)
+
+    def test_names(self):
+        ''' Make sure we only decode the fields that we keep '''
+        names = tcp_info.get_layout(104).names
+        self.assertEqual(names[0], 'state')
+        self.assertEqual(names[-1], 'total_retrans')
+        self.assertFalse('pacing_rate' in names)
+        names = tcp_info.get_layout(168).names
+        self.assertEqual(names, tcp_info.KEEP)
+
+    def test_cache(self):
+        ''' Make sure layouts are compiled once '''
+        self.assertTrue(tcp_info.get_layout(104) is
+                        tcp_info.get_layout(104))
+
+class Series(unittest.TestCase):
+
+    ''' Verifies the time series of a connection '''
+
+    def setUp(self):
+        self.client, self.server = _connect()
+
+    def tearDown(self):
+        self.client.close()
+        self.server.close()
+
+    def test_sample(self):
+        ''' Make sure samples are decoded and marshalled '''
+        if not tcp_info.HAVE_TCP_INFO:
+            return
+        series = tcp_info.Series(self.server)
+        self.assertTrue(series.sample(1.0))
+        self.server.sendall(b'x' * 1000)
+        self.assertTrue(series.sample(2.0))
+        result = series.marshal()
+        self.assertEqual(result['fields'][0], 'ticks')
+        self.assertEqual(len(result['samples']), 2)
+        self.assertEqual([sample[0] for sample in result['samples']],
+                         [1.0, 2.0])
+        state = result['fields'].index('state')
+        self.assertEqual(result['samples'][0][state], 1)  # ESTABLISHED
+        for sample in result['samples']:
+            self.assertEqual(len(sample), len(result['fields']))
+
+    def test_max_samples(self):
+        ''' Make sure we stop storing after MAX_SAMPLES '''
+        if not tcp_info.HAVE_TCP_INFO:
+            return
+        series = tcp_info.Series(self.server)
+        for ticks in range(tcp_info.MAX_SAMPLES + 10):
+            self.assertTrue(series.sample(ticks))
+        self.assertEqual(len(series.marshal()['samples']),
+                         tcp_info.MAX_SAMPLES)
+
+    def test_closed(self):
+        ''' Make sure we stop sampling a closed socket '''
+        if not tcp_info.HAVE_TCP_INFO:
+            return
+        series = tcp_info.Series(self.server)
+        self.server.close()
+        self.assertFalse(series.sample(1.0))
+        self.assertEqual(series.marshal(), {'fields': [], 'samples': []})
+
+class Sampler(unittest.TestCase):
+
+    ''' Verifies the sampler '''
+
+    def setUp(self):
+        self.client, self.server = _connect()
+        self.sampler = TCPInfoSampler()
+
+    def tearDown(self):
+        self.client.close()
+        self.server.close()
+        if self.sampler.task:
+            self.sampler.task.cancel()
+
+    def test_collect(self):
+        ''' Make sure we collect the samples of each connection '''
+        if not tcp_info.HAVE_TCP_INFO:
+            return
+        self.sampler.watch('abc', _Stream(self.server))
+        self.sampler.watch('abc', _Stream(self.server))
+        self.sampler.watch('abc', _Stream(self.client))
+        self.assertTrue(self.sampler.task is not None)
+        self.sampler._sample()
+        result = self.sampler.collect('abc')
+        self.assertEqual(len(result), 2)
+        # Initial sample, periodic sample and final sample
+        self.assertEqual(len(result[0]['samples']), 3)
+        self.assertEqual(self.sampler.collect('abc'), [])
+
+    def test_discard(self):
+        ''' Make sure we can discard the samples '''
+        if not tcp_info.HAVE_TCP_INFO:
+            return
+        self.sampler.watch('abc', _Stream(self.server))
+        self.sampler.discard('abc')
+        self.assertEqual(self.sampler.series, {})
+        self.sampler._sample()
+        self.assertTrue(self.sampler.task is None)
+
+    def test_stale(self):
+        ''' Make sure we forget the samples nobody collects '''
+        if not tcp_info.HAVE_TCP_INFO:
+            return
+        self.sampler.stale = 0
+        self.sampler.watch('abc', _Stream(self.server))
+        self.sampler._sample()
+        self.assertTrue('abc' in self.sampler.series)
+        self.server.close()
+        self.sampler._sample()
+        self.assertTrue('abc' in self.sampler.series)
+        self.assertTrue(self.sampler.task is not None)
+        time.sleep(0.01)
+        self.sampler._sample()
+        self.assertEqual(self.sampler.series, {})
+        self.assertEqual(self.sampler.idle, {})
+        self.assertTrue(self.sampler.task is None)
+
+    def test_disabled(self):
+        ''' Make sure we don't sample when the interval is zero '''
+        self.sampler.interval = 0
+        self.sampler.watch('abc', _Stream(self.server))
+        self.assertEqual(self.sampler.series, {})
+        self.assertEqual(self.sampler.collect('abc'), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -23,14 +23,18 @@
 ''' Unit test for neubot/utils_random.py '''
 
 import sys
+import tempfile
+import zlib
 
 sys.path.insert(0, '.')
 
 from neubot import utils
 
 BEFORE = utils.ticks()
+from neubot.utils_random import PayloadPool
 from neubot.utils_random import RANDOMBLOCKS
 from neubot.utils_random import RandomBody
+from neubot.utils_random import RandomFileBody
 ELAPSED = utils.ticks() - BEFORE
 print('Time to import: %s' % (utils.time_formatter(ELAPSED)))
 
@@ -40,6 +44,20 @@ def main():
 
     assert(len(RANDOMBLOCKS.get_block()) == RANDOMBLOCKS.blocksiz)
     assert(RANDOMBLOCKS.get_block() != RANDOMBLOCKS.get_block())
+    assert(len(RANDOMBLOCKS.get_block(1234)) == 1234)
+
+    # The payload must not be compressible
+    block = str(RANDOMBLOCKS.get_block())
+    assert(len(zlib.compress(block)) >= len(block))
+
+    # Map the payload from an existing file
+    filep = tempfile.NamedTemporaryFile()
+    filep.write('ABCD' * RANDOMBLOCKS.blocksiz)
+    filep.flush()
+    pool = PayloadPool(filep.name)
+    assert(pool.size == 4 * RANDOMBLOCKS.blocksiz)
+    block = pool.view(RANDOMBLOCKS.blocksiz)
+    assert(str(block) in 'ABCD' * (RANDOMBLOCKS.blocksiz / 4 + 1))
 
     filep, total = RandomBody(RANDOMBLOCKS.blocksiz + 789), 0
     while True:
@@ -55,6 +73,26 @@ def main():
     assert(len(filep.read()) == 789)
     filep.seek(7)
 
+    filep = RandomFileBody(2 * RANDOMBLOCKS.blocksiz)
+    payload = filep.payload
+    start = filep.start
+    assert(filep.tell() == 0)
+    assert(len(filep) == 2 * RANDOMBLOCKS.blocksiz)
+    offset, count = filep.region()
+    assert(offset == start)
+    assert(count == min(len(filep), payload.size - start))
+
+    filep = RandomFileBody(payload.size + 789)
+    vector = []
+    while True:
+        block = filep.read(65536)
+        if not block:
+            break
+        vector.append(block)
+    data = ''.join(vector)
+    start = filep.start
+    assert(data == (payload.mmap[:] * 2)[start:start + payload.size + 789])
+
     begin, total = utils.ticks(), 0
     while total < 1073741824:
         total += len(RANDOMBLOCKS.get_block())
@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+
+#
+# Copyright (c) 2013
+#     Nexa Center for Internet & Society, Politecnico di Torino (DAUIN)
+#     and Simone Basso <bassosimone@gmail.com>
+#
+# This file is part of Neubot <http://www.neubot.org/>.
+#
+# Neubot is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Neubot is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Neubot.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+''' Regression test for neubot/utils_sendfile.py '''
+
+import os
+import socket
+import sys
+import tempfile
+import unittest
+
+if __name__ == '__main__':
+    sys.path.insert(0, '.')
+
+from neubot.http.message import Message
+
+from neubot import six
+from neubot import utils_sendfile
+
+def _create_file(data):
+    ''' Create a temporary file containing data '''
+    filep = tempfile.TemporaryFile()
+    filep.write(data)
+    filep.flush()
+    return filep
+
+class SendfileBody(unittest.TestCase):
+
+    ''' Verifies the file-like interface of SendfileBody '''
+
+    def test_read(self):
+        ''' Make sure we read only the region '''
+        body = utils_sendfile.SendfileBody(_create_file(six.b('0123456789')),
+                                           2, 5)
+        self.assertEqual(body.read(3), six.b('234'))
+        self.assertEqual(body.tell(), 3)
+        self.assertEqual(len(body), 2)
+        self.assertEqual(body.read(), six.b('56'))
+        self.assertEqual(body.read(), six.b(''))
+        self.assertFalse(body)
+
+    def test_whole_file(self):
+        ''' Make sure the default region is the whole file '''
+        body = utils_sendfile.SendfileBody(_create_file(six.b('0123456789')))
+        self.assertEqual(body.region(), (0, 10))
+
+    def test_seek(self):
+        ''' Make sure seek is bounded by the region '''
+        body = utils_sendfile.SendfileBody(_create_file(six.b('0123456789')),
+                                           2, 5)
+        body.seek(0, os.SEEK_END)
+        self.assertEqual(body.tell(), 5)
+        body.seek(-2, os.SEEK_CUR)
+        self.assertEqual(body.read(), six.b('56'))
+        body.seek(100)
+        self.assertEqual(body.tell(), 5)
+        body.seek(0)
+        self.assertEqual(body.region(), (2, 5))
+
+    def test_compose(self):
+        ''' Make sure compose() uses the length of the region '''
+        body = utils_sendfile.SendfileBody(_create_file(six.b('0123456789')),
+                                           2, 5)
+        message = Message()
+        message.compose(code='200', reason='Ok', body=body)
+        self.assertEqual(message['content-length'], '5')
+        self.assertTrue(message.body is body)
+
+class Sendfile(unittest.TestCase):
+
+    ''' Verifies sendfile() '''
+
+    def test_socket(self):
+        ''' Make sure the region reaches the other end '''
+        if not utils_sendfile.HAVE_SENDFILE:
+            return
+        filep = _create_file(six.b('0123456789'))
+        left, right = socket.socketpair()
+        count = utils_sendfile.sendfile(left.fileno(), filep.fileno(), 3, 4)
+        self.assertEqual(count, 4)
+        self.assertEqual(right.recv(16), six.b('3456'))
+        # The offset of the file is not changed
+        self.assertEqual(filep.tell(), 10)
+        left.close()
+        right.close()
+
+    def test_error(self):
+        ''' Make sure errors are reported using OSError '''
+        if not utils_sendfile.HAVE_SENDFILE:
+            return
+        filep = _create_file(six.b('0123456789'))
+        self.assertRaises(OSError, utils_sendfile.sendfile, -1,
+                          filep.fileno(), 0, 4)
+
+if __name__ == '__main__':
+    unittest.main()
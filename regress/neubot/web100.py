@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+
+#
+# Copyright (c) 2013
+#     Nexa Center for Internet & Society, Politecnico di Torino (DAUIN)
+#     and Simone Basso <bassosimone@gmail.com>
+#
+# This file is part of Neubot <http://www.neubot.org/>.
+#
+# Neubot is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Neubot is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Neubot.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+''' Regression test for neubot/web100.py '''
+
+import os
+import shutil
+import socket
+import struct
+import sys
+import tempfile
+import unittest
+
+if __name__ == '__main__':
+    sys.path.insert(0, '.')
+
+from neubot import web100
+
+#
+# A small /read group, with a hole between LocalPort and RemAddress,
+# and with CurCwnd that overlaps SndCwnd, as an alias would do.
+#
+HEADER = '''2.5.27 201001301335 net100
+
+/read
+LocalAddressType 0 0 4
+LocalAddress 4 9 17
+LocalPort 21 8 2
+RemAddress 24 9 17
+RemPort 41 8 2
+SndCwnd 43 4 4
+CurCwnd 43 4 4
+HCThruOctetsAcked 47 7 8
+_Private 55 5 4
+
+/tune
+LimCwnd 0 5 4
+'''
+
+def _read_file(local, lport, remote, rport, cwnd, acked):
+    ''' Build the content of a /read file '''
+    return (struct.pack('=I', web100.ADDRTYPE_IPV4) +
+            socket.inet_aton(local) + '\0' * 13 + struct.pack('=H', lport) +
+            '\0' + socket.inet_aton(remote) + '\0' * 13 +
+            struct.pack('=HIQ', rport, cwnd, acked) + '\0' * 4)
+
+class FakeProc(unittest.TestCase):
+
+    ''' Base class for tests that use a fake /proc/web100 '''
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        filep = open(os.path.join(self.root, 'header'), 'w')
+        filep.write(HEADER)
+        filep.close()
+        self.hdr = web100.web100_init(self.root)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def add(self, cid, spec, data=''):
+        ''' Add a connection '''
+        dirname = os.path.join(self.root, str(cid))
+        os.mkdir(dirname)
+        for name, content in (('spec-ascii', spec + '\n'), ('read', data)):
+            filep = open(os.path.join(dirname, name), 'wb')
+            filep.write(content)
+            filep.close()
+        return dirname
+
+class Snap(FakeProc):
+
+    ''' Verifies the decoder '''
+
+    def test_header(self):
+        ''' Make sure we skip private variables '''
+        self.assertEqual(sorted(self.hdr.keys()), ['/read', '/tune'])
+        self.assertFalse('_Private' in self.hdr['/read'])
+        self.assertEqual(self.hdr['/read']['HCThruOctetsAcked'],
+                         (47, web100.COUNTER64, 8))
+
+    def test_snap(self):
+        ''' Make sure we decode all the variables '''
+        dirname = self.add(1, '127.0.0.1:80 127.0.0.2:5000', _read_file(
+                           '127.0.0.1', 80, '127.0.0.2', 5000, 14600,
+                           1 << 40))
+        self.assertEqual(web100.web100_snap(self.hdr, dirname), {
+                         'LocalAddressType': web100.ADDRTYPE_IPV4,
+                         'LocalAddress': '7f000001',
+                         'LocalPort': 80,
+                         'RemAddress': '7f000002',
+                         'RemPort': 5000,
+                         'SndCwnd': 14600,
+                         'CurCwnd': 14600,
+                         'HCThruOctetsAcked': 1 << 40,
+                         })
+
+    def test_short(self):
+        ''' Make sure we don't decode truncated files '''
+        dirname = self.add(1, '127.0.0.1:80 127.0.0.2:5000', '\0' * 20)
+        self.assertEqual(web100.web100_snap(self.hdr, dirname), {})
+
+    def test_gone(self):
+        ''' Make sure we don't fail when the connection is gone '''
+        self.assertEqual(web100.web100_snap(self.hdr, os.path.join(
+                         self.root, '1')), {})
+
+class Find(FakeProc):
+
+    ''' Verifies the connection table '''
+
+    def setUp(self):
+        FakeProc.setUp(self)
+        self.table = web100.ConnectionTable(self.root)
+        self.reads = []
+        self.readspec = web100._web100_readspec
+        web100._web100_readspec = self._readspec
+
+    def tearDown(self):
+        web100._web100_readspec = self.readspec
+        FakeProc.tearDown(self)
+
+    def _readspec(self, dirname):
+        ''' Count the spec files we read '''
+        self.reads.append(os.path.basename(dirname))
+        return self.readspec(dirname)
+
+    def _find(self, spec):
+        ''' Find the directory of the connection with spec '''
+        return web100.web100_find_dirname(self.hdr, spec, self.table)
+
+    def test_incremental(self):
+        ''' Make sure we read the spec of new connections only '''
+        first = self.add(1, '127.0.0.1:80 127.0.0.2:5000')
+        self.assertEqual(self._find('127.0.0.1:80 127.0.0.2:5000'), first)
+        second = self.add(2, '127.0.0.1:80 127.0.0.2:5001')
+        self.assertEqual(self._find('127.0.0.1:80 127.0.0.2:5001'), second)
+        self.assertEqual(self._find('127.0.0.1:80 127.0.0.2:5000'), first)
+        self.assertEqual(sorted(self.reads), ['1', '2'])
+
+    def test_gone(self):
+        ''' Make sure we forget connections that are gone '''
+        self.add(1, '127.0.0.1:80 127.0.0.2:5000')
+        self.assertTrue(self._find('127.0.0.1:80 127.0.0.2:5000'))
+        shutil.rmtree(os.path.join(self.root, '1'))
+        self.assertEqual(self._find('127.0.0.1:80 127.0.0.2:5000'), '')
+        self.assertEqual(self.table.specs, {})
+
+    def test_multiple(self):
+        ''' Make sure we refuse ambiguous specs '''
+        self.add(1, '127.0.0.1:80 127.0.0.2:5000')
+        self.add(2, '127.0.0.1:80 127.0.0.2:5000')
+        self.assertEqual(self._find('127.0.0.1:80 127.0.0.2:5000'), '')
+
+    def test_kernel_bug(self):
+        ''' Make sure we work around the ':::' kernel bug '''
+        dirname = self.add(1, ':::1.80 ::1.5000')
+        self.assertEqual(self._find('::1.80 ::1.5000'), dirname)
+
+if __name__ == '__main__':
+    unittest.main()